@@ -36,6 +36,7 @@ import hashlib
 import importlib.util
 import tempfile
 from datetime import datetime, timedelta, time, timezone
+from typing import Optional, Dict, Any, List, Tuple
 
 # Timezone-aware "now" for consistent timestamps (avoids DST bugs)
 def utc_now() -> datetime:
@@ -57,20 +58,21 @@ def eastern_now() -> datetime:
 # MARKET CALENDAR - NYSE holidays, early closes, trading hours
 # ============================================================================
 
-# Global market calendar instance (lazy-loaded)
-_market_calendar = None
+# Set when the shared calendar cannot be imported (weekday fallback)
+_market_calendar_unavailable = False
 
 def get_market_calendar():
-    """Get NYSE market calendar (lazy-loaded singleton)."""
-    global _market_calendar
-    if _market_calendar is None:
-        try:
-            import pandas_market_calendars as mcal
-            _market_calendar = mcal.get_calendar('NYSE')
-        except ImportError:
-            logger.warning("pandas-market-calendars not installed - market hours checks disabled")
-            return None
-    return _market_calendar
+    """Get the shared NYSE market calendar (lazy-imported), or None if unavailable."""
+    global _market_calendar_unavailable
+    if _market_calendar_unavailable:
+        return None
+    try:
+        from engine.data.market_calendar import get_market_calendar as shared_calendar
+    except ImportError as e:
+        _market_calendar_unavailable = True
+        logging.getLogger('NightShift').warning(f"Market calendar not available ({e}) - falling back to weekdays")
+        return None
+    return shared_calendar()
 
 
 def is_market_open(dt: Optional[datetime] = None) -> bool:
@@ -246,7 +248,6 @@ async def db_execute_with_retry(
 
 
 from pathlib import Path
-from typing import Optional, Dict, Any, List, Tuple
 from dataclasses import dataclass, field
 from multiprocessing import Pool, cpu_count
 from concurrent.futures import ProcessPoolExecutor, as_completed
@@ -267,7 +268,7 @@ try:
     DISCOVERY_AVAILABLE = True
 except ImportError:
     DISCOVERY_AVAILABLE = False
-    logger.warning("Discovery module not available - autonomous mission creation disabled")
+    logging.getLogger('NightShift').warning("Discovery module not available - autonomous mission creation disabled")
 
 # ============================================================================
 # REPRODUCIBILITY - Seed all random number generators
@@ -572,6 +573,12 @@ class RegimeType:
     CRASH_ACCELERATION = 'CRASH_ACCELERATION'      # VIX > 30, term structure inverted, panic
     MELT_UP = 'MELT_UP'                            # VIX declining, strong momentum, FOMO
 
+    # Fixed order: regime codes index into this tuple
+    ALL = (LOW_VOL_GRIND, HIGH_VOL_OSCILLATION, CRASH_ACCELERATION, MELT_UP)
+
+
+REGIME_CODES = {regime: code for code, regime in enumerate(RegimeType.ALL)}
+
 
 @dataclass
 class RegimeState:
@@ -600,6 +607,17 @@ class RegimeMonitor:
     VIX_CRASH_THRESHOLD = 30.0
     TERM_STRUCTURE_INVERSION = -0.05  # VIX9D > VIX by 5%
 
+    # Columns _prepare_regime_inputs reads (alternatives in lookup order)
+    VIX_COLUMNS = ('vix', 'VIX', 'implied_vol', 'iv')
+    VIX9D_COLUMNS = ('vix9d', 'VIX9D', 'vix_9d')
+    SKEW_COLUMNS = ('put_call_skew', 'skew', 'iv_skew')
+    INPUT_COLUMNS = ('close', 'price', 'realized_vol', 'momentum_20d') + VIX_COLUMNS + VIX9D_COLUMNS + SKEW_COLUMNS
+
+    # Regime-tag artifacts kept on disk (most recently used first); each
+    # market data version gets its own file and old versions are never read
+    REGIME_ARTIFACT_LIMIT = 8
+    REGIME_ARTIFACT_TMP_MAX_AGE = 3600  # seconds before a partial write counts as orphaned
+
     def __init__(self, data_dir: Path):
         self.data_dir = data_dir
         self._regime_cache: Dict[str, RegimeState] = {}
@@ -673,12 +691,74 @@ class RegimeMonitor:
             confidence=confidence
         )
 
-    def tag_historical_regimes(self, market_data: pd.DataFrame) -> pd.DataFrame:
+    def classify_regimes(
+        self,
+        vix: np.ndarray,
+        vix9d: np.ndarray,
+        put_call_skew: np.ndarray,
+        spy_momentum_20d: np.ndarray = 0.0
+    ) -> Tuple[np.ndarray, np.ndarray]:
         """
-        Tag each row in market data with its regime classification.
+        Vectorized classify_regime over whole columns.
 
-        Expects columns: date, vix (or implied_vol), price/close
-        Adds column: regime
+        Applies exactly the same decision tree as classify_regime (NaN inputs
+        fall through every comparison, as they do in the scalar version).
+
+        Args:
+            vix: VIX levels
+            vix9d: VIX9D levels
+            put_call_skew: Put-call IV skew
+            spy_momentum_20d: 20-day SPY returns
+
+        Returns:
+            (codes, confidence) - int8 codes indexing RegimeType.ALL, float confidence
+        """
+        vix, vix9d, skew, momentum = np.broadcast_arrays(
+            *(np.asarray(x, dtype=float) for x in (vix, vix9d, put_call_skew, spy_momentum_20d))
+        )
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            term_slope = np.where(vix9d > 0, (vix - vix9d) / vix9d, 0.0)
+
+            crash = (vix > self.VIX_CRASH_THRESHOLD) & (term_slope < self.TERM_STRUCTURE_INVERSION)
+            trending = (vix < self.VIX_LOW_THRESHOLD) & (momentum > 0.02)
+            melt_up = trending & (momentum > 0.05)
+            oscillation = (self.VIX_LOW_THRESHOLD <= vix) & (vix <= self.VIX_HIGH_THRESHOLD)
+            high_vol = vix > self.VIX_HIGH_THRESHOLD
+            fear = high_vol & (skew > 5)
+
+            # Branch order mirrors the if/elif chain in classify_regime
+            conditions = [crash, melt_up, trending, oscillation, fear, high_vol]
+            codes = np.select(conditions, [
+                REGIME_CODES[RegimeType.CRASH_ACCELERATION],
+                REGIME_CODES[RegimeType.MELT_UP],
+                REGIME_CODES[RegimeType.LOW_VOL_GRIND],
+                REGIME_CODES[RegimeType.HIGH_VOL_OSCILLATION],
+                REGIME_CODES[RegimeType.CRASH_ACCELERATION],
+                REGIME_CODES[RegimeType.HIGH_VOL_OSCILLATION],
+            ], default=REGIME_CODES[RegimeType.LOW_VOL_GRIND]).astype(np.int8)
+            confidence = np.select(conditions, [
+                np.minimum(1.0, (vix - self.VIX_CRASH_THRESHOLD) / 10),
+                np.minimum(1.0, momentum / 0.10),
+                1.0 - (vix / self.VIX_LOW_THRESHOLD),
+                1.0 - np.abs(vix - 22.5) / 7.5,
+                0.7,
+                0.8,
+            ], default=0.5)
+
+        return codes, confidence
+
+    @staticmethod
+    def realized_vol(prices: pd.Series) -> pd.Series:
+        """20-day annualized close-to-close volatility (regime input)."""
+        return prices.pct_change().rolling(20).std() * np.sqrt(252)
+
+    def _prepare_regime_inputs(self, market_data: pd.DataFrame) -> Tuple[pd.DataFrame, str, str, str]:
+        """
+        Add derived inputs (realized vol, momentum, VIX/VIX9D/skew estimates).
+
+        Returns:
+            (df, vix_col, vix9d_col, skew_col)
         """
         df = market_data.copy()
 
@@ -686,8 +766,7 @@ class RegimeMonitor:
         if 'realized_vol' not in df.columns:
             price_col = 'close' if 'close' in df.columns else 'price'
             if price_col in df.columns:
-                returns = df[price_col].pct_change()
-                df['realized_vol'] = returns.rolling(20).std() * np.sqrt(252)
+                df['realized_vol'] = self.realized_vol(df[price_col])
 
         # Calculate momentum
         if 'momentum_20d' not in df.columns:
@@ -697,7 +776,7 @@ class RegimeMonitor:
 
         # Use VIX if available, otherwise estimate from realized vol
         vix_col = None
-        for col in ['vix', 'VIX', 'implied_vol', 'iv']:
+        for col in self.VIX_COLUMNS:
             if col in df.columns:
                 vix_col = col
                 break
@@ -709,7 +788,7 @@ class RegimeMonitor:
 
         # VIX9D approximation (if not available, use VIX with small adjustment)
         vix9d_col = None
-        for col in ['vix9d', 'VIX9D', 'vix_9d']:
+        for col in self.VIX9D_COLUMNS:
             if col in df.columns:
                 vix9d_col = col
                 break
@@ -720,7 +799,7 @@ class RegimeMonitor:
 
         # Put-call skew (default to 0 if not available)
         skew_col = None
-        for col in ['put_call_skew', 'skew', 'iv_skew']:
+        for col in self.SKEW_COLUMNS:
             if col in df.columns:
                 skew_col = col
                 break
@@ -729,19 +808,107 @@ class RegimeMonitor:
             df['skew_estimate'] = 0
             skew_col = 'skew_estimate'
 
-        # Classify each row
-        regimes = []
-        for idx, row in df.iterrows():
-            vix = row.get(vix_col, 15)
-            vix9d = row.get(vix9d_col, vix * 0.95)
-            realized = row.get('realized_vol', 0.15)
-            skew = row.get(skew_col, 0)
-            momentum = row.get('momentum_20d', 0)
+        return df, vix_col, vix9d_col, skew_col
+
+    def _classify_frame(self, df: pd.DataFrame, vix_col: str, vix9d_col: str, skew_col: str) -> np.ndarray:
+        """Regime codes for a frame prepared by _prepare_regime_inputs."""
+        momentum = df['momentum_20d'].to_numpy(dtype=float) if 'momentum_20d' in df.columns else 0.0
+        codes, _ = self.classify_regimes(
+            df[vix_col].to_numpy(dtype=float),
+            df[vix9d_col].to_numpy(dtype=float),
+            df[skew_col].to_numpy(dtype=float),
+            momentum
+        )
+        return codes
+
+    def _regime_artifact_path(self, cache_key: str) -> Path:
+        """On-disk location of the regime-tag artifact for a data version."""
+        thresholds = (self.VIX_LOW_THRESHOLD, self.VIX_HIGH_THRESHOLD,
+                      self.VIX_CRASH_THRESHOLD, self.TERM_STRUCTURE_INVERSION)
+        digest = hashlib.sha1(f"{cache_key}|{thresholds}".encode()).hexdigest()[:16]
+        return Path(self.data_dir) / '.cache' / 'regime_tags' / f'{digest}.npy'
+
+    def regime_codes(self, market_data: pd.DataFrame, cache_key: Optional[str] = None) -> np.ndarray:
+        """
+        Regime code per row of market_data (indexes RegimeType.ALL).
+
+        With a cache_key (see market_data_version) the codes are computed once
+        per data version, stored as a .npy artifact under data_dir/.cache and
+        memory-mapped by every later caller - backtest workers share one copy
+        instead of re-tagging the same history per candidate.
+        """
+        path = self._regime_artifact_path(cache_key) if cache_key else None
+
+        if path is not None and path.exists():
+            try:
+                codes = np.load(path, mmap_mode='r')
+                if len(codes) == len(market_data):
+                    os.utime(path)  # Mark as recently used for pruning
+                    return codes
+            except (OSError, ValueError) as e:
+                logger.debug(f"Ignoring unreadable regime artifact {path.name}: {e}")
+
+        codes = self._classify_frame(*self._prepare_regime_inputs(market_data))
+
+        if path is not None:
+            try:
+                path.parent.mkdir(parents=True, exist_ok=True)
+                # Atomic publish: concurrent workers never see a partial file
+                fd, tmp = tempfile.mkstemp(dir=path.parent, suffix='.npy.tmp')
+                with os.fdopen(fd, 'wb') as f:
+                    np.save(f, codes)
+                os.replace(tmp, path)
+            except OSError as e:
+                logger.debug(f"Could not store regime artifact: {e}")
+            else:
+                self._prune_regime_artifacts(path.parent)
+
+        return codes
+
+    def _prune_regime_artifacts(self, directory: Path) -> None:
+        """
+        Bound the regime-tag cache to the REGIME_ARTIFACT_LIMIT most recently
+        used artifacts and drop orphaned temp files.
+
+        Unlinking is safe for readers that already memory-mapped an artifact
+        (the mapping outlives the directory entry).
+        """
+        def mtime(p: Path) -> float:
+            try:
+                return p.stat().st_mtime
+            except OSError:
+                return float('-inf')  # Removed by another process
+
+        artifacts = sorted(directory.glob('*.npy'), key=mtime, reverse=True)
+        stale = artifacts[self.REGIME_ARTIFACT_LIMIT:]
+        cutoff = datetime.now().timestamp() - self.REGIME_ARTIFACT_TMP_MAX_AGE
+        stale += [p for p in directory.glob('*.npy.tmp') if mtime(p) < cutoff]
+
+        for p in stale:
+            try:
+                p.unlink()
+            except OSError:
+                pass
+
+    def tag_historical_regimes(
+        self,
+        market_data: pd.DataFrame,
+        cache_key: Optional[str] = None
+    ) -> pd.DataFrame:
+        """
+        Tag each row in market data with its regime classification.
+
+        Expects columns: date, vix (or implied_vol), price/close
+        Adds column: regime
+        """
+        df, vix_col, vix9d_col, skew_col = self._prepare_regime_inputs(market_data)
 
-            state = self.classify_regime(vix, vix9d, realized, skew, momentum)
-            regimes.append(state.regime)
+        if cache_key:
+            codes = self.regime_codes(market_data, cache_key=cache_key)
+        else:
+            codes = self._classify_frame(df, vix_col, vix9d_col, skew_col)
 
-        df['regime'] = regimes
+        df['regime'] = np.asarray(RegimeType.ALL, dtype=object)[codes]
         return df
 
     def get_regime_performance(
@@ -752,27 +919,56 @@ class RegimeMonitor:
         """
         Calculate strategy performance broken down by regime.
 
+        regimes may hold regime labels or codes from regime_codes; it is
+        aligned with returns by position. All regimes are reduced in one
+        grouped pass (same statistics as calculate_sharpe / calculate_sortino).
+
         Returns dict of {regime: {sharpe, sortino, avg_return, count}}
         """
-        results = {}
-
-        for regime in [RegimeType.LOW_VOL_GRIND, RegimeType.HIGH_VOL_OSCILLATION,
-                       RegimeType.CRASH_ACCELERATION, RegimeType.MELT_UP]:
-            mask = regimes == regime
-            regime_returns = returns[mask]
+        values = np.asarray(returns, dtype=float)
+        regimes = np.asarray(regimes)
+        if regimes.dtype.kind in 'iu':
+            codes = regimes.astype(np.intp)
+        else:
+            codes = pd.Categorical(regimes, categories=RegimeType.ALL).codes.astype(np.intp)
+
+        n_regimes = len(RegimeType.ALL)
+        known = codes >= 0
+        counts = np.bincount(codes[known], minlength=n_regimes)
+
+        # NaN returns count toward the sample size but not the moments (pandas skipna)
+        valid = known & ~np.isnan(values)
+        g, x = codes[valid], values[valid]
+        n = np.bincount(g, minlength=n_regimes)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            mean = np.bincount(g, weights=x, minlength=n_regimes) / n
+            ss = np.bincount(g, weights=(x - mean[g]) ** 2, minlength=n_regimes)
+            std = np.sqrt(ss / (n - 1))
+            downside_vol = np.sqrt(
+                np.bincount(g, weights=np.minimum(x, 0) ** 2, minlength=n_regimes) / n
+            ) * np.sqrt(252)
 
-            if len(regime_returns) < 10:
+        results = {}
+        for code, regime in enumerate(RegimeType.ALL):
+            count = int(counts[code])
+            if count < 10:
                 results[regime] = {
                     'sharpe': 0.0, 'sortino': 0.0,
-                    'avg_return': 0.0, 'count': len(regime_returns)
+                    'avg_return': 0.0, 'count': count
                 }
                 continue
 
+            sharpe = 0.0 if std[code] == 0 else np.sqrt(252) * mean[code] / std[code]
+            if downside_vol[code] == 0:
+                sortino = sharpe  # Fallback to Sharpe (as calculate_sortino)
+            else:
+                sortino = mean[code] * np.sqrt(252) / downside_vol[code]
+
             results[regime] = {
-                'sharpe': calculate_sharpe(regime_returns),
-                'sortino': calculate_sortino(regime_returns),
-                'avg_return': regime_returns.mean() * 252,  # Annualized
-                'count': len(regime_returns)
+                'sharpe': sharpe,
+                'sortino': sortino,
+                'avg_return': mean[code] * 252,  # Annualized
+                'count': count
             }
 
         return results
@@ -782,68 +978,25 @@ class RegimeMonitor:
 # PORTFOLIO CONTRIBUTION - Symphony Fitness
 # ============================================================================
 
-def calculate_portfolio_contribution(
-    candidate_returns: pd.Series,
-    existing_returns: List[pd.Series],
-    existing_weights: Optional[List[float]] = None
-) -> float:
+@dataclass
+class ContributionScores:
+    """Portfolio contribution of K candidates against the active book."""
+    multiplier: np.ndarray        # (K,) Symphony fitness multiplier
+    avg_correlation: np.ndarray   # (K,) mean correlation with overlapping strategies
+    crisis_alpha: np.ndarray      # (K,) candidate mean / |portfolio mean| on portfolio down days
+    marginal_sharpe: np.ndarray   # (K,) Sharpe change from adding the candidate at equal weight
+    correlations: np.ndarray      # (K, N) pairwise correlations (NaN if overlap too short)
+
+
+def _contribution_multiplier(avg_corr: float, crisis_alpha: float) -> float:
     """
-    Calculate how much a candidate strategy contributes to portfolio diversification.
+    Map average correlation and crisis alpha to a fitness multiplier.
 
     Returns multiplier:
     - 5.0x if negatively correlated (makes money when others lose)
     - 1.0x if uncorrelated
     - 0.1x if highly correlated (duplicate exposure)
     """
-    if not existing_returns or candidate_returns.empty:
-        return 1.0  # No existing strategies, neutral contribution
-
-    # Align all returns to same index
-    aligned_returns = []
-    for er in existing_returns:
-        aligned = candidate_returns.align(er, join='inner')[1]
-        if len(aligned) > 20:
-            aligned_returns.append(aligned)
-
-    if not aligned_returns:
-        return 1.0
-
-    # Calculate correlation with each existing strategy
-    correlations = []
-    for er in aligned_returns:
-        corr = candidate_returns.corr(er)
-        if not np.isnan(corr):
-            correlations.append(corr)
-
-    if not correlations:
-        return 1.0
-
-    # Average correlation
-    avg_corr = np.mean(correlations)
-
-    # Calculate portfolio returns (equal weight if no weights provided)
-    if existing_weights is None:
-        existing_weights = [1.0 / len(aligned_returns)] * len(aligned_returns)
-
-    portfolio_returns = sum(
-        w * r for w, r in zip(existing_weights, aligned_returns)
-    )
-
-    # Key metric: does candidate make money when portfolio loses?
-    portfolio_down_mask = portfolio_returns < 0
-    if portfolio_down_mask.sum() > 10:
-        candidate_during_portfolio_down = candidate_returns[portfolio_down_mask].mean()
-        portfolio_during_down = portfolio_returns[portfolio_down_mask].mean()
-
-        # Crisis alpha ratio
-        if portfolio_during_down < 0:
-            crisis_alpha = candidate_during_portfolio_down / abs(portfolio_during_down)
-        else:
-            crisis_alpha = 0
-    else:
-        crisis_alpha = 0
-
-    # Calculate contribution multiplier
     if avg_corr < -0.3 and crisis_alpha > 0.5:
         # Strongly negatively correlated AND makes money in crises
         multiplier = 5.0
@@ -863,33 +1016,263 @@ def calculate_portfolio_contribution(
     return round(multiplier, 2)
 
 
-def get_existing_active_returns(supabase: Client, data_dir: Path) -> List[pd.Series]:
+class ActiveReturnBook:
     """
-    Fetch daily returns for all active strategies.
+    Daily returns of the active strategies as one aligned (T x N) matrix.
 
-    Used for portfolio contribution calculation.
+    Scoring any number of candidates against the whole book is a handful of
+    matrix products over cached per-strategy masks and moments, instead of
+    a Series.align / Series.corr pair per (candidate, strategy). The book is
+    updated incrementally (add / remove / sync) rather than reloaded each
+    cycle.
     """
-    try:
-        # Get active strategies with stored returns
-        result = supabase.table('strategy_genome').select(
-            'id', 'metadata'
-        ).eq('status', 'active').execute()
 
-        returns_list = []
-        for strategy in (result.data or []):
-            metadata = strategy.get('metadata', {})
-            daily_returns = metadata.get('daily_returns')
+    def __init__(self, min_overlap: int = 20):
+        """
+        Args:
+            min_overlap: Strategies sharing this many days or fewer with a
+                candidate are ignored for that candidate
+        """
+        self.min_overlap = min_overlap
+        self._ids: List[str] = []
+        self._index = pd.Index([])
+        self._values = np.empty((0, 0))
+        self._labels = np.empty((0, 0), dtype=bool)  # Date present in the strategy's series (even if NaN)
+        self._without_returns: set = set()
+        self._cache: Optional[Dict[str, Any]] = None
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def __contains__(self, strategy_id: str) -> bool:
+        return strategy_id in self._ids
+
+    @property
+    def strategy_ids(self) -> List[str]:
+        return list(self._ids)
+
+    def add(self, strategy_id: str, returns: pd.Series) -> None:
+        """Add (or replace) a strategy's daily returns."""
+        returns = pd.Series(returns, dtype=float)
+        if strategy_id in self._ids:
+            self.remove(strategy_id)
+
+        if not returns.index.isin(self._index).all():
+            index = self._index.union(returns.index)
+            expanded = np.full((len(index), self._values.shape[1]), np.nan)
+            labels = np.zeros(expanded.shape, dtype=bool)
+            if len(self._index):
+                rows = index.get_indexer(self._index)
+                expanded[rows] = self._values
+                labels[rows] = self._labels
+            self._index, self._values, self._labels = index, expanded, labels
+
+        rows = self._index.get_indexer(returns.index)
+        column = np.full(len(self._index), np.nan)
+        column[rows] = returns.to_numpy()
+        present = np.zeros(len(self._index), dtype=bool)
+        present[rows] = True
+        self._values = np.column_stack([self._values, column])
+        self._labels = np.column_stack([self._labels, present])
+        self._ids.append(strategy_id)
+        self._without_returns.discard(strategy_id)
+        self._cache = None
+
+    def remove(self, strategy_id: str) -> None:
+        """Drop a retired strategy (no-op if unknown)."""
+        self._without_returns.discard(strategy_id)
+        if strategy_id not in self._ids:
+            return
+        col = self._ids.index(strategy_id)
+        self._values = np.delete(self._values, col, axis=1)
+        self._labels = np.delete(self._labels, col, axis=1)
+        del self._ids[col]
+        self._cache = None
 
-            if daily_returns:
-                # Convert stored returns to Series
-                returns_series = pd.Series(daily_returns)
-                returns_list.append(returns_series)
+    def sync(self, supabase: Client) -> Tuple[int, int]:
+        """
+        Bring the book in line with the active strategies in Supabase.
 
-        return returns_list
+        Only the ids are queried every cycle; stored returns are fetched for
+        newly active strategies alone.
 
-    except Exception as e:
-        logger.warning(f"Failed to fetch existing returns: {e}")
-        return []
+        Returns:
+            (added, removed) counts
+        """
+        result = supabase.table('strategy_genome').select('id').eq('status', 'active').execute()
+        active = {row['id'] for row in (result.data or [])}
+
+        retired = [sid for sid in self._ids + list(self._without_returns) if sid not in active]
+        for sid in retired:
+            self.remove(sid)
+
+        new_ids = [sid for sid in active if sid not in self._ids and sid not in self._without_returns]
+        added = 0
+        if new_ids:
+            rows = supabase.table('strategy_genome').select(
+                'id', 'metadata'
+            ).in_('id', new_ids).execute()
+            for row in (rows.data or []):
+                daily_returns = (row.get('metadata') or {}).get('daily_returns')
+                if daily_returns:
+                    self.add(row['id'], pd.Series(daily_returns))
+                    added += 1
+                else:
+                    self._without_returns.add(row['id'])
+
+        return added, len(retired)
+
+    def _moments(self) -> Dict[str, Any]:
+        """Masks, zero-filled values and (when dense) centered columns/norms."""
+        if self._cache is None:
+            valid = ~np.isnan(self._values)
+            filled = np.where(valid, self._values, 0.0)
+            cache = {
+                'valid': valid.astype(float),
+                'labels': self._labels.astype(float),
+                'missing': (~valid).astype(float),
+                'filled': filled,
+                'filled_sq': filled ** 2,
+                'dense': bool(valid.all()),
+            }
+            if cache['dense'] and len(self._index):
+                centered = self._values - self._values.mean(axis=0)
+                cache['centered'] = centered
+                cache['norms'] = np.sqrt((centered ** 2).sum(axis=0))
+            self._cache = cache
+        return self._cache
+
+    def _align(self, candidates: List[pd.Series]) -> Tuple[np.ndarray, np.ndarray]:
+        """Candidate returns on the book's index (NaN-padded) and label-presence mask."""
+        K = len(candidates)
+        values = np.full((len(self._index), K), np.nan)
+        present = np.zeros((len(self._index), K), dtype=bool)
+        for k, candidate in enumerate(candidates):
+            candidate = pd.Series(candidate, dtype=float)
+            pos = self._index.get_indexer(candidate.index)
+            hit = pos >= 0
+            values[pos[hit], k] = candidate.to_numpy()[hit]
+            present[pos[hit], k] = True
+        return values, present
+
+    def score(
+        self,
+        candidates: List[pd.Series],
+        weights: Optional[np.ndarray] = None
+    ) -> ContributionScores:
+        """
+        Score candidates against the book in one pass.
+
+        Args:
+            candidates: Candidate daily return series (aligned to the book by label)
+            weights: Optional per-strategy portfolio weights (book column order);
+                equal weight over the overlapping strategies by default
+
+        Returns:
+            ContributionScores
+        """
+        K, N = len(candidates), len(self._ids)
+        if K == 0 or N == 0:
+            nan = np.full(K, np.nan)
+            return ContributionScores(np.ones(K), nan, np.zeros(K), nan.copy(), np.empty((K, N)))
+
+        m = self._moments()
+        C, present = self._align(candidates)
+        c_valid = ~np.isnan(C)
+        C0 = np.where(c_valid, C, 0.0)
+        Mc = c_valid.astype(float)
+
+        # Overlap counts shared dates, NaN values included (Series.align);
+        # correlations use the pairwise-complete samples (Series.corr)
+        overlap = present.T.astype(float) @ m['labels']
+        n = Mc.T @ m['valid']
+        with np.errstate(divide='ignore', invalid='ignore'):
+            if m['dense'] and c_valid.all():
+                Cc = C - C.mean(axis=0)
+                corr = (Cc.T @ m['centered']) / np.outer(np.sqrt((Cc ** 2).sum(axis=0)), m['norms'])
+            else:
+                sx = C0.T @ m['valid']
+                sy = Mc.T @ m['filled']
+                cov = C0.T @ m['filled'] - sx * sy / n
+                var_x = (C0 ** 2).T @ m['valid'] - sx ** 2 / n
+                var_y = Mc.T @ m['filled_sq'] - sy ** 2 / n
+                corr = cov / np.sqrt(var_x * var_y)
+
+        overlapping = overlap > self.min_overlap
+        corr = np.where(overlapping & np.isfinite(corr), corr, np.nan)
+        has_corr = np.isfinite(corr).any(axis=1)
+        with np.errstate(invalid='ignore'):
+            avg_corr = np.where(has_corr, np.nanmean(np.where(has_corr[:, None], corr, 0.0), axis=1), np.nan)
+
+        # Portfolio of overlapping strategies per candidate: (T x K)
+        if weights is None:
+            W = overlapping / np.maximum(overlapping.sum(axis=1, keepdims=True), 1)
+        else:
+            W = overlapping * np.asarray(weights, dtype=float)[None, :]
+        portfolio = m['filled'] @ W.T
+        p_valid = present & ((m['missing'] @ overlapping.T.astype(float)) == 0)
+
+        # Crisis alpha: does the candidate make money when the portfolio loses?
+        down = p_valid & (portfolio < 0)
+        n_down = down.sum(axis=0)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            cand_down = (C0 * down).sum(axis=0) / (down & c_valid).sum(axis=0)
+            port_down = np.where(down, portfolio, 0.0).sum(axis=0) / n_down
+            crisis_alpha = np.where(
+                (n_down > 10) & (port_down < 0), cand_down / np.abs(port_down), 0.0
+            )
+
+            # Marginal Sharpe: candidate added at equal weight to the overlapping book
+            both = p_valid & c_valid
+            n_both = both.sum(axis=0)
+            n_members = overlapping.sum(axis=1)
+            blend = (portfolio * n_members + C0) / (n_members + 1)
+
+            def _sharpe(x):
+                mean = np.where(both, x, 0.0).sum(axis=0) / n_both
+                var = np.where(both, (x - mean) ** 2, 0.0).sum(axis=0) / (n_both - 1)
+                return np.sqrt(252) * mean / np.sqrt(var)
+
+            marginal_sharpe = np.where(n_members > 0, _sharpe(blend) - _sharpe(portfolio), np.nan)
+
+        multiplier = np.array([
+            _contribution_multiplier(a, c) if np.isfinite(a) else 1.0
+            for a, c in zip(avg_corr, crisis_alpha)
+        ])
+
+        return ContributionScores(
+            multiplier=multiplier,
+            avg_correlation=avg_corr,
+            crisis_alpha=crisis_alpha,
+            marginal_sharpe=marginal_sharpe,
+            correlations=corr
+        )
+
+
+def calculate_portfolio_contribution(
+    candidate_returns: pd.Series,
+    existing_returns: List[pd.Series],
+    existing_weights: Optional[List[float]] = None
+) -> float:
+    """
+    Calculate how much a candidate strategy contributes to portfolio diversification.
+
+    Single-candidate convenience wrapper over ActiveReturnBook.score.
+
+    Returns multiplier:
+    - 5.0x if negatively correlated (makes money when others lose)
+    - 1.0x if uncorrelated
+    - 0.1x if highly correlated (duplicate exposure)
+    """
+    if not existing_returns or candidate_returns.empty:
+        return 1.0  # No existing strategies, neutral contribution
+
+    book = ActiveReturnBook()
+    for i, er in enumerate(existing_returns):
+        book.add(str(i), er)
+
+    scores = book.score([candidate_returns], weights=existing_weights)
+    return float(scores.multiplier[0])
 
 
 # ============================================================================
@@ -959,6 +1342,7 @@ class ShadowTrader:
         regime_monitor: 'RegimeMonitor',
         symbols: Optional[List[str]] = None,
         api_key: Optional[str] = None,
+        client: Optional['ThetaDataClient'] = None,
     ):
         self.supabase = supabase
         self.regime_monitor = regime_monitor
@@ -966,7 +1350,8 @@ class ShadowTrader:
         self.api_key = api_key
 
         # State
-        self._client: Optional['ThetaDataClient'] = None
+        # client: pre-built feed with the ThetaDataClient interface (e.g. tick_replay.ReplayClient)
+        self._client: Optional['ThetaDataClient'] = client
         self._running = False
         self._positions: Dict[str, ShadowPosition] = {}  # position_id -> position
         self._strategy_positions: Dict[str, List[str]] = {}  # strategy_id -> [position_ids]
@@ -1024,11 +1409,12 @@ class ShadowTrader:
         logger.info("🔮 [ShadowTrader] Starting live paper trading via ThetaData...")
 
         try:
-            # Create ThetaData client with callbacks
-            self._client = ThetaDataClient(
-                auto_reconnect=True,
-                reconnect_delay=5.0,
-            )
+            # Create ThetaData client unless a feed was injected (tick replay)
+            if self._client is None:
+                self._client = ThetaDataClient(
+                    auto_reconnect=True,
+                    reconnect_delay=5.0,
+                )
 
             # Connect to Theta Terminal
             if not await self._client.connect():
@@ -2095,6 +2481,181 @@ def calculate_convexity_score(returns: pd.Series) -> float:
     return max(0, min(2.0, convexity))  # Clamp to [0, 2]
 
 
+def market_data_version(files: List[Path]) -> str:
+    """
+    Cheap version key for a set of market data files.
+
+    Hashes file names, sizes and modification times (no file contents), so it
+    changes whenever a file is added, removed or rewritten.
+    """
+    h = hashlib.sha1()
+    for f in sorted(files):
+        st = f.stat()
+        h.update(f"{f.name}:{st.st_size}:{st.st_mtime_ns};".encode())
+    return h.hexdigest()
+
+
+def find_market_data_files(
+    data_path: Path,
+    start_date: str,
+    end_date: str
+) -> Tuple[List[Path], Optional[str]]:
+    """
+    Locate SPY Parquet files whose filename date is within [start_date, end_date].
+
+    Returns:
+        (files, error) - error is set when no SPY data exists at all
+    """
+    # Find available data files (prioritize stocks_trades)
+    trades_dir = data_path / 'stocks_trades' / 'SPY'
+    if not trades_dir.exists():
+        # Fallback: look for any available data
+        available_dirs = list(data_path.glob('*/SPY'))
+        if not available_dirs:
+            return [], "No market data found for SPY"
+        trades_dir = available_dirs[0]
+
+    parquet_files = sorted(trades_dir.glob('*.parquet'))
+    if not parquet_files:
+        return [], "No Parquet files found"
+
+    start, end = start_date.replace('-', ''), end_date.replace('-', '')
+    # Extract date from filename: SPY_20241120.parquet
+    in_range = [pf for pf in parquet_files if start <= pf.stem.split('_')[-1] <= end]
+    return in_range, None
+
+
+def with_realized_vol(combined: pl.DataFrame) -> pl.DataFrame:
+    """
+    Add the regime monitor's realized_vol column to raw market data.
+
+    Computed once when the data is loaded (or once per snapshot) so workers
+    and regime tagging reuse it instead of re-deriving it per candidate.
+    """
+    price_col = 'close' if 'close' in combined.columns else 'price'
+    if 'realized_vol' in combined.columns or price_col not in combined.columns:
+        return combined
+    rv = RegimeMonitor.realized_vol(combined[price_col].to_pandas())
+    return combined.with_columns(pl.Series('realized_vol', rv.to_numpy(dtype=float)))
+
+
+@dataclass
+class MarketDataSnapshot:
+    """
+    Handle to a per-cycle market data snapshot (Arrow IPC file).
+
+    The director materializes the backtest date range once per data version,
+    including the derived realized_vol column; workers receive this small
+    picklable handle and memory-map the file instead of each decoding and
+    concatenating the same Parquet files. Regime tags for the same data
+    version are cached next to it (RegimeMonitor.regime_codes).
+    """
+    path: str
+    version: str
+    n_rows: int
+
+    # Snapshots kept per data_dir (most recently used first). A snapshot used
+    # within the grace period is never removed: other processes may still be
+    # handing its path to workers.
+    SNAPSHOT_LIMIT = 4
+    SNAPSHOT_GRACE_SECONDS = 3600
+
+    def exists(self) -> bool:
+        return Path(self.path).exists()
+
+    def table(self) -> 'pyarrow.Table':
+        """Zero-copy, read-only Arrow view of the snapshot (columns stay in the mapped file)."""
+        import pyarrow as pa
+        return pa.ipc.open_file(pa.memory_map(self.path, 'r')).read_all()
+
+    def load(self) -> pd.DataFrame:
+        """
+        The snapshot as a writable pandas DataFrame.
+
+        Skips Parquet decoding and concatenation, but converting the mapped
+        columns to pandas copies them into process memory: strategy code may
+        modify the frame in place, which read-only zero-copy columns reject.
+        """
+        self._touch()
+        return self.table().to_pandas()
+
+    def _touch(self) -> None:
+        try:
+            os.utime(self.path)  # Most recently used, for pruning
+        except OSError:
+            pass
+
+    @classmethod
+    def _prune(cls, snapshot_dir: Path) -> None:
+        """Keep the SNAPSHOT_LIMIT most recently used snapshots; drop orphaned temp files."""
+        def last_used(p: Path) -> float:
+            try:
+                return p.stat().st_mtime
+            except OSError:
+                return float('inf')  # Removed by another process
+
+        cutoff = datetime.now().timestamp() - cls.SNAPSHOT_GRACE_SECONDS
+        snapshots = sorted(snapshot_dir.glob('*.arrow'), key=last_used, reverse=True)
+        stale = snapshots[cls.SNAPSHOT_LIMIT:] + list(snapshot_dir.glob('*.arrow.tmp'))
+
+        for p in stale:
+            if last_used(p) < cutoff:
+                try:
+                    p.unlink()
+                except OSError:
+                    pass
+
+    @classmethod
+    def build(
+        cls,
+        data_dir: Path,
+        start_date: str = '2020-01-01',
+        end_date: str = '2024-12-31',
+        regime_monitor: Optional['RegimeMonitor'] = None
+    ) -> Optional['MarketDataSnapshot']:
+        """
+        Materialize the date range once (reused while the data version is unchanged).
+
+        Returns None when there is no in-range data; workers then fall back
+        to their own loading path.
+        """
+        data_dir = Path(data_dir)
+        files, error = find_market_data_files(data_dir, start_date, end_date)
+        if error or not files:
+            return None
+
+        version = market_data_version(files)
+        key = hashlib.sha1(f"{version}|{start_date}|{end_date}".encode()).hexdigest()[:16]
+        snapshot_dir = data_dir / '.cache' / 'snapshots'
+        path = snapshot_dir / f'{key}.arrow'
+
+        if path.exists():
+            n_rows = pl.scan_ipc(path).select(pl.len()).collect().item()  # Footer only
+        else:
+            combined = with_realized_vol(pl.concat([pl.read_parquet(pf) for pf in files]))
+            n_rows = combined.height
+
+            snapshot_dir.mkdir(parents=True, exist_ok=True)
+            fd, tmp = tempfile.mkstemp(dir=snapshot_dir, suffix='.arrow.tmp')
+            os.close(fd)
+            combined.write_ipc(tmp, compression='uncompressed')  # Uncompressed = mappable
+            os.replace(tmp, path)
+            del combined
+
+        snapshot = cls(path=str(path), version=version, n_rows=n_rows)
+        snapshot._touch()
+        cls._prune(snapshot_dir)
+
+        if regime_monitor is not None:
+            # Pre-warm the shared regime-tag artifact for this data version,
+            # converting only the columns the regime monitor reads
+            table = snapshot.table()
+            inputs = [c for c in RegimeMonitor.INPUT_COLUMNS if c in table.column_names]
+            regime_monitor.regime_codes(table.select(inputs).to_pandas(), cache_key=version)
+
+        return snapshot
+
+
 def execute_strategy_backtest(
     strategy_id: str,
     code_content: str,
@@ -2102,64 +2663,53 @@ def execute_strategy_backtest(
     data_dir: str,
     start_date: str = '2020-01-01',
     end_date: str = '2024-12-31',
-    initial_capital: float = 100000.0
+    initial_capital: float = 100000.0,
+    snapshot: Optional['MarketDataSnapshot'] = None
 ) -> BacktestResult:
     """
     Execute a single strategy backtest (runs in subprocess).
 
-    This function is called by the multiprocessing pool.
+    This function is called by the multiprocessing pool. When the director
+    passes a MarketDataSnapshot the worker maps it instead of re-reading the
+    Parquet files.
     """
     import time as time_module
     start_time = time_module.time()
 
     try:
-        # Load market data from local Parquet files
         data_path = Path(data_dir)
 
-        # Find available data files (prioritize stocks_trades)
-        trades_dir = data_path / 'stocks_trades' / 'SPY'
-        if not trades_dir.exists():
-            # Fallback: look for any available data
-            available_dirs = list(data_path.glob('*/SPY'))
-            if not available_dirs:
+        if snapshot is not None and snapshot.exists():
+            # Shared per-cycle snapshot: no Parquet decoding in the worker
+            market_data = snapshot.load()
+            data_version = snapshot.version
+        else:
+            # Load market data from local Parquet files
+            in_range_files, error = find_market_data_files(data_path, start_date, end_date)
+            if error:
                 return BacktestResult(
                     strategy_id=strategy_id,
                     success=False,
-                    error="No market data found for SPY"
+                    error=error
                 )
-            trades_dir = available_dirs[0]
-
-        # Load Parquet files for date range
-        parquet_files = sorted(trades_dir.glob('*.parquet'))
-        if not parquet_files:
-            return BacktestResult(
-                strategy_id=strategy_id,
-                success=False,
-                error="No Parquet files found"
-            )
 
-        # Load and concatenate data using Polars (faster)
-        dfs = []
-        for pf in parquet_files:
-            # Extract date from filename: SPY_20241120.parquet
-            file_date = pf.stem.split('_')[-1]
-            if start_date.replace('-', '') <= file_date <= end_date.replace('-', ''):
-                dfs.append(pl.read_parquet(pf))
-
-        if not dfs:
-            # Generate synthetic data for testing
-            logger.warning(f"No data in range, using synthetic data for {strategy_id}")
-            dates = pd.date_range(start_date, end_date, freq='D')
-            prices = 100 * np.cumprod(1 + np.random.randn(len(dates)) * 0.01)
-            market_data = pd.DataFrame({
-                'date': dates,
-                'price': prices,
-                'volume': np.random.randint(1000000, 10000000, len(dates))
-            })
-        else:
-            # Combine and convert to pandas
-            combined = pl.concat(dfs)
-            market_data = combined.to_pandas()
+            data_version = None
+            if not in_range_files:
+                # Generate synthetic data for testing
+                logger.warning(f"No data in range, using synthetic data for {strategy_id}")
+                dates = pd.date_range(start_date, end_date, freq='D')
+                prices = 100 * np.cumprod(1 + np.random.randn(len(dates)) * 0.01)
+                market_data = pd.DataFrame({
+                    'date': dates,
+                    'price': prices,
+                    'volume': np.random.randint(1000000, 10000000, len(dates))
+                })
+            else:
+                # Load, combine and convert to pandas using Polars (faster);
+                # same columns as a snapshot, including realized_vol
+                combined = with_realized_vol(pl.concat([pl.read_parquet(pf) for pf in in_range_files]))
+                market_data = combined.to_pandas()
+                data_version = market_data_version(in_range_files)
 
         # Execute strategy code dynamically
         # Create a safe execution environment
@@ -2187,16 +2737,16 @@ def execute_strategy_backtest(
         # ================================================================
         # REGIME TAGGING - The Conductor's Score
         # ================================================================
+        # Tags are computed once per data version and memory-mapped afterwards
         regime_monitor = RegimeMonitor(data_path)
-        market_data_tagged = regime_monitor.tag_historical_regimes(market_data)
-        regimes = market_data_tagged['regime'] if 'regime' in market_data_tagged.columns else pd.Series()
+        regimes = regime_monitor.regime_codes(market_data, cache_key=data_version)
 
         # Calculate regime-specific performance
         regime_performance = {}
         target_regime = ''
         best_regime_sharpe = -float('inf')
 
-        if not regimes.empty and len(returns) == len(regimes):
+        if len(regimes) > 0 and len(returns) == len(regimes):
             regime_performance = regime_monitor.get_regime_performance(returns, regimes)
 
             # Determine target regime (best performing regime for this strategy)
@@ -2418,6 +2968,9 @@ class ResearchDirector:
             'errors': 0
         }
 
+        # Active strategy returns for Symphony fitness (synced incrementally each cycle)
+        self.return_book = ActiveReturnBook()
+
         # Initialize Shadow Trader for live validation
         self.regime_monitor = RegimeMonitor(config.data_dir)
         self.shadow_trader: Optional[ShadowTrader] = None
@@ -3787,8 +4340,26 @@ class Strategy:
             # ================================================================
             # SYMPHONY FITNESS: Get existing active strategy returns
             # ================================================================
-            existing_returns = get_existing_active_returns(self.supabase, self.config.data_dir)
-            logger.info(f"   Loaded {len(existing_returns)} existing active strategies for correlation")
+            try:
+                added, removed = self.return_book.sync(self.supabase)
+                logger.info(
+                    f"   Return book: {len(self.return_book)} active strategies for correlation "
+                    f"(+{added} / -{removed})"
+                )
+            except Exception as e:
+                logger.warning(f"Failed to sync active returns, using previous book: {e}")
+
+            # Materialize market data (and regime tags) once for the whole cycle
+            snapshot = None
+            try:
+                snapshot = await asyncio.to_thread(
+                    MarketDataSnapshot.build, self.config.data_dir,
+                    regime_monitor=self.regime_monitor
+                )
+                if snapshot is not None:
+                    logger.info(f"   Market data snapshot: {snapshot.n_rows:,} rows shared across workers")
+            except Exception as e:
+                logger.warning(f"   Market data snapshot failed, workers will load Parquet directly: {e}")
 
             # Prepare backtest tasks
             tasks = [
@@ -3808,7 +4379,8 @@ class Strategy:
                 futures = {
                     executor.submit(
                         execute_strategy_backtest,
-                        task[0], task[1], task[2], task[3]
+                        task[0], task[1], task[2], task[3],
+                        snapshot=snapshot
                     ): task[0]
                     for task in tasks
                 }
@@ -3832,30 +4404,27 @@ class Strategy:
             # ================================================================
             logger.info("   Calculating portfolio contributions...")
 
-            for result in results:
-                if result.success and result.daily_returns:
-                    candidate_returns = pd.Series(result.daily_returns)
+            scored = [r for r in results if r.success and r.daily_returns]
+            scores = self.return_book.score([pd.Series(r.daily_returns) for r in scored])
 
-                    # Calculate portfolio contribution multiplier
-                    contribution = calculate_portfolio_contribution(
-                        candidate_returns,
-                        existing_returns
-                    )
+            for i, result in enumerate(scored):
+                contribution = float(scores.multiplier[i])
 
-                    # Apply multiplier to fitness
-                    result.portfolio_contribution = contribution
-                    symphony_fitness = result.fitness_score * contribution
+                # Apply multiplier to fitness
+                result.portfolio_contribution = contribution
+                symphony_fitness = result.fitness_score * contribution
 
-                    logger.info(
-                        f"   {result.strategy_id[:8]}: "
-                        f"Base={result.fitness_score:.3f} × "
-                        f"Contribution={contribution:.1f}x = "
-                        f"Symphony={symphony_fitness:.3f} "
-                        f"[Target: {result.target_regime or 'UNKNOWN'}]"
-                    )
+                logger.info(
+                    f"   {result.strategy_id[:8]}: "
+                    f"Base={result.fitness_score:.3f} × "
+                    f"Contribution={contribution:.1f}x = "
+                    f"Symphony={symphony_fitness:.3f} "
+                    f"[Marginal Sharpe: {scores.marginal_sharpe[i]:+.3f}] "
+                    f"[Target: {result.target_regime or 'UNKNOWN'}]"
+                )
 
-                    # Update fitness with symphony multiplier
-                    result.fitness_score = round(symphony_fitness, 4)
+                # Update fitness with symphony multiplier
+                result.fitness_score = round(symphony_fitness, 4)
 
             # Update Supabase with results
             promoted = 0
@@ -3899,6 +4468,10 @@ class Strategy:
                     }).eq('id', result.strategy_id).execute()
                     promoted += 1
 
+                    if new_status == 'active' and result.daily_returns:
+                        # Later candidates in this session score against it immediately
+                        self.return_book.add(result.strategy_id, pd.Series(result.daily_returns))
+
                     if RED_TEAM_AVAILABLE:
                         logger.info(f"   🔴 Queued for Red Team: {result.strategy_id[:8]} (Fitness: {result.fitness_score:.4f})")
                     else:
@@ -18,15 +18,20 @@ Author: Market Physics Engine
 Layer: 3-7 Bridge
 """
 
+import bisect
 import json
 import logging
-from dataclasses import dataclass, field, asdict
+import warnings
+from collections import deque
+from dataclasses import dataclass, field, asdict, replace
 from datetime import datetime
-from typing import Dict, List, Optional, Any, Tuple
+from typing import Dict, List, Mapping, Optional, Any, Tuple, Union
 from enum import Enum
 
 import pandas as pd
 import numpy as np
+from scipy import stats
+from scipy.signal import savgol_coeffs
 
 # Import force calculation modules
 import sys
@@ -39,11 +44,13 @@ from engine.features.entropy import (
     fano_predictability_limit
 )
 from engine.features.flow import (
+    StreamingVPIN,
     calculate_vpin,
     kyle_lambda_regression,
     calculate_ofi
 )
 from engine.features.correlation import (
+    RollingPCA,
     rolling_absorption_ratio,
     eigenvalue_entropy,
     empirical_tail_dependence
@@ -66,6 +73,7 @@ from engine.features.change_point import (
 from engine.features.duration import (
     analyze_regime_hazard,
     extract_regime_durations,
+    hazard_from_durations,
     compute_minsky_moment_probability
 )
 from engine.features.morphology import (
@@ -261,6 +269,74 @@ class MarketPhysicsState:
         return "\n".join(lines)
 
 
+# =============================================================================
+# ORDER STATISTICS
+# =============================================================================
+
+class RollingPercentile:
+    """
+    Percentile rank over the last `maxlen` finite values.
+
+    A ring of values in arrival order plus the same values kept sorted:
+    each update is one bisect insert and one bisect removal, and the rank
+    of the new value is a bisect into the sorted list (no array rebuild or
+    finiteness re-scan per call).
+    """
+
+    def __init__(self, maxlen: int = 252):
+        self.maxlen = maxlen
+        self._ring: deque = deque()
+        self._sorted: List[float] = []
+
+    def __len__(self) -> int:
+        return len(self._ring)
+
+    def update(self, value: float) -> float:
+        """
+        Add a value and return its percentile rank (0-100) in the window.
+
+        Non-finite values are not stored and rank as neutral (50).
+        """
+        if not np.isfinite(value):
+            return 50.0
+        value = float(value)
+
+        if len(self._ring) >= self.maxlen:
+            oldest = self._ring.popleft()
+            del self._sorted[bisect.bisect_left(self._sorted, oldest)]
+        self._ring.append(value)
+        bisect.insort(self._sorted, value)
+
+        n = len(self._sorted)
+        if n <= 1:
+            return 50.0
+        # What % of the window is <= the current value
+        return float(np.clip(bisect.bisect_right(self._sorted, value) / n * 100, 0.0, 100.0))
+
+    def values(self) -> List[float]:
+        """Window contents in arrival order."""
+        return list(self._ring)
+
+
+@dataclass
+class _ForceOutputs:
+    """Force vectors and context accumulated while building one state."""
+    forces: List[ForceVector] = field(default_factory=list)
+    raw_metrics: Dict[str, Any] = field(default_factory=dict)
+    warnings: List[str] = field(default_factory=list)
+    observations: List[str] = field(default_factory=list)
+
+
+# Numeric columns that are not asset prices
+_NON_ASSET_COLUMNS = ('returns', 'volume')
+
+
+def _correlation_columns(df: pd.DataFrame) -> List[str]:
+    """Columns used for the absorption ratio (first 10 numeric price columns)."""
+    numeric = [c for c in df.select_dtypes(include=[np.number]).columns if c not in _NON_ASSET_COLUMNS]
+    return numeric[:10]
+
+
 class ForceAggregator:
     """
     Aggregates all Market Physics Engine calculations
@@ -272,7 +348,8 @@ class ForceAggregator:
         n_regimes: int = 2,
         entropy_window: int = 20,
         flow_window: int = 50,
-        correlation_window: int = 60
+        correlation_window: int = 60,
+        percentile_window: int = 252
     ):
         """
         Initialize Force Aggregator.
@@ -282,42 +359,32 @@ class ForceAggregator:
             entropy_window: Window for entropy calculations
             flow_window: Window for flow calculations
             correlation_window: Window for correlation calculations
+            percentile_window: Observations kept per force for percentile ranks
         """
         self.n_regimes = n_regimes
         self.entropy_window = entropy_window
         self.flow_window = flow_window
         self.correlation_window = correlation_window
+        self.percentile_window = percentile_window
 
         # HMM model (fitted on first call)
         self.hmm = None
         self.regime_names = ["Bear/HighVol", "Bull/LowVol"]  # Default
 
         # Historical percentiles
-        self.history: Dict[str, List[float]] = {}
+        self.history: Dict[str, RollingPercentile] = {}
 
     def _compute_percentile(self, name: str, value: float) -> float:
         """Compute percentile rank based on historical values."""
-        # FA_R6_4: Handle NaN values early (np.array <= NaN returns all False)
+        # FA_R6_4: Handle NaN values early (neutral percentile, not stored)
         if not np.isfinite(value):
-            return 50.0  # Neutral percentile for invalid values
+            return 50.0
 
         if name not in self.history:
-            self.history[name] = []
-
-        self.history[name].append(value)
+            self.history[name] = RollingPercentile(self.percentile_window)
 
-        # Keep last 252 values (1 year)
-        if len(self.history[name]) > 252:
-            self.history[name] = self.history[name][-252:]
-
-        # Compute percentile rank (what % of historical values are <= current value)
-        valid_history = [v for v in self.history[name] if np.isfinite(v)]
-        if len(valid_history) <= 1:
-            return 50.0
-
-        percentile = float(np.sum(np.array(valid_history) <= value) / len(valid_history) * 100)
-        # FA21: Ensure percentile is in valid range [0, 100]
-        return float(np.clip(percentile, 0.0, 100.0))
+        # FA21: RollingPercentile ranks in [0, 100]
+        return self.history[name].update(value)
 
     def _value_to_strength(self, value: float, thresholds: Tuple[float, ...]) -> ForceStrength:
         """Convert value to qualitative strength."""
@@ -384,6 +451,9 @@ class ForceAggregator:
         """
         Compute all forces and aggregate into MarketPhysicsState.
 
+        Recomputes every force over the whole DataFrame; for bar-by-bar
+        refreshes use StreamingForceEngine.
+
         Args:
             df: DataFrame with OHLCV and options data
             symbol: Symbol being analyzed
@@ -393,10 +463,7 @@ class ForceAggregator:
         """
         logger.info(f"Computing forces for {symbol}...")
 
-        forces = []
-        raw_metrics = {}
-        warnings = []
-        observations = []
+        out = _ForceOutputs()
 
         # Ensure we have returns
         if 'returns' not in df.columns and 'close' in df.columns:
@@ -413,31 +480,10 @@ class ForceAggregator:
             entropy_result = compute_entropy_dynamics(
                 returns, lookback=self.entropy_window
             )
-
-            entropy_val = entropy_result.current_entropy
-            # FA_R6_3: Validate value is finite before creating ForceVector
-            if not np.isfinite(entropy_val):
-                entropy_val = 2.5  # Default to mid-range entropy
-            # FA7 + FA_R7_6: Use np.isfinite() to catch both NaN and Inf
-            entropy_vel = float(entropy_result.entropy_velocity) if np.isfinite(entropy_result.entropy_velocity) else 0.0
-
-            forces.append(ForceVector(
-                name="shannon_entropy",
-                category=ForceCategory.ENTROPY,
-                value=entropy_val,
-                percentile=self._compute_percentile("shannon_entropy", entropy_val),
-                strength=self._value_to_strength(
-                    entropy_val, (1.0, 1.5, 2.0, 2.3, 2.7, 3.0, 3.5, 4.0)
-                ),
-                velocity=entropy_vel,
-                interpretation=f"Market uncertainty {'decaying' if entropy_result.is_decaying else 'stable/rising'}"
-            ))
-
-            raw_metrics['entropy'] = entropy_val
-            raw_metrics['entropy_velocity'] = entropy_vel
-
-            if entropy_result.is_decaying:
-                observations.append("Entropy decaying - consensus forming")
+            self._add_entropy_force(
+                out, entropy_result.current_entropy,
+                entropy_result.entropy_velocity, entropy_result.is_decaying
+            )
         except Exception as e:
             logger.warning(f"Entropy calculation failed: {e}")
 
@@ -461,32 +507,7 @@ class ForceAggregator:
                     bucket_size = np.median(volumes[volumes > 0]) if np.any(volumes > 0) else 1e6
 
                     vpin_values, _ = calculate_vpin(prices, volumes, bucket_size, n_buckets=50)
-                    if len(vpin_values) > 0:
-                        vpin_val = float(vpin_values[-1])
-
-                        # FA_R6_3: Validate value is finite before creating ForceVector
-                        if not np.isfinite(vpin_val):
-                            logger.warning(f"VPIN value is not finite: {vpin_val}, skipping")
-                            vpin_val = None
-
-                        if vpin_val is not None:
-                            forces.append(ForceVector(
-                                name="vpin",
-                                category=ForceCategory.FLOW,
-                                value=vpin_val,
-                                percentile=self._compute_percentile("vpin", vpin_val),
-                                strength=self._value_to_strength(
-                                    vpin_val, (0.1, 0.2, 0.3, 0.4, 0.5, 0.6, 0.7, 0.8)
-                                ),
-                                # FA8 + FA17: Check finiteness of both input AND output
-                                velocity=self._safe_velocity(vpin_values),
-                                interpretation=f"Order flow toxicity {'elevated' if vpin_val > 0.5 else 'normal'}"
-                            ))
-
-                            raw_metrics['vpin'] = vpin_val
-
-                            if vpin_val > 0.7:
-                                warnings.append("VPIN elevated - toxic flow detected")
+                    self._add_vpin_force(out, vpin_values)
         except Exception as e:
             logger.warning(f"VPIN calculation failed: {e}")
 
@@ -496,7 +517,7 @@ class ForceAggregator:
         try:
             if len(df.columns) > 5:  # Need multiple assets
                 # Try absorption ratio
-                numeric_cols = df.select_dtypes(include=[np.number]).columns[:10]
+                numeric_cols = _correlation_columns(df)
                 if len(numeric_cols) >= 3:
                     # FA_R7_4: Validate returns_matrix has no NaN/Inf
                     returns_matrix = df[numeric_cols].pct_change().dropna(how='any')
@@ -504,37 +525,11 @@ class ForceAggregator:
                     returns_matrix = returns_matrix.replace([np.inf, -np.inf], np.nan).dropna()
                     if len(returns_matrix) > self.correlation_window:
                         ar = rolling_absorption_ratio(
-                            returns_matrix.values,
+                            returns_matrix,
                             window=self.correlation_window,
-                            n_components=min(3, len(numeric_cols) // 2)
-                        )
-
-                        if len(ar) > 0:
-                            ar_val = ar[-1]
-
-                            # FA_R6_3: Validate value is finite before creating ForceVector
-                            if not np.isfinite(ar_val):
-                                logger.warning(f"Absorption ratio value is not finite: {ar_val}, skipping")
-                                ar_val = None
-
-                            if ar_val is not None:
-                                forces.append(ForceVector(
-                                    name="absorption_ratio",
-                                    category=ForceCategory.CORRELATION,
-                                    value=ar_val,
-                                    percentile=self._compute_percentile("absorption_ratio", ar_val),
-                                    strength=self._value_to_strength(
-                                        ar_val, (0.3, 0.4, 0.5, 0.6, 0.7, 0.8, 0.85, 0.9)
-                                    ),
-                                    # FA18: Use consistent safe_velocity method (not weak ~np.isnan check)
-                                    velocity=self._safe_velocity(ar),
-                                    interpretation=f"Systemic risk {'elevated' if ar_val > 0.8 else 'normal'}"
-                                ))
-
-                                raw_metrics['absorption_ratio'] = ar_val
-
-                                if ar_val > 0.85:
-                                    warnings.append("Absorption ratio high - systemic risk elevated")
+                            n_factors=min(3, len(numeric_cols) // 2)
+                        ).values
+                        self._add_absorption_force(out, ar)
         except Exception as e:
             logger.warning(f"Correlation calculation failed: {e}")
 
@@ -551,23 +546,6 @@ class ForceAggregator:
             if self.hmm is not None:
                 hmm_result = self.hmm.decode(returns)
 
-                # Get regime state
-                current_regime = hmm_result.most_likely_regime[-1]
-
-                # FA_R6_1: Validate regime index is within bounds
-                n_regimes = hmm_result.regime_probabilities.shape[1]
-                if current_regime < 0 or current_regime >= n_regimes:
-                    logger.warning(
-                        f"Invalid regime index {current_regime} (n_regimes={n_regimes}). "
-                        "Defaulting to regime 0."
-                    )
-                    current_regime = 0
-
-                # FA5: Clip probability to [0,1] - HMMs can have slight numerical issues
-                regime_prob = float(np.clip(
-                    hmm_result.regime_probabilities[-1, current_regime], 0.0, 1.0
-                ))
-
                 # Duration analysis
                 regime_series = hmm_result.most_likely_regime
                 # FA_R6_6: Removed unused durations variable
@@ -578,11 +556,7 @@ class ForceAggregator:
                     else:
                         break
 
-                # FA4: Hazard rate with safe indexing (prevent negative index)
                 hazard_result = analyze_regime_hazard(regime_series)
-                idx = max(0, min(days_in_regime - 1, len(hazard_result.hazard_rates) - 1))
-                hazard_rate = hazard_result.hazard_rates[idx] \
-                    if len(hazard_result.hazard_rates) > 0 else 0.05
 
                 # Critical slowing down
                 csd = critical_slowing_down_indicators(returns)
@@ -590,85 +564,27 @@ class ForceAggregator:
                 # detect_slowing_down returns 'warning_level' = 'HIGH', 'ELEVATED', 'NORMAL', or 'INSUFFICIENT_DATA'
                 is_slowing_down = slowing_down.get('warning_level') == 'HIGH'
 
-                # FA5: Clip regime probability to valid range
-                regime_state = RegimeState(
-                    current_regime=int(current_regime),
-                    regime_probability=float(np.clip(regime_prob, 0.0, 1.0)),
-                    regime_names=self.regime_names,
-                    transition_probabilities=hmm_result.transition_matrix,
+                regime_state = self._build_regime_state(
+                    out,
+                    current_regime=int(regime_series[-1]),
+                    regime_probabilities=hmm_result.regime_probabilities[-1],
+                    transition_matrix=hmm_result.transition_matrix,
                     days_in_regime=days_in_regime,
-                    hazard_rate=float(hazard_rate),
-                    minsky_signal=hazard_result.is_increasing_hazard,
-                    critical_slowing_down=is_slowing_down
+                    hazard_result=hazard_result,
+                    is_slowing_down=is_slowing_down
                 )
-
-                # FA11: Wrap numpy types for consistency
-                raw_metrics['hmm_regime'] = int(current_regime)
-                raw_metrics['regime_probability'] = float(np.clip(regime_prob, 0.0, 1.0))
-                raw_metrics['hazard_rate'] = float(hazard_rate)
-
-                if is_slowing_down:
-                    warnings.append("Critical slowing down detected - regime transition may be imminent")
-
-                if hazard_result.is_increasing_hazard:
-                    observations.append("Increasing hazard rate - Minsky dynamics active")
             else:
                 # Default regime state
-                regime_state = RegimeState(
-                    current_regime=0,
-                    regime_probability=0.5,
-                    regime_names=self.regime_names,
-                    transition_probabilities=np.array([[0.95, 0.05], [0.05, 0.95]]),
-                    days_in_regime=0,
-                    hazard_rate=0.05,
-                    minsky_signal=False,
-                    critical_slowing_down=False
-                )
+                regime_state = self._default_regime_state()
         except Exception as e:
             logger.warning(f"Regime detection failed: {e}")
-            regime_state = RegimeState(
-                current_regime=0,
-                regime_probability=0.5,
-                regime_names=self.regime_names,
-                transition_probabilities=np.array([[0.95, 0.05], [0.05, 0.95]]),
-                days_in_regime=0,
-                hazard_rate=0.05,
-                minsky_signal=False,
-                critical_slowing_down=False
-            )
+            regime_state = self._default_regime_state()
 
         # =====================================================================
         # MORPHOLOGY
         # =====================================================================
         try:
-            shape = compute_shape_metrics(returns[-60:])
-
-            # FA_R6_3: Validate value is finite before creating ForceVector
-            skewness = shape.skewness
-            if not np.isfinite(skewness):
-                logger.warning(f"Skewness value is not finite: {skewness}, skipping")
-                skewness = None
-
-            if skewness is not None:
-                forces.append(ForceVector(
-                    name="skewness",
-                    category=ForceCategory.MORPHOLOGY,
-                    value=skewness,
-                    percentile=self._compute_percentile("skewness", skewness),
-                    strength=self._value_to_strength(
-                        skewness, (-2.0, -1.0, -0.5, -0.2, 0.2, 0.5, 1.0, 2.0)
-                    ),
-                    velocity=0,  # Could compute rolling
-                    interpretation=f"Distribution {shape.shape_class}-shaped"
-                ))
-
-                raw_metrics['skewness'] = skewness
-            # FA_R7_1: Validate kurtosis is finite before storing
-            raw_metrics['kurtosis'] = shape.kurtosis if np.isfinite(shape.kurtosis) else 0.0
-            raw_metrics['shape_class'] = shape.shape_class
-
-            if not shape.is_unimodal:
-                warnings.append("Bimodal distribution detected - transition in progress")
+            self._add_morphology_force(out, compute_shape_metrics(returns[-60:]))
         except Exception as e:
             logger.warning(f"Morphology calculation failed: {e}")
 
@@ -677,40 +593,239 @@ class ForceAggregator:
         # =====================================================================
         try:
             vol_dynamics = compute_volatility_dynamics(returns)
-
-            # FA_R6_3: Validate value is finite before creating ForceVector
-            realized_vol = vol_dynamics.realized_vol
-            if not np.isfinite(realized_vol):
-                logger.warning(f"Realized vol value is not finite: {realized_vol}, skipping")
-                realized_vol = None
-
-            if realized_vol is not None:
-                forces.append(ForceVector(
-                    name="realized_vol",
-                    category=ForceCategory.DYNAMICS,
-                    value=realized_vol,
-                    percentile=self._compute_percentile("realized_vol", realized_vol),
-                    strength=self._value_to_strength(
-                        realized_vol, (5, 10, 15, 18, 22, 28, 35, 50)
-                    ),
-                    velocity=vol_dynamics.vol_velocity if not np.isnan(vol_dynamics.vol_velocity) else 0.0,
-                    interpretation=f"Volatility {vol_dynamics.vol_regime}"
-                ))
-
-                # FA10: Wrap in float() for type consistency
-                raw_metrics['realized_vol'] = float(realized_vol)
-                raw_metrics['vol_velocity'] = float(vol_dynamics.vol_velocity) if not np.isnan(vol_dynamics.vol_velocity) else 0.0
-
-                if vol_dynamics.vol_regime == 'expanding':
-                    observations.append("Volatility expanding")
-                elif vol_dynamics.vol_regime == 'contracting':
-                    observations.append("Volatility contracting - potential opportunity")
+            self._add_volatility_force(
+                out, vol_dynamics.realized_vol,
+                vol_dynamics.vol_velocity, vol_dynamics.vol_regime
+            )
         except Exception as e:
             logger.warning(f"Volatility dynamics failed: {e}")
 
-        # =====================================================================
-        # AGGREGATE SIGNALS
-        # =====================================================================
+        return self._assemble_state(symbol, out, regime_state)
+
+    # =========================================================================
+    # FORCE BUILDERS (shared by compute_forces and StreamingForceEngine)
+    # =========================================================================
+
+    def _add_entropy_force(
+        self,
+        out: _ForceOutputs,
+        entropy_val: float,
+        entropy_velocity: float,
+        is_decaying: bool
+    ) -> None:
+        # FA_R6_3: Validate value is finite before creating ForceVector
+        if not np.isfinite(entropy_val):
+            entropy_val = 2.5  # Default to mid-range entropy
+        # FA7 + FA_R7_6: Use np.isfinite() to catch both NaN and Inf
+        entropy_vel = float(entropy_velocity) if np.isfinite(entropy_velocity) else 0.0
+
+        out.forces.append(ForceVector(
+            name="shannon_entropy",
+            category=ForceCategory.ENTROPY,
+            value=entropy_val,
+            percentile=self._compute_percentile("shannon_entropy", entropy_val),
+            strength=self._value_to_strength(
+                entropy_val, (1.0, 1.5, 2.0, 2.3, 2.7, 3.0, 3.5, 4.0)
+            ),
+            velocity=entropy_vel,
+            interpretation=f"Market uncertainty {'decaying' if is_decaying else 'stable/rising'}"
+        ))
+
+        out.raw_metrics['entropy'] = entropy_val
+        out.raw_metrics['entropy_velocity'] = entropy_vel
+
+        if is_decaying:
+            out.observations.append("Entropy decaying - consensus forming")
+
+    def _add_vpin_force(self, out: _ForceOutputs, vpin_values: np.ndarray) -> None:
+        if len(vpin_values) == 0:
+            return
+        vpin_val = float(vpin_values[-1])
+
+        # FA_R6_3: Validate value is finite before creating ForceVector
+        if not np.isfinite(vpin_val):
+            logger.warning(f"VPIN value is not finite: {vpin_val}, skipping")
+            return
+
+        out.forces.append(ForceVector(
+            name="vpin",
+            category=ForceCategory.FLOW,
+            value=vpin_val,
+            percentile=self._compute_percentile("vpin", vpin_val),
+            strength=self._value_to_strength(
+                vpin_val, (0.1, 0.2, 0.3, 0.4, 0.5, 0.6, 0.7, 0.8)
+            ),
+            # FA8 + FA17: Check finiteness of both input AND output
+            velocity=self._safe_velocity(vpin_values),
+            interpretation=f"Order flow toxicity {'elevated' if vpin_val > 0.5 else 'normal'}"
+        ))
+
+        out.raw_metrics['vpin'] = vpin_val
+
+        if vpin_val > 0.7:
+            out.warnings.append("VPIN elevated - toxic flow detected")
+
+    def _add_absorption_force(self, out: _ForceOutputs, ar: np.ndarray) -> None:
+        if len(ar) == 0:
+            return
+        ar_val = float(ar[-1])
+
+        # FA_R6_3: Validate value is finite before creating ForceVector
+        if not np.isfinite(ar_val):
+            logger.warning(f"Absorption ratio value is not finite: {ar_val}, skipping")
+            return
+
+        out.forces.append(ForceVector(
+            name="absorption_ratio",
+            category=ForceCategory.CORRELATION,
+            value=ar_val,
+            percentile=self._compute_percentile("absorption_ratio", ar_val),
+            strength=self._value_to_strength(
+                ar_val, (0.3, 0.4, 0.5, 0.6, 0.7, 0.8, 0.85, 0.9)
+            ),
+            # FA18: Use consistent safe_velocity method (not weak ~np.isnan check)
+            velocity=self._safe_velocity(ar),
+            interpretation=f"Systemic risk {'elevated' if ar_val > 0.8 else 'normal'}"
+        ))
+
+        out.raw_metrics['absorption_ratio'] = ar_val
+
+        if ar_val > 0.85:
+            out.warnings.append("Absorption ratio high - systemic risk elevated")
+
+    def _build_regime_state(
+        self,
+        out: _ForceOutputs,
+        current_regime: int,
+        regime_probabilities: np.ndarray,
+        transition_matrix: np.ndarray,
+        days_in_regime: int,
+        hazard_result: Any,
+        is_slowing_down: bool
+    ) -> RegimeState:
+        # FA_R6_1: Validate regime index is within bounds
+        n_regimes = len(regime_probabilities)
+        if current_regime < 0 or current_regime >= n_regimes:
+            logger.warning(
+                f"Invalid regime index {current_regime} (n_regimes={n_regimes}). "
+                "Defaulting to regime 0."
+            )
+            current_regime = 0
+
+        # FA5: Clip probability to [0,1] - HMMs can have slight numerical issues
+        regime_prob = float(np.clip(regime_probabilities[current_regime], 0.0, 1.0))
+
+        # FA4: Hazard rate with safe indexing (prevent negative index)
+        idx = max(0, min(days_in_regime - 1, len(hazard_result.hazard_rates) - 1))
+        hazard_rate = hazard_result.hazard_rates[idx] \
+            if len(hazard_result.hazard_rates) > 0 else 0.05
+
+        regime_state = RegimeState(
+            current_regime=int(current_regime),
+            regime_probability=regime_prob,
+            regime_names=self.regime_names,
+            transition_probabilities=transition_matrix,
+            days_in_regime=days_in_regime,
+            hazard_rate=float(hazard_rate),
+            minsky_signal=hazard_result.is_increasing_hazard,
+            critical_slowing_down=is_slowing_down
+        )
+
+        # FA11: Wrap numpy types for consistency
+        out.raw_metrics['hmm_regime'] = int(current_regime)
+        out.raw_metrics['regime_probability'] = regime_prob
+        out.raw_metrics['hazard_rate'] = float(hazard_rate)
+
+        if is_slowing_down:
+            out.warnings.append("Critical slowing down detected - regime transition may be imminent")
+
+        if hazard_result.is_increasing_hazard:
+            out.observations.append("Increasing hazard rate - Minsky dynamics active")
+
+        return regime_state
+
+    def _default_regime_state(self) -> RegimeState:
+        return RegimeState(
+            current_regime=0,
+            regime_probability=0.5,
+            regime_names=self.regime_names,
+            transition_probabilities=np.array([[0.95, 0.05], [0.05, 0.95]]),
+            days_in_regime=0,
+            hazard_rate=0.05,
+            minsky_signal=False,
+            critical_slowing_down=False
+        )
+
+    def _add_morphology_force(self, out: _ForceOutputs, shape: Any) -> None:
+        # FA_R6_3: Validate value is finite before creating ForceVector
+        skewness = shape.skewness
+        if not np.isfinite(skewness):
+            logger.warning(f"Skewness value is not finite: {skewness}, skipping")
+            skewness = None
+
+        if skewness is not None:
+            out.forces.append(ForceVector(
+                name="skewness",
+                category=ForceCategory.MORPHOLOGY,
+                value=skewness,
+                percentile=self._compute_percentile("skewness", skewness),
+                strength=self._value_to_strength(
+                    skewness, (-2.0, -1.0, -0.5, -0.2, 0.2, 0.5, 1.0, 2.0)
+                ),
+                velocity=0,  # Could compute rolling
+                interpretation=f"Distribution {shape.shape_class}-shaped"
+            ))
+
+            out.raw_metrics['skewness'] = skewness
+        # FA_R7_1: Validate kurtosis is finite before storing
+        out.raw_metrics['kurtosis'] = shape.kurtosis if np.isfinite(shape.kurtosis) else 0.0
+        out.raw_metrics['shape_class'] = shape.shape_class
+
+        if not shape.is_unimodal:
+            out.warnings.append("Bimodal distribution detected - transition in progress")
+
+    def _add_volatility_force(
+        self,
+        out: _ForceOutputs,
+        realized_vol: float,
+        vol_velocity: float,
+        vol_regime: str
+    ) -> None:
+        # FA_R6_3: Validate value is finite before creating ForceVector
+        if not np.isfinite(realized_vol):
+            logger.warning(f"Realized vol value is not finite: {realized_vol}, skipping")
+            return
+
+        velocity = float(vol_velocity) if not np.isnan(vol_velocity) else 0.0
+        out.forces.append(ForceVector(
+            name="realized_vol",
+            category=ForceCategory.DYNAMICS,
+            value=realized_vol,
+            percentile=self._compute_percentile("realized_vol", realized_vol),
+            strength=self._value_to_strength(
+                realized_vol, (5, 10, 15, 18, 22, 28, 35, 50)
+            ),
+            velocity=velocity,
+            interpretation=f"Volatility {vol_regime}"
+        ))
+
+        # FA10: Wrap in float() for type consistency
+        out.raw_metrics['realized_vol'] = float(realized_vol)
+        out.raw_metrics['vol_velocity'] = velocity
+
+        if vol_regime == 'expanding':
+            out.observations.append("Volatility expanding")
+        elif vol_regime == 'contracting':
+            out.observations.append("Volatility contracting - potential opportunity")
+
+    def _assemble_state(
+        self,
+        symbol: str,
+        out: _ForceOutputs,
+        regime_state: RegimeState
+    ) -> MarketPhysicsState:
+        """Aggregate signals and scores from the accumulated forces."""
+        raw_metrics = out.raw_metrics
 
         # Entropy signal
         entropy_signal = "stable"
@@ -790,7 +905,7 @@ class ForceAggregator:
         return MarketPhysicsState(
             timestamp=datetime.now().isoformat(),
             symbol=symbol,
-            forces=forces,  # FA1: List[ForceVector], not dict - don't sanitize
+            forces=out.forces,  # FA1: List[ForceVector], not dict - don't sanitize
             regime=regime_state,
             entropy_signal=entropy_signal,  # FA2: String signal, not dict
             flow_signal=flow_signal,  # FA2: String signal, not dict
@@ -799,12 +914,462 @@ class ForceAggregator:
             bullish_force_score=bullish_force_score,
             risk_score=risk_score,
             transition_score=transition_score,
-            key_observations=observations,
-            warnings=warnings,
+            key_observations=out.observations,
+            warnings=out.warnings,
             raw_metrics=_sanitize_dict(raw_metrics)
         )
 
 
+# =============================================================================
+# STREAMING FORCE ENGINE
+# =============================================================================
+
+# Savitzky-Golay (window 5, cubic) first derivative at the newest point -
+# the last value of estimate_derivatives(series, 1.0, 5, smooth=True)[0]
+_SAVGOL_VELOCITY = savgol_coeffs(5, 3, deriv=1, pos=4, use='dot')
+
+
+def _histogram_entropy(window: np.ndarray, n_bins: int = 20) -> float:
+    """Shannon entropy of one window (as in compute_entropy_dynamics)."""
+    hist, _ = np.histogram(window, bins=n_bins)
+    total = hist.sum()
+    if total == 0:
+        return 0.0
+    p = hist[hist > 0] / total
+    return float(-np.sum(p * np.log(p)))
+
+
+class _RunningMoments:
+    """Welford mean / population variance over everything seen."""
+
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self._m2 = 0.0
+
+    def update(self, x: float) -> None:
+        self.count += 1
+        delta = x - self.mean
+        self.mean += delta / self.count
+        self._m2 += delta * (x - self.mean)
+
+    @property
+    def std(self) -> float:
+        return float(np.sqrt(self._m2 / self.count)) if self.count else np.nan
+
+
+class StreamingForceEngine:
+    """
+    Bar-by-bar MarketPhysicsState for the live daemon.
+
+    Each force keeps its own bounded state and updates in time independent
+    of history length:
+    - entropy / realized vol: ring of the last window of returns, running
+      moments of the derived series, velocity from the last 5 points
+    - VPIN: StreamingVPIN (open bucket + last n_buckets imbalances)
+    - absorption ratio: RollingPCA (rank-one covariance updates)
+    - regime: the fitted HMM is reused and filtered forward one step per
+      bar (GaussianHMM.filter_step); hazard is re-analysed only when a
+      regime ends
+    - critical slowing down: lag-1 autocorrelation / variance windows and
+      the last 252 of each for the z-scores
+    - percentile ranks: RollingPercentile on the shared ForceAggregator
+
+    Differences from ForceAggregator.compute_forces: regime labels are
+    filtered rather than smoothed (no look-back revision), hazard uses
+    completed regimes only, and the VPIN bucket size is fixed at warm-up.
+    The dip test behind morphology costs the same at any history length but
+    dominates an update, so it can be refreshed every `morphology_every`
+    bars (skewness itself is tracked every bar).
+
+    Usage:
+        engine = StreamingForceEngine(symbol='SPY')
+        state = engine.warm_up(history_df)
+        for bar in live_bars:               # dict / Series with close, volume, ...
+            state = engine.update(bar)
+    """
+
+    def __init__(
+        self,
+        aggregator: Optional[ForceAggregator] = None,
+        symbol: str = "SPY",
+        vpin_buckets: int = 50,
+        vol_window: int = 20,
+        morphology_window: int = 60,
+        morphology_every: int = 1,
+        csd_window: int = 60,
+        csd_lookback: int = 252,
+        min_hmm_observations: int = 100
+    ):
+        """
+        Args:
+            aggregator: Supplies windows, the HMM and percentile history
+                (a new ForceAggregator if None)
+            symbol: Symbol reported in the state
+            vpin_buckets: VPIN rolling window (buckets)
+            vol_window: Realized volatility window
+            morphology_window: Returns used for shape metrics
+            morphology_every: Bars between full shape (dip test) refreshes
+            csd_window: Critical slowing down indicator window
+            csd_lookback: Indicator history used for the z-scores
+            min_hmm_observations: Returns needed before the HMM is fitted
+        """
+        self.aggregator = aggregator or ForceAggregator()
+        self.symbol = symbol
+        self.vpin_buckets = vpin_buckets
+        self.vol_window = vol_window
+        self.morphology_every = max(1, morphology_every)
+        self.min_hmm_observations = min_hmm_observations
+
+        entropy_window = self.aggregator.entropy_window
+        self.n_bars = 0
+        self.n_returns = 0
+        self._prev_close: Optional[float] = None
+
+        # Entropy
+        self._entropy_returns: deque = deque(maxlen=entropy_window)
+        self._entropies: deque = deque(maxlen=5)
+
+        # Realized volatility
+        self._vol_returns: deque = deque(maxlen=vol_window)
+        self._vols: deque = deque(maxlen=5)
+        self._vol_moments = _RunningMoments()
+
+        # VPIN (bucket size fixed from the first flow_window bars or warm-up)
+        self._bucket_size: Optional[float] = None
+        self._vpin: Optional[StreamingVPIN] = None
+        self._flow_buffer: List[Tuple[float, float]] = []
+
+        # Absorption ratio
+        self._asset_columns: Optional[List[str]] = None
+        self._prev_assets: Optional[np.ndarray] = None
+        self._pca: Optional[RollingPCA] = None
+        self._absorption: deque = deque(maxlen=5)
+
+        # Regime
+        self._fit_buffer: List[float] = []
+        self._regime_probs: Optional[np.ndarray] = None
+        self._regime: Optional[int] = None
+        self._days_in_regime = 0
+        self._durations: deque = deque(maxlen=1000)
+        self._hazard = None
+
+        # Critical slowing down
+        self._csd_returns: deque = deque(maxlen=csd_window)
+        self._csd_autocorr: deque = deque(maxlen=csd_lookback)
+        self._csd_variance: deque = deque(maxlen=csd_lookback)
+
+        # Morphology
+        self._shape_returns: deque = deque(maxlen=morphology_window)
+        self._shape = None
+        self._shape_bar = -1
+
+    # -------------------------------------------------------------------------
+    # Ingest
+    # -------------------------------------------------------------------------
+
+    def warm_up(self, df: pd.DataFrame) -> MarketPhysicsState:
+        """
+        Seed all force state from history and return the state at its last bar.
+
+        Fits the HMM once (if the aggregator has none yet) and fixes the VPIN
+        bucket size at the median bar volume, as compute_forces does.
+        """
+        if len(df) == 0:
+            raise ValueError("warm_up needs at least one bar")
+
+        if self._bucket_size is None and 'volume' in df.columns:
+            volumes = df['volume'].dropna().values
+            if np.any(volumes > 0):
+                self._bucket_size = float(np.median(volumes[volumes > 0]))
+        if self._asset_columns is None and len(df.columns) > 5:
+            self._asset_columns = _correlation_columns(df)
+
+        returns = df['returns'] if 'returns' in df.columns else df['close'].pct_change()
+        returns = returns.dropna().values
+        if self.aggregator.hmm is None and len(returns) > self.min_hmm_observations:
+            self._fit_hmm(returns)
+
+        records = df.to_dict('records')
+        for bar in records[:-1]:
+            self._ingest(bar)
+            self._record_percentiles()
+        return self.update(records[-1])
+
+    def update(self, bar: Union[Mapping[str, Any], pd.Series]) -> MarketPhysicsState:
+        """
+        Add one bar and return the refreshed state.
+
+        Args:
+            bar: Mapping with 'close' and optionally 'volume', 'returns'
+                and other numeric columns (used for the absorption ratio)
+        """
+        if isinstance(bar, pd.Series):
+            bar = bar.to_dict()
+        self._ingest(bar)
+        return self.state()
+
+    def _ingest(self, bar: Mapping[str, Any]) -> None:
+        self.n_bars += 1
+        close = _finite_or_none(bar.get('close'))
+
+        ret = _finite_or_none(bar.get('returns'))
+        if ret is None and 'returns' not in bar and close is not None and self._prev_close is not None:
+            ret = _finite_or_none(close / self._prev_close - 1)
+        if close is not None:
+            self._prev_close = close
+
+        if ret is not None:
+            self._update_returns(ret)
+
+        volume = _finite_or_none(bar.get('volume'))
+        if close is not None and volume is not None:
+            self._update_flow(close, volume)
+
+        self._update_assets(bar)
+
+    def _update_returns(self, r: float) -> None:
+        self.n_returns += 1
+
+        self._entropy_returns.append(r)
+        if len(self._entropy_returns) == self._entropy_returns.maxlen:
+            self._entropies.append(_histogram_entropy(np.asarray(self._entropy_returns)))
+
+        self._vol_returns.append(r)
+        if len(self._vol_returns) == self.vol_window:
+            vol = float(np.std(np.asarray(self._vol_returns)) * np.sqrt(252))
+            self._vols.append(vol)
+            self._vol_moments.update(vol)
+
+        # CSD indicators at t use the window before t (as critical_slowing_down_indicators)
+        if len(self._csd_returns) == self._csd_returns.maxlen:
+            window = np.asarray(self._csd_returns)
+            std = np.std(window)
+            if std > 1e-10:
+                self._csd_autocorr.append(np.corrcoef(window[:-1], window[1:])[0, 1])
+            self._csd_variance.append(np.var(window))
+        self._csd_returns.append(r)
+
+        self._shape_returns.append(r)
+        self._update_regime(r)
+
+    def _update_flow(self, price: float, volume: float) -> None:
+        if self._vpin is not None:
+            self._vpin.update(price, volume)
+            return
+
+        self._flow_buffer.append((price, volume))
+        if self._bucket_size is None:
+            if len(self._flow_buffer) < self.aggregator.flow_window:
+                return
+            volumes = np.array([v for _, v in self._flow_buffer])
+            self._bucket_size = float(np.median(volumes[volumes > 0])) if np.any(volumes > 0) else 1e6
+
+        self._vpin = StreamingVPIN(self._bucket_size, n_buckets=self.vpin_buckets)
+        for p, v in self._flow_buffer:
+            self._vpin.update(p, v)
+        self._flow_buffer = []
+
+    def _update_assets(self, bar: Mapping[str, Any]) -> None:
+        if self._asset_columns is None:
+            if len(bar) <= 5:
+                return
+            self._asset_columns = [
+                k for k, v in bar.items()
+                if k not in _NON_ASSET_COLUMNS
+                and isinstance(v, (int, float, np.number)) and not isinstance(v, bool)
+            ][:10]
+        if len(self._asset_columns) < 3:
+            return
+
+        values = np.array([_finite_or_nan(bar.get(c)) for c in self._asset_columns])
+        prev, self._prev_assets = self._prev_assets, values
+        if prev is None:
+            return
+        with np.errstate(divide='ignore', invalid='ignore'):
+            x = values / prev - 1
+        # FA_R7_4: rows with NaN/Inf are skipped, as compute_forces drops them
+        if not np.isfinite(x).all():
+            return
+
+        if self._pca is None:
+            self._pca = RollingPCA(
+                len(self._asset_columns),
+                window=self.aggregator.correlation_window,
+                n_components=0,
+                n_factors=min(3, len(self._asset_columns) // 2)
+            )
+        snapshot = self._pca.update(x)
+        if snapshot is not None:
+            self._absorption.append(snapshot.absorption_ratio)
+
+    # -------------------------------------------------------------------------
+    # Regime
+    # -------------------------------------------------------------------------
+
+    def _fit_hmm(self, returns: np.ndarray) -> None:
+        hmm = GaussianHMM(HMMConfig(n_regimes=self.aggregator.n_regimes))
+        hmm.fit(returns)
+        self.aggregator.hmm = hmm
+
+    def _update_regime(self, r: float) -> None:
+        hmm = self.aggregator.hmm
+        if hmm is None:
+            self._fit_buffer.append(r)
+            if len(self._fit_buffer) <= self.min_hmm_observations:
+                return
+            self._fit_hmm(np.asarray(self._fit_buffer))
+            probs = self.aggregator.hmm.filter(np.asarray(self._fit_buffer))
+            self._fit_buffer = []
+            for row in probs:
+                self._advance_regime(row)
+            return
+
+        self._advance_regime(hmm.filter_step(self._regime_probs, r))
+
+    def _advance_regime(self, probs: np.ndarray) -> None:
+        self._regime_probs = probs
+        regime = int(np.argmax(probs))
+        if regime == self._regime:
+            self._days_in_regime += 1
+            return
+        if self._regime is not None:
+            self._durations.append(self._days_in_regime)
+            self._hazard = None  # Re-analysed on next read
+        self._regime = regime
+        self._days_in_regime = 1
+
+    def _regime_state(self, out: _ForceOutputs) -> RegimeState:
+        hmm = self.aggregator.hmm
+        if hmm is None or self._regime_probs is None:
+            return self.aggregator._default_regime_state()
+
+        if self._hazard is None:
+            with warnings.catch_warnings():
+                warnings.simplefilter('ignore')
+                self._hazard = hazard_from_durations(np.asarray(self._durations))
+
+        return self.aggregator._build_regime_state(
+            out,
+            current_regime=self._regime,
+            regime_probabilities=self._regime_probs,
+            transition_matrix=hmm.transition_matrix,
+            days_in_regime=self._days_in_regime,
+            hazard_result=self._hazard,
+            is_slowing_down=self._slowing_down()
+        )
+
+    def _slowing_down(self, threshold_std: float = 2.0) -> bool:
+        """detect_slowing_down(...)['warning_level'] == 'HIGH' on the tracked indicators."""
+        lookback = self._csd_autocorr.maxlen
+        if len(self._csd_autocorr) < lookback or len(self._csd_variance) < lookback:
+            return False
+        ac = np.asarray(self._csd_autocorr)
+        var = np.asarray(self._csd_variance)
+        ac_z = (ac[-1] - ac.mean()) / ac.std()
+        var_z = (var[-1] - var.mean()) / var.std()
+        return bool(ac_z > threshold_std and var_z > threshold_std)
+
+    # -------------------------------------------------------------------------
+    # Per-force values
+    # -------------------------------------------------------------------------
+
+    def _entropy(self) -> Tuple[float, float, bool]:
+        """(current_entropy, entropy_velocity, is_decaying) as compute_entropy_dynamics."""
+        if self.n_returns < self.aggregator.entropy_window * 3:
+            return np.nan, np.nan, False
+        velocity = float(_SAVGOL_VELOCITY @ np.asarray(self._entropies))
+        return self._entropies[-1], velocity, velocity < -0.01
+
+    def _volatility(self) -> Tuple[float, float, str]:
+        """(realized_vol, vol_velocity, vol_regime) as compute_volatility_dynamics."""
+        if self.n_returns < self.vol_window * 2:
+            return np.nan, np.nan, 'unknown'
+        velocity = float(_SAVGOL_VELOCITY @ np.asarray(self._vols))
+        vol_of_vol = self._vol_moments.std if self._vol_moments.count >= 50 else np.nan
+
+        if np.isnan(velocity) or np.isnan(vol_of_vol):
+            regime = 'unknown'
+        elif velocity > vol_of_vol * 0.1:
+            regime = 'expanding'
+        elif velocity < -vol_of_vol * 0.1:
+            regime = 'contracting'
+        else:
+            regime = 'stable'
+        return self._vols[-1], velocity, regime
+
+    def _vpin_values(self) -> np.ndarray:
+        if self._vpin is None or self._vpin.n_bars < self.aggregator.flow_window:
+            return np.array([])
+        return self._vpin.recent_values(5)
+
+    def _skewness(self) -> float:
+        data = np.asarray(self._shape_returns)
+        if len(data) < 10:
+            return np.nan
+        if np.std(data, ddof=1) < 1e-10:
+            return 0.0
+        return float(stats.skew(data))
+
+    def _morphology(self):
+        if self._shape is None or self.n_bars - self._shape_bar >= self.morphology_every:
+            with warnings.catch_warnings():
+                warnings.simplefilter('ignore')
+                self._shape = compute_shape_metrics(np.asarray(self._shape_returns))
+            self._shape_bar = self.n_bars
+        return self._shape
+
+    def _record_percentiles(self) -> None:
+        """Feed percentile history during warm-up without building a state."""
+        pct = self.aggregator._compute_percentile
+        entropy_val, _, _ = self._entropy()
+        pct("shannon_entropy", entropy_val if np.isfinite(entropy_val) else 2.5)
+        vpin = self._vpin_values()
+        if len(vpin):
+            pct("vpin", vpin[-1])
+        if self._absorption:
+            pct("absorption_ratio", self._absorption[-1])
+        pct("skewness", self._skewness())
+        pct("realized_vol", self._volatility()[0])
+
+    # -------------------------------------------------------------------------
+    # State
+    # -------------------------------------------------------------------------
+
+    def state(self) -> MarketPhysicsState:
+        """MarketPhysicsState for the latest bar."""
+        agg = self.aggregator
+        out = _ForceOutputs()
+
+        agg._add_entropy_force(out, *self._entropy())
+        agg._add_vpin_force(out, self._vpin_values())
+        agg._add_absorption_force(out, np.asarray(self._absorption))
+        regime_state = self._regime_state(out)
+
+        shape = self._morphology()
+        if self._shape_bar != self.n_bars:
+            # Between dip-test refreshes the skewness is still current
+            shape = replace(shape, skewness=self._skewness())
+        agg._add_morphology_force(out, shape)
+
+        agg._add_volatility_force(out, *self._volatility())
+
+        return agg._assemble_state(self.symbol, out, regime_state)
+
+
+def _finite_or_none(value: Any) -> Optional[float]:
+    try:
+        value = float(value)
+    except (TypeError, ValueError):
+        return None
+    return value if np.isfinite(value) else None
+
+
+def _finite_or_nan(value: Any) -> float:
+    value = _finite_or_none(value)
+    return np.nan if value is None else value
+
+
 # =============================================================================
 # CONVENIENCE FUNCTIONS
 # =============================================================================
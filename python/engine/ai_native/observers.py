@@ -777,6 +777,108 @@ Output JSON:
 }
 
 
+# =============================================================================
+# FEATURE SNAPSHOT
+# =============================================================================
+
+# Reported as 0.0 when the column is missing
+PRICE_FIELDS = ('close', 'open', 'high', 'low', 'volume')
+HISTORY_WINDOW = 20
+SIGNIFICANT_DIGITS = 6
+
+_COMPACT = (',', ':')
+
+
+def _compact_number(value: Any) -> Any:
+    """Float rounded to SIGNIFICANT_DIGITS (None for NaN/Inf, labels as strings)."""
+    try:
+        value = float(value)
+    except (TypeError, ValueError):
+        return None if value is None else str(value)
+    if not np.isfinite(value):
+        return None
+    return float(f'{value:.{SIGNIFICANT_DIGITS}g}')
+
+
+class FeatureSnapshot:
+    """
+    Shared, memoized field summaries for one run_observers call.
+
+    Each field (a data_requirements entry) is summarized once - latest
+    value plus 20-bar mean/std - and serialized once into a compact JSON
+    fragment. Observers that need the same field reuse both, and each
+    prompt is assembled from just the fragments its observer declares.
+    """
+
+    def __init__(self, market_data: pd.DataFrame, equations: Dict[str, str] = None):
+        """
+        Args:
+            market_data: DataFrame with market features
+            equations: Math Swarm discovered equations (added to every observer's data)
+        """
+        self.market_data = market_data
+        self.equations = equations
+        self._latest = market_data.iloc[-1] if len(market_data) > 0 else None
+        self._has_history = len(market_data) > HISTORY_WINDOW
+
+        self._features: Dict[str, Dict[str, Any]] = {}
+        self._fragments: Dict[str, str] = {}
+        self._equations_fragment = (
+            json.dumps({'math_swarm_equations': equations}, separators=_COMPACT, default=str)[1:-1]
+            if equations else ''
+        )
+
+        self.computed = 0
+        self.reused = 0
+
+    def features(self, name: str) -> Dict[str, Any]:
+        """Summary values for one field ({} if the data has no such column)."""
+        if name in self._features:
+            self.reused += 1
+            return self._features[name]
+        self.computed += 1
+
+        values: Dict[str, Any] = {}
+        if name in self.market_data.columns:
+            values[name] = _compact_number(self._latest[name] if self._latest is not None else 0)
+            if self._has_history and pd.api.types.is_numeric_dtype(self.market_data[name]):
+                col = self.market_data[name].dropna()
+                if len(col) > 0:
+                    recent = col.tail(HISTORY_WINDOW)
+                    values[f'{name}_20d_mean'] = _compact_number(recent.mean())
+                    values[f'{name}_20d_std'] = _compact_number(recent.std())
+        elif name in PRICE_FIELDS:
+            values[name] = 0.0
+
+        self._features[name] = values
+        self._fragments[name] = json.dumps(values, separators=_COMPACT)[1:-1]
+        return values
+
+    def observer_data(self, requirements: List[str]) -> Dict[str, Any]:
+        """Merged field summaries (plus equations) for one observer."""
+        data: Dict[str, Any] = {}
+        for req in requirements:
+            data.update(self.features(req))
+        if self.equations:
+            data['math_swarm_equations'] = self.equations
+        return data
+
+    def render(self, requirements: List[str]) -> str:
+        """Compact JSON object for a prompt, joined from the cached fragments."""
+        parts = []
+        for req in dict.fromkeys(requirements):
+            if req not in self._fragments:
+                self.features(req)
+            if self._fragments[req]:
+                parts.append(self._fragments[req])
+        if self._equations_fragment:
+            parts.append(self._equations_fragment)
+        return '{' + ','.join(parts) + '}'
+
+    def stats(self) -> Dict[str, int]:
+        return {'fields_computed': self.computed, 'fields_reused': self.reused}
+
+
 class ObserverSwarm:
     """
     Manages parallel execution of 20+ observer agents.
@@ -810,7 +912,8 @@ class ObserverSwarm:
         self,
         observer_id: str,
         market_data: pd.DataFrame,
-        equations: Dict[str, str] = None
+        equations: Dict[str, str] = None,
+        snapshot: Optional[FeatureSnapshot] = None
     ) -> Dict[str, Any]:
         """
         Prepare data for a specific observer.
@@ -819,37 +922,15 @@ class ObserverSwarm:
             observer_id: Observer identifier
             market_data: DataFrame with market features
             equations: Math Swarm discovered equations (context)
+            snapshot: Shared FeatureSnapshot of market_data (built if None)
 
         Returns:
             Dict of data relevant to this observer
         """
         config = OBSERVER_REGISTRY.get(observer_id, {})
-        requirements = config.get('data_requirements', [])
-
-        # Extract latest values for required columns
-        data = {}
-        latest = market_data.iloc[-1] if len(market_data) > 0 else {}
-
-        for req in requirements:
-            if req in market_data.columns:
-                data[req] = float(latest.get(req, 0))
-            elif req in ['close', 'open', 'high', 'low', 'volume']:
-                data[req] = float(latest.get(req, 0))
-
-        # Add historical context
-        if len(market_data) > 20:
-            for req in requirements:
-                if req in market_data.columns:
-                    col = market_data[req].dropna()
-                    if len(col) > 0:
-                        data[f'{req}_20d_mean'] = float(col.tail(20).mean())
-                        data[f'{req}_20d_std'] = float(col.tail(20).std())
-
-        # Add equations as context if available
-        if equations:
-            data['math_swarm_equations'] = equations
-
-        return data
+        if snapshot is None:
+            snapshot = FeatureSnapshot(market_data, equations)
+        return snapshot.observer_data(config.get('data_requirements', []))
 
     def run_observers(
         self,
@@ -870,9 +951,10 @@ class ObserverSwarm:
         """
         logger.info(f"Running {len(self.observers)} observers on {symbol}...")
 
-        # Build tasks for swarm
+        # Build tasks for swarm (each field summarized once, shared across observers)
         tasks = []
         observer_data = {}
+        snapshot = FeatureSnapshot(market_data, equations)
 
         for obs_id in self.observers:
             if obs_id not in OBSERVER_REGISTRY:
@@ -880,12 +962,12 @@ class ObserverSwarm:
                 continue
 
             config = OBSERVER_REGISTRY[obs_id]
-            data = self.prepare_observer_data(obs_id, market_data, equations)
-            observer_data[obs_id] = data
+            requirements = config.get('data_requirements', [])
+            observer_data[obs_id] = snapshot.observer_data(requirements)
 
             user_prompt = f"""Analyze the following market data for {symbol}:
 
-{json.dumps(data, indent=2, default=str)}
+{snapshot.render(requirements)}
 
 Provide your observation and interpretation in the specified JSON format."""
 
@@ -897,6 +979,8 @@ Provide your observation and interpretation in the specified JSON format."""
                 "temperature": 0.3
             })
 
+        logger.debug(f"Observer feature snapshot: {snapshot.stats()}")
+
         # Run swarm
         results = run_swarm_sync(tasks, concurrency=self.concurrency)
 
@@ -9,11 +9,17 @@ Calculates comprehensive performance metrics including:
 - Win rate
 - Profit factor
 - Recovery time
+
+BatchPerformanceMetrics grades a whole (T x S) return matrix at once:
+point metrics, stationary block-bootstrap Sharpe intervals, probabilistic /
+deflated Sharpe ratios and multiple-testing-corrected p-values.
 """
 
 import pandas as pd
 import numpy as np
-from typing import Dict, Optional
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Optional, Union
+from scipy import stats
 
 
 class PerformanceMetrics:
@@ -417,3 +423,326 @@ class PerformanceMetrics:
             metrics_by_regime.append(metrics)
 
         return pd.DataFrame(metrics_by_regime)
+
+
+# ============================================================================
+# BATCHED STATISTICS ENGINE
+# ============================================================================
+
+EULER_GAMMA = 0.5772156649015329
+
+
+def stationary_bootstrap_counts(
+    n_obs: int,
+    n_bootstrap: int,
+    mean_block: float = 10.0,
+    seed: Optional[int] = None
+) -> np.ndarray:
+    """
+    Resampling weights for the Politis-Romano stationary bootstrap.
+
+    Each resample is a sequence of blocks with geometric lengths (mean
+    mean_block) starting at uniform positions, wrapping circularly. Sums
+    over a resample only depend on how often each observation is drawn,
+    so resamples are returned as a (n_bootstrap, n_obs) count matrix:
+    counts @ X gives the resampled sums of every column of X in one product.
+
+    Parameters:
+    -----------
+    n_obs : int
+        Length of the original series
+    n_bootstrap : int
+        Number of resamples
+    mean_block : float
+        Expected block length (1.0 = iid bootstrap)
+    seed : int, optional
+        Random seed
+
+    Returns:
+    --------
+    counts : np.ndarray
+        (n_bootstrap, n_obs) draw counts; every row sums to n_obs
+    """
+    rng = np.random.default_rng(seed)
+    idx = np.empty((n_bootstrap, n_obs), dtype=np.int64)
+    idx[:, 0] = rng.integers(0, n_obs, n_bootstrap)
+    jumps = rng.random((n_bootstrap, n_obs)) < 1.0 / max(mean_block, 1.0)
+    starts = rng.integers(0, n_obs, (n_bootstrap, n_obs))
+    for t in range(1, n_obs):
+        idx[:, t] = np.where(jumps[:, t], starts[:, t], (idx[:, t - 1] + 1) % n_obs)
+
+    rows = np.repeat(np.arange(n_bootstrap) * n_obs, n_obs)
+    counts = np.bincount(rows + idx.ravel(), minlength=n_bootstrap * n_obs)
+    return counts.reshape(n_bootstrap, n_obs).astype(np.float64)
+
+
+def adjust_pvalues(pvalues: np.ndarray, method: str = 'fdr_bh') -> np.ndarray:
+    """
+    Multiple-testing-adjusted p-values.
+
+    Parameters:
+    -----------
+    pvalues : np.ndarray
+        Raw p-values
+    method : str
+        'fdr_bh' (Benjamini-Hochberg step-up), 'holm' or 'bonferroni'
+
+    Returns:
+    --------
+    adjusted : np.ndarray
+        Adjusted p-values in the original order (reject where adjusted <= alpha)
+    """
+    p = np.asarray(pvalues, dtype=float)
+    n = p.size
+    if n == 0:
+        return p.copy()
+
+    if method == 'bonferroni':
+        return np.minimum(p * n, 1.0)
+
+    order = np.argsort(p, kind='mergesort')
+    ranked = p[order]
+    ranks = np.arange(1, n + 1)
+    if method == 'fdr_bh':
+        adjusted = np.minimum.accumulate((ranked * n / ranks)[::-1])[::-1]
+    elif method == 'holm':
+        adjusted = np.maximum.accumulate(ranked * (n - ranks + 1))
+    else:
+        raise ValueError(f"Unknown correction method: {method}")
+
+    out = np.empty(n)
+    out[order] = np.minimum(adjusted, 1.0)
+    return out
+
+
+def probabilistic_sharpe_ratio(
+    sharpe: np.ndarray,
+    benchmark: Union[float, np.ndarray],
+    n_obs: np.ndarray,
+    skew: np.ndarray,
+    kurtosis: np.ndarray
+) -> np.ndarray:
+    """
+    Probabilistic Sharpe ratio (Bailey & Lopez de Prado 2012).
+
+    P(true SR > benchmark) under the non-normal asymptotic distribution of
+    the estimator. Sharpe ratios are per-period (not annualized) and
+    kurtosis is non-excess (3 for a normal distribution).
+    """
+    sharpe = np.asarray(sharpe, dtype=float)
+    variance = 1.0 - skew * sharpe + (kurtosis - 1.0) / 4.0 * sharpe ** 2
+    z = (sharpe - benchmark) * np.sqrt(np.maximum(n_obs - 1, 0)) / np.sqrt(np.maximum(variance, 1e-12))
+    return stats.norm.cdf(z)
+
+
+def expected_max_sharpe(sharpe_variance: float, n_trials: int) -> float:
+    """
+    Expected maximum per-period Sharpe of n_trials unskilled strategies.
+
+    False-strategy theorem benchmark used by the deflated Sharpe ratio.
+    """
+    if n_trials <= 1 or sharpe_variance <= 0:
+        return 0.0
+    return float(np.sqrt(sharpe_variance) * (
+        (1 - EULER_GAMMA) * stats.norm.ppf(1 - 1.0 / n_trials)
+        + EULER_GAMMA * stats.norm.ppf(1 - 1.0 / (n_trials * np.e))
+    ))
+
+
+def _grade_chunk(
+    returns: np.ndarray,
+    counts: Optional[np.ndarray],
+    annual_factor: float,
+    risk_free_rate: float,
+    target: float,
+    confidence: float
+) -> Dict[str, np.ndarray]:
+    """Point metrics and bootstrap Sharpe interval for a (T x s) chunk."""
+    T = returns.shape[0]
+    rf = risk_free_rate / annual_factor
+    ann = np.sqrt(annual_factor)
+
+    mean = returns.mean(axis=0)
+    centered = returns - mean
+    m2 = (centered ** 2).mean(axis=0)
+    std = np.sqrt(m2 * T / (T - 1))
+    safe_m2 = np.where(m2 > 0, m2, np.nan)
+    skew = (centered ** 3).mean(axis=0) / safe_m2 ** 1.5
+    kurtosis = (centered ** 4).mean(axis=0) / safe_m2 ** 2
+
+    downside_sq = np.minimum(returns - target, 0) ** 2
+    downside = np.sqrt(downside_sq.mean(axis=0))
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        sr = np.where(std > 0, (mean - rf) / std, 0.0)
+        sortino = np.where(downside > 0, (mean - rf) / downside * ann, 0.0)
+
+    # Compounded equity starting at 1.0 (the initial capital counts as a peak)
+    equity = np.cumprod(1.0 + returns, axis=0)
+    peak = np.maximum(np.maximum.accumulate(equity, axis=0), 1.0)
+    max_dd = (equity / peak - 1.0).min(axis=0)
+    years = T / annual_factor
+    with np.errstate(divide='ignore', invalid='ignore'):
+        cagr = np.where(equity[-1] > 0, equity[-1] ** (1.0 / years) - 1.0, -1.0)
+        calmar = np.where(max_dd < 0, cagr / np.abs(max_dd), 0.0)
+
+    result = {
+        'n_obs': np.full(returns.shape[1], T),
+        'mean': mean,
+        'std': std,
+        'sharpe': sr * ann,
+        'sortino': sortino,
+        'calmar': calmar,
+        'cagr': cagr,
+        'max_drawdown': max_dd,
+        'skew': np.nan_to_num(skew),
+        'kurtosis': np.nan_to_num(kurtosis, nan=3.0),
+        'sharpe_per_period': sr,
+    }
+
+    if counts is not None:
+        # Resampled moments from count-weighted sums (B x s), no (B x T x s) tensor
+        s1 = counts @ returns
+        s2 = counts @ (returns ** 2)
+        boot_mean = s1 / T
+        boot_var = np.maximum(s2 - s1 * boot_mean, 0.0) / (T - 1)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            boot_sharpe = np.where(boot_var > 0, (boot_mean - rf) / np.sqrt(boot_var), 0.0) * ann
+        tail = (1.0 - confidence) / 2.0
+        result['sharpe_ci_low'], result['sharpe_ci_high'] = np.quantile(boot_sharpe, [tail, 1.0 - tail], axis=0)
+
+    return result
+
+
+class BatchPerformanceMetrics:
+    """
+    Grade many strategies at once from a (T x S) return matrix.
+
+    Columns are processed in chunks (optionally across processes); every
+    chunk shares one set of stationary-bootstrap resamples, so intervals
+    keep the cross-sectional dependence between strategies and the results
+    do not depend on the chunking.
+    """
+
+    def __init__(
+        self,
+        annual_factor: float = 252,
+        risk_free_rate: float = 0.0,
+        target: float = 0.0,
+        n_bootstrap: int = 1000,
+        mean_block: float = 10.0,
+        confidence: float = 0.95,
+        correction: str = 'fdr_bh',
+        alpha: float = 0.05,
+        chunk_size: int = 1024,
+        n_jobs: int = 1,
+        seed: Optional[int] = 42
+    ):
+        """
+        Parameters:
+        -----------
+        annual_factor : float
+            Periods per year for annualization (default 252)
+        risk_free_rate : float
+            Annual risk-free rate
+        target : float
+            Sortino target return per period
+        n_bootstrap : int
+            Stationary bootstrap resamples (0 disables intervals)
+        mean_block : float
+            Expected bootstrap block length in periods
+        confidence : float
+            Confidence level of the Sharpe intervals
+        correction : str
+            Multiple-testing correction: 'fdr_bh', 'holm' or 'bonferroni'
+        alpha : float
+            Significance level applied to the corrected p-values
+        chunk_size : int
+            Strategies per vectorized chunk
+        n_jobs : int
+            Worker processes for chunks (1 = in-process)
+        seed : int, optional
+            Bootstrap seed
+        """
+        self.annual_factor = annual_factor
+        self.risk_free_rate = risk_free_rate
+        self.target = target
+        self.n_bootstrap = n_bootstrap
+        self.mean_block = mean_block
+        self.confidence = confidence
+        self.correction = correction
+        self.alpha = alpha
+        self.chunk_size = chunk_size
+        self.n_jobs = n_jobs
+        self.seed = seed
+
+    def grade(
+        self,
+        returns: Union[pd.DataFrame, np.ndarray],
+        n_trials: Optional[int] = None,
+        sharpe_variance: Optional[float] = None
+    ) -> pd.DataFrame:
+        """
+        Compute metrics for every strategy (column) of a return matrix.
+
+        Parameters:
+        -----------
+        returns : pd.DataFrame or np.ndarray
+            (T x S) daily returns, rows aligned on a common calendar.
+            NaN is treated as a flat (zero-return) day.
+        n_trials : int, optional
+            Number of strategies tried for the deflated Sharpe ratio
+            (default S, the columns graded here)
+        sharpe_variance : float, optional
+            Cross-trial variance of per-period Sharpe ratios
+            (default: estimated from the graded columns)
+
+        Returns:
+        --------
+        metrics : pd.DataFrame
+            One row per strategy: sharpe, sortino, calmar, cagr, max_drawdown,
+            bootstrap sharpe_ci_low/high, psr, dsr, p_value, p_value_adj, significant
+        """
+        names = returns.columns if isinstance(returns, pd.DataFrame) else None
+        R = np.nan_to_num(np.asarray(returns, dtype=np.float64))
+        if R.ndim == 1:
+            R = R[:, None]
+        T, S = R.shape
+        if T < 3:
+            raise ValueError(f"Need at least 3 observations, got {T}")
+
+        counts = None
+        if self.n_bootstrap > 0:
+            counts = stationary_bootstrap_counts(T, self.n_bootstrap, self.mean_block, self.seed)
+
+        bounds = [(i, min(i + self.chunk_size, S)) for i in range(0, S, self.chunk_size)]
+        args = (counts, self.annual_factor, self.risk_free_rate, self.target, self.confidence)
+        if self.n_jobs > 1 and len(bounds) > 1:
+            with ProcessPoolExecutor(max_workers=self.n_jobs) as pool:
+                futures = [pool.submit(_grade_chunk, R[:, a:b], *args) for a, b in bounds]
+                chunks = [f.result() for f in futures]
+        else:
+            chunks = [_grade_chunk(R[:, a:b], *args) for a, b in bounds]
+
+        result = pd.DataFrame({
+            key: np.concatenate([c[key] for c in chunks]) for key in chunks[0]
+        }, index=names)
+
+        # Probabilistic / deflated Sharpe on per-period estimates
+        sr = result.pop('sharpe_per_period').values
+        n_obs = result['n_obs'].values
+        skew = result['skew'].values
+        kurt = result['kurtosis'].values
+        if sharpe_variance is None:
+            sharpe_variance = float(np.var(sr, ddof=1)) if S > 1 else 0.0
+        benchmark = expected_max_sharpe(sharpe_variance, n_trials or S)
+
+        result['psr'] = probabilistic_sharpe_ratio(sr, 0.0, n_obs, skew, kurt)
+        result['dsr'] = probabilistic_sharpe_ratio(sr, benchmark, n_obs, skew, kurt)
+
+        # One-sided test of SR > 0, corrected for the number of strategies graded
+        result['p_value'] = 1.0 - result['psr']
+        result['p_value_adj'] = adjust_pvalues(result['p_value'].values, self.correction)
+        result['significant'] = result['p_value_adj'] <= self.alpha
+
+        return result
@@ -0,0 +1,542 @@
+#!/usr/bin/env python3
+"""
+Backtest Job Queue
+==================
+Runs backtests off the request thread.
+
+- Submit returns a job id immediately; jobs run on a bounded process pool
+- Priorities (higher first) and cancellation (queued jobs are dropped,
+  running jobs stop at the next checkpoint)
+- Progress and partial equity curves stream back from the workers and can
+  be polled or followed as server-sent events
+- Results are persisted to disk and can be re-fetched after completion
+  (the newest max_results are kept)
+- A crashed worker fails its job and the pool is rebuilt
+- Identical (strategy, date range, capital) requests share one live job
+- The predictive interceptor runs on a thread alongside the backtest
+"""
+
+import hashlib
+import heapq
+import itertools
+import json
+import logging
+import multiprocessing
+import os
+import subprocess
+import tempfile
+import threading
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+# =============================================================================
+# JOB MODEL
+# =============================================================================
+
+class JobStatus:
+    QUEUED = 'queued'
+    RUNNING = 'running'
+    COMPLETED = 'completed'
+    FAILED = 'failed'
+    CANCELLED = 'cancelled'
+
+    FINAL = (COMPLETED, FAILED, CANCELLED)
+
+
+class JobCancelled(Exception):
+    """Raised inside a worker when its job has been cancelled."""
+
+
+def backtest_job_key(strategy_key: str, start_date: str, end_date: str, capital: float) -> str:
+    """De-duplication key for a backtest request."""
+    raw = f"{strategy_key}|{start_date}|{end_date}|{float(capital)}"
+    return hashlib.sha1(raw.encode()).hexdigest()[:16]
+
+
+@dataclass
+class BacktestJob:
+    """State of one queued / running / finished backtest."""
+    job_id: str
+    key: str
+    params: Dict[str, Any]
+    priority: int = 0
+    status: str = JobStatus.QUEUED
+    progress: float = 0.0
+    message: str = 'queued'
+    equity_curve: List[Dict] = field(default_factory=list)
+    error: Optional[str] = None
+    interceptor: Optional[Dict] = None
+    created_at: float = field(default_factory=time.time)
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    version: int = 0  # Bumped on every update (SSE / long-poll cursor)
+
+    def to_dict(self, equity_since: Optional[int] = None) -> Dict[str, Any]:
+        """Status snapshot; equity_since=N includes curve points from index N."""
+        snapshot = {
+            'job_id': self.job_id,
+            'status': self.status,
+            'priority': self.priority,
+            'progress': round(self.progress, 4),
+            'message': self.message,
+            'params': self.params,
+            'equity_points': len(self.equity_curve),
+            'error': self.error,
+            'interceptor': self.interceptor,
+            'created_at': self.created_at,
+            'started_at': self.started_at,
+            'finished_at': self.finished_at,
+            'version': self.version,
+        }
+        if equity_since is not None:
+            snapshot['equity_since'] = equity_since
+            snapshot['equity_curve'] = self.equity_curve[equity_since:]
+        return snapshot
+
+
+# =============================================================================
+# WORKER SIDE
+# =============================================================================
+
+_progress_queue = None
+_EQUITY_CHUNK = 500
+
+
+def _init_job_worker(progress_queue) -> None:
+    global _progress_queue
+    _progress_queue = progress_queue
+
+
+def _write_json_atomic(path: Path, payload: Dict) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=path.parent, suffix='.tmp')
+    with os.fdopen(fd, 'w') as f:
+        json.dump(payload, f, default=str)
+    os.replace(tmp, path)
+
+
+class JobContext:
+    """Handle a job runner uses to report progress and observe cancellation."""
+
+    def __init__(self, job_id: str, jobs_dir: Path):
+        self.job_id = job_id
+        self.jobs_dir = Path(jobs_dir)
+
+    def progress(self, fraction: float, message: str = '') -> None:
+        if _progress_queue is not None:
+            _progress_queue.put((self.job_id, 'progress', fraction, message))
+
+    def equity(self, rows: List[Dict]) -> None:
+        """Stream equity curve points (in chunks) to the server."""
+        if _progress_queue is None:
+            return
+        for i in range(0, len(rows), _EQUITY_CHUNK):
+            _progress_queue.put((self.job_id, 'equity', json.loads(json.dumps(rows[i:i + _EQUITY_CHUNK], default=str)), ''))
+
+    def checkpoint(self) -> None:
+        """Raise JobCancelled if the job was cancelled while running."""
+        if (self.jobs_dir / f"{self.job_id}.cancel").exists():
+            raise JobCancelled(self.job_id)
+
+
+def run_backtest_job(ctx: JobContext, params: Dict[str, Any]) -> Dict[str, Any]:
+    """Default runner: QuantEngineAPI.run_backtest with phase progress."""
+    from engine.api.routes import get_api
+
+    api = get_api()
+    ctx.progress(0.05, 'loading market data')
+    api._get_spy_data()
+    ctx.checkpoint()
+
+    ctx.progress(0.2, 'simulating')
+    result = api.run_backtest(params['strategy_key'], params['start_date'], params['end_date'], params['capital'])
+    ctx.checkpoint()
+
+    ctx.progress(0.9, 'streaming results')
+    ctx.equity(result.get('equity_curve', []))
+    return result
+
+
+def _execute_job(runner: Callable, job_id: str, params: Dict[str, Any], jobs_dir: str) -> Dict[str, Any]:
+    """
+    Process-pool entry point: run, persist the result, report the outcome.
+
+    The outcome is also sent through the progress queue so it arrives after
+    every progress / equity message of the job.
+    """
+    ctx = JobContext(job_id, Path(jobs_dir))
+    try:
+        ctx.checkpoint()
+        result = runner(ctx, params)
+        _write_json_atomic(Path(jobs_dir) / f"{job_id}.json", result)
+        if result.get('success', True):
+            outcome = {'status': JobStatus.COMPLETED}
+        else:
+            outcome = {'status': JobStatus.FAILED, 'error': result.get('error')}
+    except JobCancelled:
+        outcome = {'status': JobStatus.CANCELLED}
+    except Exception as e:
+        outcome = {'status': JobStatus.FAILED, 'error': str(e)}
+
+    if _progress_queue is not None:
+        _progress_queue.put((job_id, 'done', outcome, ''))
+    return outcome
+
+
+def _run_interceptor(strategy_key: str, start_date: str, end_date: str) -> Optional[Dict]:
+    """Predictive interceptor: check causal memory for known failure patterns."""
+    interceptor_task = f"""Check if strategy '{strategy_key}' has historical failures in period {start_date} to {end_date}.
+
+Return JSON: {{"risk_level": "HIGH|MEDIUM|LOW", "mechanism": "why", "evidence": "data"}}
+If no risk: {{"risk_level": "LOW"}}"""
+
+    try:
+        result_check = subprocess.run(
+            ['python3', 'scripts/deepseek_agent.py', interceptor_task, 'analyst'],
+            capture_output=True,
+            text=True,
+            timeout=30,
+            cwd=str(Path(__file__).resolve().parents[2])
+        )
+        if result_check.returncode != 0:
+            return None
+        risk = json.loads(result_check.stdout)
+        if risk.get('risk_level') == 'HIGH':
+            print(f"⚠️  PREDICTIVE INTERVENTION: High risk for {strategy_key}")
+            print(f"    Mechanism: {risk.get('mechanism')}")
+        return risk
+    except (json.JSONDecodeError, ValueError) as e:
+        print(f"  [Interceptor] Failed to parse risk check: {e}")
+    except Exception as e:
+        print(f"[Interceptor] Check failed: {e}")
+    return None
+
+
+# =============================================================================
+# QUEUE
+# =============================================================================
+
+class BacktestJobQueue:
+    """
+    Priority job queue over a bounded process pool.
+
+    A dispatcher thread hands the highest-priority queued job to the pool
+    whenever a worker is free; a listener thread applies worker progress
+    messages to the job table and wakes any waiting stream.
+    """
+
+    def __init__(
+        self,
+        max_workers: Optional[int] = None,
+        jobs_dir: Optional[str] = None,
+        runner: Callable = run_backtest_job,
+        interceptor: Optional[Callable] = _run_interceptor,
+        max_finished: int = 200,
+        max_results: int = 500
+    ):
+        self.max_workers = max_workers or max(1, min(4, (os.cpu_count() or 2) - 1))
+        self.jobs_dir = Path(jobs_dir or os.environ.get(
+            'BACKTEST_JOBS_DIR', '~/.quant-engine/backtest_jobs'
+        )).expanduser()
+        self.jobs_dir.mkdir(parents=True, exist_ok=True)
+        self.runner = runner
+        self.interceptor = interceptor
+        self.max_finished = max_finished
+        self.max_results = max_results
+
+        self._jobs: Dict[str, BacktestJob] = {}
+        self._live_by_key: Dict[str, str] = {}
+        self._heap: List = []
+        self._seq = itertools.count()
+        self._running = 0
+        # Re-entrant: a future that is already done runs its callback inline
+        self._lock = threading.RLock()
+        self._changed = threading.Condition(self._lock)
+        self._closed = False
+
+        self._mp_context = multiprocessing.get_context('spawn')
+        self._progress_queue = self._mp_context.Queue()
+        self._pool = self._new_pool()
+        self._interceptor_pool = ThreadPoolExecutor(max_workers=2, thread_name_prefix='interceptor')
+
+        with self._lock:
+            self._prune_results()
+        threading.Thread(target=self._dispatch_loop, name='job-dispatcher', daemon=True).start()
+        threading.Thread(target=self._listen_loop, name='job-listener', daemon=True).start()
+
+    # -------------------------------------------------------------------------
+    # Public API
+    # -------------------------------------------------------------------------
+
+    def submit(
+        self,
+        strategy_key: str,
+        start_date: str,
+        end_date: str,
+        capital: float = 100000,
+        priority: int = 0
+    ) -> Dict[str, Any]:
+        """
+        Queue a backtest (or join an identical live one).
+
+        Returns:
+            {'job_id': ..., 'status': ..., 'deduplicated': bool}
+        """
+        key = backtest_job_key(strategy_key, start_date, end_date, capital)
+        with self._lock:
+            live_id = self._live_by_key.get(key)
+            if live_id is not None:
+                job = self._jobs[live_id]
+                if priority > job.priority and job.status == JobStatus.QUEUED:
+                    job.priority = priority
+                    heapq.heappush(self._heap, (-priority, next(self._seq), live_id))
+                return {'job_id': live_id, 'status': job.status, 'deduplicated': True}
+
+            job = BacktestJob(
+                job_id=uuid.uuid4().hex[:12],
+                key=key,
+                params={'strategy_key': strategy_key, 'start_date': start_date,
+                        'end_date': end_date, 'capital': capital},
+                priority=priority,
+            )
+            self._jobs[job.job_id] = job
+            self._live_by_key[key] = job.job_id
+            heapq.heappush(self._heap, (-priority, next(self._seq), job.job_id))
+            self._prune_finished()
+            self._changed.notify_all()
+            submitted = {'job_id': job.job_id, 'status': job.status, 'deduplicated': False}
+
+        if self.interceptor is not None:
+            future = self._interceptor_pool.submit(self.interceptor, strategy_key, start_date, end_date)
+            future.add_done_callback(lambda f, job_id=job.job_id: self._set_interceptor(job_id, f))
+
+        logger.info(f"Queued backtest job {job.job_id} ({strategy_key} {start_date}..{end_date}, priority={priority})")
+        return submitted
+
+    def cancel(self, job_id: str) -> bool:
+        """Cancel a queued or running job. Returns False if unknown or already finished."""
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None or job.status in JobStatus.FINAL:
+                return False
+            if job.status == JobStatus.QUEUED:
+                # Lazily dropped from the heap by the dispatcher
+                self._finish(job, JobStatus.CANCELLED, message='cancelled')
+            else:
+                (self.jobs_dir / f"{job_id}.cancel").touch()
+                job.message = 'cancelling'
+                self._touch(job)
+        return True
+
+    def get(self, job_id: str, equity_since: Optional[int] = None) -> Optional[Dict[str, Any]]:
+        """Job status snapshot (None if unknown)."""
+        with self._lock:
+            job = self._jobs.get(job_id)
+            return job.to_dict(equity_since) if job else None
+
+    def list_jobs(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            return [job.to_dict() for job in sorted(self._jobs.values(), key=lambda j: -j.created_at)]
+
+    def result(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Persisted result of a completed job (survives server restarts)."""
+        path = self.jobs_dir / f"{job_id}.json"
+        if not path.exists():
+            return None
+        with open(path) as f:
+            return json.load(f)
+
+    def wait(self, job_id: str, timeout: Optional[float] = None) -> Optional[Dict[str, Any]]:
+        """Block until the job finishes (or timeout); returns its final snapshot."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._lock:
+            while True:
+                job = self._jobs.get(job_id)
+                if job is None or job.status in JobStatus.FINAL:
+                    return job.to_dict() if job else None
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return job.to_dict()
+                self._changed.wait(remaining)
+
+    def stream(self, job_id: str, heartbeat: float = 15.0) -> Iterator[Dict[str, Any]]:
+        """
+        Yield a snapshot on every change, with only the new equity points.
+
+        Ends after the final state; yields the unchanged snapshot as a
+        heartbeat every `heartbeat` seconds.
+        """
+        version, sent = -1, 0
+        while True:
+            with self._lock:
+                job = self._jobs.get(job_id)
+                if job is None:
+                    return
+                if job.version == version:
+                    self._changed.wait(heartbeat)
+                snapshot = job.to_dict(equity_since=sent)
+                version = job.version
+                sent = len(job.equity_curve)
+                final = job.status in JobStatus.FINAL
+            yield snapshot
+            if final:
+                return
+
+    def shutdown(self) -> None:
+        with self._lock:
+            self._closed = True
+            self._changed.notify_all()
+        self._pool.shutdown(wait=False, cancel_futures=True)
+        self._interceptor_pool.shutdown(wait=False)
+        self._progress_queue.put(None)
+
+    # -------------------------------------------------------------------------
+    # Internals (call with self._lock held unless noted)
+    # -------------------------------------------------------------------------
+
+    def _new_pool(self) -> ProcessPoolExecutor:
+        return ProcessPoolExecutor(
+            max_workers=self.max_workers, mp_context=self._mp_context,
+            initializer=_init_job_worker, initargs=(self._progress_queue,)
+        )
+
+    def _rebuild_pool(self, broken: ProcessPoolExecutor) -> None:
+        """Replace a broken pool (once, however many of its jobs report it)."""
+        if self._pool is not broken or self._closed:
+            return
+        logger.warning("Backtest worker pool broke - starting a new one")
+        self._pool = self._new_pool()
+        broken.shutdown(wait=False, cancel_futures=True)
+
+    def _touch(self, job: BacktestJob) -> None:
+        job.version += 1
+        self._changed.notify_all()
+
+    def _finish(self, job: BacktestJob, status: str, message: str = '', error: Optional[str] = None) -> None:
+        job.status = status
+        job.message = message or status
+        job.error = error
+        job.finished_at = time.time()
+        if status == JobStatus.COMPLETED:
+            job.progress = 1.0
+        if self._live_by_key.get(job.key) == job.job_id:
+            del self._live_by_key[job.key]
+        (self.jobs_dir / f"{job.job_id}.cancel").unlink(missing_ok=True)
+        self._touch(job)
+
+    def _prune_finished(self) -> None:
+        finished = [j for j in self._jobs.values() if j.status in JobStatus.FINAL]
+        for job in sorted(finished, key=lambda j: j.finished_at)[:max(0, len(finished) - self.max_finished)]:
+            del self._jobs[job.job_id]
+        self._prune_results()
+
+    def _prune_results(self) -> None:
+        """Keep the newest max_results persisted results (and those of known jobs)."""
+        results = []
+        for path in self.jobs_dir.glob('*.json'):
+            try:
+                results.append((path.stat().st_mtime, path))
+            except FileNotFoundError:
+                continue
+        if len(results) <= self.max_results:
+            return
+        results.sort(reverse=True)
+        for _, path in results[self.max_results:]:
+            if path.stem not in self._jobs:
+                path.unlink(missing_ok=True)
+
+    def _set_interceptor(self, job_id: str, future) -> None:
+        risk = future.result() if not future.exception() else None
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is not None and risk is not None:
+                job.interceptor = risk
+                self._touch(job)
+
+    def _dispatch_loop(self) -> None:
+        with self._lock:
+            while not self._closed:
+                if self._running >= self.max_workers or not self._heap:
+                    self._changed.wait()
+                    continue
+                _, _, job_id = heapq.heappop(self._heap)
+                job = self._jobs.get(job_id)
+                if job is None or job.status != JobStatus.QUEUED:
+                    continue  # Cancelled, or a stale entry after a priority bump
+
+                job.status = JobStatus.RUNNING
+                job.message = 'starting'
+                job.started_at = time.time()
+                self._running += 1
+                self._touch(job)
+                pool = self._pool
+                try:
+                    future = pool.submit(_execute_job, self.runner, job_id, job.params, str(self.jobs_dir))
+                except (BrokenProcessPool, RuntimeError) as e:
+                    self._running -= 1
+                    self._finish(job, JobStatus.FAILED, error=f"worker pool unavailable: {e}")
+                    self._rebuild_pool(pool)
+                    continue
+                future.add_done_callback(lambda f, job_id=job_id, pool=pool: self._on_done(job_id, pool, f))
+
+    def _on_done(self, job_id: str, pool: ProcessPoolExecutor, future) -> None:
+        # Normal outcomes are applied by the listener (after the job's last
+        # progress message); only crashes and cancelled futures are finalized here.
+        cancelled = future.cancelled()
+        error = None if cancelled else future.exception()
+        with self._lock:
+            self._running -= 1
+            job = self._jobs.get(job_id)
+            if job is not None and job.status not in JobStatus.FINAL:
+                if cancelled:
+                    self._finish(job, JobStatus.CANCELLED, message='cancelled')
+                elif error is not None:
+                    self._finish(job, JobStatus.FAILED, error=str(error) or type(error).__name__)
+            if isinstance(error, BrokenProcessPool):
+                self._rebuild_pool(pool)
+            self._changed.notify_all()
+
+    def _listen_loop(self) -> None:
+        """Apply worker progress messages (runs without the lock held between messages)."""
+        while True:
+            try:
+                message = self._progress_queue.get()
+            except (EOFError, OSError):
+                return
+            if message is None:
+                return
+            job_id, kind, payload, text = message
+            with self._lock:
+                job = self._jobs.get(job_id)
+                if job is None or job.status != JobStatus.RUNNING:
+                    continue
+                if kind == 'done':
+                    self._finish(job, payload['status'], error=payload.get('error'))
+                    continue
+                if kind == 'progress':
+                    job.progress = float(payload)
+                    job.message = text
+                elif kind == 'equity':
+                    job.equity_curve.extend(payload)
+                self._touch(job)
+
+
+# Singleton instance for server use
+_job_queue = None
+_job_queue_lock = threading.Lock()
+
+def get_job_queue() -> BacktestJobQueue:
+    """Get or create the job queue singleton."""
+    global _job_queue
+    with _job_queue_lock:
+        if _job_queue is None:
+            _job_queue = BacktestJobQueue()
+    return _job_queue
@@ -9,9 +9,18 @@ This module provides:
 - get_strategy_card(): Strategy details and metrics
 - run_simulation(): Scenario analysis (VIX shock, price drop)
 - run_backtest(): Full backtest execution
+
+Regime labels are computed once per data version and kept as a columnar
+artifact; responses are cached (LRU) per (endpoint, params, data version).
 """
 
+import hashlib
 import json
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+from pathlib import Path
 import pandas as pd
 import numpy as np
 import logging
@@ -98,6 +107,135 @@ REGIME_DESCRIPTIONS = {
 }
 
 
+# =============================================================================
+# CACHES
+# =============================================================================
+
+def frame_version(df: pd.DataFrame) -> str:
+    """Content hash of a DataFrame (changes whenever any value changes)."""
+    hashed = pd.util.hash_pandas_object(df, index=False).values
+    return hashlib.sha1(hashed.tobytes() + ','.join(map(str, df.columns)).encode()).hexdigest()[:16]
+
+
+class ResponseCache:
+    """Thread-safe LRU cache of API responses keyed on (endpoint, params, data version)."""
+
+    def __init__(self, max_entries: int = 256):
+        self.max_entries = max_entries
+        self._entries: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def _key(endpoint: str, params: Dict[str, Any], version: Optional[str]) -> tuple:
+        return endpoint, json.dumps(params, sort_keys=True, default=str), version
+
+    def get(self, endpoint: str, params: Dict[str, Any], version: Optional[str]) -> Optional[Dict[str, Any]]:
+        """Cached response (shallow copy, so callers may add top-level keys) or None."""
+        key = self._key(endpoint, params, version)
+        with self._lock:
+            response = self._entries.get(key)
+            if response is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return dict(response)
+
+    def put(self, endpoint: str, params: Dict[str, Any], version: Optional[str], response: Dict[str, Any]) -> None:
+        key = self._key(endpoint, params, version)
+        with self._lock:
+            self._entries[key] = dict(response)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+class RegimeLabelStore:
+    """
+    Regime labels for the full history, computed once per data version.
+
+    Labels are written as an uncompressed Arrow file (one column per field)
+    and memory-mapped on reuse, so a restart does not re-label. Range
+    queries binary-search the sorted date column.
+    """
+
+    COLUMNS = ('regime', 'regime_id', 'close', 'RV5', 'RV20', 'slope')
+
+    def __init__(self, cache_dir: Optional[str] = None):
+        self.cache_dir = Path(cache_dir or os.environ.get(
+            'REGIME_LABELS_DIR', '~/.quant-engine/regime_labels'
+        )).expanduser()
+        self.version: Optional[str] = None
+        self._dates: Optional[np.ndarray] = None
+        self._columns: Dict[str, np.ndarray] = {}
+        self._lock = threading.Lock()
+
+    def ensure(self, spy_df: pd.DataFrame, version: str, regime_engine: RegimeEngine) -> None:
+        """Make labels for this data version available (load or compute)."""
+        with self._lock:
+            if self.version == version:
+                return
+            path = self.cache_dir / f"regimes_{version}.arrow"
+            if path.exists():
+                table = self._read(path)
+            else:
+                table = self._label(spy_df, regime_engine)
+                self._write(path, table)
+
+            columns = {name: table.column(name).to_numpy(zero_copy_only=False) for name in table.column_names}
+            self._dates = columns.pop('date').astype('datetime64[D]')
+            self._columns = columns
+            self.version = version
+
+    def slice(self, start: date, end: date) -> Dict[str, np.ndarray]:
+        """Columns for start <= date <= end (inclusive)."""
+        lo = int(np.searchsorted(self._dates, np.datetime64(start, 'D'), side='left'))
+        hi = int(np.searchsorted(self._dates, np.datetime64(end, 'D'), side='right'))
+        sliced = {name: values[lo:hi] for name, values in self._columns.items()}
+        sliced['date'] = self._dates[lo:hi]
+        return sliced
+
+    def _label(self, spy_df: pd.DataFrame, regime_engine: RegimeEngine):
+        import pyarrow as pa
+
+        labeled = regime_engine.label_historical_data(spy_df)
+        labeled = labeled.assign(date=pd.to_datetime(labeled['date'])).sort_values('date', kind='mergesort')
+        regime_id = labeled['regime_id'] if 'regime_id' in labeled.columns else pd.Series(0, index=labeled.index)
+
+        arrays = {
+            'date': pa.array(labeled['date'].values.astype('datetime64[D]')),
+            'regime': pa.array(labeled['regime'].astype(str).values),
+            'regime_id': pa.array(pd.to_numeric(regime_id, errors='coerce').fillna(0).astype(np.int64).values),
+        }
+        for name in ('close', 'RV5', 'RV20', 'slope'):
+            if name in labeled.columns:
+                arrays[name] = pa.array(labeled[name].astype(float).values)
+        return pa.table(arrays)
+
+    def _read(self, path: Path):
+        import pyarrow as pa
+        with pa.memory_map(str(path), 'r') as source:
+            return pa.ipc.open_file(source).read_all()
+
+    def _write(self, path: Path, table) -> None:
+        import pyarrow as pa
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=path.parent, suffix='.tmp')
+        os.close(fd)
+        with pa.OSFile(tmp, 'wb') as sink, pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+        os.replace(tmp, path)
+        for stale in path.parent.glob('regimes_*.arrow'):
+            if stale != path:
+                stale.unlink(missing_ok=True)
+
+
 class QuantEngineAPI:
     """
     Main API class for the Quant Engine.
@@ -108,23 +246,30 @@ class QuantEngineAPI:
         self.regime_engine = RegimeEngine()
         self._spy_cache = None
         self._spy_cache_time = None
+        self.data_version: Optional[str] = None
+        self.response_cache = ResponseCache()
+        self.regime_labels = RegimeLabelStore()
         # Simulator instance for integrity tracking
         self._simulator: Optional[TradeSimulator] = None
 
-    def _get_spy_data(self, force_reload: bool = False) -> pd.DataFrame:
-        """Get SPY data with simple caching."""
+    def _get_spy_data(self, force_reload: bool = False, copy: bool = True) -> pd.DataFrame:
+        """
+        Get SPY data with simple caching.
+
+        Pass copy=False for read-only use (no per-call copy of the history).
+        """
         cache_ttl = 300  # 5 minutes
         now = datetime.now()
 
-        if (not force_reload and
-            self._spy_cache is not None and
-            self._spy_cache_time and
-            (now - self._spy_cache_time).seconds < cache_ttl):
-            return self._spy_cache.copy()
+        if not (not force_reload and
+                self._spy_cache is not None and
+                self._spy_cache_time and
+                (now - self._spy_cache_time).seconds < cache_ttl):
+            self._spy_cache = load_spy_data()
+            self._spy_cache_time = now
+            self.data_version = frame_version(self._spy_cache)
 
-        self._spy_cache = load_spy_data()
-        self._spy_cache_time = now
-        return self._spy_cache.copy()
+        return self._spy_cache.copy() if copy else self._spy_cache
 
     def get_regime_heatmap(
         self,
@@ -157,53 +302,59 @@ class QuantEngineAPI:
             start = datetime.strptime(start_date, '%Y-%m-%d').date()
             end = datetime.strptime(end_date, '%Y-%m-%d').date()
 
-            # Load SPY data
-            spy_df = self._get_spy_data()
+            # Load SPY data (refreshes data_version)
+            spy_df = self._get_spy_data(copy=False)
 
-            # Filter date range
-            spy_df = spy_df[(spy_df['date'] >= start) & (spy_df['date'] <= end)].copy()
+            params = {'start_date': start_date, 'end_date': end_date}
+            cached = self.response_cache.get('regimes', params, self.data_version)
+            if cached is not None:
+                return cached
 
-            if len(spy_df) == 0:
+            # Regime classification over the full history, once per data version
+            self.regime_labels.ensure(spy_df, self.data_version, self.regime_engine)
+            columns = self.regime_labels.slice(start, end)
+
+            if len(columns['date']) == 0:
                 return {
                     'success': False,
                     'error': f'No data available for {start_date} to {end_date}'
                 }
 
-            # Run regime classification
-            labeled_df = self.regime_engine.label_historical_data(spy_df)
-
-            # Build heatmap data
-            heatmap_data = []
-            for _, row in labeled_df.iterrows():
-                regime_label = row.get('regime', 'UNKNOWN')
-                regime_id = row.get('regime_id', 0)
-
-                # Extract metrics from row
-                metrics = {}
-                if 'RV5' in row:
-                    metrics['rv5'] = float(row['RV5']) if pd.notna(row['RV5']) else None
-                if 'RV20' in row:
-                    metrics['rv20'] = float(row['RV20']) if pd.notna(row['RV20']) else None
-                if 'close' in row:
-                    metrics['close'] = float(row['close'])
-                if 'slope' in row:
-                    metrics['trend'] = 'up' if row['slope'] > 0 else 'down'
-
-                heatmap_data.append({
-                    'date': row['date'].strftime('%Y-%m-%d') if hasattr(row['date'], 'strftime') else str(row['date']),
-                    'regime': regime_label,
-                    'regime_id': int(regime_id) if pd.notna(regime_id) else 0,
+            # Build heatmap data column-wise
+            dates = np.datetime_as_string(columns['date'], unit='D').tolist()
+            regimes = columns['regime'].tolist()
+            regime_ids = columns['regime_id'].tolist()
+
+            metric_columns = []
+            for source, name in (('RV5', 'rv5'), ('RV20', 'rv20')):
+                if source in columns:
+                    values = columns[source]
+                    metric_columns.append((name, [None if np.isnan(v) else v for v in values.tolist()]))
+            if 'close' in columns:
+                metric_columns.append(('close', columns['close'].tolist()))
+            if 'slope' in columns:
+                metric_columns.append(('trend', np.where(columns['slope'] > 0, 'up', 'down').tolist()))
+
+            heatmap_data = [
+                {
+                    'date': dates[i],
+                    'regime': regimes[i],
+                    'regime_id': regime_ids[i],
                     'confidence': 0.85,  # Placeholder until engine supports confidence
-                    'metrics': metrics,
-                    'description': REGIME_DESCRIPTIONS.get(regime_label, 'Unknown market state.')
-                })
+                    'metrics': {name: values[i] for name, values in metric_columns},
+                    'description': REGIME_DESCRIPTIONS.get(regimes[i], 'Unknown market state.')
+                }
+                for i in range(len(dates))
+            ]
 
-            return {
+            result = {
                 'success': True,
                 'data': heatmap_data,
                 'count': len(heatmap_data),
                 'date_range': {'start': start_date, 'end': end_date}
             }
+            self.response_cache.put('regimes', params, self.data_version, result)
+            return result
 
         except Exception as e:
             logger.error(f"Error in get_regime_heatmap: {e}", exc_info=True)
@@ -342,6 +493,10 @@ class QuantEngineAPI:
                 }
             }
         """
+        cached = self.response_cache.get('discovery', {}, None)
+        if cached is not None:
+            return cached
+
         # Build regime -> strategies mapping
         regime_strategies = {}
         for regime in REGIME_DESCRIPTIONS.keys():
@@ -398,7 +553,7 @@ class QuantEngineAPI:
                     'risk_distribution': {'low': 0, 'medium': 0, 'high': 0}
                 }
 
-        return {
+        result = {
             'success': True,
             'matrix': regime_strategies,
             'coverage': {
@@ -411,6 +566,8 @@ class QuantEngineAPI:
             'regime_risk_profile': regime_risk_profile,
             'regime_descriptions': REGIME_DESCRIPTIONS
         }
+        self.response_cache.put('discovery', {}, None, result)
+        return result
 
     def run_simulation(
         self,
@@ -638,7 +795,7 @@ class QuantEngineAPI:
         """
         try:
             # Load and filter data
-            spy_df = self._get_spy_data()
+            spy_df = self._get_spy_data(copy=False)
 
             start = datetime.strptime(start_date, '%Y-%m-%d').date()
             end = datetime.strptime(end_date, '%Y-%m-%d').date()
@@ -654,13 +811,15 @@ class QuantEngineAPI:
             simulator = TradeSimulator(initial_capital=capital)
             result = simulator.run(spy_df, strategy_key)
 
-            return {
+            response = {
                 'success': True,
                 'metrics': result.get('metrics', {}),
                 'equity_curve': result.get('equity_curve', []),
                 'trades': result.get('trades', []),
-                'engine_source': 'quant-engine'
+                'engine_source': 'quant-engine',
+                'data_version': self.data_version
             }
+            return response
 
         except Exception as e:
             logger.error(f"Error in run_backtest: {e}", exc_info=True)
@@ -669,6 +828,41 @@ class QuantEngineAPI:
                 'error': str(e)
             }
 
+    @staticmethod
+    def _backtest_params(strategy_key: str, start_date: str, end_date: str, capital: float) -> Dict[str, Any]:
+        return {'strategy_key': strategy_key, 'start_date': start_date,
+                'end_date': end_date, 'capital': float(capital)}
+
+    def cached_backtest(
+        self,
+        strategy_key: str,
+        start_date: str,
+        end_date: str,
+        capital: float = 100000
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Cached /backtest response for the current data version, or None.
+
+        Backtests run in job-queue worker processes, so the server process
+        looks here before dispatching and stores results with cache_backtest.
+        """
+        self._get_spy_data(copy=False)
+        params = self._backtest_params(strategy_key, start_date, end_date, capital)
+        return self.response_cache.get('backtest', params, self.data_version)
+
+    def cache_backtest(
+        self,
+        strategy_key: str,
+        start_date: str,
+        end_date: str,
+        capital: float,
+        response: Dict[str, Any]
+    ) -> None:
+        """Store a successful backtest response under the data version it was computed on."""
+        if response.get('success') and response.get('data_version'):
+            params = self._backtest_params(strategy_key, start_date, end_date, capital)
+            self.response_cache.put('backtest', params, response['data_version'], response)
+
     def run_backtest_on_noise(
         self,
         strategy_key: str,
@@ -779,8 +973,8 @@ class QuantEngineAPI:
                     'available_plugins': available
                 }
 
-            # Get data for plugin
-            spy_df = self._get_spy_data()
+            # Get data for plugin (copied once below; plugins may modify their input)
+            spy_df = self._get_spy_data(copy=False)
 
             # Filter date range if provided
             if start_date or end_date:
@@ -795,6 +989,8 @@ class QuantEngineAPI:
                     end = datetime.now().date()
 
                 spy_df = spy_df[(spy_df['date'] >= start) & (spy_df['date'] <= end)].copy()
+            else:
+                spy_df = spy_df.copy()
 
             if len(spy_df) == 0:
                 return {
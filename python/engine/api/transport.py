@@ -0,0 +1,266 @@
+#!/usr/bin/env python3
+"""
+Columnar Response Transport
+===========================
+Opt-in encodings for large tabular API payloads (equity curves, trade
+lists, market data), negotiated via the Accept header:
+
+- application/json (default): row records, unchanged
+- application/vnd.quant.columnar+json: one entry per column; numeric and
+  timestamp columns are base64 little-endian buffers that map directly onto
+  JS typed arrays (Float64Array / Uint8Array)
+- application/x-ndjson: the columnar JSON split into row chunks, one
+  JSON document per line, streamed as they are encoded
+- application/vnd.apache.arrow.stream: Arrow IPC stream, one record batch
+  per chunk, non-tabular fields in the schema metadata
+
+Chart-bound series can be downsampled server-side with LTTB
+(Largest-Triangle-Three-Buckets), which keeps the visual shape of a series
+with a fixed number of points.
+"""
+
+import base64
+import io
+import json
+from typing import Any, Dict, Iterator, Optional, Sequence, Union
+
+import numpy as np
+import pandas as pd
+
+JSON = 'application/json'
+COLUMNAR_JSON = 'application/vnd.quant.columnar+json'
+NDJSON = 'application/x-ndjson'
+ARROW_STREAM = 'application/vnd.apache.arrow.stream'
+
+FORMATS = (JSON, COLUMNAR_JSON, NDJSON, ARROW_STREAM)
+
+DEFAULT_CHUNK_SIZE = 65536
+
+Tabular = Union[pd.DataFrame, Sequence[Dict[str, Any]]]
+
+
+# =============================================================================
+# NEGOTIATION
+# =============================================================================
+
+def negotiate(accept_header: Optional[str]) -> str:
+    """
+    Pick the response format for an Accept header.
+
+    Plain JSON wins ties and wildcards, so existing clients are unaffected.
+    """
+    from werkzeug.datastructures import MIMEAccept
+    from werkzeug.http import parse_accept_header
+
+    accept = parse_accept_header(accept_header or '', MIMEAccept)
+    return accept.best_match(FORMATS, default=JSON) or JSON
+
+
+def to_frame(table: Tabular) -> pd.DataFrame:
+    """Row records (or a DataFrame) as a DataFrame."""
+    if isinstance(table, pd.DataFrame):
+        return table
+    return pd.DataFrame.from_records(list(table))
+
+
+def to_records(table: Tabular) -> list:
+    """
+    A table as JSON-safe row records.
+
+    Row records are returned as they are (a DataFrame round trip would turn
+    None and missing keys into NaN, which is not valid JSON); DataFrame
+    missing values become None.
+    """
+    if not isinstance(table, pd.DataFrame):
+        return list(table)
+    return table.astype(object).where(table.notna(), None).to_dict('records')
+
+
+# =============================================================================
+# DOWNSAMPLING
+# =============================================================================
+
+def lttb_indices(x: np.ndarray, y: np.ndarray, n_out: int) -> np.ndarray:
+    """
+    Largest-Triangle-Three-Buckets downsampling.
+
+    Args:
+        x: Sorted x values (float)
+        y: Series values (float); non-finite points are never selected
+        n_out: Number of points to keep (first and last always kept)
+
+    Returns:
+        Sorted indices into x / y
+    """
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    valid = np.flatnonzero(np.isfinite(x) & np.isfinite(y))
+    n = len(valid)
+    if n_out >= n or n_out < 3:
+        return valid
+
+    xs, ys = x[valid], y[valid]
+    # Prefix sums give every bucket average in O(1)
+    cx = np.concatenate([[0.0], np.cumsum(xs)])
+    cy = np.concatenate([[0.0], np.cumsum(ys)])
+    every = (n - 2) / (n_out - 2)
+    edges = (np.arange(n_out - 1) * every).astype(np.int64) + 1
+    edges[-1] = n - 1
+
+    selected = np.empty(n_out, dtype=np.int64)
+    selected[0] = 0
+    a = 0
+    for i in range(n_out - 2):
+        lo, hi = edges[i], edges[i + 1]
+        avg_lo = hi
+        avg_hi = edges[i + 2] if i + 2 < len(edges) else n
+        span = avg_hi - avg_lo
+        avg_x = (cx[avg_hi] - cx[avg_lo]) / span
+        avg_y = (cy[avg_hi] - cy[avg_lo]) / span
+
+        area = np.abs((xs[a] - avg_x) * (ys[lo:hi] - ys[a]) - (xs[a] - xs[lo:hi]) * (avg_y - ys[a]))
+        a = lo + int(np.argmax(area))
+        selected[i + 1] = a
+    selected[-1] = n - 1
+    return valid[selected]
+
+
+def _numeric_axis(values: pd.Series) -> np.ndarray:
+    """Float x axis for a date / timestamp / numeric column."""
+    if pd.api.types.is_numeric_dtype(values):
+        return values.to_numpy(dtype=float)
+    parsed = pd.to_datetime(values, errors='coerce', utc=True)
+    return (parsed - pd.Timestamp(0, tz='UTC')).dt.total_seconds().to_numpy(dtype=float, na_value=np.nan)
+
+
+def downsample_positions(frame: pd.DataFrame, max_points: int, y: str,
+                         x: Optional[str] = None) -> Optional[np.ndarray]:
+    """Row positions downsample() keeps, or None when the frame is kept whole."""
+    if not max_points or len(frame) <= max_points or y not in frame.columns:
+        return None
+    xs = _numeric_axis(frame[x]) if x and x in frame.columns else np.arange(len(frame), dtype=float)
+    return lttb_indices(xs, pd.to_numeric(frame[y], errors='coerce').to_numpy(dtype=float, na_value=np.nan), max_points)
+
+
+def downsample(frame: pd.DataFrame, max_points: int, y: str, x: Optional[str] = None) -> pd.DataFrame:
+    """
+    Reduce a chart series to at most max_points rows with LTTB.
+
+    Args:
+        frame: Rows in x order
+        max_points: Target row count (no-op if the frame is already smaller)
+        y: Value column
+        x: Time / x column (row position when None or missing)
+    """
+    keep = downsample_positions(frame, max_points, y, x)
+    return frame if keep is None else frame.iloc[keep].reset_index(drop=True)
+
+
+# =============================================================================
+# COLUMNAR JSON
+# =============================================================================
+
+def _b64(array: np.ndarray) -> str:
+    return base64.b64encode(np.ascontiguousarray(array).tobytes()).decode('ascii')
+
+
+def encode_column(values: pd.Series) -> Dict[str, Any]:
+    """
+    One column as {'dtype', 'data'}.
+
+    float/int -> 'float64' (Float64Array), bool -> 'uint8' (Uint8Array),
+    datetimes -> 'timestamp_ms' (Float64Array of epoch milliseconds, NaN for
+    missing); anything else -> 'string' with a plain list (None for missing).
+    """
+    if pd.api.types.is_bool_dtype(values):
+        return {'dtype': 'uint8', 'data': _b64(values.to_numpy(dtype='<u1'))}
+    if pd.api.types.is_numeric_dtype(values):
+        return {'dtype': 'float64', 'data': _b64(values.to_numpy(dtype='<f8', na_value=np.nan))}
+    if pd.api.types.is_datetime64_any_dtype(values):
+        ms = _numeric_axis(values) * 1000.0
+        return {'dtype': 'timestamp_ms', 'data': _b64(ms.astype('<f8'))}
+    strings = values.astype(object).where(values.notna(), None)
+    return {'dtype': 'string', 'data': [None if v is None else str(v) for v in strings.tolist()]}
+
+
+def decode_column(column: Dict[str, Any]) -> Union[np.ndarray, list]:
+    """Inverse of encode_column (timestamps stay epoch milliseconds)."""
+    if column['dtype'] == 'string':
+        return column['data']
+    dtype = '<u1' if column['dtype'] == 'uint8' else '<f8'
+    return np.frombuffer(base64.b64decode(column['data']), dtype=dtype)
+
+
+def encode_columns(frame: pd.DataFrame) -> Dict[str, Any]:
+    """A DataFrame as {'length', 'columns': {name: encoded column}}."""
+    return {
+        'length': len(frame),
+        'columns': {str(name): encode_column(frame[name]) for name in frame.columns},
+    }
+
+
+def columnar_payload(payload: Dict[str, Any], tables: Dict[str, pd.DataFrame]) -> Dict[str, Any]:
+    """Response dict with each table replaced by its columnar encoding."""
+    body = dict(payload)
+    body['format'] = 'columnar'
+    for name, frame in tables.items():
+        body[name] = encode_columns(frame)
+    return body
+
+
+def iter_columnar_chunks(payload: Dict[str, Any], tables: Dict[str, pd.DataFrame],
+                         chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[str]:
+    """
+    NDJSON stream: a header line (non-tabular fields plus table lengths),
+    then one {'table', 'offset', 'length', 'columns'} line per chunk.
+    """
+    header = dict(payload)
+    header['format'] = 'columnar'
+    header['tables'] = {name: len(frame) for name, frame in tables.items()}
+    yield json.dumps(header, default=str) + '\n'
+
+    for name, frame in tables.items():
+        for offset in range(0, len(frame), chunk_size):
+            chunk = encode_columns(frame.iloc[offset:offset + chunk_size])
+            yield json.dumps({'table': name, 'offset': offset, **chunk}) + '\n'
+
+
+# =============================================================================
+# ARROW IPC
+# =============================================================================
+
+def iter_arrow_stream(payload: Dict[str, Any], frame: pd.DataFrame,
+                      chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[bytes]:
+    """
+    Arrow IPC stream of one table, yielded as each record batch is written.
+
+    Non-tabular response fields are JSON-encoded under the b'payload' schema
+    metadata key.
+    """
+    import pyarrow as pa
+
+    table = pa.Table.from_pandas(frame, preserve_index=False)
+    schema = table.schema.with_metadata({b'payload': json.dumps(payload, default=str).encode()})
+
+    sink = io.BytesIO()
+    with pa.ipc.new_stream(sink, schema) as writer:
+        for batch in table.to_batches(max_chunksize=chunk_size):
+            writer.write_batch(batch)
+            yield _drain(sink)
+    yield _drain(sink)
+
+
+def _drain(sink: io.BytesIO) -> bytes:
+    data = sink.getvalue()
+    sink.seek(0)
+    sink.truncate()
+    return data
+
+
+def read_arrow_stream(data: bytes):
+    """Decode an Arrow IPC stream body into (payload dict, pyarrow.Table)."""
+    import pyarrow as pa
+
+    table = pa.ipc.open_stream(data).read_all()
+    metadata = table.schema.metadata or {}
+    return json.loads(metadata.get(b'payload', b'{}')), table
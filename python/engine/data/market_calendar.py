@@ -0,0 +1,42 @@
+"""
+Market Calendar - NYSE trading sessions
+=======================================
+Shared lazy-loaded NYSE calendar for the daemon and the miners.
+
+Falls back to weekdays when pandas-market-calendars is not installed.
+"""
+
+import logging
+
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+# Global market calendar instance (lazy-loaded)
+_market_calendar = None
+_calendar_unavailable = False
+
+
+def get_market_calendar():
+    """Get NYSE market calendar (lazy-loaded singleton), or None if unavailable."""
+    global _market_calendar, _calendar_unavailable
+    if _market_calendar is None and not _calendar_unavailable:
+        try:
+            import pandas_market_calendars as mcal
+            _market_calendar = mcal.get_calendar('NYSE')
+        except ImportError:
+            _calendar_unavailable = True
+            logger.warning("pandas-market-calendars not installed - falling back to weekdays")
+    return _market_calendar
+
+
+def trading_days(start_date: str, end_date: str) -> pd.DatetimeIndex:
+    """
+    NYSE trading sessions between two dates (inclusive).
+
+    Falls back to weekdays when the calendar package is unavailable.
+    """
+    cal = get_market_calendar()
+    if cal is None:
+        return pd.bdate_range(start=start_date, end=end_date)
+    return pd.DatetimeIndex(cal.valid_days(start_date=start_date, end_date=end_date).tz_localize(None))
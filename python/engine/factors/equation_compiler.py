@@ -0,0 +1,443 @@
+"""
+Equation Compiler - Batch evaluation of Math Swarm equations.
+
+Parses each equation once into an expression DAG, merges the whole Pareto
+frontier into one plan with common subexpressions shared, and evaluates the
+plan over contiguous NumPy feature columns in row chunks.
+
+Evaluation semantics match FactorComputer._evaluate_equation (protected
+sqrt/log, numpy ufuncs, variable names x0..xN resolved through the
+feature mapping, otherwise bare feature names).
+
+Author: Physics Engine
+Created: 2025-12-06
+"""
+
+import ast
+import hashlib
+import logging
+import operator
+import re
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional, Sequence, Set, Tuple
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+
+# ============================================================================
+# OPERATOR TABLES
+# ============================================================================
+
+def _protected_sqrt(x):
+    return np.sqrt(np.clip(x, 0, np.inf))
+
+
+def _protected_log(x):
+    return np.log(np.clip(x, 1e-10, np.inf))
+
+
+# Same function namespace FactorComputer._evaluate_equation exposes
+FUNCTIONS: Dict[str, Callable] = {
+    'sign': np.sign,
+    'abs': np.abs,
+    'sqrt': _protected_sqrt,
+    'square': np.square,
+    'log': _protected_log,
+    'exp': np.exp,
+    'sin': np.sin,
+    'cos': np.cos,
+    'tan': np.tan,
+}
+
+BINARY_OPS: Dict[type, Callable] = {
+    ast.Add: operator.add,
+    ast.Sub: operator.sub,
+    ast.Mult: operator.mul,
+    ast.Div: operator.truediv,
+    ast.Pow: operator.pow,
+    ast.Mod: operator.mod,
+}
+
+UNARY_OPS: Dict[type, Callable] = {
+    ast.USub: operator.neg,
+    ast.UAdd: operator.pos,
+}
+
+# a + b == b + a bit-for-bit in IEEE arithmetic, so operands can be ordered
+COMMUTATIVE = {ast.Add, ast.Mult}
+
+_VAR_PATTERN = re.compile(r'\bx\d+\b')
+
+
+class EquationCompileError(ValueError):
+    """Equation uses syntax or names the compiler does not support."""
+
+
+# ============================================================================
+# EXPRESSION DAG
+# ============================================================================
+
+@dataclass(frozen=True)
+class Node:
+    """
+    One operation in a compiled plan.
+
+    kind is 'column' (arg = feature name), 'const' (arg = value),
+    'unary' / 'binary' (arg = ast operator type) or 'call' (arg = function
+    name, 'np.<ufunc>' for direct numpy calls). children are node ids.
+    """
+    kind: str
+    arg: object
+    children: Tuple[int, ...] = ()
+
+
+class _DagBuilder:
+    """Hash-conses nodes so identical subexpressions get one id."""
+
+    def __init__(self):
+        self.nodes: List[Node] = []
+        self._ids: Dict[Node, int] = {}
+
+    def add(self, node: Node) -> int:
+        if node.kind == 'binary' and node.arg in COMMUTATIVE:
+            node = Node(node.kind, node.arg, tuple(sorted(node.children)))
+        existing = self._ids.get(node)
+        if existing is not None:
+            return existing
+        self._ids[node] = len(self.nodes)
+        self.nodes.append(node)
+        return self._ids[node]
+
+
+def _resolve_names(
+    equation: str,
+    feature_mapping: Dict[str, str],
+    columns: Set[str]
+) -> Dict[str, str]:
+    """
+    Identifier -> feature column, using FactorComputer._parse_equation rules.
+
+    Equations containing x0..xN resolve only those variables through the
+    mapping; otherwise identifiers that are feature columns resolve directly.
+    """
+    if _VAR_PATTERN.search(equation):
+        return dict(feature_mapping)
+    identifiers = set(re.findall(r'\b[a-z_][a-z0-9_]*\b', equation, re.IGNORECASE))
+    return {name: name for name in identifiers if name not in FUNCTIONS and name in columns}
+
+
+def _lower(tree: ast.AST, names: Dict[str, str], dag: _DagBuilder) -> int:
+    """Lower a Python expression AST into DAG nodes; returns the root id."""
+    if isinstance(tree, ast.Expression):
+        return _lower(tree.body, names, dag)
+
+    if isinstance(tree, ast.Constant) and isinstance(tree.value, (int, float)) \
+            and not isinstance(tree.value, bool):
+        # numpy scalars so constant subtrees follow array semantics (1/0 -> inf)
+        return dag.add(Node('const', np.float64(tree.value)))
+
+    if isinstance(tree, ast.Name):
+        if tree.id not in names:
+            raise EquationCompileError(f"Unknown name '{tree.id}'")
+        return dag.add(Node('column', names[tree.id]))
+
+    if isinstance(tree, ast.BinOp) and type(tree.op) in BINARY_OPS:
+        left = _lower(tree.left, names, dag)
+        right = _lower(tree.right, names, dag)
+        return dag.add(Node('binary', type(tree.op), (left, right)))
+
+    if isinstance(tree, ast.UnaryOp) and type(tree.op) in UNARY_OPS:
+        return dag.add(Node('unary', type(tree.op), (_lower(tree.operand, names, dag),)))
+
+    if isinstance(tree, ast.Call) and not tree.keywords:
+        func = tree.func
+        if isinstance(func, ast.Name) and func.id in FUNCTIONS:
+            name = func.id
+        elif (isinstance(func, ast.Attribute) and isinstance(func.value, ast.Name)
+              and func.value.id == 'np' and isinstance(getattr(np, func.attr, None), np.ufunc)):
+            name = f'np.{func.attr}'
+        else:
+            raise EquationCompileError(f"Unsupported call: {ast.dump(func)}")
+        args = tuple(_lower(arg, names, dag) for arg in tree.args)
+        return dag.add(Node('call', name, args))
+
+    raise EquationCompileError(f"Unsupported syntax: {type(tree).__name__}")
+
+
+def equation_hash(equation: str) -> str:
+    """Stable identifier for an equation string."""
+    return hashlib.sha1(equation.encode('utf-8')).hexdigest()
+
+
+# ============================================================================
+# COMPILED PLAN
+# ============================================================================
+
+@dataclass
+class CompiledPlan:
+    """
+    Evaluation plan for a batch of equations.
+
+    nodes are in topological order; outputs[i] is the root node of
+    equations[i], or None if that equation failed to compile (see errors).
+    """
+    equations: List[str]
+    nodes: List[Node]
+    outputs: List[Optional[int]]
+    errors: Dict[int, str]
+    last_use: List[int]
+
+    @property
+    def columns(self) -> List[str]:
+        """Feature columns referenced by the plan."""
+        return sorted({n.arg for n in self.nodes if n.kind == 'column'})
+
+    @property
+    def n_unique_ops(self) -> int:
+        """Operations evaluated per row chunk (after subexpression sharing)."""
+        return sum(1 for n in self.nodes if n.kind not in ('column', 'const'))
+
+    def evaluate(
+        self,
+        features: pd.DataFrame,
+        chunk_size: Optional[int] = None,
+        out: Optional[np.ndarray] = None
+    ) -> np.ndarray:
+        """
+        Evaluate every equation over the feature rows.
+
+        Args:
+            features: Feature DataFrame
+            chunk_size: Rows per chunk (None = all rows at once)
+            out: Optional (n_rows, n_equations) float64 buffer to fill
+                (column-major keeps each factor's writes contiguous)
+
+        Returns:
+            (n_rows, n_equations) array; failed equations are all-NaN
+        """
+        n_rows = len(features)
+        if out is None:
+            out = np.full((n_rows, len(self.equations)), np.nan, order='F')
+
+        missing = [c for c in self.columns if c not in features.columns]
+        arrays = {
+            c: np.ascontiguousarray(features[c].to_numpy(dtype=float, na_value=np.nan))
+            for c in self.columns if c not in missing
+        }
+        dead_roots = self._roots_needing(missing)
+
+        step = chunk_size or max(n_rows, 1)
+        for start in range(0, n_rows, step):
+            stop = min(start + step, n_rows)
+            self._evaluate_chunk(arrays, start, stop, out, dead_roots)
+
+        return out
+
+    def _roots_needing(self, missing: Sequence[str]) -> Set[int]:
+        """Node ids whose value depends on a missing column."""
+        dead: Set[int] = set()
+        if not missing:
+            return dead
+        missing = set(missing)
+        for i, node in enumerate(self.nodes):
+            if (node.kind == 'column' and node.arg in missing) or any(c in dead for c in node.children):
+                dead.add(i)
+        return dead
+
+    def _evaluate_chunk(
+        self,
+        arrays: Dict[str, np.ndarray],
+        start: int,
+        stop: int,
+        out: np.ndarray,
+        dead: Set[int]
+    ) -> None:
+        values: Dict[int, object] = {}
+        roots: Dict[int, List[int]] = {}
+        for eq_idx, root in enumerate(self.outputs):
+            if root is not None:
+                roots.setdefault(root, []).append(eq_idx)
+
+        with np.errstate(all='ignore'):
+            for i, node in enumerate(self.nodes):
+                if i in dead:
+                    continue
+                if node.kind == 'column':
+                    value = arrays[node.arg][start:stop]
+                elif node.kind == 'const':
+                    value = node.arg
+                elif node.kind == 'binary':
+                    value = BINARY_OPS[node.arg](values[node.children[0]], values[node.children[1]])
+                elif node.kind == 'unary':
+                    value = UNARY_OPS[node.arg](values[node.children[0]])
+                else:
+                    func = FUNCTIONS.get(node.arg) or getattr(np, node.arg[3:])
+                    value = func(*(values[c] for c in node.children))
+                values[i] = value
+
+                for eq_idx in roots.get(i, ()):
+                    out[start:stop, eq_idx] = value
+
+                # Free intermediates once their last consumer has run
+                for child in node.children:
+                    if self.last_use[child] == i:
+                        values.pop(child, None)
+
+
+def compile_equations(
+    equations: Sequence[str],
+    feature_mapping: Dict[str, str],
+    columns: Sequence[str]
+) -> CompiledPlan:
+    """
+    Compile a batch of equations into one shared-subexpression plan.
+
+    Equations that fail to parse or reference unknown names get outputs[i]
+    = None; callers can fall back to per-equation evaluation for those.
+
+    Args:
+        equations: Equation strings (PySR / Python expression syntax)
+        feature_mapping: Variable name (x0, ...) -> feature column
+        columns: Available feature columns
+
+    Returns:
+        CompiledPlan
+    """
+    columns = set(columns)
+    dag = _DagBuilder()
+    outputs: List[Optional[int]] = []
+    errors: Dict[int, str] = {}
+
+    for idx, equation in enumerate(equations):
+        n_before = len(dag.nodes)
+        try:
+            tree = _parse_cached(equation)
+            outputs.append(_lower(tree, _resolve_names(equation, feature_mapping, columns), dag))
+        except (EquationCompileError, SyntaxError) as e:
+            # Roll back any nodes added by the partially lowered equation
+            for node in dag.nodes[n_before:]:
+                del dag._ids[node]
+            del dag.nodes[n_before:]
+            outputs.append(None)
+            errors[idx] = str(e)
+
+    last_use = list(range(len(dag.nodes)))
+    for i, node in enumerate(dag.nodes):
+        for child in node.children:
+            last_use[child] = i
+    return CompiledPlan(list(equations), dag.nodes, outputs, errors, last_use)
+
+
+_PARSE_CACHE: Dict[str, ast.Expression] = {}
+_PLAN_CACHE: Dict[str, CompiledPlan] = {}
+_MAX_CACHED_PLANS = 64
+
+
+def _parse_cached(equation: str) -> ast.Expression:
+    """Parse an equation once per process (keyed by equation hash)."""
+    key = equation_hash(equation)
+    tree = _PARSE_CACHE.get(key)
+    if tree is None:
+        tree = ast.parse(equation.strip(), mode='eval')
+        _PARSE_CACHE[key] = tree
+    return tree
+
+
+def get_compiled_plan(
+    equations: Sequence[str],
+    feature_mapping: Dict[str, str],
+    columns: Sequence[str]
+) -> CompiledPlan:
+    """
+    compile_equations with a process-wide cache.
+
+    The key hashes the equation strings, the variable mapping and the
+    feature columns the equations can resolve against.
+    """
+    digest = hashlib.sha1()
+    for equation in equations:
+        digest.update(equation_hash(equation).encode())
+    digest.update(repr(sorted(feature_mapping.items())).encode())
+    digest.update(repr(sorted(columns)).encode())
+    key = digest.hexdigest()
+
+    plan = _PLAN_CACHE.get(key)
+    if plan is None:
+        plan = compile_equations(equations, feature_mapping, columns)
+        if len(_PLAN_CACHE) >= _MAX_CACHED_PLANS:
+            _PLAN_CACHE.pop(next(iter(_PLAN_CACHE)))
+        _PLAN_CACHE[key] = plan
+    return plan
+
+
+# ============================================================================
+# EXPANDING Z-SCORE
+# ============================================================================
+
+def expanding_zscore(
+    values: np.ndarray,
+    min_periods: int = 20,
+    out: Optional[np.ndarray] = None,
+    max_cells: int = 1 << 21
+) -> np.ndarray:
+    """
+    Column-wise expanding-window z-score (no lookahead).
+
+    Matches pandas expanding(min_periods).mean()/std(): NaNs are skipped in
+    the statistics, fewer than min_periods observations give NaN, and zero
+    standard deviation (constant history) gives NaN. Columns are processed
+    in blocks of about max_cells cells, and running sums are centered on
+    each column's first observation to limit cancellation.
+
+    Args:
+        values: (n_rows, n_columns) or (n_rows,) array
+        min_periods: Minimum observations before emitting a value
+        out: Optional output buffer; may be `values` itself (in place)
+        max_cells: Cells per column block (bounds temporaries)
+
+    Returns:
+        Array of z-scores with the input's shape
+    """
+    values = np.asarray(values, dtype=float)
+    squeeze = values.ndim == 1
+    X = values[:, None] if squeeze else values
+    n_rows, n_cols = X.shape
+    if out is None:
+        out = np.empty_like(X, order='F')
+    elif squeeze:
+        out = out[:, None]
+
+    step = max(1, max_cells // max(n_rows, 1))
+    with np.errstate(divide='ignore', invalid='ignore'):
+        for j0 in range(0, n_cols, step):
+            block = np.asfortranarray(X[:, j0:j0 + step])
+            ok = ~np.isnan(block)
+
+            first = np.argmax(ok, axis=0)
+            anchor = np.where(ok.any(axis=0), block[first, np.arange(block.shape[1])], 0.0)
+
+            centered = block - anchor
+            centered[~ok] = 0.0
+
+            n = np.cumsum(ok, axis=0, dtype=float)
+            s = np.cumsum(centered, axis=0)
+            mean = s / n
+            var = np.cumsum(centered * centered, axis=0)
+            # Deviations from the first value sum to exactly zero only while
+            # every value so far is equal; pandas reports zero variance there
+            constant = var == 0
+            var -= s * mean
+            var /= n - 1
+            np.maximum(var, 0.0, out=var)
+            var[constant] = 0.0
+
+            std = np.sqrt(var, out=var)
+            std[std == 0] = np.nan
+            z = (centered - mean) / std
+            z[(n < min_periods) | ~ok] = np.nan
+            out[:, j0:j0 + step] = z
+
+    return out[:, 0] if squeeze else out
@@ -145,6 +145,101 @@ class ValidationResult:
         return '\n'.join(lines)
 
 
+# ============================================================================
+# VECTORIZED SIMULATION
+# ============================================================================
+
+# Fraction of equity committed per trade (linear equity P&L model)
+POSITION_FRACTION = 0.1
+
+# Backtest grid entry: (entry_threshold, exit_threshold, direction)
+ThresholdTriple = Tuple[float, float, str]
+
+
+def _trade_boundaries(
+    signal: np.ndarray,
+    factor: np.ndarray,
+    exit_threshold: float,
+    direction: str
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Entry and exit days of the run_backtest state machine.
+
+    The loop exits an open position when the factor crosses the exit
+    threshold or the signal goes to 0, then enters whenever flat and the
+    signal is non-zero (so an exit and re-entry can share a day). That makes
+    "holding after day t" equal to signal[t] != 0, and the boundaries follow
+    without a sequential scan.
+
+    Returns:
+        (entries, exits) sorted index arrays; exits[k] closes entries[k]
+    """
+    holding = signal != 0  # NaN counts as non-zero, as in the loop
+
+    with np.errstate(invalid='ignore'):
+        if direction == "long":
+            crossed = factor < exit_threshold
+        elif direction == "short":
+            crossed = factor > exit_threshold
+        else:
+            crossed = np.zeros(len(factor), dtype=bool)
+
+    exit_condition = crossed | (signal == 0)
+    was_holding = np.concatenate([[False], holding[:-1]])
+
+    exits = np.flatnonzero(was_holding & exit_condition)
+    entries = np.flatnonzero(holding & (~was_holding | exit_condition))
+    return entries, exits
+
+
+def _equity_after_trades(
+    initial_capital: float,
+    pct_changes: np.ndarray,
+    commission: float
+) -> np.ndarray:
+    """
+    Equity after each trade of E_k = E_{k-1} * (1 + f * pct_k) - commission.
+
+    Closed form via cumulative products:
+    E_k = P_k * (E_0 - commission * sum_{j<=k} 1 / P_j), P_k = prod (1 + f * pct_j).
+    """
+    growth = np.cumprod(1 + POSITION_FRACTION * pct_changes)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return growth * (initial_capital - commission * np.cumsum(1 / growth))
+
+
+def _grouped_threshold_stats(
+    factor: np.ndarray,
+    returns: np.ndarray,
+    thresholds: np.ndarray,
+    upper: bool
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Count, mean and sample std of returns where factor > t (upper) or
+    factor < t (lower), for every threshold t, from one sort.
+    """
+    order = np.argsort(factor, kind='stable')
+    sorted_factor = factor[order]
+    centered = returns[order] - returns.mean()
+    s1 = np.concatenate([[0.0], np.cumsum(centered)])
+    s2 = np.concatenate([[0.0], np.cumsum(centered ** 2)])
+
+    if upper:
+        start = np.searchsorted(sorted_factor, thresholds, side='right')
+        stop = np.full(len(thresholds), len(factor))
+    else:
+        start = np.zeros(len(thresholds), dtype=int)
+        stop = np.searchsorted(sorted_factor, thresholds, side='left')
+
+    n = stop - start
+    total = s1[stop] - s1[start]
+    total_sq = s2[stop] - s2[start]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        mean = total / n
+        var = np.maximum((total_sq - total * mean) / (n - 1), 0.0)
+    return n, mean + returns.mean(), np.sqrt(var)
+
+
 # ============================================================================
 # FACTOR BACKTESTER
 # ============================================================================
@@ -333,34 +428,30 @@ class FactorBacktester:
         # Test percentile thresholds
         percentiles = [10, 20, 30, 40, 60, 70, 80, 90]
 
-        for percentile in percentiles:
-            threshold = np.percentile(aligned['factor'], percentile)
-
-            # Test long direction
-            long_mask = aligned['factor'] > threshold
-            if long_mask.sum() >= min_trades:
-                long_returns = aligned.loc[long_mask, 'returns']
-                if len(long_returns) > 0:
-                    sharpe = long_returns.mean() / long_returns.std() * np.sqrt(252) if long_returns.std() > 0 else 0
-                    t_stat, p_val = stats.ttest_1samp(long_returns, 0)
-
-                    if p_val < significance_level and sharpe > best_sharpe:
-                        best_sharpe = sharpe
-                        best_threshold = threshold
-                        best_direction = "long"
-
-            # Test short direction
-            short_mask = aligned['factor'] < -threshold
-            if short_mask.sum() >= min_trades:
-                short_returns = aligned.loc[short_mask, 'returns']
-                if len(short_returns) > 0:
-                    sharpe = short_returns.mean() / short_returns.std() * np.sqrt(252) if short_returns.std() > 0 else 0
-                    t_stat, p_val = stats.ttest_1samp(short_returns, 0)
-
-                    if p_val < significance_level and sharpe > best_sharpe:
-                        best_sharpe = sharpe
-                        best_threshold = -threshold
-                        best_direction = "short"
+        # Group statistics for every candidate from one sort of the factor
+        factor = aligned['factor'].to_numpy(dtype=float)
+        rets = aligned['returns'].to_numpy(dtype=float)
+        thresholds = np.percentile(factor, percentiles)
+        long_n, long_mean, long_std = _grouped_threshold_stats(factor, rets, thresholds, upper=True)
+        short_n, short_mean, short_std = _grouped_threshold_stats(factor, rets, -thresholds, upper=False)
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            long_sharpe = np.where(long_std > 0, long_mean / long_std * np.sqrt(252), 0)
+            short_sharpe = np.where(short_std > 0, short_mean / short_std * np.sqrt(252), 0)
+            long_p = 2 * stats.t.sf(np.abs(long_mean / (long_std / np.sqrt(long_n))), long_n - 1)
+            short_p = 2 * stats.t.sf(np.abs(short_mean / (short_std / np.sqrt(short_n))), short_n - 1)
+
+        # Same visiting order as before: each percentile long, then short
+        for i, threshold in enumerate(thresholds):
+            if long_n[i] >= min_trades and long_p[i] < significance_level and long_sharpe[i] > best_sharpe:
+                best_sharpe = long_sharpe[i]
+                best_threshold = threshold
+                best_direction = "long"
+
+            if short_n[i] >= min_trades and short_p[i] < significance_level and short_sharpe[i] > best_sharpe:
+                best_sharpe = short_sharpe[i]
+                best_threshold = -threshold
+                best_direction = "short"
 
         # Exit threshold: use median of factor values when signal is active
         # Simplified: exit when factor crosses zero or reverses direction
@@ -393,6 +484,33 @@ class FactorBacktester:
         Returns:
             BacktestResult with all metrics
         """
+        results = self.run_backtest_grid(
+            factor_name, [(entry_threshold, exit_threshold, direction)], {'dates': dates}
+        )
+        return results[(entry_threshold, exit_threshold, direction, 'dates')]
+
+    def run_backtest_grid(
+        self,
+        factor_name: str,
+        grid: List[ThresholdTriple],
+        date_sets: Dict[str, pd.DatetimeIndex]
+    ) -> Dict[Tuple[float, float, str, str], BacktestResult]:
+        """
+        Backtest every (entry, exit, direction) triple on every date set.
+
+        The factor is computed and lagged once; signals are generated once
+        per triple; each (triple, date set) simulation is a vectorized pass
+        over NumPy arrays. Results are identical to calling run_backtest
+        for each combination.
+
+        Args:
+            factor_name: Name of factor to compute
+            grid: List of (entry_threshold, exit_threshold, direction)
+            date_sets: Name -> dates, e.g. discovery / validation / walkforward
+
+        Returns:
+            Dict keyed by (entry_threshold, exit_threshold, direction, set_name)
+        """
         # Compute factor values
         factor_values = self.factor_computer.compute_factor(factor_name, self.features)
 
@@ -400,129 +518,165 @@ class FactorBacktester:
         # At time t, we only know factor values through t-1
         factor_values = factor_values.shift(1)
 
-        # Generate signals
-        signals = self.signal_generator.generate_signal(
-            factor_values, entry_threshold, exit_threshold, direction
-        )
+        # EQUITY ONLY: Using spot/close price for linear P&L model
+        spot = self._spot_prices()
+
+        # Date-set lookups are shared by every triple
+        prepared = {}
+        for set_name, dates in date_sets.items():
+            dates = pd.DatetimeIndex(dates)
+            days = dates[dates.isin(self.features.index)]
+            prepared[set_name] = (
+                dates,
+                days,
+                factor_values.reindex(days, fill_value=0).to_numpy(dtype=float),
+                spot.reindex(days).to_numpy(dtype=float),
+            )
 
-        # Initialize tracking
-        trades = []
-        equity = self.initial_capital
-        equity_curve = []
-
-        current_position = None
-        entry_date = None
-        entry_price = None
-
-        # Simulate trading
-        for date in dates:
-            if date not in signals.index or date not in self.features.index:
-                continue
-
-            signal = signals[date]
-            features_row = self.features.loc[date]
-            # EQUITY ONLY: Using spot/close price for linear P&L model
-            spot = features_row.get('close', features_row.get('spot', 0))
-
-            # Exit logic
-            if current_position is not None:
-                should_exit = False
-                exit_reason = ""
-
-                # Check exit threshold
-                if direction == "long" and factor_values.get(date, 0) < exit_threshold:
-                    should_exit = True
-                    exit_reason = "EXIT_THRESHOLD"
-                elif direction == "short" and factor_values.get(date, 0) > exit_threshold:
-                    should_exit = True
-                    exit_reason = "EXIT_THRESHOLD"
-
-                # Check signal reversal
-                if signal == 0:
-                    should_exit = True
-                    exit_reason = "SIGNAL_EXIT"
-
-                if should_exit:
-                    # Calculate P&L (simplified - assumes linear return)
-                    days_held = (date - entry_date).days
-                    if days_held > 0:
-                        # Use simplified P&L based on spot movement
-                        pct_change = (spot - entry_price) / entry_price if entry_price > 0 else 0
-                        if direction == "short":
-                            pct_change = -pct_change
-
-                        pnl = equity * pct_change * 0.1  # 10% of equity per trade
-                        commission = self.execution_model.get_commission_cost(1)
-
-                        trades.append({
-                            'entry': entry_date,
-                            'exit': date,
-                            'pnl': pnl - commission,
-                            'reason': exit_reason,
-                            'days_held': days_held
-                        })
-
-                        equity += pnl - commission
-
-                    current_position = None
-                    entry_date = None
-                    entry_price = None
-
-            # Entry logic
-            if current_position is None and signal != 0:
-                current_position = signal
-                entry_date = date
-                # EQUITY ONLY: Using spot price as entry price
-                entry_price = spot
-
-            equity_curve.append({
-                'date': date,
-                'equity': equity
-            })
+        results = {}
+        for entry_threshold, exit_threshold, direction in grid:
+            # Generate signals
+            signals = self.signal_generator.generate_signal(
+                factor_values, entry_threshold, exit_threshold, direction
+            )
+
+            for set_name, (dates, days, factor, price) in prepared.items():
+                # Dates without a signal are skipped entirely
+                keep = days.isin(signals.index)
+                if not keep.all():
+                    days, factor, price = days[keep], factor[keep], price[keep]
+
+                results[(entry_threshold, exit_threshold, direction, set_name)] = self._simulate(
+                    days, signals.reindex(days).to_numpy(dtype=float), factor, price,
+                    spot, exit_threshold, direction, dates
+                )
+
+        return results
+
+    def _spot_prices(self) -> pd.Series:
+        """Close price series (falls back to spot, then 0) used for trade P&L."""
+        for column in ('close', 'spot'):
+            if column in self.features.columns:
+                return self.features[column]
+        return pd.Series(0, index=self.features.index)
+
+    def _simulate(
+        self,
+        days: pd.DatetimeIndex,
+        signal: np.ndarray,
+        factor: np.ndarray,
+        price: np.ndarray,
+        spot: pd.Series,
+        exit_threshold: float,
+        direction: str,
+        dates: pd.DatetimeIndex
+    ) -> BacktestResult:
+        """
+        Equity-only trade simulation over arrays.
+
+        days are the requested dates present in both signals and features,
+        with signal / factor / price aligned to them. Positions are 10% of
+        equity per trade, one commission per round trip, and any open
+        position is closed at the last requested date.
+        """
+        if len(days) == 0:
+            return self._empty_result()
+
+        commission = self.execution_model.get_commission_cost(1)
+        sign = -1.0 if direction == "short" else 1.0
+
+        entries, exits = _trade_boundaries(signal, factor, exit_threshold, direction)
+        paired = entries[:len(exits)]
+
+        # Trades only book when held at least one calendar day
+        day_values = days.values
+        days_held = ((day_values[exits] - day_values[paired]) // np.timedelta64(1, 'D')).astype(int)
+        booked = days_held > 0
+        entry_price = price[paired]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            pct = np.where(entry_price > 0, (price[exits] - entry_price) / entry_price, 0) * sign
+        pct = np.where(booked, pct, 0.0)
+
+        equity_after = _equity_after_trades(self.initial_capital, pct, commission * booked)
+        equity_before = np.concatenate([[self.initial_capital], equity_after[:-1]])
+        pnls = equity_before * pct * POSITION_FRACTION - commission
+
+        # Equity at the end of each day reflects every exit up to that day
+        exits_by_day = np.zeros(len(days), dtype=int)
+        exits_by_day[exits] = 1
+        equity_path = np.concatenate([[self.initial_capital], equity_after])
+        equity_values = equity_path[np.cumsum(exits_by_day)]
+
+        booked_idx = np.flatnonzero(booked)
+        trades = [
+            {
+                'entry': entry_date,
+                'exit': exit_date,
+                'pnl': pnl,
+                'reason': 'SIGNAL_EXIT' if exit_signal == 0 else 'EXIT_THRESHOLD',
+                'days_held': held
+            }
+            for entry_date, exit_date, pnl, exit_signal, held in zip(
+                days[paired[booked_idx]], days[exits[booked_idx]], pnls[booked_idx].tolist(),
+                signal[exits[booked_idx]].tolist(), days_held[booked_idx].tolist()
+            )
+        ]
+        equity = equity_path[-1]
 
         # Close any open position
-        if current_position is not None and len(dates) > 0:
+        if len(entries) > len(exits):
             final_date = dates[-1]
-            final_spot = self.features.loc[final_date].get('close', self.features.loc[final_date].get('spot', 0))
-            days_held = (final_date - entry_date).days
+            entry_date = days[entries[-1]]
+            entry_px = price[entries[-1]]
+            final_spot = float(spot.loc[final_date])
 
-            pct_change = (final_spot - entry_price) / entry_price if entry_price > 0 else 0
+            pct_change = (final_spot - entry_px) / entry_px if entry_px > 0 else 0
             if direction == "short":
                 pct_change = -pct_change
 
-            pnl = equity * pct_change * 0.1
-            commission = self.execution_model.get_commission_cost(1)
-
+            pnl = equity * pct_change * POSITION_FRACTION
             trades.append({
                 'entry': entry_date,
                 'exit': final_date,
                 'pnl': pnl - commission,
                 'reason': 'END_OF_PERIOD',
-                'days_held': days_held
+                'days_held': (final_date - entry_date).days
             })
 
             equity += pnl - commission
 
-        # Compute metrics
-        equity_df = pd.DataFrame(equity_curve)
-        if equity_df.empty or len(trades) == 0:
+        if len(trades) == 0:
             return self._empty_result()
 
-        equity_df = equity_df.set_index('date')
+        return self._compute_metrics(days, equity_values, equity, trades, commission)
 
+    def _compute_metrics(
+        self,
+        days: pd.DatetimeIndex,
+        equity_values: np.ndarray,
+        final_equity: float,
+        trades: List[Dict],
+        commission: float
+    ) -> BacktestResult:
+        """Performance and trade statistics from an equity path."""
         # Use LOG RETURNS for geometric compounding
-        equity_df['log_returns'] = np.log(equity_df['equity'] / equity_df['equity'].shift(1)).fillna(0)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            log_returns = np.log(equity_values[1:] / equity_values[:-1])
+        log_returns = np.concatenate([[0.0], log_returns])
+        log_returns[np.isnan(log_returns)] = 0.0
+
+        equity_df = pd.DataFrame(
+            {'equity': equity_values, 'log_returns': log_returns},
+            index=pd.DatetimeIndex(days, name='date')
+        )
 
         # Calculate total return geometrically
-        total_return = (equity - self.initial_capital) / self.initial_capital
+        total_return = (final_equity - self.initial_capital) / self.initial_capital
 
         # Annualize using geometric mean
         n_days = len(equity_df)
-        if n_days > 0:
-            # Geometric annualization: (1 + total_return)^(252/n_days) - 1
-            ann_return = (1 + total_return) ** (252 / n_days) - 1
-        else:
-            ann_return = 0
+        # Geometric annualization: (1 + total_return)^(252/n_days) - 1
+        ann_return = (1 + total_return) ** (252 / n_days) - 1
 
         # Annualized volatility from log returns
         ann_vol = equity_df['log_returns'].std() * np.sqrt(252)
@@ -534,13 +688,14 @@ class FactorBacktester:
         # FIX: Sortino uses LPM2 (Lower Partial Moment), not std of negative returns
         # Per Gemini audit 2025-12-06: std(neg_returns) measures dispersion around mean loss,
         # which is wrong. LPM2 = sqrt(mean(min(r, 0)^2)) measures dispersion around zero.
-        downside_returns = np.minimum(equity_df['log_returns'], 0)  # Clip positive to 0
+        downside_returns = np.minimum(log_returns, 0)  # Clip positive to 0
         downside_vol = np.sqrt((downside_returns ** 2).mean()) * np.sqrt(252)
         sortino = ann_return / downside_vol if downside_vol > 0 else 0
 
-        cum_max = equity_df['equity'].expanding().max()
-        drawdown = (equity_df['equity'] - cum_max) / cum_max
-        max_dd = abs(drawdown.min()) if len(drawdown) > 0 else 0
+        cum_max = np.fmax.accumulate(equity_values)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            drawdown = (equity_values - cum_max) / cum_max
+        max_dd = abs(pd.Series(drawdown).min())
 
         calmar = ann_return / max_dd if max_dd > 0 else 0
 
@@ -549,15 +704,15 @@ class FactorBacktester:
         winners = [p for p in trade_pnls if p > 0]
         losers = [p for p in trade_pnls if p <= 0]
 
-        win_rate = len(winners) / len(trades) if len(trades) > 0 else 0
+        win_rate = len(winners) / len(trades)
 
         total_gains = sum(winners)
         total_losses = abs(sum(losers))
         profit_factor = total_gains / total_losses if total_losses > 0 else 0
 
-        avg_trade = np.mean(trade_pnls) if trade_pnls else 0
+        avg_trade = np.mean(trade_pnls)
 
-        total_commission = sum(self.execution_model.get_commission_cost(1) for _ in trades)
+        total_commission = sum(commission for _ in trades)
 
         # Statistical significance
         t_stat, p_val = stats.ttest_1samp(trade_pnls, 0) if len(trade_pnls) > 1 else (0.0, 1.0)
@@ -667,25 +822,19 @@ class FactorBacktester:
 
             logger.info(f"\nUsing manual thresholds: entry={entry_threshold}, exit={exit_threshold}, direction={direction}")
 
-        # Run backtest on Discovery set
-        logger.info("\nRunning backtest on Discovery Set...")
-        discovery_result = self.run_backtest(
-            factor_name, entry_threshold, exit_threshold, direction, discovery_dates
-        )
-        logger.info(f"Discovery: Sharpe={discovery_result.sharpe:.3f}, Return={discovery_result.total_return:.2%}, Trades={discovery_result.n_trades}")
+        # Backtest all three sets in one batched call (NO re-optimization)
+        key = (entry_threshold, exit_threshold, direction)
+        results = self.run_backtest_grid(factor_name, [key], {
+            'discovery': discovery_dates,
+            'validation': validation_dates,
+            'walkforward': walkforward_dates,
+        })
+        discovery_result = results[key + ('discovery',)]
+        validation_result = results[key + ('validation',)]
+        walkforward_result = results[key + ('walkforward',)]
 
-        # Step 2: Validation Set - Test threshold (NO re-optimization)
-        logger.info("\nStep 2: Validation Set - Testing threshold...")
-        validation_result = self.run_backtest(
-            factor_name, entry_threshold, exit_threshold, direction, validation_dates
-        )
+        logger.info(f"Discovery: Sharpe={discovery_result.sharpe:.3f}, Return={discovery_result.total_return:.2%}, Trades={discovery_result.n_trades}")
         logger.info(f"Validation: Sharpe={validation_result.sharpe:.3f}, Return={validation_result.total_return:.2%}, Trades={validation_result.n_trades}")
-
-        # Step 3: Walk-Forward Set - Final test (NO re-optimization)
-        logger.info("\nStep 3: Walk-Forward Set - Final test...")
-        walkforward_result = self.run_backtest(
-            factor_name, entry_threshold, exit_threshold, direction, walkforward_dates
-        )
         logger.info(f"Walk-Forward: Sharpe={walkforward_result.sharpe:.3f}, Return={walkforward_result.total_return:.2%}, Trades={walkforward_result.n_trades}")
 
         # Determine survival
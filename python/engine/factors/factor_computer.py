@@ -17,6 +17,8 @@ from typing import Dict, List, Optional, Union
 import numpy as np
 import pandas as pd
 
+from .equation_compiler import expanding_zscore, get_compiled_plan
+
 logger = logging.getLogger(__name__)
 
 
@@ -45,7 +47,8 @@ class FactorComputer:
         equations_path: str,
         features_path: str,
         normalize: bool = True,
-        min_periods: int = 20
+        min_periods: int = 20,
+        chunk_size: Optional[int] = None
     ):
         """
         Initialize the FactorComputer.
@@ -55,11 +58,14 @@ class FactorComputer:
             features_path: Path to master features parquet file
             normalize: Whether to z-score normalize factors (default: True)
             min_periods: Minimum periods for expanding window normalization (default: 20)
+            chunk_size: Rows per evaluation chunk in compute_all_factors
+                (default: all rows at once; set to bound memory on minute data)
         """
         self.equations_path = Path(equations_path)
         self.features_path = Path(features_path)
         self.normalize = normalize
         self.min_periods = min_periods
+        self.chunk_size = chunk_size
 
         # Load equations and features
         self.equations = self._load_equations()
@@ -180,6 +186,13 @@ class FactorComputer:
         Returns:
             Series of computed factor values
         """
+        plan = get_compiled_plan([equation_str], self.feature_mapping, list(features.columns))
+        if not plan.errors:
+            try:
+                return pd.Series(plan.evaluate(features)[:, 0], index=features.index)
+            except Exception as e:
+                logger.debug(f"Compiled evaluation failed for '{equation_str}', using eval: {e}")
+
         # Parse equation to reference feature columns
         parsed_eq = self._parse_equation(equation_str)
 
@@ -234,17 +247,10 @@ class FactorComputer:
         if not self.normalize:
             return series
 
-        # Expanding mean and std
-        expanding_mean = series.expanding(min_periods=self.min_periods).mean()
-        expanding_std = series.expanding(min_periods=self.min_periods).std()
-
-        # Z-score: (x - mean) / std
-        # Where mean and std only use data up to current point
-        # Handle division by zero: when std == 0 (constant series), mark as NaN
-        zscore = (series - expanding_mean) / expanding_std.replace(0.0, np.nan)
-
-        # First min_periods will be NaN due to insufficient history
-        return zscore
+        # Expanding mean and std over data up to each point only;
+        # constant history (std == 0) is marked NaN
+        zscore = expanding_zscore(series.to_numpy(dtype=float), self.min_periods)
+        return pd.Series(zscore, index=series.index, name=series.name)
 
     def compute_factor(
         self,
@@ -342,27 +348,33 @@ class FactorComputer:
 
         logger.info(f"Computing {len(all_eqs)} factors...")
 
-        factors = {}
-        for idx, eq_dict in enumerate(all_eqs):
-            try:
-                factor = self.compute_factor(equation_idx=idx)
-                factors[f'factor_{idx}'] = factor
-
-                # Log equation details
-                complexity = eq_dict.get('complexity', 'N/A')
-                loss = eq_dict.get('loss', 'N/A')
-                logger.debug(
-                    f"  factor_{idx}: complexity={complexity}, loss={loss:.6f}"
-                    if isinstance(loss, float) else
-                    f"  factor_{idx}: complexity={complexity}, loss={loss}"
-                )
+        names = [f'factor_{idx}' for idx in range(len(all_eqs))]
+        equations = [eq_dict['equation'] for eq_dict in all_eqs]
 
-            except Exception as e:
-                logger.error(f"Failed to compute factor {idx}: {e}")
-                # Add NaN column for this factor
-                factors[f'factor_{idx}'] = pd.Series(np.nan, index=self.features.index)
+        # One shared-subexpression plan for the whole frontier
+        plan = get_compiled_plan(equations, self.feature_mapping, list(self.features.columns))
+        values = np.full((len(self.features), len(equations)), np.nan, order='F')
+
+        try:
+            plan.evaluate(self.features, chunk_size=self.chunk_size, out=values)
+            fallback = sorted(plan.errors)
+        except Exception as e:
+            logger.error(f"Batch factor evaluation failed, evaluating per equation: {e}")
+            fallback = list(range(len(equations)))
+
+        # Equations the compiler could not handle go through eval as before
+        for idx in fallback:
+            values[:, idx] = self._evaluate_equation(equations[idx], self.features).to_numpy(dtype=float)
+
+        if self.normalize:
+            expanding_zscore(values, self.min_periods, out=values)
+
+        logger.info(
+            f"Evaluated {len(equations)} equations with {plan.n_unique_ops} unique operations "
+            f"({len(fallback)} via fallback)"
+        )
 
-        df = pd.DataFrame(factors)
+        df = pd.DataFrame(values, index=self.features.index, columns=names)
         logger.info(f"Computed factors: shape={df.shape}")
 
         return df
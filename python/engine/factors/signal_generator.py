@@ -38,6 +38,176 @@ class ThresholdResult:
         return self.p_value < alpha
 
 
+# Default candidate grid: 20th to 80th percentile in steps of 5
+# (avoids extremes to ensure sufficient samples in both groups)
+DEFAULT_PERCENTILES = np.arange(20, 81, 5)
+
+
+@dataclass
+class ThresholdScan:
+    """
+    Welch t-test statistics for every (candidate percentile, factor) split.
+
+    All arrays are shaped (n_candidates, n_factors). The high group is
+    factor > threshold, the low group factor <= threshold.
+    """
+    factor_names: List[str]
+    percentiles: np.ndarray
+    thresholds: np.ndarray
+    t_statistic: np.ndarray
+    p_value: np.ndarray
+    mean_high: np.ndarray
+    mean_low: np.ndarray
+    n_high: np.ndarray
+    n_low: np.ndarray
+
+    def best(
+        self,
+        direction: Literal["above", "below"],
+        hysteresis_factor: float = 0.5,
+        min_samples_per_group: int = 20
+    ) -> Dict[str, Optional[ThresholdResult]]:
+        """
+        Most significant correctly-signed split per factor.
+
+        Same selection rule as the sequential search: lowest p-value among
+        candidates with enough samples and the expected sign, earliest
+        candidate on ties. Factors with no valid split map to None.
+        """
+        if direction == "above":
+            correct = self.mean_high > self.mean_low
+        else:
+            correct = self.mean_low > self.mean_high
+
+        valid = (
+            correct
+            & (self.n_high >= min_samples_per_group)
+            & (self.n_low >= min_samples_per_group)
+            & (self.p_value < 1.0)
+        )
+        masked_p = np.where(valid, self.p_value, np.inf)
+        best_idx = np.argmin(masked_p, axis=0)
+
+        results: Dict[str, Optional[ThresholdResult]] = {}
+        for j, name in enumerate(self.factor_names):
+            i = best_idx[j]
+            if not valid[i, j]:
+                results[name] = None
+                continue
+
+            entry_threshold = float(self.thresholds[i, j])
+            results[name] = ThresholdResult(
+                entry_threshold=entry_threshold,
+                # Exit when factor retreats to entry * (1 - hysteresis)
+                exit_threshold=entry_threshold * (1 - hysteresis_factor),
+                t_statistic=float(self.t_statistic[i, j]),
+                p_value=float(self.p_value[i, j]),
+                mean_return_high=float(self.mean_high[i, j]),
+                mean_return_low=float(self.mean_low[i, j]),
+                n_high=int(self.n_high[i, j]),
+                n_low=int(self.n_low[i, j])
+            )
+        return results
+
+
+def scan_thresholds(
+    factors: pd.DataFrame,
+    returns: pd.Series,
+    percentiles: Optional[np.ndarray] = None
+) -> ThresholdScan:
+    """
+    Welch t-statistics for every candidate split of every factor at once.
+
+    Each factor column is sorted once; prefix sums of returns and squared
+    returns in that order give both groups' counts, means and variances for
+    any threshold, so a dense percentile grid costs no more than a sparse
+    one. Rows with a NaN return are dropped for all factors, NaN factor
+    values only for their own column.
+
+    Args:
+        factors: DataFrame of factor columns (rows aligned with returns)
+        returns: Forward returns
+        percentiles: Candidate percentiles (default DEFAULT_PERCENTILES)
+
+    Returns:
+        ThresholdScan with (n_candidates, n_factors) statistics
+    """
+    percentiles = DEFAULT_PERCENTILES if percentiles is None else np.asarray(percentiles, dtype=float)
+
+    r = np.asarray(returns, dtype=float)
+    X = factors.to_numpy(dtype=float)
+    keep = ~np.isnan(r)
+    r, X = r[keep], X[keep]
+
+    # Welch t is shift-invariant; centering keeps the prefix sums well conditioned
+    shift = r.mean() if len(r) else 0.0
+    rc = r - shift
+
+    n_candidates, n_factors = len(percentiles), X.shape[1]
+    thresholds = np.full((n_candidates, n_factors), np.nan)
+    n_low = np.zeros((n_candidates, n_factors), dtype=np.int64)
+    n_total = np.zeros(n_factors, dtype=np.int64)
+    sum_low = np.zeros((n_candidates, n_factors))
+    sumsq_low = np.zeros((n_candidates, n_factors))
+    sum_total = np.zeros(n_factors)
+    sumsq_total = np.zeros(n_factors)
+
+    # NaNs sort to the end of each column
+    order = np.argsort(X, axis=0, kind='stable')
+    sorted_x = np.take_along_axis(X, order, axis=0)
+    sorted_r = rc[order]
+    zero_row = np.zeros((1, n_factors))
+    cs = np.vstack([zero_row, np.cumsum(sorted_r, axis=0)])
+    cs2 = np.vstack([zero_row, np.cumsum(sorted_r ** 2, axis=0)])
+
+    for j in range(n_factors):
+        n = int(np.count_nonzero(~np.isnan(sorted_x[:, j])))
+        n_total[j] = n
+        sum_total[j] = cs[n, j]
+        sumsq_total[j] = cs2[n, j]
+        if n == 0:
+            continue
+        col = sorted_x[:n, j]
+        thresholds[:, j] = np.percentile(col, percentiles)
+        # Low group is factor <= threshold
+        k = np.searchsorted(col, thresholds[:, j], side='right')
+        n_low[:, j] = k
+        sum_low[:, j] = cs[k, j]
+        sumsq_low[:, j] = cs2[k, j]
+
+    n_high = n_total[None, :] - n_low
+    sum_high = sum_total[None, :] - sum_low
+    sumsq_high = sumsq_total[None, :] - sumsq_low
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        mean_high = sum_high / n_high
+        mean_low = sum_low / n_low
+        var_high = (sumsq_high - sum_high * mean_high) / (n_high - 1)
+        var_low = (sumsq_low - sum_low * mean_low) / (n_low - 1)
+        # Rounding can leave tiny negatives for constant groups
+        var_high = np.maximum(var_high, 0.0)
+        var_low = np.maximum(var_low, 0.0)
+
+        se_high = var_high / n_high
+        se_low = var_low / n_low
+        denom = se_high + se_low
+        t_stat = (mean_high - mean_low) / np.sqrt(denom)
+        df = denom ** 2 / (se_high ** 2 / (n_high - 1) + se_low ** 2 / (n_low - 1))
+        p_value = 2 * stats.t.sf(np.abs(t_stat), df)
+
+    return ThresholdScan(
+        factor_names=list(factors.columns),
+        percentiles=percentiles,
+        thresholds=thresholds,
+        t_statistic=t_stat,
+        p_value=p_value,
+        mean_high=mean_high + shift,
+        mean_low=mean_low + shift,
+        n_high=n_high,
+        n_low=n_low
+    )
+
+
 class SignalGenerator:
     """
     Generate trading signals from factor values using threshold crossing logic.
@@ -188,7 +358,8 @@ class SignalGenerator:
         direction: Literal["above", "below"],
         significance_level: float = 0.05,
         hysteresis_factor: float = 0.5,
-        min_samples_per_group: int = 20
+        min_samples_per_group: int = 20,
+        percentiles: Optional[np.ndarray] = None
     ) -> ThresholdResult:
         """
         Find threshold where factor predicts returns with statistical significance.
@@ -205,6 +376,8 @@ class SignalGenerator:
         3. Select threshold with strongest significance
         4. Set exit threshold with hysteresis to prevent whipsaw
 
+        All candidates are evaluated in one pass (see scan_thresholds).
+
         Args:
             factor_name: Column name in factor_data
             train_dates: DatetimeIndex of training period
@@ -213,6 +386,7 @@ class SignalGenerator:
             significance_level: Alpha for hypothesis test
             hysteresis_factor: Exit threshold = entry_threshold * (1 ± hysteresis_factor)
             min_samples_per_group: Minimum observations in each group for valid test
+            percentiles: Candidate percentiles (default 20th-80th in steps of 5)
 
         Returns:
             ThresholdResult with entry/exit thresholds and test statistics
@@ -221,80 +395,19 @@ class SignalGenerator:
             raise ValueError(f"Factor '{factor_name}' not found")
 
         # Get training data
-        train_data = self.factor_data.loc[train_dates]
-        factor_train = train_data[factor_name].copy()
+        factor_train = self.factor_data.loc[train_dates, factor_name]
         returns_train = forward_returns.loc[train_dates]
 
-        # Remove NaN values
-        valid_mask = ~(factor_train.isna() | returns_train.isna())
-        factor_train = factor_train[valid_mask]
-        returns_train = returns_train[valid_mask]
-
-        if len(factor_train) < 2 * min_samples_per_group:
-            raise ValueError(f"Insufficient training data: {len(factor_train)} samples, "
+        n_valid = int((~(factor_train.isna() | returns_train.isna())).sum())
+        if n_valid < 2 * min_samples_per_group:
+            raise ValueError(f"Insufficient training data: {n_valid} samples, "
                            f"need at least {2 * min_samples_per_group}")
 
         logger.info(f"Finding significant threshold for {factor_name} "
-                   f"on {len(factor_train)} training samples")
-
-        # Test percentiles as candidate thresholds
-        # Avoid extremes to ensure sufficient samples in both groups
-        percentiles = np.arange(20, 81, 5)  # 20th to 80th percentile
-        candidate_thresholds = np.percentile(factor_train, percentiles)
-
-        best_result = None
-        best_significance = 1.0  # p-value (lower is better)
-
-        for threshold in candidate_thresholds:
-            # Split into high and low factor groups
-            high_mask = factor_train > threshold
-            low_mask = factor_train <= threshold
+                   f"on {n_valid} training samples")
 
-            returns_high = returns_train[high_mask]
-            returns_low = returns_train[low_mask]
-
-            # Skip if not enough samples in either group
-            if len(returns_high) < min_samples_per_group or len(returns_low) < min_samples_per_group:
-                continue
-
-            # Perform t-test
-            t_stat, p_value = stats.ttest_ind(returns_high, returns_low, equal_var=False)
-
-            mean_high = returns_high.mean()
-            mean_low = returns_low.mean()
-
-            # Check if direction matches expectation
-            if direction == "above":
-                # We want high factor to predict high returns
-                correct_direction = mean_high > mean_low
-            else:
-                # We want low factor to predict high returns
-                correct_direction = mean_low > mean_high
-
-            # Update best if more significant and correct direction
-            if correct_direction and p_value < best_significance:
-                best_significance = p_value
-
-                entry_threshold = threshold
-
-                # Calculate exit threshold with hysteresis
-                if direction == "above":
-                    # Exit when factor drops below entry * (1 - hysteresis)
-                    exit_threshold = entry_threshold * (1 - hysteresis_factor)
-                else:
-                    # Exit when factor rises above entry * (1 - hysteresis)
-                    exit_threshold = entry_threshold * (1 - hysteresis_factor)
-
-                best_result = ThresholdResult(
-                    entry_threshold=entry_threshold,
-                    exit_threshold=exit_threshold,
-                    t_statistic=t_stat,
-                    p_value=p_value,
-                    mean_return_high=mean_high,
-                    mean_return_low=mean_low,
-                    n_high=len(returns_high),
-                    n_low=len(returns_low)
-                )
+        scan = scan_thresholds(factor_train.to_frame(), returns_train, percentiles)
+        best_result = scan.best(direction, hysteresis_factor, min_samples_per_group)[factor_name]
 
         if best_result is None:
             raise ValueError(f"Could not find valid threshold for {factor_name}. "
@@ -308,6 +421,52 @@ class SignalGenerator:
 
         return best_result
 
+    def find_significant_thresholds(
+        self,
+        factor_names: List[str],
+        train_dates: pd.DatetimeIndex,
+        forward_returns: pd.Series,
+        direction: Literal["above", "below"],
+        hysteresis_factor: float = 0.5,
+        min_samples_per_group: int = 20,
+        percentiles: Optional[np.ndarray] = None
+    ) -> Dict[str, Optional[ThresholdResult]]:
+        """
+        Threshold search for many factors side by side.
+
+        Same selection as find_significant_threshold, but every factor is
+        scanned in one matrix pass. Factors without a valid split map to
+        None instead of raising.
+
+        Args:
+            factor_names: Columns in factor_data
+            train_dates: DatetimeIndex of training period
+            forward_returns: Series of forward returns aligned with factor_data
+            direction: 'above' or 'below'
+            hysteresis_factor: Exit threshold = entry_threshold * (1 - hysteresis_factor)
+            min_samples_per_group: Minimum observations in each group
+            percentiles: Candidate percentiles (dense grids are cheap)
+
+        Returns:
+            Dict of factor name -> ThresholdResult (or None)
+        """
+        missing = [f for f in factor_names if f not in self.factor_data.columns]
+        if missing:
+            raise ValueError(f"Factors not found: {missing}")
+
+        scan = scan_thresholds(
+            self.factor_data.loc[train_dates, factor_names],
+            forward_returns.loc[train_dates],
+            percentiles
+        )
+        results = scan.best(direction, hysteresis_factor, min_samples_per_group)
+
+        n_found = sum(r is not None for r in results.values())
+        logger.info(f"Threshold scan: {n_found}/{len(factor_names)} factors with valid thresholds "
+                   f"over {len(scan.percentiles)} candidates")
+
+        return results
+
     def apply_embargo(
         self,
         signals: pd.DataFrame,
@@ -361,7 +520,9 @@ class SignalGenerator:
         direction: Literal["above", "below"],
         significance_level: float = 0.05,
         cooldown_days: int = 5,
-        embargo_dates: Optional[List[pd.Timestamp]] = None
+        embargo_dates: Optional[List[pd.Timestamp]] = None,
+        threshold_result: Optional[ThresholdResult] = None,
+        percentiles: Optional[np.ndarray] = None
     ) -> Tuple[pd.DataFrame, ThresholdResult]:
         """
         End-to-end signal generation with statistical threshold optimization.
@@ -380,18 +541,23 @@ class SignalGenerator:
             significance_level: Alpha for significance test
             cooldown_days: Days between trades
             embargo_dates: Optional embargo boundary dates
+            threshold_result: Precomputed threshold (e.g. from
+                find_significant_thresholds) to skip the search
+            percentiles: Candidate percentiles for the search
 
         Returns:
             Tuple of (signals DataFrame, ThresholdResult)
         """
         # Step 1: Find optimal threshold on training data
-        threshold_result = self.find_significant_threshold(
-            factor_name=factor_name,
-            train_dates=train_dates,
-            forward_returns=forward_returns,
-            direction=direction,
-            significance_level=significance_level
-        )
+        if threshold_result is None:
+            threshold_result = self.find_significant_threshold(
+                factor_name=factor_name,
+                train_dates=train_dates,
+                forward_returns=forward_returns,
+                direction=direction,
+                significance_level=significance_level,
+                percentiles=percentiles
+            )
 
         if not threshold_result.is_significant(significance_level):
             logger.warning(f"Threshold for {factor_name} not significant at alpha={significance_level} "
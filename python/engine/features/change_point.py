@@ -19,6 +19,8 @@ from typing import List, Optional, Tuple, Dict, Any, Union
 from scipy import stats
 import warnings
 
+from .kernels import lindley_scan, rising_edges
+
 
 # =============================================================================
 # Data Classes
@@ -140,13 +142,9 @@ def cusum_mean_shift(
     z = (data - reference_mean) / reference_std
 
     # Two-sided CUSUM
-    cusum_pos = np.zeros(n)
-    cusum_neg = np.zeros(n)
-
-    for i in range(1, n):
-        cusum_pos[i] = max(0, cusum_pos[i-1] + z[i] - drift)
-        # CP1: Negative CUSUM uses min() not max(), tracks downward shifts
-        cusum_neg[i] = min(0, cusum_neg[i-1] + z[i] + drift)
+    cusum_pos = lindley_scan(z - drift)
+    # CP1: Negative CUSUM uses min() not max(), tracks downward shifts
+    cusum_neg = -lindley_scan(-(z + drift))
 
     # CP2: Combined statistic uses abs() for negative CUSUM (which is <= 0)
     cusum_stat = np.maximum(cusum_pos, np.abs(cusum_neg))
@@ -155,14 +153,7 @@ def cusum_mean_shift(
     alarms = cusum_stat > threshold
 
     # Find change points (first alarm after each reset)
-    change_points = []
-    in_alarm = False
-    for i in range(n):
-        if alarms[i] and not in_alarm:
-            change_points.append(i)
-            in_alarm = True
-        elif not alarms[i]:
-            in_alarm = False
+    change_points = rising_edges(alarms).tolist()
 
     return CUSUMResult(
         statistic=cusum_stat,
@@ -241,22 +232,13 @@ def cusum_variance_shift(
     s = log_ratio + 0.5 * data**2 * var_diff
 
     # Cumulative statistic
-    cusum_stat = np.zeros(n)
-    for i in range(1, n):
-        cusum_stat[i] = max(0, cusum_stat[i-1] + s[i])
+    cusum_stat = lindley_scan(s)
 
     # Detect alarms
     alarms = cusum_stat > threshold
 
     # Find change points
-    change_points = []
-    in_alarm = False
-    for i in range(n):
-        if alarms[i] and not in_alarm:
-            change_points.append(i)
-            in_alarm = True
-        elif not alarms[i]:
-            in_alarm = False
+    change_points = rising_edges(alarms).tolist()
 
     return CUSUMResult(
         statistic=cusum_stat,
@@ -189,7 +189,8 @@ def compute_hazard_rate(
     hazard = np.zeros(max_duration)
 
     # Count endings at each duration
-    n_at_d = np.bincount(durations, minlength=max_duration + 1)[1:]
+    # Durations beyond max_duration stay in the risk set but their endings fall outside the range
+    n_at_d = np.bincount(durations, minlength=max_duration + 1)[1:max_duration + 1]
 
     # Count at risk at each duration
     n_at_risk = np.zeros(max_duration)
@@ -288,6 +289,32 @@ def analyze_regime_hazard(
     """
     # Extract regime durations
     durations = extract_regime_durations(regime_series)
+    return hazard_from_durations(durations, max_duration)
+
+
+def hazard_from_durations(
+    durations: np.ndarray,
+    max_duration: int = 252
+) -> HazardResult:
+    """
+    Hazard analysis from already-extracted regime durations.
+
+    Lets streaming callers keep a running list of completed durations and
+    re-run the analysis only when a regime ends.
+
+    Parameters
+    ----------
+    durations : np.ndarray
+        Regime durations (in bars)
+    max_duration : int
+        Maximum duration to analyze
+
+    Returns
+    -------
+    HazardResult
+        Complete hazard analysis
+    """
+    durations = np.asarray(durations, dtype=int)
 
     if len(durations) < 3:
         warnings.warn("Insufficient regime changes for hazard analysis")
@@ -19,7 +19,7 @@ import logging
 import math
 from typing import Dict, List, Optional, Tuple, Union
 from dataclasses import dataclass
-from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
 import itertools
 
 import numpy as np
@@ -27,6 +27,8 @@ import pandas as pd
 from scipy.stats import entropy as scipy_entropy
 from scipy.special import digamma
 
+from .kernels import lz76_complexity, ordinal_patterns, pattern_counts
+
 logger = logging.getLogger("MarketPhysics.Features.Entropy")
 
 
@@ -234,28 +236,18 @@ def permutation_entropy(
     if n < order * delay:
         return np.nan
 
-    # Generate all permutation patterns
-    permutations = []
+    # Rank pattern of every embedded vector (stable ranks: ties keep time order)
+    patterns = ordinal_patterns(data, order, delay)
 
-    for i in range(n - delay * (order - 1)):
-        # Extract subsequence
-        subsequence = [data[i + j * delay] for j in range(order)]
-        # Get permutation pattern (rank order)
-        pattern = tuple(np.argsort(subsequence))
-        permutations.append(pattern)
-    
     # Check if we have any permutations
-    if len(permutations) == 0:
+    if len(patterns) == 0:
         return np.nan
 
-    # Count pattern frequencies
-    counter = Counter(permutations)
-    total = len(permutations)
+    # Count pattern frequencies (first-appearance order)
+    counts = pattern_counts(patterns)
+    total = len(patterns)
 
-    # Calculate entropy (guard against log(0) and empty counter)
-    if total == 0:
-        return np.nan
-    probs = np.array(list(counter.values())) / total
+    probs = counts / total
     h = -np.sum(np.where(probs > 0, probs * np.log2(probs), 0))
 
     if normalize:
@@ -299,6 +291,131 @@ def rolling_permutation_entropy(
 # ============================================================================
 # TRANSFER ENTROPY (DIRECTED CAUSALITY)
 # ============================================================================
+#
+# Histories are encoded as integer state codes (base-`bins` digits of the
+# discretized window) and joint states are counted with np.bincount. The
+# plug-in estimator
+#
+#   TE = Σ p(x', x, y) log2[ p(x'|x, y) / p(x'|x) ]
+#      = mean_i log2[ c(x', x, y)_i c(x)_i / (c(x, y)_i c(x', x)_i) ]
+#
+# is evaluated per sample from looked-up counts, so a batch of source
+# histories (other symbols, shuffled surrogates) is scored in one pass by
+# offsetting each row's codes into its own block of the count array.
+
+# Above this many joint states, codes are compacted with np.unique
+_MAX_DENSE_STATES = 1 << 24
+
+
+def _history_codes(codes: np.ndarray, length: int, start: int, stop: int, base: int) -> np.ndarray:
+    """
+    Encode codes[i-length+1:i+1] as one integer for i in [start, stop).
+
+    Works on the last axis, so a (S, n) batch of series yields (S, stop-start).
+    """
+    out = np.zeros(codes.shape[:-1] + (stop - start,), dtype=np.int64)
+    for lag in range(length):
+        out = out * base + codes[..., start - lag:stop - lag]
+    return out
+
+
+def _compact(codes: np.ndarray) -> Tuple[np.ndarray, int]:
+    """Map codes to 0..n_states-1 when the raw state space is too large."""
+    uniques, inverse = np.unique(codes, return_inverse=True)
+    return inverse.reshape(codes.shape), len(uniques)
+
+
+def _state_counts(keys: np.ndarray, n_states: int) -> np.ndarray:
+    """Per-sample occurrence count of each key (same shape as keys)."""
+    if n_states <= _MAX_DENSE_STATES:
+        return np.bincount(keys.ravel(), minlength=n_states)[keys]
+    _, inverse, counts = np.unique(keys.ravel(), return_inverse=True, return_counts=True)
+    return counts[inverse].reshape(keys.shape)
+
+
+def _prepare_te_series(
+    source: np.ndarray,
+    target: np.ndarray,
+    bins: int
+) -> Optional[Tuple[np.ndarray, np.ndarray]]:
+    """Align lengths, drop NaN pairs and discretize (transfer_entropy preprocessing)."""
+    source = np.asarray(source, dtype=float).flatten()
+    target = np.asarray(target, dtype=float).flatten()
+
+    n = min(len(source), len(target))
+    source = source[:n]
+    target = target[:n]
+
+    mask = ~(np.isnan(source) | np.isnan(target))
+    return _discretize(source[mask], bins), _discretize(target[mask], bins)
+
+
+def _te_from_codes(
+    target_d: np.ndarray,
+    source_d: np.ndarray,
+    k: int,
+    l: int,
+    bins: int
+) -> np.ndarray:
+    """
+    Transfer entropy source → target from discretized series.
+
+    Args:
+        target_d: Discretized target, shape (n,)
+        source_d: Discretized source(s), shape (n,) or (S, n)
+        k, l: Target / source history lengths
+        bins: Code alphabet size
+
+    Returns:
+        TE in bits, one per source row (NaN if too short)
+    """
+    source_d = np.atleast_2d(source_d)
+    S, n = source_d.shape
+    start = max(k, l)
+
+    if n < start + 2:
+        return np.full(S, np.nan)
+
+    stop = n - 1
+    M = stop - start
+
+    x_next = target_d[start + 1:stop + 1].astype(np.int64)
+    x_past = _history_codes(target_d, k, start, stop, bins)
+    y_past = _history_codes(source_d, l, start, stop, bins)
+
+    n_x = bins ** k
+    n_y = bins ** l
+    if n_x > max(M, 1 << 16):
+        x_past, n_x = _compact(x_past)
+    if n_y > max(M, 1 << 16):
+        y_past, n_y = _compact(y_past)
+
+    # Target-only marginals are shared by every source row
+    c_x = np.bincount(x_past, minlength=n_x)[x_past]
+    xx = x_next * n_x + x_past
+    c_xx = _state_counts(xx, bins * n_x)
+
+    # Row offsets keep each source's joint states in a separate block
+    row = np.arange(S, dtype=np.int64)[:, None]
+    xy = x_past * n_y + y_past
+    c_xy = _state_counts(row * (n_x * n_y) + xy, S * n_x * n_y)
+    xxy = xx * n_y + y_past
+    c_xxy = _state_counts(row * (bins * n_x * n_y) + xxy, S * bins * n_x * n_y)
+
+    te = np.mean(np.log2((c_xxy * c_x) / (c_xy * c_xx)), axis=1)
+    return np.maximum(te, 0.0)  # TE should be non-negative
+
+
+def _shuffled_sources(
+    source_d: np.ndarray,
+    n_surrogates: int,
+    rng: Optional[np.random.Generator] = None
+) -> np.ndarray:
+    """(n_surrogates, n) independent permutations of a discretized source."""
+    random = rng.random if rng is not None else np.random.random
+    order = np.argsort(random((n_surrogates, len(source_d))), axis=1)
+    return source_d[order]
+
 
 def transfer_entropy(
     source: np.ndarray,
@@ -329,68 +446,8 @@ def transfer_entropy(
         TE is asymmetric: TE(Y→X) ≠ TE(X→Y)
         Use this to detect lead-lag relationships (e.g., VIX → SPX)
     """
-    source = np.asarray(source).flatten()
-    target = np.asarray(target).flatten()
-
-    # Align lengths
-    n = min(len(source), len(target))
-    source = source[:n]
-    target = target[:n]
-
-    # Remove NaNs
-    mask = ~(np.isnan(source) | np.isnan(target))
-    source = source[mask]
-    target = target[mask]
-    n = len(target)
-
-    if n < max(k, l) + 2:
-        return np.nan
-
-    # Discretize
-    source_d = _discretize(source, bins)
-    target_d = _discretize(target, bins)
-
-    # Build joint distributions
-    joint_xxy = Counter()  # (x_next, x_past, y_past)
-    joint_xx = Counter()   # (x_next, x_past)
-    joint_xy = Counter()   # (x_past, y_past)
-    marg_x = Counter()     # (x_past,)
-
-    for i in range(max(k, l), n - 1):
-        x_next = target_d[i + 1]
-        x_past = tuple(target_d[i-k+1:i+1])
-        y_past = tuple(source_d[i-l+1:i+1])
-
-        joint_xxy[(x_next, x_past, y_past)] += 1
-        joint_xx[(x_next, x_past)] += 1
-        joint_xy[(x_past, y_past)] += 1
-        marg_x[x_past] += 1
-
-    total = sum(joint_xxy.values())
-    if total == 0:
-        return np.nan
-
-    # Calculate TE using joint probabilities
-    # TE = Σ p(x_next, x_past, y_past) * log[p(x_next|x_past,y_past) / p(x_next|x_past)]
-    te = 0.0
-
-    for (x_next, x_past, y_past), count in joint_xxy.items():
-        p_xxy = count / total
-        p_xx = joint_xx[(x_next, x_past)] / total
-        p_xy = joint_xy[(x_past, y_past)] / total
-        p_x = marg_x[x_past] / total
-
-        # p(x_next|x_past,y_past) = p(x_next,x_past,y_past) / p(x_past,y_past)
-        # p(x_next|x_past) = p(x_next,x_past) / p(x_past)
-
-        if p_xy > 0 and p_x > 0 and p_xx > 0:
-            p_cond_xy = p_xxy / p_xy  # p(x_next|x_past,y_past)
-            p_cond_x = p_xx / p_x     # p(x_next|x_past)
-
-            if p_cond_xy > 0 and p_cond_x > 0:
-                te += p_xxy * np.log2(p_cond_xy / p_cond_x)
-
-    return max(0, te)  # TE should be non-negative
+    source_d, target_d = _prepare_te_series(source, target, bins)
+    return float(_te_from_codes(target_d, source_d, k, l, bins)[0])
 
 
 def effective_transfer_entropy(
@@ -406,7 +463,9 @@ def effective_transfer_entropy(
 
     ETE = TE - mean(TE_shuffled)
 
-    Subtracts the noise floor estimated from shuffled surrogates.
+    Subtracts the noise floor estimated from shuffled surrogates. All
+    surrogates are scored in one batched count over the aligned, NaN-free
+    samples.
 
     Args:
         source, target: Time series
@@ -416,25 +475,17 @@ def effective_transfer_entropy(
     Returns:
         Tuple of (ETE, raw_TE, surrogate_mean)
     """
-    raw_te = transfer_entropy(source, target, k=k, l=l, bins=bins)
+    source_d, target_d = _prepare_te_series(source, target, bins)
+    raw_te = float(_te_from_codes(target_d, source_d, k, l, bins)[0])
 
     if np.isnan(raw_te):
         return np.nan, np.nan, np.nan
 
-    # Generate surrogate TEs by shuffling source
-    surrogate_tes = []
-    source_arr = np.asarray(source).copy()
-
-    for _ in range(n_surrogates):
-        np.random.shuffle(source_arr)
-        te_surr = transfer_entropy(source_arr, target, k=k, l=l, bins=bins)
-        if not np.isnan(te_surr):
-            surrogate_tes.append(te_surr)
-
-    if len(surrogate_tes) == 0:
+    if n_surrogates <= 0:
         return raw_te, raw_te, 0.0
 
-    surrogate_mean = np.mean(surrogate_tes)
+    surrogate_tes = _te_from_codes(target_d, _shuffled_sources(source_d, n_surrogates), k, l, bins)
+    surrogate_mean = float(np.mean(surrogate_tes))
     ete = raw_te - surrogate_mean
 
     return ete, raw_te, surrogate_mean
@@ -457,8 +508,10 @@ def bidirectional_transfer_entropy(
         net_flow > 0: X leads Y
         net_flow < 0: Y leads X
     """
-    te_x_to_y = transfer_entropy(x, y, k=k, l=l, bins=bins)
-    te_y_to_x = transfer_entropy(y, x, k=k, l=l, bins=bins)
+    # Both directions share the same aligned, discretized pair
+    x_d, y_d = _prepare_te_series(x, y, bins)
+    te_x_to_y = float(_te_from_codes(y_d, x_d, k, l, bins)[0])
+    te_y_to_x = float(_te_from_codes(x_d, y_d, k, l, bins)[0])
 
     net_flow = te_x_to_y - te_y_to_x
 
@@ -479,6 +532,273 @@ def bidirectional_transfer_entropy(
     }
 
 
+# ============================================================================
+# TRANSFER ENTROPY MATRIX (LEAD-LAG NETWORK)
+# ============================================================================
+
+@dataclass
+class TransferEntropyMatrix:
+    """
+    Pairwise transfer entropy across a symbol universe.
+
+    te.loc[a, b] is TE(a → b): information a's past carries about b's future.
+    """
+    te: pd.DataFrame
+    surrogate_mean: Optional[pd.DataFrame] = None
+    p_values: Optional[pd.DataFrame] = None
+
+    @property
+    def effective(self) -> pd.DataFrame:
+        """Bias-corrected TE (raw TE when no surrogates were run)."""
+        if self.surrogate_mean is None:
+            return self.te
+        return self.te - self.surrogate_mean
+
+    @property
+    def net_flow(self) -> pd.DataFrame:
+        """TE(a → b) - TE(b → a); positive means a leads b."""
+        eff = self.effective
+        return eff - eff.T
+
+    def lead_lag_pairs(self, min_net_flow: float = 0.01, max_p_value: float = 0.05) -> pd.DataFrame:
+        """
+        Leader → follower pairs sorted by net information flow.
+
+        Returns:
+            DataFrame with columns leader, follower, net_flow, te, p_value
+        """
+        flow = self.net_flow
+        rows = []
+        for leader in flow.index:
+            for follower in flow.columns:
+                value = flow.loc[leader, follower]
+                if leader == follower or not value >= min_net_flow:
+                    continue
+                p_value = self.p_values.loc[leader, follower] if self.p_values is not None else np.nan
+                if self.p_values is not None and p_value > max_p_value:
+                    continue
+                rows.append({
+                    'leader': leader,
+                    'follower': follower,
+                    'net_flow': value,
+                    'te': self.te.loc[leader, follower],
+                    'p_value': p_value
+                })
+
+        result = pd.DataFrame(rows, columns=['leader', 'follower', 'net_flow', 'te', 'p_value'])
+        return result.sort_values('net_flow', ascending=False).reset_index(drop=True)
+
+
+def _te_matrix_column(
+    data: np.ndarray,
+    codes: Optional[np.ndarray],
+    target_idx: int,
+    k: int,
+    l: int,
+    bins: int,
+    n_surrogates: int,
+    seed: Optional[int]
+) -> Tuple[int, np.ndarray, np.ndarray, np.ndarray]:
+    """
+    TE from every column of data into one target column.
+
+    Args:
+        codes: Per-column discretization when data has no NaNs, else None
+
+    Returns:
+        (target_idx, te, surrogate_mean, p_value) arrays over sources
+    """
+    # Local generator: seeding must not touch the caller's global RNG state
+    rng = np.random.default_rng(None if seed is None else seed + target_idx)
+
+    N = data.shape[1]
+    te = np.full(N, np.nan)
+    surr_mean = np.full(N, np.nan)
+    p_value = np.full(N, np.nan)
+    target = data[:, target_idx]
+
+    if codes is not None:
+        # Shared discretization: score every source in one batch
+        te = _te_from_codes(codes[:, target_idx], codes.T, k, l, bins)
+        if n_surrogates > 0:
+            # One set of permutations per target, applied to every source;
+            # sources are batched in blocks to bound the (rows x T) arrays
+            order = np.argsort(rng.random((n_surrogates, len(codes))), axis=1)
+            block = max(1, 2_000_000 // (n_surrogates * len(codes)))
+            for j0 in range(0, N, block):
+                sources = codes.T[j0:j0 + block]
+                shuffled = sources[:, order].reshape(-1, len(codes))
+                surrogates = _te_from_codes(codes[:, target_idx], shuffled, k, l, bins)
+                surrogates = surrogates.reshape(len(sources), n_surrogates)
+                surr_mean[j0:j0 + block] = surrogates.mean(axis=1)
+                # Permutation p-value with the +1 correction (never exactly zero)
+                exceed = (surrogates >= te[j0:j0 + block, None]).sum(axis=1)
+                p_value[j0:j0 + block] = (exceed + 1) / (n_surrogates + 1)
+    else:
+        for j in range(N):
+            source_d, target_d = _prepare_te_series(data[:, j], target, bins)
+            te[j] = _te_from_codes(target_d, source_d, k, l, bins)[0]
+            if n_surrogates > 0 and j != target_idx and not np.isnan(te[j]):
+                surrogates = _te_from_codes(target_d, _shuffled_sources(source_d, n_surrogates, rng), k, l, bins)
+                surr_mean[j] = np.mean(surrogates)
+                p_value[j] = (np.sum(surrogates >= te[j]) + 1) / (n_surrogates + 1)
+
+    surr_mean[target_idx] = np.nan
+    p_value[target_idx] = np.nan
+    te[target_idx] = np.nan
+    return target_idx, te, surr_mean, p_value
+
+
+def _te_matrix_columns(
+    data: np.ndarray,
+    targets: List[int],
+    k: int,
+    l: int,
+    bins: int,
+    n_surrogates: int,
+    seed: Optional[int]
+) -> List[Tuple[int, np.ndarray, np.ndarray, np.ndarray]]:
+    """Score a block of target columns (module-level so it pickles to workers)."""
+    codes = None
+    if not np.isnan(data).any():
+        codes = np.column_stack([_discretize(data[:, j], bins) for j in range(data.shape[1])])
+    return [_te_matrix_column(data, codes, j, k, l, bins, n_surrogates, seed) for j in targets]
+
+
+def transfer_entropy_matrix(
+    data: Union[pd.DataFrame, np.ndarray],
+    k: int = 1,
+    l: int = 1,
+    bins: int = 10,
+    n_surrogates: int = 0,
+    n_jobs: int = 1,
+    seed: Optional[int] = None
+) -> TransferEntropyMatrix:
+    """
+    Pairwise N x N transfer entropy across a universe of series.
+
+    Each target column is scored against every source in one batched count
+    (columns are discretized once when the panel has no NaNs; otherwise each
+    pair is aligned exactly as in transfer_entropy). Diagonal is NaN.
+
+    Args:
+        data: T x N returns (DataFrame columns become the symbol labels)
+        k, l, bins: TE parameters
+        n_surrogates: Shuffled surrogates per pair (0 = raw TE only)
+        n_jobs: Worker processes over target columns (1 = in-process)
+        seed: Base RNG seed for reproducible surrogates
+
+    Returns:
+        TransferEntropyMatrix (te, surrogate_mean, p_values)
+    """
+    if isinstance(data, pd.DataFrame):
+        labels = list(data.columns)
+        values = data.to_numpy(dtype=float)
+    else:
+        values = np.asarray(data, dtype=float)
+        labels = list(range(values.shape[1]))
+
+    N = values.shape[1]
+    te = np.full((N, N), np.nan)
+    surr_mean = np.full((N, N), np.nan)
+    p_value = np.full((N, N), np.nan)
+
+    if n_jobs > 1 and N > 1:
+        # One block of targets per worker so the panel is pickled n_jobs times
+        blocks = [list(b) for b in np.array_split(np.arange(N), min(n_jobs, N))]
+        with ProcessPoolExecutor(max_workers=len(blocks)) as executor:
+            futures = [
+                executor.submit(_te_matrix_columns, values, block, k, l, bins, n_surrogates, seed)
+                for block in blocks
+            ]
+            results = [r for f in futures for r in f.result()]
+    else:
+        results = _te_matrix_columns(values, list(range(N)), k, l, bins, n_surrogates, seed)
+
+    # Column j of each matrix holds sources → target j
+    for j, col_te, col_surr, col_p in results:
+        te[:, j] = col_te
+        surr_mean[:, j] = col_surr
+        p_value[:, j] = col_p
+
+    def frame(values: np.ndarray) -> pd.DataFrame:
+        return pd.DataFrame(values, index=labels, columns=labels)
+
+    return TransferEntropyMatrix(
+        te=frame(te),
+        surrogate_mean=frame(surr_mean) if n_surrogates > 0 else None,
+        p_values=frame(p_value) if n_surrogates > 0 else None
+    )
+
+
+def rolling_transfer_entropy(
+    source: pd.Series,
+    target: pd.Series,
+    window: int = 250,
+    step: int = 1,
+    k: int = 1,
+    l: int = 1,
+    bins: int = 10
+) -> pd.Series:
+    """
+    Transfer entropy source → target over rolling windows.
+
+    Value at index t uses rows [t-window+1, t] (same as transfer_entropy on
+    that slice); windows are discretized independently.
+
+    Args:
+        source, target: Aligned series
+        window: Window length
+        step: Evaluate every `step` rows (others NaN)
+        k, l, bins: TE parameters
+
+    Returns:
+        Series of TE values aligned to target's index
+    """
+    src = np.asarray(source, dtype=float)
+    tgt = np.asarray(target, dtype=float)
+    result = np.full(len(tgt), np.nan)
+
+    for t in range(window - 1, len(tgt), step):
+        source_d, target_d = _prepare_te_series(src[t-window+1:t+1], tgt[t-window+1:t+1], bins)
+        result[t] = _te_from_codes(target_d, source_d, k, l, bins)[0]
+
+    index = target.index if isinstance(target, pd.Series) else None
+    return pd.Series(result, index=index, name='transfer_entropy')
+
+
+def rolling_transfer_entropy_matrix(
+    data: pd.DataFrame,
+    window: int = 250,
+    step: int = 21,
+    k: int = 1,
+    l: int = 1,
+    bins: int = 10,
+    n_surrogates: int = 0,
+    n_jobs: int = 1,
+    seed: Optional[int] = None
+) -> Dict[pd.Timestamp, TransferEntropyMatrix]:
+    """
+    TE matrices over rolling windows, keyed by window end label.
+
+    Args:
+        data: T x N returns DataFrame
+        window: Window length
+        step: Rows between consecutive windows
+        k, l, bins, n_surrogates, n_jobs, seed: See transfer_entropy_matrix
+
+    Returns:
+        Dict of window end index label -> TransferEntropyMatrix
+    """
+    results = {}
+    for end in range(window, len(data) + 1, step):
+        results[data.index[end - 1]] = transfer_entropy_matrix(
+            data.iloc[end - window:end], k=k, l=l, bins=bins,
+            n_surrogates=n_surrogates, n_jobs=n_jobs, seed=seed
+        )
+    return results
+
+
 # ============================================================================
 # KL DIVERGENCE (REGIME SHIFT DETECTION)
 # ============================================================================
@@ -643,37 +963,7 @@ def _lz_complexity(sequence: np.ndarray) -> int:
 
     Counts number of unique substrings.
     """
-    sequence = list(sequence)
-    n = len(sequence)
-
-    if n == 0:
-        return 0
-
-    complexity = 1
-    prefix_len = 1
-
-    i = 0
-    while i + prefix_len <= n:
-        # Check if current substring is in previous part
-        current = tuple(sequence[i:i+prefix_len])
-        # ENT2 FIX: Prefix is everything BEFORE position i, not including current
-        prefix = sequence[:i]
-
-        found = False
-        # Search for current substring in prefix
-        for j in range(len(prefix) - prefix_len + 1):
-            if tuple(prefix[j:j+prefix_len]) == current:
-                found = True
-                break
-
-        if found:
-            prefix_len += 1
-        else:
-            complexity += 1
-            i += prefix_len
-            prefix_len = 1
-
-    return complexity
+    return lz76_complexity(sequence)
 
 
 def fano_predictability_limit(
@@ -18,6 +18,7 @@ Research Source: ORDER-FLOW-ANALYSIS-RESEARCH.md
 """
 
 import logging
+from collections import deque
 from dataclasses import dataclass
 from typing import Dict, List, Optional, Tuple, Union
 
@@ -26,6 +27,8 @@ import pandas as pd
 from scipy import stats
 from scipy.stats import norm
 
+from .kernels import reset_positions, segmented_cumsum, tick_signs
+
 logger = logging.getLogger("AlphaFactory.Features.Flow")
 
 
@@ -68,30 +71,9 @@ def tick_rule(prices: np.ndarray) -> np.ndarray:
     Returns:
         Array of trade signs (+1 buy, -1 sell)
     """
-    prices = np.asarray(prices)
-    n = len(prices)
-
-    if n < 2:
-        return np.zeros(n)
-
-    # Calculate price changes
-    changes = np.diff(prices)
-
-    # Initialize signs (0 for first trade)
-    signs = np.zeros(n)
-
-    # Classify based on tick rule
-    for i in range(1, n):
-        if changes[i-1] > 0:
-            signs[i] = 1  # Buy
-        elif changes[i-1] < 0:
-            signs[i] = -1  # Sell
-        else:
-            # FL6: Zero tick - use previous classification, or 0 if unclassifiable
-            # Don't assume buy (1) in flat markets
-            signs[i] = signs[i-1]
-
-    return signs
+    # FL6: Zero ticks carry the previous classification, or 0 if unclassifiable
+    # Don't assume buy (1) in flat markets
+    return tick_signs(prices)
 
 
 def lee_ready(
@@ -155,8 +137,7 @@ def lee_ready(
 
     # For trades at midpoint, use tick rule
     if np.any(at_mid):
-        tick_signs = tick_rule(trade_prices)
-        signs[at_mid] = tick_signs[at_mid]
+        signs[at_mid] = tick_rule(trade_prices)[at_mid]
 
     return signs
 
@@ -408,6 +389,123 @@ def calculate_vpin(
     return vpin, vpin_midpoints
 
 
+class StreamingVPIN:
+    """
+    VPIN updated one bar at a time.
+
+    Follows calculate_vpin's bucketing (whole bars, a bucket closes on the
+    bar before the one that reaches its volume threshold, the open bucket
+    counts as the last one) and BVC's one-bar classification lag, but keeps
+    only the running cumulative volume, the open bucket and the last
+    n_buckets + 4 closed imbalances. With a fixed sigma the values match
+    calculate_vpin on the full history; with sigma=None the expanding
+    standard deviation is floored using the mean absolute return seen so
+    far (the batch floor uses the whole series).
+
+    Usage:
+        vpin = StreamingVPIN(bucket_size=np.median(volumes))
+        for price, volume in bars:
+            value = vpin.update(price, volume)    # NaN until the first bar
+    """
+
+    def __init__(self, bucket_size: float, n_buckets: int = 50, sigma: Optional[float] = None):
+        """
+        Args:
+            bucket_size: Volume per bucket
+            n_buckets: Rolling window for VPIN
+            sigma: Fixed return volatility for BVC (expanding estimate if None)
+        """
+        self.bucket_size = float(bucket_size)
+        self.n_buckets = n_buckets
+        self.sigma = sigma
+
+        self.n_bars = 0
+        self.cum_volume = 0.0
+        self._next_threshold = 0  # Index into bucket_size * (k + 1) thresholds
+        self._prev_price: Optional[float] = None
+        self._pending_buy_prob: Optional[float] = None
+
+        # Expanding return moments (Welford) for sigma=None
+        self._n_returns = 0
+        self._ret_mean = 0.0
+        self._ret_m2 = 0.0
+        self._abs_sum = 0.0
+
+        self._open_buy = 0.0
+        self._open_sell = 0.0
+        self._closed: deque = deque(maxlen=n_buckets + 4)
+
+    def _return_sigma(self, r: float) -> float:
+        if self.sigma is not None:
+            return self.sigma
+        self._n_returns += 1
+        delta = r - self._ret_mean
+        self._ret_mean += delta / self._n_returns
+        self._ret_m2 += delta * (r - self._ret_mean)
+        self._abs_sum += abs(r)
+        if self._n_returns == 1:
+            sigma = abs(r)
+        else:
+            sigma = np.sqrt(self._ret_m2 / self._n_returns)
+        eps = max(self._abs_sum / self._n_returns * 0.01, 1e-6)
+        return max(sigma, eps)
+
+    def update(self, price: float, volume: float) -> float:
+        """
+        Add one bar.
+
+        Returns:
+            Current VPIN (NaN until two bars have been seen)
+        """
+        # Classify with the previous bar's return (no lookahead)
+        buy_prob = 0.5 if self._pending_buy_prob is None else self._pending_buy_prob
+        if self._prev_price is not None:
+            r = np.log(price / self._prev_price)
+            self._pending_buy_prob = float(norm.cdf(r / self._return_sigma(r)))
+        self._prev_price = price
+
+        self.cum_volume += volume
+        bar = self.n_bars
+        self.n_bars += 1
+
+        # Thresholds reached by this bar close the open bucket before it
+        closed_here = False
+        while self.bucket_size + self._next_threshold * self.bucket_size <= self.cum_volume:
+            self._next_threshold += 1
+            if not closed_here and bar > 0:
+                bucket_vol = self._open_buy + self._open_sell
+                if bucket_vol > 0:
+                    self._closed.append(abs(self._open_buy - self._open_sell) / bucket_vol)
+                self._open_buy = self._open_sell = 0.0
+                closed_here = True
+
+        self._open_buy += volume * buy_prob
+        self._open_sell += volume * (1 - buy_prob)
+
+        values = self.recent_values(1)
+        return float(values[-1]) if len(values) else np.nan
+
+    def recent_values(self, n: int = 5) -> np.ndarray:
+        """Last n points of the VPIN series calculate_vpin would return now."""
+        if self.n_bars < 2:
+            return np.array([])
+
+        imbalances = list(self._closed)
+        open_vol = self._open_buy + self._open_sell
+        if open_vol > 0:
+            imbalances.append(abs(self._open_buy - self._open_sell) / open_vol)
+        if not imbalances:
+            return np.array([])
+
+        window = self.n_buckets
+        if self.cum_volume < self.bucket_size * window:
+            window = min(window, max(1, int(self.cum_volume / self.bucket_size)))
+        window = min(window, len(imbalances))
+
+        tail = np.asarray(imbalances[-(window + n - 1):])
+        return np.convolve(tail, np.ones(window) / window, mode='valid')[-n:]
+
+
 def vpin_cdf(
     current_vpin: float,
     historical_vpin: np.ndarray,
@@ -867,23 +965,9 @@ def cumulative_ofi(
     if reset_periods is None:
         return np.cumsum(ofi)
 
-    reset_periods = np.asarray(reset_periods)
-    cum_ofi = np.zeros_like(ofi, dtype=float)
-
-    # Find reset points
-    reset_idx = 0
-    cum = 0.0
-
-    for i in range(len(ofi)):
-        # FL9: Use while loop to handle multiple resets at same index
-        while reset_idx < len(reset_periods) and i >= reset_periods[reset_idx]:
-            cum = 0.0
-            reset_idx += 1
-
-        cum += ofi[i]
-        cum_ofi[i] = cum
-
-    return cum_ofi
+    # FL9: Every reset reached by an index applies there (multiple resets at same index)
+    starts = reset_positions(reset_periods, len(ofi), consume_all=True)
+    return segmented_cumsum(ofi, starts)
 
 
 # =============================================================================
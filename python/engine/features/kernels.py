@@ -0,0 +1,507 @@
+#!/usr/bin/env python3
+"""
+Scan Kernels - Shared Path-Dependent Loops for Feature Modules
+==============================================================
+Vectorized replacements for the per-sample Python loops in the physics
+feature modules (flow, change_point, mm_inventory, entropy, morphology).
+
+Most scans reduce to a ufunc accumulate:
+- Forward fill: index of last valid sample via np.maximum.accumulate
+- Resetting sums: reset positions via np.maximum.accumulate, then cumsum
+  per segment
+- Lindley recursion S_i = max(0, S_{i-1} + x_i): C_i - min_{j<=i} C_j
+  over the running sum C
+- Trailing windows: np.lib.stride_tricks.sliding_window_view in chunks
+
+Two scans are inherently sequential (LZ76 parsing, convex hull stacks).
+They run in plain Python by default and as compiled kernels when the
+compiled backend is enabled:
+
+    QUANT_ENGINE_KERNELS=compiled   (or kernels.set_backend('compiled'))
+
+The compiled backend needs numba. It is optional: when numba is missing
+the NumPy/Python kernels are used and a warning is logged once.
+"""
+
+import logging
+import os
+from typing import Any, Dict, Optional, Tuple
+
+import numpy as np
+
+logger = logging.getLogger("MarketPhysics.Features.Kernels")
+
+KERNEL_BACKEND_ENV = "QUANT_ENGINE_KERNELS"
+BACKENDS = ("numpy", "compiled")
+
+# Rows per sliding-window block (bounds memory at ~chunk * window floats)
+WINDOW_CHUNK = 4096
+
+# Tolerance used by the dip-test hull construction
+_HULL_EPS = 1e-12
+
+_backend: Optional[str] = None
+_compiled_kernels: Optional[Dict[str, Any]] = None
+_compiled_unavailable = False
+
+
+# =============================================================================
+# BACKEND SELECTION
+# =============================================================================
+
+def set_backend(name: str) -> str:
+    """
+    Select the kernel backend.
+
+    Args:
+        name: 'numpy' or 'compiled'
+
+    Returns:
+        The backend actually in use ('numpy' if compiled kernels are unavailable)
+    """
+    global _backend
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown kernel backend '{name}'. Options: {list(BACKENDS)}")
+    _backend = name
+    return active_backend()
+
+
+def active_backend() -> str:
+    """Backend used by the next kernel call."""
+    global _backend
+    if _backend is None:
+        requested = os.environ.get(KERNEL_BACKEND_ENV, "numpy").lower()
+        _backend = requested if requested in BACKENDS else "numpy"
+    if _backend == "compiled" and _compiled() is None:
+        return "numpy"
+    return _backend
+
+
+def _compiled() -> Optional[Dict[str, Any]]:
+    """JIT-compiled sequential kernels, or None when numba is not installed."""
+    global _compiled_kernels, _compiled_unavailable
+    if _compiled_kernels is not None or _compiled_unavailable:
+        return _compiled_kernels
+    try:
+        import numba
+    except ImportError:
+        _compiled_unavailable = True
+        logger.warning("numba not installed - compiled kernels disabled, using NumPy kernels")
+        return None
+
+    jit = numba.njit(cache=True, nogil=True)
+    _compiled_kernels = {
+        "lz76": jit(_lz76_array),
+        "envelope": jit(_unit_envelope_array),
+    }
+    return _compiled_kernels
+
+
+def _use_compiled(name: str):
+    if active_backend() != "compiled":
+        return None
+    return _compiled()[name]
+
+
+# =============================================================================
+# FORWARD FILL / TICK SIGNS
+# =============================================================================
+
+def tick_signs(prices: np.ndarray) -> np.ndarray:
+    """
+    Tick-rule trade signs: +1 uptick, -1 downtick, zero ticks carry the
+    previous sign (0 until the first non-zero tick).
+
+    Args:
+        prices: Trade price series
+
+    Returns:
+        Float array of signs, same length as prices (first element 0)
+    """
+    prices = np.asarray(prices, dtype=float)
+    n = len(prices)
+    signs = np.zeros(n)
+    if n < 2:
+        return signs
+
+    changes = np.diff(prices)
+    # NaN changes compare False both ways: treated as zero ticks
+    signs[1:] = np.where(changes > 0, 1.0, np.where(changes < 0, -1.0, 0.0))
+    return forward_fill_nonzero(signs)
+
+
+def forward_fill_nonzero(values: np.ndarray) -> np.ndarray:
+    """Replace zeros with the last preceding non-zero value (leading zeros stay 0)."""
+    values = np.asarray(values)
+    n = len(values)
+    if n == 0:
+        return values.copy()
+    last = np.where(values != 0, np.arange(n), 0)
+    np.maximum.accumulate(last, out=last)
+    return values[last]
+
+
+# =============================================================================
+# RESETTING CUMULATIVE SUMS
+# =============================================================================
+
+def reset_positions(boundaries: np.ndarray, n: int, consume_all: bool = True) -> np.ndarray:
+    """
+    Positions at which a resetting running sum restarts.
+
+    Mirrors the sequential boundary scan: boundaries are consumed in array
+    order, each one once the index reaches it.
+
+    Args:
+        boundaries: Boundary indices (need not be sorted or unique)
+        n: Series length
+        consume_all: If True, every boundary reached at an index is consumed
+            there (a `while` scan). If False, at most one boundary is
+            consumed per index (an `if` scan), so duplicates spill forward.
+
+    Returns:
+        Sorted unique reset positions in [0, n)
+    """
+    boundaries = np.ceil(np.asarray(boundaries, dtype=float).ravel())
+    if len(boundaries) == 0 or n == 0:
+        return np.zeros(0, dtype=np.intp)
+
+    if consume_all:
+        # t_k = max(t_{k-1}, b_k)
+        times = np.maximum.accumulate(np.maximum(boundaries, 0.0))
+    else:
+        # t_k = max(t_{k-1} + 1, b_k)  <=>  t_k - k = max(t_{k-1} - (k-1), b_k - k)
+        k = np.arange(len(boundaries))
+        times = k + np.maximum(np.maximum.accumulate(boundaries - k), 0.0)
+
+    times = times[times < n]
+    return np.unique(times.astype(np.intp))
+
+
+def segmented_cumsum(values: np.ndarray, starts: np.ndarray) -> np.ndarray:
+    """
+    Running sum that restarts from zero at each start position.
+
+    Each segment is summed independently (float64), so results match a
+    sequential `cum += v` loop exactly.
+
+    Args:
+        values: Series to accumulate
+        starts: Sorted reset positions (e.g. from reset_positions)
+
+    Returns:
+        Float array of segment-wise cumulative sums
+    """
+    values = np.asarray(values)
+    n = len(values)
+    out = np.empty(n, dtype=float)
+    edges = np.concatenate(([0], np.asarray(starts, dtype=np.intp), [n]))
+    edges = np.unique(np.clip(edges, 0, n))
+    for a, b in zip(edges[:-1], edges[1:]):
+        np.cumsum(values[a:b], dtype=float, out=out[a:b])
+    return out
+
+
+# =============================================================================
+# LINDLEY / CUSUM
+# =============================================================================
+
+def lindley_scan(increments: np.ndarray) -> np.ndarray:
+    """
+    One-sided CUSUM recursion S_0 = 0, S_i = max(0, S_{i-1} + x_i).
+
+    Closed form: S_i = C_i - min_{0<=j<=i} C_j with C the running sum of
+    x_1..x_i (C_0 = 0). The first increment is ignored, as in the loop.
+    Matches the loop to rounding (~1e-16 relative to |C|).
+
+    Args:
+        increments: Per-step increments x_i
+
+    Returns:
+        Statistic S, same length as increments
+    """
+    increments = np.asarray(increments, dtype=float)
+    n = len(increments)
+    if n == 0:
+        return np.zeros(0)
+    running = np.empty(n)
+    running[0] = 0.0
+    np.cumsum(increments[1:], out=running[1:])
+    stat = running - np.minimum.accumulate(running)
+    # Clamp rounding noise at the reflecting barrier
+    return np.maximum(stat, 0.0)
+
+
+def rising_edges(mask: np.ndarray) -> np.ndarray:
+    """Indices where a boolean mask switches from False to True (index 0 counts)."""
+    mask = np.asarray(mask, dtype=bool)
+    if len(mask) == 0:
+        return np.zeros(0, dtype=np.intp)
+    previous = np.concatenate(([False], mask[:-1]))
+    return np.flatnonzero(mask & ~previous)
+
+
+# =============================================================================
+# TRAILING WINDOWS
+# =============================================================================
+
+def lagged_zscore(values: np.ndarray, window: int) -> np.ndarray:
+    """
+    Z-score of each value against the preceding `window` values.
+
+    z_i = (x_i - mean(x[i-window:i])) / std(x[i-window:i]) for i >= window,
+    population std, NaN where the window has zero variance.
+
+    Windows are evaluated in blocks of WINDOW_CHUNK rows with exact per-window
+    mean/std (no running-sum cancellation on trending series).
+
+    Args:
+        values: Input series
+        window: Number of preceding values
+
+    Returns:
+        Z-score array (NaN for the first `window` values)
+    """
+    values = np.asarray(values, dtype=float)
+    n = len(values)
+    zscore = np.full(n, np.nan)
+    if window < 1 or n <= window:
+        return zscore
+
+    windows = np.lib.stride_tricks.sliding_window_view(values[:-1], window)
+    for start in range(0, len(windows), WINDOW_CHUNK):
+        block = windows[start:start + WINDOW_CHUNK]
+        mean = block.mean(axis=1)
+        std = block.std(axis=1)
+        current = values[window + start:window + start + len(block)]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            z = (current - mean) / std
+        zscore[window + start:window + start + len(block)] = np.where(std > 0, z, np.nan)
+    return zscore
+
+
+# =============================================================================
+# ORDINAL PATTERNS
+# =============================================================================
+
+def ordinal_patterns(data: np.ndarray, order: int, delay: int = 1) -> np.ndarray:
+    """
+    Integer code of the rank pattern of every delay-embedded vector.
+
+    The pattern of (x_i, x_{i+d}, ..., x_{i+(order-1)d}) is its stable argsort
+    (ties keep time order); the code packs it in base `order`.
+
+    Args:
+        data: 1-D series without NaN
+        order: Embedding dimension
+        delay: Time delay between points
+
+    Returns:
+        int64 codes, one per embedded vector
+    """
+    data = np.asarray(data, dtype=float)
+    span = delay * (order - 1)
+    if len(data) <= span:
+        return np.zeros(0, dtype=np.int64)
+
+    embedded = np.lib.stride_tricks.sliding_window_view(data, span + 1)[:, ::delay]
+    patterns = np.argsort(embedded, axis=1, kind='stable')
+    weights = order ** np.arange(order - 1, -1, -1, dtype=np.int64)
+    return patterns.astype(np.int64) @ weights
+
+
+def pattern_counts(codes: np.ndarray) -> np.ndarray:
+    """Occurrence counts of each distinct code, in order of first appearance."""
+    codes = np.asarray(codes)
+    if len(codes) == 0:
+        return np.zeros(0, dtype=np.int64)
+    _, first, counts = np.unique(codes, return_index=True, return_counts=True)
+    return counts[np.argsort(first, kind='stable')]
+
+
+# =============================================================================
+# LEMPEL-ZIV (LZ76)
+# =============================================================================
+
+def lz76_complexity(symbols: np.ndarray) -> int:
+    """
+    Lempel-Ziv (1976) complexity of a symbol sequence.
+
+    A phrase grows while it occurs entirely inside the sequence before the
+    phrase start; every new phrase adds one (the count starts at 1).
+
+    Sequences with at most 256 distinct symbols are matched with bytes.find
+    (C substring search); larger alphabets use the compiled kernel or a
+    Python scan.
+
+    Args:
+        symbols: 1-D sequence of discrete symbols
+
+    Returns:
+        Complexity count
+    """
+    symbols = np.asarray(symbols).ravel()
+    n = len(symbols)
+    if n == 0:
+        return 0
+
+    kernel = _use_compiled("lz76")
+    _, codes = np.unique(symbols, return_inverse=True)
+    if kernel is not None:
+        return int(kernel(codes.astype(np.int64)))
+    if codes.max() < 256:
+        return _lz76_bytes(codes.astype(np.uint8).tobytes())
+    return _lz76_array(codes.astype(np.int64))
+
+
+def _lz76_bytes(seq: bytes) -> int:
+    n = len(seq)
+    complexity = 1
+    prefix_len = 1
+    i = 0
+    while i + prefix_len <= n:
+        if seq.find(seq[i:i + prefix_len], 0, i) >= 0:
+            prefix_len += 1
+        else:
+            complexity += 1
+            i += prefix_len
+            prefix_len = 1
+    return complexity
+
+
+def _lz76_array(seq: np.ndarray) -> int:
+    # Plain loops over an int64 array: the compiled kernel body
+    n = seq.shape[0]
+    complexity = 1
+    prefix_len = 1
+    i = 0
+    while i + prefix_len <= n:
+        found = False
+        for j in range(i - prefix_len + 1):
+            k = 0
+            while k < prefix_len and seq[j + k] == seq[i + k]:
+                k += 1
+            if k == prefix_len:
+                found = True
+                break
+        if found:
+            prefix_len += 1
+        else:
+            complexity += 1
+            i += prefix_len
+            prefix_len = 1
+    return complexity
+
+
+# =============================================================================
+# CONVEX ENVELOPES (DIP TEST)
+# =============================================================================
+
+def unit_envelope(x: np.ndarray, y: np.ndarray, lower: bool = True) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Convex minorant (lower=True) or concave majorant of points on [0, 1]^2.
+
+    The hull is anchored at (0, 0) and closed at (1, 1), as the dip test's
+    GCM/LCM on normalized data. Points closer than 1e-12 in x are never
+    popped.
+
+    Args:
+        x: Sorted x-coordinates in [0, 1]
+        y: y-coordinates
+        lower: Build the greatest convex minorant (else least concave majorant)
+
+    Returns:
+        (hull_x, hull_y) vertex arrays, hull_x non-decreasing
+    """
+    x = np.ascontiguousarray(x, dtype=float)
+    y = np.ascontiguousarray(y, dtype=float)
+    kernel = _use_compiled("envelope")
+    if kernel is not None:
+        return kernel(x, y, lower)
+    return _unit_envelope_list(x.tolist(), y.tolist(), lower)
+
+
+def envelope_at(hull_x: np.ndarray, hull_y: np.ndarray, x: np.ndarray) -> np.ndarray:
+    """
+    Evaluate a piecewise-linear envelope at x.
+
+    Each x uses the last vertex with hull_x <= x + 1e-12 and interpolates
+    toward the next one; zero-width segments return the left vertex value.
+    """
+    hull_x = np.asarray(hull_x, dtype=float)
+    hull_y = np.asarray(hull_y, dtype=float)
+    x = np.asarray(x, dtype=float)
+    last = len(hull_x) - 1
+
+    idx = np.searchsorted(hull_x[1:], x + _HULL_EPS, side='right')
+    left = np.minimum(idx, max(last - 1, 0))
+    right = np.minimum(left + 1, last)
+    x1, y1 = hull_x[left], hull_y[left]
+    x2, y2 = hull_x[right], hull_y[right]
+
+    sloped = x2 > x1 + _HULL_EPS
+    with np.errstate(divide='ignore', invalid='ignore'):
+        t = (x - x1) / (x2 - x1)
+    values = np.where(sloped, y1 + t * (y2 - y1), y1)
+    return np.where(idx >= last, hull_y[-1], values)
+
+
+def _unit_envelope_list(x: list, y: list, lower: bool) -> Tuple[np.ndarray, np.ndarray]:
+    hull_x = [0.0]
+    hull_y = [0.0]
+    for x_new, y_new in zip(x, y):
+        while len(hull_x) >= 2:
+            dx_prev = hull_x[-1] - hull_x[-2]
+            dx_new = x_new - hull_x[-1]
+            if dx_prev < _HULL_EPS or dx_new < _HULL_EPS:
+                break
+            slope_prev = (hull_y[-1] - hull_y[-2]) / dx_prev
+            slope_new = (y_new - hull_y[-1]) / dx_new
+            # Lower hull keeps non-decreasing slopes, upper hull non-increasing
+            if lower and slope_new >= slope_prev - _HULL_EPS:
+                break
+            if not lower and slope_new <= slope_prev + _HULL_EPS:
+                break
+            hull_x.pop()
+            hull_y.pop()
+        hull_x.append(x_new)
+        hull_y.append(y_new)
+
+    if hull_x[-1] < 1.0 - _HULL_EPS:
+        hull_x.append(1.0)
+        hull_y.append(1.0)
+    return np.array(hull_x), np.array(hull_y)
+
+
+def _unit_envelope_array(x: np.ndarray, y: np.ndarray, lower: bool) -> Tuple[np.ndarray, np.ndarray]:
+    # Array-stack version of _unit_envelope_list: the compiled kernel body
+    n = x.shape[0]
+    hull_x = np.empty(n + 2)
+    hull_y = np.empty(n + 2)
+    hull_x[0] = 0.0
+    hull_y[0] = 0.0
+    m = 1
+    for i in range(n):
+        x_new = x[i]
+        y_new = y[i]
+        while m >= 2:
+            dx_prev = hull_x[m - 1] - hull_x[m - 2]
+            dx_new = x_new - hull_x[m - 1]
+            if dx_prev < 1e-12 or dx_new < 1e-12:
+                break
+            slope_prev = (hull_y[m - 1] - hull_y[m - 2]) / dx_prev
+            slope_new = (y_new - hull_y[m - 1]) / dx_new
+            if lower and slope_new >= slope_prev - 1e-12:
+                break
+            if not lower and slope_new <= slope_prev + 1e-12:
+                break
+            m -= 1
+        hull_x[m] = x_new
+        hull_y[m] = y_new
+        m += 1
+
+    if hull_x[m - 1] < 1.0 - 1e-12:
+        hull_x[m] = 1.0
+        hull_y[m] = 1.0
+        m += 1
+    return hull_x[:m].copy(), hull_y[:m].copy()
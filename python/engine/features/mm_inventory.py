@@ -31,6 +31,8 @@ import pandas as pd
 from scipy import stats
 from scipy.stats import norm
 
+from .kernels import lagged_zscore, reset_positions, segmented_cumsum
+
 logger = logging.getLogger("AlphaFactory.Features.MMInventory")
 
 
@@ -460,18 +462,9 @@ def cumulative_delta(
     if daily_boundaries is None:
         return np.cumsum(delta)
 
-    cum_delta = np.zeros_like(delta, dtype=float)
-    boundary_idx = 0
-    cum = 0.0
-
-    for i in range(len(delta)):
-        if boundary_idx < len(daily_boundaries) and i >= daily_boundaries[boundary_idx]:
-            cum = 0.0
-            boundary_idx += 1
-        cum += delta[i]
-        cum_delta[i] = cum
-
-    return cum_delta
+    # At most one boundary is consumed per bar
+    starts = reset_positions(daily_boundaries, len(delta), consume_all=False)
+    return segmented_cumsum(delta, starts)
 
 
 def inventory_zscore(
@@ -488,20 +481,8 @@ def inventory_zscore(
     Returns:
         Z-score series
     """
-    inventory_proxy = np.asarray(inventory_proxy)
-    n = len(inventory_proxy)
-
-    zscore = np.full(n, np.nan)
-
-    for i in range(window, n):
-        window_data = inventory_proxy[i-window:i]
-        mean = np.mean(window_data)
-        std = np.std(window_data)
-
-        if std > 0:
-            zscore[i] = (inventory_proxy[i] - mean) / std
-
-    return zscore
+    # Each value is scored against the preceding window (excludes itself)
+    return lagged_zscore(inventory_proxy, window)
 
 
 def predict_inventory_reversion(
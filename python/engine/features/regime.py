@@ -663,6 +663,49 @@ class GaussianHMM:
             next_regime_prob=next_prob
         )
 
+    def filter_step(self, prev_probs: Optional[np.ndarray], x: float) -> np.ndarray:
+        """
+        One step of online forward filtering with the fitted parameters.
+
+        P(S_t | O_1..O_t) ∝ P(O_t | S_t) Σ_i P(S_{t-1}=i | O_1..O_{t-1}) A[i, S_t]
+
+        Same recursion (and emission floors) as _forward, so stepping through
+        a series reproduces its normalized alpha row by row without a refit
+        or a pass over history.
+
+        Args:
+            prev_probs: Filtered probabilities at t-1 (None for the first observation)
+            x: New observation
+
+        Returns:
+            Filtered regime probabilities at t
+        """
+        if not self._fitted:
+            raise ValueError("Model must be fitted first")
+
+        sigma = np.maximum(self.stds, 1e-3)
+        b = np.exp(-0.5 * ((x - self.means) / sigma) ** 2) / (sigma * np.sqrt(2 * np.pi))
+        b = np.maximum(b, 1e-300)
+
+        prior = self.initial_probs if prev_probs is None else prev_probs @ self.transition_matrix
+        alpha = prior * b
+        total = np.sum(alpha)
+        return alpha / total if total > 0 else alpha
+
+    def filter(self, data: np.ndarray) -> np.ndarray:
+        """
+        Filtered (causal) regime probabilities, T x K.
+
+        Unlike decode(), which smooths with the backward pass, row t only
+        uses observations up to t - what a live consumer can know.
+        """
+        if not self._fitted:
+            raise ValueError("Model must be fitted first")
+
+        data = np.asarray(data).flatten()
+        alpha, _ = self._forward(data, self._emission_matrix(data))
+        return alpha
+
     def predict_transition_prob(
         self,
         current_regime_prob: np.ndarray,
@@ -21,6 +21,7 @@ logger = logging.getLogger(__name__)
 # Import from unified engine package
 from ..trading.simulator import TradeSimulator
 from ..data.loaders import load_spy_data
+from ..data.market_calendar import trading_days
 
 # These modules may not exist yet - stub definitions
 class StrategyGenome:
@@ -242,6 +243,38 @@ def calculate_strategy_pvalue(
     return pvalue
 
 
+# =============================================================================
+# Vectorized Triggers
+# =============================================================================
+
+def trigger_masks(genomes: List[StrategyGenome], vix_proxy: np.ndarray) -> np.ndarray:
+    """
+    Entry-trigger masks for many genomes over one day's bars.
+
+    Vectorized form of MasterMiner._check_trigger; genomes sharing a
+    trigger share one comparison.
+
+    Args:
+        genomes: Strategies to evaluate
+        vix_proxy: VIX proxy per bar (n_bars,)
+
+    Returns:
+        Boolean array (n_genomes, n_bars)
+    """
+    masks = np.ones((len(genomes), len(vix_proxy)), dtype=bool)
+    computed: Dict[Tuple, np.ndarray] = {}
+    for g, genome in enumerate(genomes):
+        trigger = genome.trigger
+        if trigger.get('type') != 'vix_level' or trigger.get('operator') not in ('>', '<'):
+            continue
+        key = (trigger.get('operator'), trigger.get('value'))
+        if key not in computed:
+            op, val = key
+            computed[key] = vix_proxy > val if op == '>' else vix_proxy < val
+        masks[g] = computed[key]
+    return masks
+
+
 class MasterMiner:
     def __init__(self, start_date: str, end_date: str, capital: float = 100000.0):
         self.start_date = start_date
@@ -253,6 +286,7 @@ class MasterMiner:
         
         self.quote_cache = {} 
         self.current_cache_date = None
+        self.quote_cache_size = 10
         
     def _get_quote_cached(self, symbol: str, date_str: str) -> pd.DataFrame:
         if self.current_cache_date != date_str:
@@ -260,7 +294,7 @@ class MasterMiner:
             self.current_cache_date = date_str
             
         if symbol not in self.quote_cache:
-            if len(self.quote_cache) > 10:
+            if len(self.quote_cache) > self.quote_cache_size:
                 first_key = next(iter(self.quote_cache))
                 del self.quote_cache[first_key]
             
@@ -287,66 +321,147 @@ class MasterMiner:
             logging.error(f"Failed to parse expiration from '{symbol}': {e}")
             raise ValueError(f"Invalid option symbol format: {symbol}") from e
 
-    def run(self, genome: StrategyGenome):
-        print(f"--- LAUNCHING MINE: {genome.name} --- ")
-        dates = pd.date_range(start=self.start_date, end=self.end_date, freq='D')
-        
-        for date_obj in dates:
+    def _load_day_bars(self, date_str: str) -> pd.DataFrame:
+        """One day's 15-minute bars (close, iv_decimal, vix_proxy); empty if unavailable."""
+        try:
+            spy_df = self.loader.load_trades('SPY', date_str, columns=['timestamp', 'underlying_price', 'iv'])
+        except Exception as e:
+            print(f"  [WARN] Failed to load SPY data for {date_str}: {e}")
+            return pd.DataFrame()
+        if spy_df.empty:
+            return pd.DataFrame()
+
+        ohlc = spy_df.set_index('timestamp').resample('15min').agg({
+            'underlying_price': 'last',
+            'iv': 'median'
+        }).dropna()
+        ohlc.columns = ['close', 'iv_snapshot']
+
+        iv = ohlc['iv_snapshot'].to_numpy(dtype=float)
+        ohlc['iv_decimal'] = np.where(iv > 4.0, iv / 100.0, iv)
+        ohlc['vix_proxy'] = ohlc['iv_decimal'] * 100.0
+        return ohlc
+
+    def _next_exit_bar(self, simulator: TradeSimulator, genome: StrategyGenome,
+                       timestamps: pd.DatetimeIndex, start: int) -> Optional[int]:
+        """First bar >= start at which any active trade expires or reaches its hold time."""
+        hold_days = genome.exit.get('hold_days', 999)
+        first = None
+        for trade in simulator.active_trades:
+            exp_date = pd.Timestamp(self._parse_expiration(trade.symbol).date())
+            if timestamps.tz is not None:
+                exp_date = exp_date.tz_localize(timestamps.tz)
+            # (timestamp - entry).days >= hold  <=>  timestamp >= entry + hold days
+            due = min(exp_date, pd.Timestamp(trade.entry_date) + pd.Timedelta(days=hold_days))
+            j = start + int(timestamps[start:].searchsorted(due))
+            if j < len(timestamps) and (first is None or j < first):
+                first = j
+        return first
+
+    def _process_bar(self, simulator: TradeSimulator, genome: StrategyGenome, timestamp,
+                     bar: Dict[str, float], date_str: str, manage_exits: bool, check_entry: bool):
+        """Exits then entries for one bar - the body of the original per-bar loop."""
+        current_spot = bar['close']
+        current_iv_decimal = bar['iv_decimal']
+
+        # A. MANAGE EXITS
+        if manage_exits:
+            for trade in list(simulator.active_trades):
+                days_held = (timestamp - trade.entry_date).days
+
+                exp_date = self._parse_expiration(trade.symbol)
+                if timestamp.date() >= exp_date.date():
+                    self._execute_expiration(trade, timestamp, current_spot, simulator)
+                    continue
+
+                if days_held >= genome.exit.get('hold_days', 999):
+                    self._execute_exit(trade, timestamp, 'time_exit', date_str, simulator)
+
+        # B. MANAGE ENTRIES
+        if check_entry and not simulator.active_trades:
+            target_dte = 7
+            target_delta = genome.instrument.get('delta', -0.05)
+            opt_type = genome.instrument.get('type', 'put')
+            exp_date = self.factory.get_expiration(timestamp, target_dte)
+            strike = self.factory.get_strike(current_spot, target_delta, opt_type,
+                                             iv=current_iv_decimal, dte=target_dte)
+            symbol = self.factory.build_occ('SPY', exp_date, opt_type, strike)
+            action = genome.instrument.get('action', 'buy')
+            direction = 'SHORT' if action == 'sell' else 'LONG'
+
+            self._execute_entry(symbol, timestamp, direction, genome, date_str, simulator)
+
+    def _run_day(self, simulator: TradeSimulator, genome: StrategyGenome, bars: pd.DataFrame,
+                 entry_mask: np.ndarray, date_str: str):
+        """
+        Resolve one genome's exits and entries over a day's bars.
+
+        Equivalent to visiting every bar, but jumps straight to the bars where
+        something can happen: the next exit bar while a trade is open, the
+        next trigger bar while flat.
+        """
+        timestamps = bars.index
+        close = bars['close'].to_numpy()
+        iv = bars['iv_decimal'].to_numpy()
+        trigger_bars = np.flatnonzero(entry_mask)
+        n_bars = len(bars)
+
+        i = 0
+        while i < n_bars:
+            if simulator.active_trades:
+                j = self._next_exit_bar(simulator, genome, timestamps, i)
+                if j is None:
+                    break
+                bar = {'close': close[j], 'iv_decimal': iv[j]}
+                self._process_bar(simulator, genome, timestamps[j], bar, date_str,
+                                  manage_exits=True, check_entry=bool(entry_mask[j]))
+            else:
+                k = trigger_bars.searchsorted(i)
+                if k == len(trigger_bars):
+                    break
+                j = trigger_bars[k]
+                bar = {'close': close[j], 'iv_decimal': iv[j]}
+                self._process_bar(simulator, genome, timestamps[j], bar, date_str,
+                                  manage_exits=False, check_entry=True)
+            i = j + 1
+
+    def run_batch(self, genomes: List[StrategyGenome],
+                  simulators: Optional[List[TradeSimulator]] = None) -> List[pd.DataFrame]:
+        """
+        Test many genomes in one pass over the data.
+
+        Each trading day is loaded and resampled once; triggers for all genomes
+        are evaluated as masks over the day's bars, and option quotes are
+        shared through the per-day quote cache.
+
+        Args:
+            genomes: Strategies to test
+            simulators: One simulator per genome (default: fresh simulators)
+
+        Returns:
+            Per-genome simulator results, in input order
+        """
+        if simulators is None:
+            simulators = [TradeSimulator(initial_capital=self.capital) for _ in genomes]
+        self.quote_cache_size = max(10, 4 * len(genomes))
+
+        for date_obj in trading_days(self.start_date, self.end_date):
             date_str = date_obj.strftime('%Y-%m-%d')
             print(f"Processing {date_str}...")
-            
-            try:
-                spy_df = self.loader.load_trades('SPY', date_str, columns=['timestamp', 'underlying_price', 'iv'])
-            except Exception as e:
-                print(f"  [WARN] Failed to load SPY data for {date_str}: {e}")
+
+            bars = self._load_day_bars(date_str)
+            if bars.empty:
                 continue
-            if spy_df.empty: continue
-                
-            ohlc = spy_df.set_index('timestamp').resample('15min').agg({
-                'underlying_price': 'last',
-                'iv': 'median'
-            }).dropna()
-            ohlc.columns = ['close', 'iv_snapshot']
-            
-            for timestamp, bar in ohlc.iterrows():
-                current_spot = bar['close']
-                current_iv_decimal = bar['iv_snapshot'] / 100.0 if bar['iv_snapshot'] > 4.0 else bar['iv_snapshot']
-                
-                # A. MANAGE EXITS
-                for trade in list(self.simulator.active_trades):
-                    days_held = (timestamp - trade.entry_date).days
-                    
-                    exp_date = self._parse_expiration(trade.symbol)
-                    if timestamp.date() >= exp_date.date():
-                         self._execute_expiration(trade, timestamp, current_spot)
-                         continue
-                    
-                    should_exit = False
-                    reason = ''
-                    if days_held >= genome.exit.get('hold_days', 999):
-                        should_exit = True
-                        reason = 'time_exit'
-                    
-                    if should_exit:
-                        self._execute_exit(trade, timestamp, reason, date_str)
-                        
-                # B. MANAGE ENTRIES
-                if not self.simulator.active_trades:
-                    vix_proxy = current_iv_decimal * 100.0
-                    if self._check_trigger(genome, vix_proxy):
-                        target_dte = 7
-                        target_delta = genome.instrument.get('delta', -0.05)
-                        opt_type = genome.instrument.get('type', 'put')
-                        exp_date = self.factory.get_expiration(timestamp, target_dte)
-                        strike = self.factory.get_strike(current_spot, target_delta, opt_type, 
-                                                       iv=current_iv_decimal, dte=target_dte)
-                        symbol = self.factory.build_occ('SPY', exp_date, opt_type, strike)
-                        action = genome.instrument.get('action', 'buy')
-                        direction = 'SHORT' if action == 'sell' else 'LONG'
-                        
-                        self._execute_entry(symbol, timestamp, direction, genome, date_str)
-                        
-        return self.simulator.get_results()
+
+            masks = trigger_masks(genomes, bars['vix_proxy'].to_numpy())
+            for genome, simulator, mask in zip(genomes, simulators, masks):
+                self._run_day(simulator, genome, bars, mask, date_str)
+
+        return [simulator.get_results() for simulator in simulators]
+
+    def run(self, genome: StrategyGenome):
+        print(f"--- LAUNCHING MINE: {genome.name} --- ")
+        return self.run_batch([genome], simulators=[self.simulator])[0]
 
     def walk_forward_validate(
         self,
@@ -494,12 +609,12 @@ class MasterMiner:
         if not genomes:
             return []
 
-        # Run all strategies and collect results
-        raw_results = []
-        for genome in genomes:
-            logger.info(f"Testing strategy: {getattr(genome, 'id', 'unknown')}")
-            results = self.run(genome)
+        # Run all strategies in one pass over the data and collect results
+        logger.info(f"Testing {len(genomes)} strategies")
+        batch_results = self.run_batch(genomes)
 
+        raw_results = []
+        for genome, results in zip(genomes, batch_results):
             sharpe = self._calculate_sharpe(results)
             total_return = self._calculate_return(results)
             n_obs = len(results) if not results.empty else 0
@@ -515,9 +630,6 @@ class MasterMiner:
                 'n_obs': n_obs,
             })
 
-            # Reset simulator for next strategy
-            self.simulator = TradeSimulator(initial_capital=self.capital)
-
         # Apply correction
         pvalues = [r['pvalue'] for r in raw_results]
 
@@ -555,31 +667,34 @@ class MasterMiner:
             if op == '<': return vix_val < val
         return True
 
-    def _execute_entry(self, symbol, timestamp, direction, genome, date_str):
+    def _execute_entry(self, symbol, timestamp, direction, genome, date_str, simulator=None):
+        simulator = simulator or self.simulator
         quote = self._get_current_quote(symbol, timestamp, date_str)
         if quote is None: return
         price = quote.ask_price if direction == 'LONG' else quote.bid_price
         size = genome.sizing.get('value', 1)
         
-        trade = self.simulator.enter_trade(symbol, timestamp, price, size, direction, genome.id)
+        trade = simulator.enter_trade(symbol, timestamp, price, size, direction, genome.id)
         if trade:
             pass # Trade accepted
 
-    def _execute_exit(self, trade, timestamp, reason, date_str):
+    def _execute_exit(self, trade, timestamp, reason, date_str, simulator=None):
+        simulator = simulator or self.simulator
         quote = self._get_current_quote(trade.symbol, timestamp, date_str)
         if quote is None: return 
         price = quote.bid_price if trade.direction == 'LONG' else quote.ask_price
-        self.simulator.exit_trade(trade, timestamp, price, reason)
+        simulator.exit_trade(trade, timestamp, price, reason)
 
-    def _execute_expiration(self, trade, timestamp, spot_price):
+    def _execute_expiration(self, trade, timestamp, spot_price, simulator=None):
+        simulator = simulator or self.simulator
         try:
             strike = float(trade.symbol[-8:]) / 1000.0
             is_call = 'C' in trade.symbol
             if is_call: intrinsic = max(0.0, spot_price - strike)
             else: intrinsic = max(0.0, strike - spot_price)
-            self.simulator.exit_trade(trade, timestamp, intrinsic, 'expiration', vix=0.0)
+            simulator.exit_trade(trade, timestamp, intrinsic, 'expiration', vix=0.0)
         except Exception:
-            self.simulator.exit_trade(trade, timestamp, 0.0, 'expiration_error', vix=0.0)
+            simulator.exit_trade(trade, timestamp, 0.0, 'expiration_error', vix=0.0)
 
     def generate_api_response(self) -> Dict[str, Any]:
         """
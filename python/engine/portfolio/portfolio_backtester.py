@@ -8,6 +8,7 @@ rebalancing and risk management rules defined in a PortfolioDNA.
 """
 
 import logging
+from concurrent.futures import ProcessPoolExecutor
 from dataclasses import dataclass, field
 from datetime import datetime
 from pathlib import Path
@@ -61,20 +62,92 @@ class PortfolioBacktestResult:
             'calmar_ratio': self.calmar_ratio,
         }
 
+# ============================================================================
+# REBALANCE SCHEDULE
+# ============================================================================
+
+def rebalance_schedule(
+    dates: pd.DatetimeIndex,
+    frequency: RebalanceFrequency,
+    regimes: Optional[pd.Series] = None
+) -> np.ndarray:
+    """
+    Boolean mask of rebalance dates, computed up front.
+
+    DAILY: every date. WEEKLY / MONTHLY: first trading date of each
+    week / month. REGIME_CHANGE: every date whose regime differs from the
+    previous date's. The first date always rebalances.
+
+    Args:
+        dates: Trading dates of the backtest
+        frequency: RebalanceFrequency from the PortfolioDNA
+        regimes: Regime series (required for REGIME_CHANGE)
+
+    Returns:
+        Boolean array aligned with dates
+    """
+    n = len(dates)
+    due = np.zeros(n, dtype=bool)
+    if n == 0:
+        return due
+
+    if frequency == RebalanceFrequency.DAILY:
+        due[:] = True
+    elif frequency == RebalanceFrequency.WEEKLY:
+        iso = dates.isocalendar()
+        period = iso['year'].to_numpy() * 100 + iso['week'].to_numpy()
+        due[1:] = period[1:] != period[:-1]
+    elif frequency == RebalanceFrequency.MONTHLY:
+        period = dates.year.to_numpy() * 12 + dates.month.to_numpy()
+        due[1:] = period[1:] != period[:-1]
+    elif frequency == RebalanceFrequency.REGIME_CHANGE and regimes is not None:
+        aligned = regimes.reindex(dates)
+        changed = aligned.ne(aligned.shift()).to_numpy() & aligned.notna().to_numpy()
+        due[1:] = changed[1:]
+
+    due[0] = True
+    return due
+
+
 # ============================================================================
 # PORTFOLIO BACKTESTER
 # ============================================================================
 
+# Worker-process copy of the PrecisionBacktester (set once per worker)
+_WORKER_BACKTESTER: Optional[PrecisionBacktester] = None
+
+
+def _init_returns_worker(precision_backtester: PrecisionBacktester) -> None:
+    global _WORKER_BACKTESTER
+    _WORKER_BACKTESTER = precision_backtester
+
+
+def _structure_daily_returns(dna: StructureDNA, start_date: datetime, end_date: datetime) -> Optional[pd.Series]:
+    """Backtest one structure in a worker process and return its daily returns."""
+    result = _WORKER_BACKTESTER.backtest(dna, start_date=start_date, end_date=end_date)
+    if result and result.daily_returns is not None and not result.daily_returns.empty:
+        return result.daily_returns
+    return None
+
+
 class PortfolioBacktester:
     """
     Simulates the performance of a portfolio of options strategies.
     Applies rebalancing and risk management based on PortfolioDNA.
+
+    Strategy returns are held as one (dates x strategies) matrix. A
+    backtest calls the optimizer only on precomputed rebalance dates,
+    forward-fills the resulting weight matrix and gets portfolio returns
+    (net of turnover costs) from a single row-wise dot product, so
+    hundreds of PortfolioDNAs can be evaluated per generation.
     """
 
     def __init__(
         self,
         precision_backtester: PrecisionBacktester,
         discovered_structures: List[StructureDNA],
+        n_workers: int = 1,
+        transaction_cost_bps: float = 0.0,
     ):
         """
         Initialize the PortfolioBacktester.
@@ -82,16 +155,21 @@ class PortfolioBacktester:
         Args:
             precision_backtester: An initialized PrecisionBacktester instance.
             discovered_structures: A list of individual StructureDNA objects.
+            n_workers: Processes used to pre-compute strategy returns (1 = serial).
+            transaction_cost_bps: Cost charged on portfolio turnover (sum of |weight changes|).
         """
         self.precision_backtester = precision_backtester
         self.discovered_structures = discovered_structures
         self.trading_dates = precision_backtester.trading_dates
+        self.n_workers = n_workers
+        self.transaction_cost_bps = transaction_cost_bps
 
         # Pre-compute daily returns for all discovered structures
         self.strategy_daily_returns: Dict[str, pd.Series] = self._precompute_strategy_returns()
 
         # Combine all strategy returns into a single DataFrame for easier lookup
         self.all_strategy_returns_df = pd.DataFrame(self.strategy_daily_returns).reindex(self.trading_dates).fillna(0.0)
+        self._returns_matrix = self.all_strategy_returns_df.to_numpy(dtype=float)
         logger.info(f"Pre-computed daily returns for {len(self.discovered_structures)} strategies over {len(self.trading_dates)} days.")
 
         self.regimes = precision_backtester.regimes # Access regimes from PrecisionBacktester
@@ -99,27 +177,52 @@ class PortfolioBacktester:
     def _precompute_strategy_returns(self) -> Dict[str, pd.Series]:
         """
         Run the PrecisionBacktester for each discovered structure to get its daily returns.
+
+        Structures are backtested in parallel when n_workers > 1; results
+        are collected in structure order either way.
         """
-        returns = {}
-        for i, dna in enumerate(self.discovered_structures):
+        unique: Dict[str, StructureDNA] = {}
+        for dna in self.discovered_structures:
             # Use a unique identifier for each strategy
             strategy_id = f"{dna.structure_key}-{hash(frozenset(dna.to_dict().items()))}"
-            if strategy_id in returns:
-                continue # Avoid re-backtesting identical DNAs if hash collision
+            unique.setdefault(strategy_id, dna)  # Avoid re-backtesting identical DNAs
+
+        start_date, end_date = self.trading_dates.min(), self.trading_dates.max()
+        ids, dnas = list(unique.keys()), list(unique.values())
+
+        if self.n_workers > 1 and len(dnas) > 1:
+            with ProcessPoolExecutor(
+                max_workers=self.n_workers,
+                initializer=_init_returns_worker,
+                initargs=(self.precision_backtester,)
+            ) as executor:
+                daily = list(executor.map(
+                    _structure_daily_returns, dnas,
+                    [start_date] * len(dnas), [end_date] * len(dnas),
+                    chunksize=max(1, len(dnas) // (4 * self.n_workers))
+                ))
+        else:
+            daily = []
+            for dna in dnas:
+                result = self.precision_backtester.backtest(dna, start_date=start_date, end_date=end_date)
+                ok = result and result.daily_returns is not None and not result.daily_returns.empty
+                daily.append(result.daily_returns if ok else None)
 
-            result = self.precision_backtester.backtest(
-                dna,
-                start_date=self.trading_dates.min(),
-                end_date=self.trading_dates.max()
-            )
-            if result and result.daily_returns is not None and not result.daily_returns.empty:
-                returns[strategy_id] = result.daily_returns.reindex(self.trading_dates).fillna(0.0)
+        returns = {}
+        for strategy_id, dna, series in zip(ids, dnas, daily):
+            if series is not None:
+                returns[strategy_id] = series.reindex(self.trading_dates).fillna(0.0)
             else:
                 logger.warning(f"No valid returns for strategy: {dna.structure_key}. Skipping.")
         return returns
 
 
-    def _calculate_metrics(self, daily_returns: pd.Series, dna: PortfolioDNA) -> PortfolioBacktestResult:
+    def _calculate_metrics(
+        self,
+        daily_returns: pd.Series,
+        dna: PortfolioDNA,
+        dates: Optional[pd.DatetimeIndex] = None
+    ) -> PortfolioBacktestResult:
         """Helper to calculate portfolio-level metrics."""
         if daily_returns.empty or daily_returns.std() == 0:
             return PortfolioBacktestResult(
@@ -129,7 +232,7 @@ class PortfolioBacktester:
             )
 
         # Ensure returns are aligned to all trading days
-        full_returns = daily_returns.reindex(self.trading_dates).fillna(0.0)
+        full_returns = daily_returns.reindex(self.trading_dates if dates is None else dates).fillna(0.0)
 
         total_return = (1 + full_returns).prod() - 1
         n_days = len(full_returns)
@@ -166,6 +269,63 @@ class PortfolioBacktester:
             daily_returns=full_returns
         )
 
+    def _weight_matrix(
+        self,
+        portfolio_dna: PortfolioDNA,
+        optimizer_func: callable,
+        dates: pd.DatetimeIndex
+    ) -> Tuple[np.ndarray, Dict[datetime, Dict[str, float]]]:
+        """
+        Call the optimizer on rebalance dates only and forward-fill its weights.
+
+        If the optimizer declines a scheduled date (returns None) it is
+        asked again on the following dates until it answers or the next
+        scheduled date arrives.
+
+        Returns:
+            (weights, weights_history) - weights is (len(dates), n_strategies)
+        """
+        columns = self.all_strategy_returns_df.columns
+        col_pos = {s_id: j for j, s_id in enumerate(columns)}
+        due = np.flatnonzero(rebalance_schedule(dates, portfolio_dna.rebalance_frequency, self.regimes))
+        bounds = np.append(due[1:], len(dates))
+
+        update_rows = np.full(len(dates), -1, dtype=np.int64)
+        updates: List[np.ndarray] = []
+        weights_history = {}
+
+        for first, stop in zip(due, bounds):
+            for i in range(first, stop):
+                current_date = dates[i]
+                weights_for_this_day = optimizer_func(
+                    current_date,
+                    portfolio_dna,
+                    self.discovered_structures,
+                    self.all_strategy_returns_df,
+                    self.regimes
+                )
+                if weights_for_this_day:
+                    row = np.zeros(len(columns))
+                    for s_id, w in weights_for_this_day.items():
+                        if s_id in col_pos:
+                            row[col_pos[s_id]] = w
+                    update_rows[i] = len(updates)
+                    updates.append(row)
+                    weights_history[current_date] = weights_for_this_day
+                    break
+
+        weights = np.zeros((len(dates), len(columns)))
+        if updates:
+            # Forward-fill: each date uses the latest update at or before it
+            latest = np.maximum.accumulate(update_rows)
+            held = latest >= 0
+            weights[held] = np.asarray(updates)[latest[held]]
+
+        # Flat when no strategy has a positive weight; cap each allocation
+        active = (weights > 0).any(axis=1)
+        weights = np.where(active[:, None], np.minimum(weights, portfolio_dna.max_strategy_allocation_pct), 0.0)
+        return weights, weights_history
+
     def backtest_portfolio(
         self,
         portfolio_dna: PortfolioDNA,
@@ -183,89 +343,70 @@ class PortfolioBacktester:
             end_date: End of backtest period.
         """
         # Filter trading dates for the backtest period
+        in_period = np.ones(len(self.trading_dates), dtype=bool)
         if start_date:
-            self.trading_dates = self.trading_dates[self.trading_dates >= start_date]
+            in_period &= self.trading_dates >= start_date
         if end_date:
-            self.trading_dates = self.trading_dates[self.trading_dates <= end_date]
+            in_period &= self.trading_dates <= end_date
+        date_pos = np.flatnonzero(in_period)
+        dates = self.trading_dates[date_pos]
 
-        if self.trading_dates.empty:
+        if dates.empty:
             logger.warning("No trading dates for portfolio backtest.")
             return self._calculate_metrics(pd.Series(), portfolio_dna)
 
-        portfolio_equity = pd.Series(1.0, index=self.trading_dates)
-        portfolio_daily_returns = pd.Series(0.0, index=self.trading_dates)
-        current_weights = {s_id: 0.0 for s_id in self.strategy_daily_returns.keys()}
-        weights_history = {}
+        weights, weights_history = self._weight_matrix(portfolio_dna, optimizer_func, dates)
 
-        in_portfolio_position = False # Track if portfolio is actively trading
-        current_max_drawdown = 0.0
-        portfolio_value = 1.0
-
-        for i, current_date in enumerate(self.trading_dates):
-            # Check for rebalance or regime change
-            rebalance_day = False
-            if portfolio_dna.rebalance_frequency == RebalanceFrequency.DAILY:
-                rebalance_day = True
-            elif portfolio_dna.rebalance_frequency == RebalanceFrequency.WEEKLY and current_date.weekday() == 0: # Monday
-                rebalance_day = True
-            elif portfolio_dna.rebalance_frequency == RebalanceFrequency.MONTHLY and current_date.day == 1:
-                rebalance_day = True
-            elif portfolio_dna.rebalance_frequency == RebalanceFrequency.REGIME_CHANGE:
-                # Need to compare current_regime with previous_regime. Simplistic for now.
-                # Actual logic would involve passing previous_regime from outside or within optimizer_func
-                # For now, assume optimizer_func handles regime changes
-                pass # Handled by optimizer_func
-
-            # Get weights for this period
-            # The optimizer_func will decide if a rebalance is due or if weights should change based on regime
-            weights_for_this_day = optimizer_func(
-                current_date, 
-                portfolio_dna, 
-                self.discovered_structures, 
-                self.all_strategy_returns_df, 
-                self.regimes
-            )
-            
-            # If weights are received, update and log
-            if weights_for_this_day:
-                current_weights = weights_for_this_day
-                weights_history[current_date] = current_weights
-                if any(w > 0 for w in current_weights.values()):
-                    in_portfolio_position = True
-                else:
-                    in_portfolio_position = False
-
-            daily_portfolio_return = 0.0
-            if in_portfolio_position:
-                for strategy_id, weight in current_weights.items():
-                    # Ensure weight is within max allocation
-                    adjusted_weight = min(weight, portfolio_dna.max_strategy_allocation_pct)
-                    daily_portfolio_return += self.all_strategy_returns_df.loc[current_date, strategy_id] * adjusted_weight
-
-            portfolio_daily_returns.loc[current_date] = daily_portfolio_return
-            portfolio_value *= (1 + daily_portfolio_return)
-            portfolio_equity.loc[current_date] = portfolio_value
-            
-            # Apply portfolio-level stop-loss/profit-target
-            # This is a bit simplified; typically, these are checked against the peak equity
-            current_max_drawdown = max(current_max_drawdown, 1 - portfolio_value / portfolio_equity.max())
-            if current_max_drawdown >= portfolio_dna.portfolio_stop_loss_pct:
-                logger.info(f"Portfolio Stop Loss hit on {current_date.date()}! Equity: {portfolio_value:.2f}")
-                # Future: Implement a temporary or permanent portfolio shutdown
-                break
-            # if portfolio_value >= (1 + portfolio_dna.portfolio_profit_target_pct):
-            #     logger.info(f"Portfolio Profit Target hit on {current_date.date()}! Equity: {portfolio_value:.2f}")
-            #     break # Future: Implement a temporary or permanent portfolio shutdown
+        # Portfolio returns: one row-wise dot product, net of turnover costs
+        daily = np.einsum('ij,ij->i', self._returns_matrix[date_pos], weights)
+        if self.transaction_cost_bps:
+            turnover = np.abs(np.diff(weights, axis=0, prepend=0.0)).sum(axis=1)
+            daily = daily - turnover * self.transaction_cost_bps / 1e4
+        equity = np.cumprod(1 + daily)
+
+        # Portfolio-level stop loss on drawdown from peak equity (starting at 1.0)
+        peak = np.maximum(np.maximum.accumulate(equity), 1.0)
+        stopped = np.flatnonzero(1 - equity / peak >= portfolio_dna.portfolio_stop_loss_pct)
+        last = len(dates)
+        if len(stopped):
+            last = stopped[0] + 1
+            logger.info(f"Portfolio Stop Loss hit on {dates[stopped[0]].date()}! Equity: {equity[stopped[0]]:.2f}")
+            # Future: Implement a temporary or permanent portfolio shutdown
 
+        portfolio_daily_returns = pd.Series(daily[:last], index=dates[:last])
 
         # Re-calculate metrics based on actual (potentially curtailed) performance
-        final_result = self._calculate_metrics(portfolio_daily_returns.loc[:current_date], portfolio_dna)
-        final_result.equity_curve = portfolio_equity.loc[:current_date]
-        final_result.daily_returns = portfolio_daily_returns.loc[:current_date]
-        final_result.weights_history = weights_history
+        final_result = self._calculate_metrics(portfolio_daily_returns, portfolio_dna, dates=dates)
+        final_result.equity_curve = pd.Series(equity[:last], index=dates[:last])
+        final_result.daily_returns = portfolio_daily_returns
+        final_result.weights_history = {
+            d: w for d, w in weights_history.items() if d <= dates[last - 1]
+        }
 
         return final_result
 
+    def backtest_population(
+        self,
+        population: List[PortfolioDNA],
+        optimizer_factory: callable,
+        start_date: Optional[datetime] = None,
+        end_date: Optional[datetime] = None
+    ) -> List[PortfolioBacktestResult]:
+        """
+        Backtest a population of PortfolioDNAs against the shared return matrix.
+
+        Args:
+            population: PortfolioDNAs to evaluate.
+            optimizer_factory: Called once per DNA to get a fresh optimizer_func
+                (optimizers are stateful, e.g. PortfolioOptimizer.last_weights).
+            start_date: Start of backtest period.
+            end_date: End of backtest period.
+        """
+        return [
+            self.backtest_portfolio(dna, optimizer_factory(), start_date, end_date)
+            for dna in population
+        ]
+
 
 if __name__ == '__main__':
     # This block would require mock PrecisionBacktester and StructureDNA objects
@@ -22,6 +22,149 @@ from engine.portfolio.portfolio_dna import PortfolioDNA, WeightingMethod, Rebala
 
 logger = logging.getLogger("AlphaFactory.PortfolioOptimizer")
 
+ANN_FACTOR = 252  # Daily data
+
+# ============================================================================
+# WINDOW STATISTICS & ANALYTIC OBJECTIVES
+# ============================================================================
+
+class RollingWindowMoments:
+    """
+    Mean vector and covariance of a regime-filtered lookback window.
+
+    Keeps running sums (sum of rows, sum of outer products) for the last
+    window; when the next rebalance's window overlaps it, only the rows that
+    entered and left are added / subtracted instead of re-scanning the
+    whole window.
+    """
+
+    def __init__(self, values: np.ndarray, regimes: np.ndarray, recompute_every: int = 250):
+        """
+        Args:
+            values: (T, N) daily strategy returns
+            regimes: (T,) regime label per row
+            recompute_every: Incremental updates before a full rescan (bounds drift)
+        """
+        self.values = values
+        self.regimes = regimes
+        self.recompute_every = recompute_every
+        self._state: Optional[Tuple] = None  # (start, stop, regime, n, s1, s2, n_updates)
+
+    def _sums(self, start: int, stop: int, regime) -> Tuple[int, np.ndarray, np.ndarray]:
+        rows = self.values[start:stop][self.regimes[start:stop] == regime]
+        return len(rows), rows.sum(axis=0), rows.T @ rows
+
+    def window(self, start: int, stop: int, regime) -> Tuple[np.ndarray, int, np.ndarray, np.ndarray]:
+        """
+        Moments of rows start..stop-1 whose regime equals regime.
+
+        Returns:
+            (row_positions, n, mean, covariance) - covariance uses ddof=1
+        """
+        state = self._state
+        if (state is not None and state[2] == regime and state[6] < self.recompute_every
+                and state[0] <= start < state[1] <= stop):
+            _, _, _, n, s1, s2, n_updates = state
+            n_out, out1, out2 = self._sums(state[0], start, regime)
+            n_in, in1, in2 = self._sums(state[1], stop, regime)
+            n, s1, s2 = n - n_out + n_in, s1 - out1 + in1, s2 - out2 + in2
+            n_updates += 1
+        else:
+            (n, s1, s2), n_updates = self._sums(start, stop, regime), 0
+        self._state = (start, stop, regime, n, s1, s2, n_updates)
+
+        positions = start + np.flatnonzero(self.regimes[start:stop] == regime)
+        if n == 0:
+            return positions, 0, np.zeros(len(s1)), np.zeros_like(s2)
+        mean = s1 / n
+        cov = (s2 - n * np.outer(mean, mean)) / max(n - 1, 1)
+        return positions, n, mean, cov
+
+
+def portfolio_objective(
+    rows: np.ndarray,
+    objective: PortfolioObjective,
+    mean: Optional[np.ndarray] = None,
+    cov: Optional[np.ndarray] = None
+) -> Tuple[callable, Optional[callable]]:
+    """
+    Objective (negated metric, for minimization) and its analytic gradient.
+
+    Sharpe uses only the window mean vector and covariance; Sortino uses
+    the window rows for the LPM2 downside term.
+
+    Args:
+        rows: (T, N) window returns
+        objective: PortfolioObjective
+        mean: Optional precomputed window mean (N,)
+        cov: Optional precomputed window covariance (N, N), ddof=1
+
+    Returns:
+        (fun, jac) - jac is None when no closed form exists (MIN_DRAWDOWN)
+    """
+    T = len(rows)
+    mu = rows.mean(axis=0) if mean is None else mean
+    sqrt_ann = np.sqrt(ANN_FACTOR)
+
+    if objective == PortfolioObjective.SHARPE_RATIO:
+        sigma = np.atleast_2d(np.cov(rows, rowvar=False)) if cov is None else cov
+
+        def fun(w):
+            var = w @ sigma @ w
+            if not var > 1e-18:
+                return -1e9 # Avoid division by zero
+            return -(ANN_FACTOR * (mu @ w)) / (np.sqrt(var) * sqrt_ann)
+
+        def jac(w):
+            sw = sigma @ w
+            var = w @ sw
+            if not var > 1e-18:
+                return np.zeros_like(w)
+            sd = np.sqrt(var)
+            # d/dw [mu.w / sd] = mu / sd - (mu.w) * Sigma w / sd^3
+            return -sqrt_ann * (mu / sd - (mu @ w) * sw / sd ** 3)
+
+        return fun, jac
+
+    if objective == PortfolioObjective.SORTINO_RATIO:
+        def _downside(w):
+            down = np.minimum(rows @ w, 0)
+            return down, (down @ down) / T
+
+        def fun(w):
+            _, lpm2 = _downside(w)
+            if lpm2 == 0:
+                return -1e9 # No downside risk -> infinite sortino
+            return -(ANN_FACTOR * (mu @ w)) / (np.sqrt(lpm2) * sqrt_ann)
+
+        def jac(w):
+            down, lpm2 = _downside(w)
+            if lpm2 == 0:
+                return np.zeros_like(w)
+            d = np.sqrt(lpm2)
+            # dD/dw = rows' min(rows w, 0) / (T D)
+            grad_d = rows.T @ down / (T * d)
+            return -sqrt_ann * (mu / d - (mu @ w) * grad_d / d ** 2)
+
+        return fun, jac
+
+    if objective == PortfolioObjective.MAX_RETURN:
+        return (lambda w: -ANN_FACTOR * (mu @ w)), (lambda w: -ANN_FACTOR * mu)
+
+    if objective == PortfolioObjective.MIN_DRAWDOWN:
+        def fun(w):
+            cumulative = np.cumprod(1 + rows @ w)
+            peak = np.maximum.accumulate(cumulative)
+            return ((cumulative - peak) / peak).min() # Minimize drawdown (bring closer to zero)
+        return fun, None
+
+    return (lambda w: -1e9), None # Default for unsupported objectives
+
+
+# ============================================================================
+# PORTFOLIO OPTIMIZER
+# ============================================================================
+
 class PortfolioOptimizer:
     """
     Optimizes portfolio weights based on various criteria, including market regimes.
@@ -38,54 +181,59 @@ class PortfolioOptimizer:
         self.last_weights: Dict[str, float] = {} # Store last calculated weights
         self.last_rebalance_date: Optional[datetime] = None
         self.current_regime: Optional[int] = None
-
-    def _calculate_portfolio_metrics(self, weights: np.ndarray, returns_df: pd.DataFrame, objective: PortfolioObjective) -> float:
-        """
-        Calculates a portfolio metric (e.g., Sharpe, Sortino) for a given set of weights.
-        Used as the objective function for the optimizer.
+        self._window_source: Optional[pd.DataFrame] = None
+        self._moments: Optional[RollingWindowMoments] = None
+
+    def _window_moments(self, all_strategy_returns_df: pd.DataFrame) -> RollingWindowMoments:
+        """Array view of the returns and aligned regimes (rebuilt if the frame changes)."""
+        if self._window_source is not all_strategy_returns_df:
+            regimes = self.regime_data.reindex(all_strategy_returns_df.index).to_numpy()
+            self._moments = RollingWindowMoments(all_strategy_returns_df.to_numpy(dtype=float), regimes)
+            self._window_source = all_strategy_returns_df
+        return self._moments
+
+    def _initial_weights(self, selected_strategy_ids: List[str], max_allocation: float) -> np.ndarray:
+        """Warm start from last_weights (clipped to bounds); equal weights otherwise."""
+        num_assets = len(selected_strategy_ids)
+        equal = np.full(num_assets, 1.0 / num_assets)
+        if not self.last_weights:
+            return equal
+        warm = np.clip([self.last_weights.get(s_id, 0.0) for s_id in selected_strategy_ids], 0, max_allocation)
+        total = warm.sum()
+        return warm / total if total > 0 else equal
+
+    def optimize_schedule(
+        self,
+        portfolio_dna: PortfolioDNA,
+        discovered_structures: List[StructureDNA],
+        all_strategy_returns_df: pd.DataFrame,
+        dates: Optional[pd.DatetimeIndex] = None,
+    ) -> Dict[datetime, Dict[str, float]]:
         """
-        if returns_df.empty or len(returns_df) < 2:
-            return -1e9 # Penalize empty or insufficient data heavily
+        Batch mode: solve every rebalance date of a PortfolioDNA in one call.
 
-        portfolio_returns = returns_df.dot(weights)
+        Rebalance dates come from rebalance_schedule; a date the optimizer
+        declines is retried on the following dates until the next scheduled
+        one (same as PortfolioBacktester). Each solve warm-starts from the
+        previous weights and reuses the rolling window moments.
 
-        # Annualization factor (assuming daily data)
-        ann_factor = 252
-
-        # Mean return
-        mean_return = portfolio_returns.mean() * ann_factor
-
-        if objective == PortfolioObjective.SHARPE_RATIO:
-            # Standard deviation
-            std_dev = portfolio_returns.std() * np.sqrt(ann_factor)
-            if std_dev == 0:
-                return -1e9 # Avoid division by zero
-            sharpe = mean_return / std_dev
-            return -sharpe # Minimize negative Sharpe
-
-        elif objective == PortfolioObjective.SORTINO_RATIO:
-            # FIX: Sortino uses LPM2 (Lower Partial Moment), not std of negative returns
-            # Per Gemini audit 2025-12-06: std(neg_returns) measures dispersion around mean loss,
-            # which is wrong. LPM2 = sqrt(mean(min(r, 0)^2)) measures dispersion around zero.
-            downside_returns = np.minimum(portfolio_returns, 0)  # Clip positive to 0
-            downside_std_dev = np.sqrt((downside_returns ** 2).mean()) * np.sqrt(ann_factor)
-
-            if downside_std_dev == 0:
-                return -1e9 # Avoid division by zero if mean_return is negative, or if no downside risk -> infinite sortino
-            sortino = mean_return / downside_std_dev
-            return -sortino # Minimize negative Sortino
-
-        elif objective == PortfolioObjective.MAX_RETURN:
-            return -mean_return # Minimize negative return = Maximize return
-        
-        elif objective == PortfolioObjective.MIN_DRAWDOWN:
-            cumulative_returns = (1 + portfolio_returns).cumprod()
-            max_peak = cumulative_returns.expanding().max()
-            drawdowns = (cumulative_returns - max_peak) / max_peak
-            max_drawdown = drawdowns.min() # This is negative
-            return max_drawdown # Minimize drawdown (bring closer to zero)
-        
-        return -1e9 # Default for unsupported objectives
+        Returns:
+            {date: {strategy_id: weight}} for every date weights were set
+        """
+        from engine.portfolio.portfolio_backtester import rebalance_schedule
+
+        dates = all_strategy_returns_df.index if dates is None else dates
+        due = np.flatnonzero(rebalance_schedule(dates, portfolio_dna.rebalance_frequency, self.regime_data))
+        weights_history = {}
+        for first, stop in zip(due, np.append(due[1:], len(dates))):
+            for current_date in dates[first:stop]:
+                weights = self.get_portfolio_weights(
+                    current_date, portfolio_dna, discovered_structures, all_strategy_returns_df
+                )
+                if weights:
+                    weights_history[current_date] = weights
+                    break
+        return weights_history
 
 
     def get_portfolio_weights(
@@ -94,6 +242,7 @@ class PortfolioOptimizer:
         portfolio_dna: PortfolioDNA,
         discovered_structures: List[StructureDNA],
         all_strategy_returns_df: pd.DataFrame, # Daily returns for all strategies
+        regimes: Optional[pd.Series] = None, # Passed by PortfolioBacktester; self.regime_data is used
     ) -> Optional[Dict[str, float]]:
         """
         Determines the optimal weights for the portfolio for the current day.
@@ -118,10 +267,10 @@ class PortfolioOptimizer:
             rebalance_due = True
         elif portfolio_dna.rebalance_frequency == RebalanceFrequency.DAILY:
             rebalance_due = True
-        elif portfolio_dna.rebalance_frequency == RebalanceFrequency.WEEKLY and current_date.weekday() == 0 and current_date > self.last_rebalance_date:
-            rebalance_due = True
-        elif portfolio_dna.rebalance_frequency == RebalanceFrequency.MONTHLY and current_date.day == 1 and current_date.month != self.last_rebalance_date.month:
-            rebalance_due = True
+        elif portfolio_dna.rebalance_frequency == RebalanceFrequency.WEEKLY and current_date.isocalendar()[:2] != self.last_rebalance_date.isocalendar()[:2]:
+            rebalance_due = True # First trading day of a new week (matches rebalance_schedule)
+        elif portfolio_dna.rebalance_frequency == RebalanceFrequency.MONTHLY and (current_date.year, current_date.month) != (self.last_rebalance_date.year, self.last_rebalance_date.month):
+            rebalance_due = True # First trading day of a new month (matches rebalance_schedule)
         elif portfolio_dna.rebalance_frequency == RebalanceFrequency.REGIME_CHANGE and current_regime != self.current_regime:
             rebalance_due = True
 
@@ -154,17 +303,21 @@ class PortfolioOptimizer:
             return self.last_weights
 
 
-        # Filter historical returns for the lookback window
-        historical_returns = all_strategy_returns_df.loc[lookback_start_date:current_date, selected_strategy_ids].copy()
-        
-        if historical_returns.empty:
+        # Lookback window as row positions (index is sorted by date)
+        index = all_strategy_returns_df.index
+        start = index.searchsorted(lookback_start_date, side='left')
+        stop = index.searchsorted(current_date, side='right')
+
+        if stop <= start:
             logger.warning(f"Insufficient historical data for optimization on {current_date.date()}. Keeping previous weights.")
             return None
 
-        # Filter for the current regime within the lookback window
-        regime_historical_returns = historical_returns[self.regime_data.loc[historical_returns.index] == current_regime]
-        
-        if regime_historical_returns.empty or len(regime_historical_returns) < 5: # Need at least 5 days for std dev
+        # Filter for the current regime within the lookback window (moments updated incrementally)
+        positions, n_rows, window_mean, window_cov = self._window_moments(all_strategy_returns_df).window(
+            start, stop, current_regime
+        )
+
+        if n_rows < 5: # Need at least 5 days for std dev
             logger.warning(f"Insufficient regime-specific data for optimization on {current_date.date()} in regime {current_regime}. Keeping previous weights.")
             return None
 
@@ -179,16 +332,21 @@ class PortfolioOptimizer:
         bounds = tuple((0, portfolio_dna.max_strategy_allocation_pct) for _ in range(num_assets))
         
         # Constraints: sum of weights equals 1
-        constraints = ({'type': 'eq', 'fun': lambda x: np.sum(x) - 1})
-
-        # Initial guess (equal weights)
-        init_weights = np.array([1.0 / num_assets] * num_assets)
+        constraints = ({'type': 'eq', 'fun': lambda x: np.sum(x) - 1, 'jac': lambda x: np.ones_like(x)})
+
+        # Window statistics for the selected strategies
+        col_idx = all_strategy_returns_df.columns.get_indexer(selected_strategy_ids)
+        rows = self._moments.values[np.ix_(positions, col_idx)]
+        fun, jac = portfolio_objective(
+            rows, portfolio_dna.objective,
+            mean=window_mean[col_idx], cov=window_cov[np.ix_(col_idx, col_idx)]
+        )
 
         try:
             optimization_result = minimize(
-                fun=self._calculate_portfolio_metrics,
-                x0=init_weights,
-                args=(regime_historical_returns, portfolio_dna.objective),
+                fun=fun,
+                x0=self._initial_weights(selected_strategy_ids, portfolio_dna.max_strategy_allocation_pct),
+                jac=jac,
                 method='SLSQP', # Sequential Least Squares Programming
                 bounds=bounds,
                 constraints=constraints,
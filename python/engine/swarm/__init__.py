@@ -6,6 +6,9 @@ Massive-scale parallel agent execution using DeepSeek API.
 Components:
 - SwarmOrchestrator: Async engine for 50-500 concurrent requests
 - run_swarm_sync: Synchronous wrapper for easy integration
+- iter_swarm_sync: Results in completion order (streaming)
+- ResponseCache: Persistent prompt-hash cache of responses (TTL, LRU bound)
+- SwarmScheduler: AIMD concurrency, token budgets, priority classes
 
 Usage:
     from engine.swarm import run_swarm_sync
@@ -18,6 +21,9 @@ Usage:
     results = run_swarm_sync(tasks, concurrency=50)
 """
 
-from .orchestrator import SwarmOrchestrator, run_swarm_sync
+from .orchestrator import SwarmOrchestrator, run_swarm_sync, iter_swarm_sync
+from .response_cache import ResponseCache, get_response_cache
+from .scheduler import SwarmScheduler, PRIORITY_CLASSES
 
-__all__ = ['SwarmOrchestrator', 'run_swarm_sync']
+__all__ = ['SwarmOrchestrator', 'run_swarm_sync', 'iter_swarm_sync', 'ResponseCache',
+           'get_response_cache', 'SwarmScheduler', 'PRIORITY_CLASSES']
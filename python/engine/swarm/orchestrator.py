@@ -8,6 +8,10 @@ Zero process overhead. 100% network bound.
 This is the core engine that allows you to fire 50-500 requests
 at once without crashing your machine.
 
+Deterministic tasks (temperature 0) are answered from a persistent
+content-addressed response cache when possible, and identical tasks in
+flight at the same time share one request.
+
 Usage:
     from engine.swarm import run_swarm_sync
 
@@ -23,13 +27,19 @@ import asyncio
 import aiohttp
 import os
 import logging
-from typing import List, Dict, Any
+import queue
+import threading
+import time
+from typing import List, Dict, Any, AsyncIterator, Iterator, Optional, Tuple
+
+from .response_cache import ResponseCache, get_response_cache, request_key
+from .scheduler import SwarmScheduler
 
 logger = logging.getLogger(__name__)
 
 # DeepSeek API Configuration
 DEEPSEEK_API_KEY = os.environ.get('DEEPSEEK_API_KEY')
-DEEPSEEK_URL = 'https://api.deepseek.com/chat/completions'
+DEEPSEEK_URL = os.environ.get('DEEPSEEK_URL', 'https://api.deepseek.com/chat/completions')
 
 
 class SwarmOrchestrator:
@@ -38,19 +48,54 @@ class SwarmOrchestrator:
     Zero process overhead. 100% network bound.
     """
 
-    def __init__(self, concurrency: int = 50, timeout: int = 300):
+    def __init__(
+        self,
+        concurrency: int = 50,
+        timeout: int = 300,
+        cache: Optional[ResponseCache] = None,
+        use_cache: bool = True,
+        api_url: Optional[str] = None,
+        api_key: Optional[str] = None,
+        min_concurrency: int = 1,
+        latency_target: Optional[float] = None,
+        token_budgets: Optional[Dict[str, int]] = None,
+        max_retries: int = 2,
+        connect_timeout: float = 10.0,
+    ):
         """
         Initialize the Swarm Orchestrator.
 
         Args:
-            concurrency: Maximum concurrent requests (default 50, max ~500)
-            timeout: Request timeout in seconds (default 300 for reasoning models)
+            concurrency: Maximum concurrent requests (default 50, max ~500);
+                the adaptive limit starts here and backs off under 429 / 5xx
+            timeout: Request timeout in seconds (default 300 for reasoning
+                models; tasks may override with "timeout")
+            cache: Response cache (default: shared persistent cache)
+            use_cache: Set False to always call the API
+            api_url: Chat completions endpoint (default DEEPSEEK_URL)
+            api_key: API key (default DEEPSEEK_API_KEY)
+            min_concurrency: Floor for the adaptive limit
+            latency_target: Seconds; slower requests also shrink the limit
+            token_budgets: Model -> tokens per minute
+            max_retries: Retries for rate-limited (429) requests
+            connect_timeout: Seconds to establish a connection
         """
         self.concurrency = concurrency
         self.timeout = timeout
-        self.semaphore = asyncio.Semaphore(concurrency)
-
-        if not DEEPSEEK_API_KEY:
+        self.max_retries = max_retries
+        self.connect_timeout = connect_timeout
+        self.scheduler = SwarmScheduler(concurrency, min_concurrency=min_concurrency,
+                                        latency_target=latency_target, token_budgets=token_budgets)
+        self.api_url = api_url or DEEPSEEK_URL
+        self.api_key = api_key or os.environ.get('DEEPSEEK_API_KEY') or DEEPSEEK_API_KEY
+        if not use_cache:
+            self.cache = None
+        else:
+            self.cache = cache if cache is not None else get_response_cache()
+        # prompt key -> future of the request currently answering it
+        self._inflight: Dict[str, asyncio.Future] = {}
+
+        if not self.api_key:
             raise ValueError(
                 "DEEPSEEK_API_KEY environment variable is required. "
                 "Get your key at https://platform.deepseek.com/"
@@ -62,84 +107,193 @@ class SwarmOrchestrator:
         """
         Runs a single agent task asynchronously.
 
+        Deterministic tasks (temperature 0, unless the task sets
+        "cache": False) are served from the response cache, or share the
+        request of an identical task already in flight.
+
         Args:
             session: aiohttp session for connection pooling
             task: Dict with id, system, user, model, temperature
 
         Returns:
             Dict with id, status, content, reasoning, usage
+            (plus cached / coalesced flags when no request was made)
         """
-        async with self.semaphore:
-            task_id = task.get('id', 'unknown')
-            system_prompt = task.get(
-                'system', "You are a helpful quantitative research assistant."
-            )
-            user_prompt = task.get('user', "")
-            model = task.get('model', 'deepseek-reasoner')  # Default to R1
-            temperature = task.get('temperature', 0.0)
-
-            payload = {
-                "model": model,
-                "messages": [
-                    {"role": "system", "content": system_prompt},
-                    {"role": "user", "content": user_prompt}
-                ],
-                "temperature": temperature,
-                "stream": False
-            }
+        task_id = task.get('id', 'unknown')
+        temperature = task.get('temperature', 0.0)
+        if self.cache is None or temperature != 0 or not task.get('cache', True):
+            return await self._call_api(session, task)
+
+        key = request_key(self._payload(task))
+
+        inflight = self._inflight.get(key)
+        if inflight is not None:
+            self.cache.coalesced += 1
+            result = await asyncio.shield(inflight)
+            return {**result, "id": task_id, "coalesced": True}
+
+        cached = self.cache.get(key)
+        if cached is not None:
+            logger.info(f"Agent {task_id} served from cache")
+            return {"id": task_id, "status": "success", **cached, "cached": True}
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            result = await self._call_api(session, task)
+            if result['status'] == 'success':
+                self.cache.put(key, result)
+            future.set_result(result)
+            return result
+        except BaseException as e:
+            future.set_result({"id": task_id, "status": "failed", "error": repr(e)})
+            raise
+        finally:
+            del self._inflight[key]
+
+    @staticmethod
+    def _payload(task: Dict) -> Dict:
+        """Chat-completion request body for a task (also the cache key)."""
+        system_prompt = task.get(
+            'system', "You are a helpful quantitative research assistant."
+        )
+        user_prompt = task.get('user', "")
+        model = task.get('model', 'deepseek-reasoner')  # Default to R1
+        temperature = task.get('temperature', 0.0)
+
+        payload = {
+            "model": model,
+            "messages": [
+                {"role": "system", "content": system_prompt},
+                {"role": "user", "content": user_prompt}
+            ],
+            "temperature": temperature,
+            "stream": False
+        }
+        if 'max_tokens' in task:
+            payload['max_tokens'] = task['max_tokens']
+        return payload
+
+    async def _call_api(
+        self, session: aiohttp.ClientSession, task: Dict
+    ) -> Dict:
+        """
+        Send one task to the API through the scheduler.
 
-            try:
-                async with session.post(
-                    DEEPSEEK_URL,
-                    headers={
-                        "Authorization": f"Bearer {DEEPSEEK_API_KEY}",
-                        "Content-Type": "application/json"
-                    },
-                    json=payload,
-                    timeout=aiohttp.ClientTimeout(total=self.timeout)
-                ) as response:
-                    if response.status != 200:
-                        error_text = await response.text()
-                        logger.error(f"Agent {task_id} failed: API {response.status}")
-                        return {
-                            "id": task_id,
-                            "status": "failed",
-                            "error": f"API {response.status}: {error_text}"
-                        }
-
-                    data = await response.json()
-
-                    # Handle DeepSeek response format
-                    choice = data['choices'][0]
-                    content = choice['message']['content']
-
-                    # Capture reasoning chain if available (DeepSeek R1 feature)
-                    reasoning = choice['message'].get('reasoning_content', None)
-
-                    logger.info(f"Agent {task_id} completed successfully")
+        429 responses are retried (up to max_retries, honouring Retry-After);
+        429 / 5xx / timeouts also shrink the adaptive concurrency limit.
+        """
+        task_id = task.get('id', 'unknown')
+        timeout = task.get('timeout', self.timeout)
+        payload = self._payload(task)
+
+        for attempt in range(self.max_retries + 1):
+            retry_after = None
+            async with self.scheduler.slot(task) as slot:
+                started = time.monotonic()
+                try:
+                    async with session.post(
+                        self.api_url,
+                        headers={
+                            "Authorization": f"Bearer {self.api_key}",
+                            "Content-Type": "application/json"
+                        },
+                        json=payload,
+                        timeout=aiohttp.ClientTimeout(total=timeout, sock_connect=self.connect_timeout)
+                    ) as response:
+                        if response.status != 200:
+                            error_text = await response.text()
+                            slot.record(time.monotonic() - started,
+                                        congested=response.status == 429 or response.status >= 500)
+                            if response.status == 429 and attempt < self.max_retries:
+                                retry_after = _retry_after(response, attempt)
+                                logger.warning(f"Agent {task_id} rate limited; retrying in {retry_after:.1f}s")
+                            else:
+                                logger.error(f"Agent {task_id} failed: API {response.status}")
+                                return {
+                                    "id": task_id,
+                                    "status": "failed",
+                                    "error": f"API {response.status}: {error_text}"
+                                }
+                        else:
+                            data = await response.json()
+                            slot.record(time.monotonic() - started, congested=False, usage=data.get('usage'))
+
+                            # Handle DeepSeek response format
+                            choice = data['choices'][0]
+                            content = choice['message']['content']
+
+                            # Capture reasoning chain if available (DeepSeek R1 feature)
+                            reasoning = choice['message'].get('reasoning_content', None)
+
+                            logger.info(f"Agent {task_id} completed successfully")
+                            return {
+                                "id": task_id,
+                                "status": "success",
+                                "content": content,
+                                "reasoning": reasoning,
+                                "model": payload['model'],
+                                "usage": data.get('usage', {})
+                            }
+
+                except asyncio.TimeoutError:
+                    slot.record(time.monotonic() - started, congested=True)
+                    logger.error(f"Agent {task_id} timed out after {timeout}s")
                     return {
                         "id": task_id,
-                        "status": "success",
-                        "content": content,
-                        "reasoning": reasoning,
-                        "model": model,
-                        "usage": data.get('usage', {})
+                        "status": "failed",
+                        "error": f"Timeout after {timeout}s"
                     }
+                except Exception as e:
+                    slot.record(time.monotonic() - started, congested=isinstance(e, aiohttp.ClientError))
+                    logger.error(f"Agent {task_id} exception: {e}")
+                    return {"id": task_id, "status": "failed", "error": str(e)}
+
+            # Back off outside the slot so other requests can use it
+            await asyncio.sleep(retry_after)
+
+    async def stream_swarm(self, tasks: List[Dict]) -> AsyncIterator[Dict]:
+        """
+        Execute tasks and yield each result as soon as it finishes.
+
+        Lets downstream phases (e.g. synthesis) start on early results
+        instead of waiting for the slowest reasoning call.
+
+        Args:
+            tasks: List of task dicts (see run_swarm); an optional
+                "priority" ('live', 'interactive', 'research') orders
+                waiting requests
+
+        Yields:
+            Result dicts in completion order (each carries its task id)
+        """
+        async for _, result in self._stream_indexed(tasks):
+            yield result
+
+    async def _stream_indexed(self, tasks: List[Dict]) -> AsyncIterator[Tuple[int, Dict]]:
+        """(task index, result) pairs in completion order."""
+        logger.info(f"Launching swarm of {len(tasks)} agents (concurrency={self.concurrency})")
+
+        connector = aiohttp.TCPConnector(limit=self.concurrency)
+        async with aiohttp.ClientSession(connector=connector) as session:
+            async def indexed(i: int, task: Dict) -> Tuple[int, Dict]:
+                return i, await self._dispatch_agent(session, task)
+
+            pending = [asyncio.ensure_future(indexed(i, task)) for i, task in enumerate(tasks)]
+            try:
+                for next_done in asyncio.as_completed(pending):
+                    yield await next_done
+            finally:
+                for future in pending:
+                    future.cancel()
 
-            except asyncio.TimeoutError:
-                logger.error(f"Agent {task_id} timed out after {self.timeout}s")
-                return {
-                    "id": task_id,
-                    "status": "failed",
-                    "error": f"Timeout after {self.timeout}s"
-                }
-            except Exception as e:
-                logger.error(f"Agent {task_id} exception: {e}")
-                return {"id": task_id, "status": "failed", "error": str(e)}
+        logger.info(f"Scheduler: {self.scheduler.stats()}")
+        if self.cache is not None:
+            logger.info(f"Response cache: {self.cache.stats()}")
 
     async def run_swarm(self, tasks: List[Dict]) -> List[Dict]:
         """
-        Execute a list of tasks in parallel with throttled concurrency.
+        Execute a list of tasks in parallel with adaptive concurrency.
 
         Args:
             tasks: List of task dicts, each with:
@@ -148,16 +302,16 @@ class SwarmOrchestrator:
                 - user: User prompt
                 - model: (optional) deepseek-reasoner or deepseek-chat
                 - temperature: (optional) 0.0-1.0
+                - priority: (optional) 'live', 'interactive' or 'research'
+                - max_tokens / timeout: (optional) per-task limits
 
         Returns:
             List of result dicts with id, status, content, reasoning, usage
+            (in task order)
         """
-        logger.info(f"Launching swarm of {len(tasks)} agents (concurrency={self.concurrency})")
-
-        connector = aiohttp.TCPConnector(limit=self.concurrency)
-        async with aiohttp.ClientSession(connector=connector) as session:
-            futures = [self._dispatch_agent(session, task) for task in tasks]
-            results = await asyncio.gather(*futures)
+        results: List[Optional[Dict]] = [None] * len(tasks)
+        async for i, result in self._stream_indexed(tasks):
+            results[i] = result
 
         success_count = sum(1 for r in results if r['status'] == 'success')
         logger.info(f"Swarm complete: {success_count}/{len(tasks)} successful")
@@ -165,7 +319,17 @@ class SwarmOrchestrator:
         return results
 
 
-def run_swarm_sync(tasks: List[Dict], concurrency: int = 50, timeout: int = 300) -> List[Dict]:
+def _retry_after(response: aiohttp.ClientResponse, attempt: int) -> float:
+    """Seconds to wait before retrying a 429 (Retry-After header or exponential backoff)."""
+    try:
+        return max(0.0, float(response.headers.get('Retry-After', '')))
+    except ValueError:
+        return min(30.0, 0.5 * 2 ** attempt)
+
+
+def run_swarm_sync(
+    tasks: List[Dict], concurrency: int = 50, timeout: int = 300, use_cache: bool = True
+) -> List[Dict]:
     """
     Synchronous wrapper for SwarmOrchestrator.run_swarm().
 
@@ -175,6 +339,7 @@ def run_swarm_sync(tasks: List[Dict], concurrency: int = 50, timeout: int = 300)
         tasks: List of task dicts (see SwarmOrchestrator.run_swarm)
         concurrency: Max concurrent requests (default 50)
         timeout: Request timeout in seconds (default 300)
+        use_cache: Serve repeated deterministic prompts from the response cache
 
     Returns:
         List of result dicts
@@ -186,5 +351,45 @@ def run_swarm_sync(tasks: List[Dict], concurrency: int = 50, timeout: int = 300)
         ]
         results = run_swarm_sync(tasks)
     """
-    orchestrator = SwarmOrchestrator(concurrency=concurrency, timeout=timeout)
+    orchestrator = SwarmOrchestrator(concurrency=concurrency, timeout=timeout, use_cache=use_cache)
     return asyncio.run(orchestrator.run_swarm(tasks))
+
+
+def iter_swarm_sync(
+    tasks: List[Dict], concurrency: int = 50, timeout: int = 300, use_cache: bool = True, **kwargs
+) -> Iterator[Dict]:
+    """
+    Synchronous streaming wrapper for SwarmOrchestrator.stream_swarm().
+
+    Yields results in completion order while the swarm keeps running on a
+    background event loop.
+
+    Example:
+        for result in iter_swarm_sync(tasks):
+            if result['status'] == 'success':
+                start_synthesis(result)
+    """
+    orchestrator = SwarmOrchestrator(concurrency=concurrency, timeout=timeout,
+                                     use_cache=use_cache, **kwargs)
+    results: queue.Queue = queue.Queue()
+    done = object()
+
+    async def produce():
+        try:
+            async for result in orchestrator.stream_swarm(tasks):
+                results.put(result)
+        except BaseException as e:
+            results.put(e)
+        finally:
+            results.put(done)
+
+    worker = threading.Thread(target=asyncio.run, args=(produce(),), daemon=True)
+    worker.start()
+    while True:
+        item = results.get()
+        if item is done:
+            break
+        if isinstance(item, BaseException):
+            raise item
+        yield item
+    worker.join()
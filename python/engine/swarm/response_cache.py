@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+"""
+Swarm Response Cache
+====================
+Content-addressed, persistent cache of LLM responses.
+
+Identical deterministic requests (same model, messages and max_tokens,
+temperature 0) are answered from disk instead of the API. Entries expire
+after a TTL and the cache is bounded in size (least recently used entries
+are evicted first).
+
+Usage:
+    from engine.swarm.response_cache import get_response_cache
+
+    cache = get_response_cache()
+    print(cache.stats())   # hits, misses, hit_rate, ...
+"""
+
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CACHE_PATH = '~/.quant-engine/swarm_cache/responses.sqlite'
+DEFAULT_TTL = 24 * 3600
+DEFAULT_MAX_ENTRIES = 20000
+
+# Result fields that are stored (id / status are per-request)
+CACHED_FIELDS = ('content', 'reasoning', 'model', 'usage')
+
+
+def request_key(payload: Dict[str, Any]) -> str:
+    """Content hash of a chat-completion request payload (prompt and limits)."""
+    canonical = json.dumps(
+        {**payload, 'temperature': float(payload.get('temperature', 0.0))},
+        sort_keys=True, ensure_ascii=False
+    )
+    return hashlib.sha256(canonical.encode('utf-8')).hexdigest()
+
+
+class ResponseCache:
+    """
+    SQLite-backed response cache with TTL and LRU size bound.
+
+    Thread-safe; one connection guarded by a lock (lookups are tiny next to
+    an LLM round trip).
+    """
+
+    def __init__(
+        self,
+        path: Optional[str] = None,
+        ttl: float = DEFAULT_TTL,
+        max_entries: int = DEFAULT_MAX_ENTRIES,
+    ):
+        """
+        Args:
+            path: SQLite file (':memory:' for a process-local cache)
+            ttl: Seconds an entry stays valid
+            max_entries: Entries kept before LRU eviction
+        """
+        self.path = path or os.environ.get('SWARM_CACHE_PATH', DEFAULT_CACHE_PATH)
+        self.ttl = ttl
+        self.max_entries = max_entries
+
+        if self.path != ':memory:':
+            self.path = str(Path(self.path).expanduser())
+            Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute(
+            'CREATE TABLE IF NOT EXISTS responses ('
+            ' key TEXT PRIMARY KEY, value TEXT NOT NULL,'
+            ' created REAL NOT NULL, accessed REAL NOT NULL)'
+        )
+        self._conn.execute('CREATE INDEX IF NOT EXISTS responses_accessed ON responses(accessed)')
+
+        self.hits = 0
+        self.misses = 0
+        self.stores = 0
+        self.evictions = 0
+        self.coalesced = 0
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Cached result fields for a prompt key, or None (expired entries count as misses)."""
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                'SELECT value, created FROM responses WHERE key = ?', (key,)
+            ).fetchone()
+            if row is None or now - row[1] > self.ttl:
+                if row is not None:
+                    self._conn.execute('DELETE FROM responses WHERE key = ?', (key,))
+                self.misses += 1
+                return None
+            self._conn.execute('UPDATE responses SET accessed = ? WHERE key = ?', (now, key))
+            self.hits += 1
+        return json.loads(row[0])
+
+    def put(self, key: str, result: Dict[str, Any]) -> None:
+        """Store the cacheable fields of a successful result."""
+        value = json.dumps({f: result.get(f) for f in CACHED_FIELDS}, default=str)
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                'INSERT OR REPLACE INTO responses (key, value, created, accessed) VALUES (?, ?, ?, ?)',
+                (key, value, now, now)
+            )
+            self.stores += 1
+            self._evict(now)
+
+    def _evict(self, now: float) -> None:
+        expired = self._conn.execute('DELETE FROM responses WHERE created < ?', (now - self.ttl,)).rowcount
+        count = self._conn.execute('SELECT COUNT(*) FROM responses').fetchone()[0]
+        overflow = count - self.max_entries
+        if overflow > 0:
+            self._conn.execute(
+                'DELETE FROM responses WHERE key IN '
+                '(SELECT key FROM responses ORDER BY accessed ASC LIMIT ?)', (overflow,)
+            )
+        self.evictions += max(expired, 0) + max(overflow, 0)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._conn.execute('DELETE FROM responses')
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute('SELECT COUNT(*) FROM responses').fetchone()[0]
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit-rate metrics (coalesced = identical in-flight tasks served by one request)."""
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hit_rate,
+            'coalesced': self.coalesced,
+            'stores': self.stores,
+            'evictions': self.evictions,
+            'entries': len(self),
+        }
+
+
+# Singleton instance
+_response_cache: Optional[ResponseCache] = None
+
+
+def get_response_cache() -> ResponseCache:
+    """Get or create the shared response cache."""
+    global _response_cache
+    if _response_cache is None:
+        _response_cache = ResponseCache()
+    return _response_cache
@@ -0,0 +1,318 @@
+#!/usr/bin/env python3
+"""
+Swarm Scheduler - Adaptive Concurrency and Token Budgets
+========================================================
+Flow control for SwarmOrchestrator requests.
+
+- AdaptiveLimiter: AIMD concurrency limit. Grows by ~1 slot per round trip
+  while requests are healthy, halves (at most once per round trip) on
+  429 / 5xx / timeouts or when latency exceeds the target. Waiting
+  requests are granted slots in priority order.
+- TokenBudget: token bucket per model (tokens per minute). Requests reserve
+  an estimate up front and settle against the reported usage; requests
+  waiting for tokens are served in priority order.
+- SwarmScheduler: both of the above behind one `slot()` context manager.
+
+Priority classes (lower runs first):
+    live      - live trading decisions
+    interactive - user-facing requests
+    research  - daemon / batch research (default)
+"""
+
+import asyncio
+import heapq
+import itertools
+import time
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict, List, Optional, Union
+
+PRIORITY_CLASSES = {
+    'live': 0,
+    'interactive': 5,
+    'research': 10,
+}
+DEFAULT_PRIORITY = 'research'
+
+# Completion tokens assumed when a task does not set max_tokens
+DEFAULT_COMPLETION_ESTIMATE = 1000
+
+
+def priority_value(priority: Union[str, int, None]) -> int:
+    """Numeric priority for a class name or number (lower runs first)."""
+    if priority is None:
+        return PRIORITY_CLASSES[DEFAULT_PRIORITY]
+    if isinstance(priority, str):
+        if priority not in PRIORITY_CLASSES:
+            raise ValueError(f"Unknown priority class '{priority}'. Options: {list(PRIORITY_CLASSES)}")
+        return PRIORITY_CLASSES[priority]
+    return int(priority)
+
+
+def estimate_tokens(task: Dict[str, Any]) -> int:
+    """Rough token estimate for a task (~4 characters per prompt token)."""
+    prompt_chars = len(task.get('system', '')) + len(task.get('user', ''))
+    return prompt_chars // 4 + int(task.get('max_tokens', DEFAULT_COMPLETION_ESTIMATE))
+
+
+# =============================================================================
+# ADAPTIVE CONCURRENCY
+# =============================================================================
+
+class AdaptiveLimiter:
+    """AIMD concurrency limit with a priority-ordered wait queue."""
+
+    def __init__(
+        self,
+        initial: int,
+        min_limit: int = 1,
+        max_limit: Optional[int] = None,
+        latency_target: Optional[float] = None,
+        backoff: float = 0.5,
+        smoothing: float = 0.2,
+    ):
+        """
+        Args:
+            initial: Starting limit
+            min_limit: Floor for the limit
+            max_limit: Ceiling for the limit (default: initial)
+            latency_target: Seconds; slower successful requests count as
+                congestion (None disables latency-driven backoff)
+            backoff: Multiplicative decrease factor
+            smoothing: EWMA weight for latency
+        """
+        self.min_limit = max(1, min_limit)
+        self.max_limit = max(self.min_limit, max_limit or initial)
+        self.limit = float(min(max(initial, self.min_limit), self.max_limit))
+        self.latency_target = latency_target
+        self.backoff = backoff
+        self.smoothing = smoothing
+
+        self.in_flight = 0
+        self.latency_ewma: Optional[float] = None
+        self._waiters: List = []
+        self._seq = itertools.count()
+        self._last_decrease = 0.0
+
+        self.successes = 0
+        self.congestion_events = 0
+        self.decreases = 0
+
+    async def acquire(self, priority: int = PRIORITY_CLASSES[DEFAULT_PRIORITY]) -> None:
+        if not self._waiters and self.in_flight < int(self.limit):
+            self.in_flight += 1
+            return
+
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (priority, next(self._seq), future))
+        try:
+            await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                # Granted just as we were cancelled: hand the slot back
+                self.release()
+            raise
+
+    def release(self) -> None:
+        self.in_flight -= 1
+        self._wake()
+
+    def _wake(self) -> None:
+        while self._waiters and self.in_flight < int(self.limit):
+            _, _, future = heapq.heappop(self._waiters)
+            if future.done():
+                continue
+            self.in_flight += 1
+            future.set_result(None)
+
+    def record(self, latency: float, congested: bool) -> None:
+        """Feed back one finished request."""
+        if self.latency_ewma is None:
+            self.latency_ewma = latency
+        else:
+            self.latency_ewma += self.smoothing * (latency - self.latency_ewma)
+
+        too_slow = self.latency_target is not None and latency > self.latency_target
+        if congested or too_slow:
+            self.congestion_events += 1
+            now = time.monotonic()
+            # One decrease per round trip: requests already in flight saw the same congestion
+            if now - self._last_decrease >= (self.latency_ewma or 0.0):
+                self.limit = max(float(self.min_limit), self.limit * self.backoff)
+                self._last_decrease = now
+                self.decreases += 1
+        else:
+            self.successes += 1
+            # Additive increase: about +1 per limit's worth of successes
+            self.limit = min(float(self.max_limit), self.limit + 1.0 / self.limit)
+            self._wake()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            'limit': round(self.limit, 2),
+            'in_flight': self.in_flight,
+            'waiting': sum(1 for _, _, f in self._waiters if not f.done()),
+            'latency_ewma': self.latency_ewma,
+            'successes': self.successes,
+            'congestion_events': self.congestion_events,
+            'decreases': self.decreases,
+        }
+
+
+# =============================================================================
+# TOKEN BUDGETS
+# =============================================================================
+
+class TokenBudget:
+    """Token bucket refilled at tokens_per_minute (burst up to one minute's worth)."""
+
+    def __init__(self, tokens_per_minute: int):
+        self.capacity = float(tokens_per_minute)
+        self.rate = tokens_per_minute / 60.0
+        self.tokens = self.capacity
+        self.used = 0
+        self.waited = 0.0
+        self._updated = time.monotonic()
+        self._waiters: List = []
+        self._seq = itertools.count()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    async def acquire(self, tokens: int, priority: int = PRIORITY_CLASSES[DEFAULT_PRIORITY]) -> int:
+        """
+        Reserve tokens, waiting for the bucket to refill. Returns the amount reserved.
+
+        Waiters are served strictly in (priority, arrival) order, so a large
+        request is not starved by small ones and live requests go first.
+        """
+        tokens = min(float(tokens), self.capacity)
+        self._refill()
+        if not self._waiters and self.tokens >= tokens:
+            self.tokens -= tokens
+            return tokens
+
+        wakeup = asyncio.Event()
+        entry = (priority, next(self._seq), wakeup)
+        heapq.heappush(self._waiters, entry)
+        try:
+            while True:
+                self._refill()
+                head = self._waiters[0] is entry
+                if head and self.tokens >= tokens:
+                    heapq.heappop(self._waiters)
+                    self.tokens -= tokens
+                    return tokens
+                # The head sleeps until refilled (or a refund); the rest until they are next
+                wait = (tokens - self.tokens) / self.rate if head else None
+                wakeup.clear()
+                started = time.monotonic()
+                try:
+                    await asyncio.wait_for(wakeup.wait(), timeout=wait)
+                except asyncio.TimeoutError:
+                    pass
+                if head:
+                    self.waited += time.monotonic() - started
+        finally:
+            if entry in self._waiters:
+                self._waiters.remove(entry)
+                heapq.heapify(self._waiters)
+            self._wake_head()
+
+    def _wake_head(self) -> None:
+        if self._waiters:
+            self._waiters[0][2].set()
+
+    def settle(self, reserved: float, actual: Optional[int]) -> None:
+        """Correct a reservation with the tokens actually used."""
+        if actual is None:
+            actual = reserved
+        self.used += actual
+        self._refill()
+        self.tokens = min(self.capacity, self.tokens + reserved - actual)
+        if reserved > actual:
+            self._wake_head()
+
+
+# =============================================================================
+# SCHEDULER
+# =============================================================================
+
+class SwarmScheduler:
+    """Adaptive concurrency + per-model token budgets + priority classes."""
+
+    def __init__(
+        self,
+        concurrency: int = 50,
+        min_concurrency: int = 1,
+        latency_target: Optional[float] = None,
+        token_budgets: Optional[Dict[str, int]] = None,
+    ):
+        """
+        Args:
+            concurrency: Starting and maximum concurrent requests
+            min_concurrency: Floor the limit can back off to
+            latency_target: Seconds above which a request counts as congestion
+            token_budgets: Model name -> tokens per minute (unlisted models unlimited)
+        """
+        self.limiter = AdaptiveLimiter(concurrency, min_limit=min_concurrency,
+                                       max_limit=concurrency, latency_target=latency_target)
+        self.budgets = {model: TokenBudget(tpm) for model, tpm in (token_budgets or {}).items()}
+
+    @asynccontextmanager
+    async def slot(self, task: Dict[str, Any]) -> AsyncIterator['_Slot']:
+        """
+        Hold a request slot for a task.
+
+        Usage:
+            async with scheduler.slot(task) as slot:
+                ... send request ...
+                slot.record(latency, congested=False, usage=data['usage'])
+        """
+        model = task.get('model', 'deepseek-reasoner')
+        priority = priority_value(task.get('priority'))
+        budget = self.budgets.get(model)
+        reserved = await budget.acquire(estimate_tokens(task), priority) if budget else 0
+
+        try:
+            await self.limiter.acquire(priority)
+        except asyncio.CancelledError:
+            if budget is not None:
+                budget.settle(reserved, 0)
+            raise
+        slot = _Slot(self.limiter, budget, reserved)
+        try:
+            yield slot
+        finally:
+            self.limiter.release()
+            slot.settle()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            **self.limiter.stats(),
+            'token_budgets': {
+                model: {'used': b.used, 'available': int(b.tokens), 'waited_s': round(b.waited, 3)}
+                for model, b in self.budgets.items()
+            },
+        }
+
+
+class _Slot:
+    """Feedback handle for one scheduled request."""
+
+    def __init__(self, limiter: AdaptiveLimiter, budget: Optional[TokenBudget], reserved: float):
+        self._limiter = limiter
+        self._budget = budget
+        self._reserved = reserved
+        self._usage_tokens: Optional[int] = None
+
+    def record(self, latency: float, congested: bool, usage: Optional[Dict[str, Any]] = None) -> None:
+        self._limiter.record(latency, congested)
+        if usage:
+            self._usage_tokens = usage.get('total_tokens') or (
+                usage.get('prompt_tokens', 0) + usage.get('completion_tokens', 0))
+
+    def settle(self) -> None:
+        if self._budget is not None:
+            self._budget.settle(self._reserved, self._usage_tokens)
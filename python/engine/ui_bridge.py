@@ -2,9 +2,18 @@
 UI Bridge - Emit events from Python engine to Electron UI
 
 This module allows the Market Physics Engine to communicate with the
-JARVIS UI by writing structured JSON events to /tmp/claude-code-results/.
+JARVIS UI by writing structured JSON events under /tmp/claude-code-results/.
 The ClaudeCodeResultWatcher in Electron picks these up and updates the UI.
 
+Transport:
+    Events are batched by a background flusher into an append-only
+    segmented log (events/<start_ms>-<pid>-<seq>.ndjson, one compact JSON
+    event per line). Progress-only events are coalesced (latest wins per
+    session and view) and rate-limited; a bounded queue applies
+    backpressure to everything else. Set UI_EVENT_TRANSPORT=files to fall
+    back to one event_<ms>_<id>.json file per event (also used when the
+    log cannot be written).
+
 Usage:
     from engine.ui_bridge import emit_ui_event, UIEventType
 
@@ -31,10 +40,14 @@ Usage:
     )
 """
 
+import atexit
 import json
 import os
+import sys
+import threading
 import time
 import uuid
+from collections import deque
 from datetime import datetime
 from enum import Enum
 from typing import Optional, Dict, Any, List, Union
@@ -68,6 +81,233 @@ def ensure_results_dir():
     """Ensure the results directory exists"""
     RESULTS_DIR.mkdir(parents=True, exist_ok=True)
 
+# ============================================================================
+# EVENT TRANSPORT - Segmented log with coalescing, rate limiting, backpressure
+# ============================================================================
+
+# Segmented log directory tailed by the Electron watcher
+EVENT_LOG_DIR = RESULTS_DIR / "events"
+
+
+def _write_event_file(event: Dict[str, Any]) -> Union[str, bool]:
+    """Fallback transport: one JSON file per event (unique, atomically renamed)."""
+    filename = f"event_{int(time.time() * 1000)}_{uuid.uuid4().hex[:8]}.json"
+    filepath = RESULTS_DIR / filename
+    tmp_path = RESULTS_DIR / f".{filename}.tmp"
+
+    try:
+        ensure_results_dir()
+        with open(tmp_path, 'w') as f:
+            json.dump(event, f, default=str)
+        os.replace(tmp_path, filepath)
+    except Exception as e:
+        print(f"ERROR: Failed to write UI event to {filepath}: {e}", file=sys.stderr)
+        return False
+
+    return str(filepath)
+
+
+class UIEventBus:
+    """
+    Batches UI events into an append-only segmented log.
+
+    - Ordered events go through a bounded queue; publishers block up to
+      block_timeout when it is full, then the event is dropped (counted)
+    - Coalescable (progress-only) events keep only the latest per key and
+      are written at most max_rate times per second per key
+    - A background thread writes each batch with one append; segments
+      rotate at segment_bytes and only the newest max_segments per process
+      are kept if nobody consumes them (dropped unread segments are counted
+      and reported on stderr)
+    """
+
+    def __init__(
+        self,
+        log_dir: Path = EVENT_LOG_DIR,
+        flush_interval: float = 0.05,
+        max_rate: float = 10.0,
+        max_pending: int = 10000,
+        block_timeout: float = 0.5,
+        segment_bytes: int = 4 * 1024 * 1024,
+        max_segments: int = 16,
+    ):
+        self.log_dir = Path(log_dir)
+        self.flush_interval = flush_interval
+        self.min_interval = 1.0 / max_rate if max_rate else 0.0
+        self.max_pending = max_pending
+        self.block_timeout = block_timeout
+        self.segment_bytes = segment_bytes
+        self.max_segments = max_segments
+
+        self.pid = os.getpid()
+        # Start time in the name keeps segments unique across pid reuse
+        self._prefix = f"{int(time.time() * 1000)}-{self.pid}"
+        self._pending: deque = deque()
+        self._latest: Dict[Any, Dict[str, Any]] = {}
+        self._last_emit: Dict[Any, float] = {}
+        self._cond = threading.Condition()
+        self._write_lock = threading.Lock()
+        self._closed = False
+
+        self._segment_index = 0
+        self._segment_size = 0
+        self.stats = {'published': 0, 'coalesced': 0, 'dropped': 0, 'written': 0, 'batches': 0,
+                      'segments_dropped': 0}
+
+        self.log_dir.mkdir(parents=True, exist_ok=True)
+        self._segment_path = self._next_segment()
+
+        self._thread = threading.Thread(target=self._run, name="ui-event-bus", daemon=True)
+        self._thread.start()
+
+    # ------------------------------------------------------------------
+    # Publishing
+    # ------------------------------------------------------------------
+
+    def publish(self, event: Dict[str, Any], coalesce_key: Any = None, supersedes: Any = None) -> bool:
+        """
+        Queue an event. Returns False if it was dropped under backpressure.
+
+        Events with a coalesce_key replace any unwritten event with the same
+        key. Ordered events may name the key whose unwritten progress they
+        supersede (e.g. a completion event for the same session and view).
+        """
+        with self._cond:
+            if self._closed:
+                return False
+            self.stats['published'] += 1
+
+            if coalesce_key is not None:
+                if coalesce_key in self._latest:
+                    self.stats['coalesced'] += 1
+                self._latest[coalesce_key] = event
+                return True
+
+            deadline = time.monotonic() + self.block_timeout
+            while len(self._pending) >= self.max_pending:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    self.stats['dropped'] += 1
+                    return False
+                self._cond.notify_all()
+                self._cond.wait(remaining)
+
+            if supersedes is not None and self._latest.pop(supersedes, None) is not None:
+                self.stats['coalesced'] += 1
+            self._pending.append(event)
+            if len(self._pending) >= self.max_pending // 2:
+                self._cond.notify_all()
+            return True
+
+    def flush(self, force: bool = True) -> None:
+        """Write everything queued (force ignores the progress rate limit)."""
+        # Taking and writing under one lock keeps batches in order
+        with self._write_lock:
+            self._write_batch(self._take_batch(force))
+
+    def close(self) -> None:
+        """Stop the flusher and write whatever is left."""
+        with self._cond:
+            if self._closed:
+                return
+            self._closed = True
+            self._cond.notify_all()
+        if threading.current_thread() is not self._thread:
+            self._thread.join(timeout=2.0)
+        self.flush()
+
+    @property
+    def segment_path(self) -> Path:
+        return self._segment_path
+
+    # ------------------------------------------------------------------
+    # Flushing
+    # ------------------------------------------------------------------
+
+    def _take_batch(self, force: bool) -> List[Dict[str, Any]]:
+        now = time.monotonic()
+        with self._cond:
+            batch = list(self._pending)
+            self._pending.clear()
+            for key in list(self._latest):
+                if force or now - self._last_emit.get(key, -1e18) >= self.min_interval:
+                    batch.append(self._latest.pop(key))
+                    self._last_emit[key] = now
+            self._cond.notify_all()
+        return batch
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                if self._closed:
+                    return
+                self._cond.wait(self.flush_interval)
+            try:
+                self.flush(force=False)
+            except Exception as e:
+                print(f"ERROR: UI event bus flush failed: {e}", file=sys.stderr)
+
+    def _write_batch(self, batch: List[Dict[str, Any]]) -> None:
+        if not batch:
+            return
+        payload = ''.join(json.dumps(e, separators=(',', ':'), default=str) + '\n' for e in batch).encode()
+        try:
+            with open(self._segment_path, 'ab') as f:
+                f.write(payload)
+        except OSError as e:
+            print(f"ERROR: UI event log unavailable ({e}); writing event files", file=sys.stderr)
+            for event in batch:
+                _write_event_file(event)
+            return
+        self._segment_size += len(payload)
+        self.stats['written'] += len(batch)
+        self.stats['batches'] += 1
+        if self._segment_size >= self.segment_bytes:
+            self._segment_path = self._next_segment()
+
+    def _next_segment(self) -> Path:
+        self._segment_index += 1
+        self._segment_size = 0
+        path = self.log_dir / f"{self._prefix}-{self._segment_index:06d}.ndjson"
+        path.touch()
+
+        # The watcher deletes segments it has read, so these were never consumed
+        stale = sorted(self.log_dir.glob(f"{self._prefix}-*.ndjson"))[:-self.max_segments]
+        for old in stale:
+            old.unlink(missing_ok=True)
+        if stale:
+            self.stats['segments_dropped'] += len(stale)
+            print(f"WARNING: UI event log has no consumer; dropped {len(stale)} unread segment(s) "
+                  f"({self.stats['segments_dropped']} total)", file=sys.stderr)
+        return path
+
+
+_event_bus: Optional[UIEventBus] = None
+_event_bus_lock = threading.Lock()
+
+
+def get_event_bus() -> Optional[UIEventBus]:
+    """Get the per-process event bus, or None when falling back to event files."""
+    global _event_bus
+    if os.environ.get("UI_EVENT_TRANSPORT", "log").lower() == "files":
+        return None
+    with _event_bus_lock:
+        # Forked children get their own bus (the flusher thread does not survive fork)
+        if _event_bus is None or _event_bus.pid != os.getpid():
+            try:
+                _event_bus = UIEventBus()
+                atexit.register(_event_bus.close)
+            except OSError as e:
+                print(f"ERROR: UI event log unavailable ({e}); writing event files", file=sys.stderr)
+                return None
+        return _event_bus
+
+
+def flush_ui_events() -> None:
+    """Write all queued UI events now (e.g. before handing control to the UI)."""
+    if _event_bus is not None and _event_bus.pid == os.getpid():
+        _event_bus.flush()
+
 def emit_ui_event(
     view: Optional[str] = None,
     message: str = "",
@@ -100,9 +340,13 @@ def emit_ui_event(
         files_modified: List of files modified
 
     Returns:
-        Path to the event file created
+        Path to the event log segment (or event file) written to,
+        False if the event was dropped
     """
-    ensure_results_dir()
+    # Progress-only events are coalesced per (session, view): latest wins
+    stream_key = (session_id, view)
+    coalescable = (progress is not None and not (chart or table or metrics or notification
+                                                 or files_created or files_modified))
 
     # Generate UUID for session_id if not provided
     if session_id is None:
@@ -163,19 +407,15 @@ def emit_ui_event(
     if files_modified:
         event["files_modified"] = files_modified
 
-    # Write to file with unique timestamp
-    filename = f"event_{int(time.time() * 1000)}.json"
-    filepath = RESULTS_DIR / filename
+    bus = get_event_bus()
+    if bus is None:
+        return _write_event_file(event)
 
-    try:
-        with open(filepath, 'w') as f:
-            json.dump(event, f, indent=2)
-    except Exception as e:
-        import sys
-        print(f"ERROR: Failed to write UI event to {filepath}: {e}", file=sys.stderr)
-        return False
-
-    return str(filepath)
+    if coalescable:
+        published = bus.publish(event, coalesce_key=stream_key)
+    else:
+        published = bus.publish(event, supersedes=stream_key)
+    return str(bus.segment_path) if published else False
 
 def _infer_activity_type(view: Optional[str]) -> str:
     """Infer activity type from view if not explicitly provided"""
@@ -1079,4 +1319,5 @@ if __name__ == "__main__":
     })
     print("Gamma analysis event emitted")
 
-    print("Done! Check /tmp/claude-code-results/ for events")
+    flush_ui_events()
+    print("Done! Check /tmp/claude-code-results/events/ for events")
@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+Scan Kernel Micro-Benchmarks
+
+Times each kernel in engine.features.kernels against the per-sample loop
+it replaced (best of N). The reference loops are the ones the equivalence
+tests in tests/test_kernels.py check the kernels against.
+
+Usage:
+    python scripts/benchmark_kernels.py
+    python scripts/benchmark_kernels.py --backend compiled --repeat 5
+"""
+
+import sys
+import time
+import argparse
+from pathlib import Path
+
+import numpy as np
+
+# Add engine (and tests) to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from engine.features import kernels
+from tests.test_kernels import (
+    dip_inputs,
+    ref_envelope,
+    ref_lagged_zscore,
+    ref_lindley,
+    ref_lz76,
+    ref_permutation_entropy,
+    ref_reset_cumsum,
+    ref_rising_edges,
+    ref_tick_rule,
+)
+
+
+def best_time(fn, *args, repeat=3):
+    best = np.inf
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(*args)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def benchmark_cases(rng):
+    """Kernel name -> (kernel, reference loop, args)."""
+    prices = np.round(100 + np.cumsum(rng.normal(0, 0.05, 200_000)), 1)
+    values = rng.normal(0, 1, 200_000)
+    boundaries = np.arange(0, 200_000, 390)
+    proxy = np.cumsum(rng.normal(0, 1, 20_000))
+    symbols = rng.integers(0, 10, 3000)
+    _, x = dip_inputs(rng, 2000)
+    y = np.arange(2000) / 2000
+    return {
+        'tick_signs': (kernels.tick_signs, ref_tick_rule, (prices,)),
+        'segmented_cumsum': (
+            lambda v, b: kernels.segmented_cumsum(v, kernels.reset_positions(b, len(v))),
+            lambda v, b: ref_reset_cumsum(v, b, True), (values, boundaries)),
+        'lindley_scan': (kernels.lindley_scan, ref_lindley, (values,)),
+        'rising_edges': (kernels.rising_edges, ref_rising_edges, (values > 1.0,)),
+        'lagged_zscore': (kernels.lagged_zscore, ref_lagged_zscore, (proxy, 100)),
+        'ordinal_patterns': (
+            lambda d: kernels.pattern_counts(kernels.ordinal_patterns(d, 4, 1)),
+            lambda d: ref_permutation_entropy(d, 4, 1), (values[:20_000],)),
+        'lz76_complexity': (kernels.lz76_complexity, ref_lz76, (symbols,)),
+        'envelope_at': (
+            lambda x, y: kernels.envelope_at(*kernels.unit_envelope(x, y), x),
+            lambda x, y: ref_envelope(x, y, True), (x, y)),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark scan kernels against their reference loops')
+    parser.add_argument('--backend', choices=kernels.BACKENDS, default='numpy', help='Kernel backend')
+    parser.add_argument('--repeat', type=int, default=3, help='Kernel timings per case (best is kept)')
+    parser.add_argument('--seed', type=int, default=11, help='Random seed for the inputs')
+    args = parser.parse_args()
+
+    backend = kernels.set_backend(args.backend)
+    print(f"Kernel backend: {backend}\n")
+
+    slower = []
+    for name, (kernel, reference, inputs) in benchmark_cases(np.random.default_rng(args.seed)).items():
+        kernel(*inputs)  # Warm-up (JIT compilation on the compiled backend)
+        kernel_time = best_time(kernel, *inputs, repeat=args.repeat)
+        loop_time = best_time(reference, *inputs, repeat=1)
+        print(f"{name:18s} kernel {kernel_time * 1e3:8.2f} ms   loop {loop_time * 1e3:8.2f} ms   "
+              f"x{loop_time / kernel_time:.1f}")
+        if kernel_time >= loop_time:
+            slower.append(name)
+
+    if slower:
+        print(f"\nSlower than the reference loop: {', '.join(slower)}")
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -1,35 +1,272 @@
 """
 OVERFITTING RED TEAM ANALYSIS (FAST VERSION)
-Reduced permutation iterations for faster execution.
+Parallel, batched red-team tests for faster execution.
 
 This script performs:
 1. Parameter count audit
-2. Parameter sensitivity analysis (±10% variations)
-3. Walk-forward performance degradation
-4. Permutation tests (10 iterations instead of 100)
+2. Parameter sensitivity analysis (±10% variations, runs in parallel)
+3. Walk-forward performance degradation (years in parallel)
+4. Permutation tests (thousands of label permutations, batched across a process pool)
 5. Overall overfitting risk score
+
+Data is loaded once per worker; only the permuted part is re-evaluated.
+P-values are reported with Clopper-Pearson confidence intervals, and
+every test reports its runtime.
 """
 
+import os
+import time
 import pandas as pd
 import numpy as np
 import sys
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
-from typing import Dict, List, Tuple
+from typing import Callable, Dict, List, Optional, Tuple
+from scipy import stats
 import warnings
 warnings.filterwarnings('ignore')
 
 # Add src to path
 sys.path.insert(0, str(Path(__file__).parent / 'src'))
 
-from backtest import RotationEngine
-from analysis import PerformanceMetrics
+# The engine lives outside this tree in some checkouts; the resampling
+# helpers below don't need it
+try:
+    from backtest import RotationEngine
+    from analysis import PerformanceMetrics
+except ImportError:
+    RotationEngine = None
+    PerformanceMetrics = None
+
+
+# ============================================================================
+# RED TEAM ENGINE - batched resampling statistics
+# ============================================================================
+
+def sharpe_rows(pnl: np.ndarray, periods_per_year: int = 252) -> np.ndarray:
+    """Annualized Sharpe of each row of a (B, T) P&L matrix (population std, as _calculate_sharpe)."""
+    pnl = np.atleast_2d(pnl)
+    std = pnl.std(axis=1)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        sharpe = pnl.mean(axis=1) / std * np.sqrt(periods_per_year)
+    return np.where(std > 0, sharpe, 0.0)
+
+
+def monte_carlo_pvalue(null: np.ndarray, observed: float, alpha: float = 0.05) -> Tuple[float, Tuple[float, float]]:
+    """
+    One-sided Monte Carlo p-value P(null >= observed) with a Clopper-Pearson CI.
+
+    Uses (k + 1) / (n + 1) so the p-value is never exactly zero; the CI is
+    computed on the same k + 1 of n + 1 basis, so it always contains the p-value.
+    """
+    n = len(null) + 1
+    k = int(np.sum(null >= observed)) + 1
+    p_value = k / n
+    lo = stats.beta.ppf(alpha / 2, k, n - k + 1)
+    hi = stats.beta.ppf(1 - alpha / 2, k + 1, n - k) if k < n else 1.0
+    return p_value, (float(lo), float(hi))
+
+
+def stationary_bootstrap_indices(rng: np.random.Generator, n_samples: int, length: int, mean_block: float) -> np.ndarray:
+    """
+    (n_samples, length) index matrix for the Politis-Romano stationary bootstrap.
+
+    Each step continues the current block with probability 1 - 1/mean_block,
+    otherwise jumps to a uniform random start (wrapping circularly).
+    """
+    idx = np.empty((n_samples, length), dtype=np.int64)
+    idx[:, 0] = rng.integers(0, length, n_samples)
+    jumps = rng.random((n_samples, length)) < 1.0 / mean_block
+    starts = rng.integers(0, length, (n_samples, length))
+    for t in range(1, length):
+        idx[:, t] = np.where(jumps[:, t], starts[:, t], (idx[:, t - 1] + 1) % length)
+    return idx
+
+
+def _bootstrap_batch(seed, n: int, pnl: np.ndarray, mean_block: float) -> np.ndarray:
+    """Sharpe of n stationary-bootstrap resamples of pnl."""
+    rng = np.random.default_rng(seed)
+    return sharpe_rows(pnl[stationary_bootstrap_indices(rng, n, len(pnl), mean_block)])
+
+
+def _allocation_permutation_batch(seed, n: int, unit_pnl: np.ndarray, regime_weights: np.ndarray,
+                                  labels: np.ndarray) -> np.ndarray:
+    """
+    Sharpe of n label permutations under the regime allocation model.
+
+    Permuted day t trades the mean baseline allocation of regime labels[perm[t]]
+    on the fixed per-profile unit P&L - one (n, T, P) tensor product per batch.
+    """
+    rng = np.random.default_rng(seed)
+    perm = np.argsort(rng.random((n, len(labels))), axis=1)
+    weights = regime_weights[labels[perm]]  # (n, T, P)
+    return sharpe_rows(np.einsum('ntp,tp->nt', weights, unit_pnl))
+
+
+# Worker-process data (loaded once per worker, reused for every permutation)
+_WORKER_DATA: Optional[pd.DataFrame] = None
+
+
+def _init_permutation_worker(data: pd.DataFrame) -> None:
+    global _WORKER_DATA
+    _WORKER_DATA = data
+
+
+def _engine_sharpe(portfolio: pd.DataFrame) -> Tuple[float, float]:
+    if 'portfolio_pnl' not in portfolio.columns or len(portfolio) < 2:
+        return 0.0, 0.0
+    pnl = portfolio['portfolio_pnl'].values
+    return float(sharpe_rows(pnl)[0]), float(pnl.sum())
+
+
+def _engine_permutation_batch(seed, n: int) -> np.ndarray:
+    """Full RotationEngine re-runs on n label permutations of the worker's data."""
+    rng = np.random.default_rng(seed)
+    labels = _WORKER_DATA['regime'].values
+    sharpes = np.zeros(n)
+    for i in range(n):
+        permuted_data = _WORKER_DATA.copy()
+        permuted_data['regime'] = rng.permutation(labels)
+        try:
+            sharpes[i] = _engine_sharpe(_rotation_engine().run(data=permuted_data)['portfolio'])[0]
+        except Exception:
+            sharpes[i] = 0.0
+    return sharpes
+
+
+def _rotation_engine(**kwargs):
+    if RotationEngine is None:
+        raise ImportError("RotationEngine not importable - expected backtest.py under scripts/src")
+    return RotationEngine(**kwargs)
+
+
+def _engine_run(engine_kwargs: Dict, start_date: str, end_date: str) -> Tuple[float, float]:
+    """One RotationEngine backtest -> (sharpe, total P&L)."""
+    return _engine_sharpe(_rotation_engine(**engine_kwargs).run(start_date, end_date)['portfolio'])
+
+
+class RedTeamEngine:
+    """
+    Runs resampling tests as seeded batches across a process pool.
+
+    Batches are seeded from one SeedSequence, so results are reproducible
+    for a given seed regardless of n_jobs.
+    """
+
+    def __init__(self, n_jobs: Optional[int] = None, batch_size: int = 250, seed: int = 42):
+        self.n_jobs = n_jobs or os.cpu_count() or 1
+        self.batch_size = batch_size
+        self.seed = seed
+
+    def _batches(self, n_total: int) -> List[Tuple[np.random.SeedSequence, int]]:
+        sizes = [self.batch_size] * (n_total // self.batch_size)
+        if n_total % self.batch_size:
+            sizes.append(n_total % self.batch_size)
+        seeds = np.random.SeedSequence(self.seed).spawn(len(sizes))
+        return list(zip(seeds, sizes))
+
+    def map_batches(self, fn: Callable, n_total: int, *args,
+                    initializer: Optional[Callable] = None, initargs: Tuple = ()) -> np.ndarray:
+        """Evaluate fn(seed, n, *args) over batches covering n_total samples."""
+        batches = self._batches(n_total)
+        if self.n_jobs == 1 or len(batches) == 1:
+            if initializer is not None:
+                initializer(*initargs)
+            return np.concatenate([fn(seed, n, *args) for seed, n in batches])
+        with ProcessPoolExecutor(max_workers=self.n_jobs, initializer=initializer, initargs=initargs) as pool:
+            futures = [pool.submit(fn, seed, n, *args) for seed, n in batches]
+            return np.concatenate([f.result() for f in futures])
+
+    def map_runs(self, fn: Callable, arg_list: List[Tuple], return_exceptions: bool = False) -> List:
+        """
+        Evaluate independent full runs (e.g. parameter perturbations) in parallel.
+
+        With return_exceptions, a failing run yields its exception in place of
+        a result instead of failing the whole batch.
+        """
+        if self.n_jobs == 1 or len(arg_list) == 1:
+            results = []
+            for args in arg_list:
+                try:
+                    results.append(fn(*args))
+                except Exception as e:
+                    if not return_exceptions:
+                        raise
+                    results.append(e)
+            return results
+        with ProcessPoolExecutor(max_workers=min(self.n_jobs, len(arg_list))) as pool:
+            futures = [pool.submit(fn, *args) for args in arg_list]
+            if not return_exceptions:
+                return [f.result() for f in futures]
+            return [f.exception() or f.result() for f in futures]
+
+    def bootstrap_sharpe_ci(self, pnl: np.ndarray, n_boot: int = 2000, mean_block: float = 10.0,
+                            alpha: float = 0.05) -> Tuple[float, float]:
+        """Stationary block-bootstrap confidence interval of the Sharpe ratio."""
+        boot = self.map_batches(_bootstrap_batch, n_boot, np.asarray(pnl, dtype=float), mean_block)
+        return float(np.quantile(boot, alpha / 2)), float(np.quantile(boot, 1 - alpha / 2))
+
+
+def regime_allocation_model(portfolio: pd.DataFrame, labels: np.ndarray) -> Optional[Tuple[np.ndarray, np.ndarray, np.ndarray]]:
+    """
+    Invariant inputs for the vectorized permutation null.
+
+    Requires per-profile '<profile>_pnl' / '<profile>_weight' columns in the
+    engine's portfolio frame. Unit P&L is P&L per unit weight on allocated
+    days (flat otherwise); the regime table is each regime's mean allocation.
+
+    Returns:
+        (unit_pnl (T, P), regime_weights (K, P), label codes (T,)) or None
+    """
+    weight_cols = [c for c in portfolio.columns if c.endswith('_weight')]
+    pnl_cols = [c.replace('_weight', '_pnl') for c in weight_cols]
+    if not weight_cols or not all(c in portfolio.columns for c in pnl_cols) or len(labels) != len(portfolio):
+        return None
+
+    weights = portfolio[weight_cols].to_numpy(dtype=float)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        unit_pnl = np.where(weights > 0, portfolio[pnl_cols].to_numpy(dtype=float) / weights, 0.0)
+    codes, uniques = pd.factorize(labels)
+    regime_weights = np.vstack([weights[codes == k].mean(axis=0) for k in range(len(uniques))])
+    return unit_pnl, regime_weights, codes
+
+
+def allocation_model_pnl(model: Tuple[np.ndarray, np.ndarray, np.ndarray]) -> np.ndarray:
+    """Daily P&L of the unpermuted allocation model."""
+    unit_pnl, regime_weights, codes = model
+    return (regime_weights[codes] * unit_pnl).sum(axis=1)
 
 
 class OverfittingRedTeam:
     """Aggressive overfitting detection system."""
 
-    def __init__(self):
-        self.metrics_calc = PerformanceMetrics()
+    def __init__(self, n_permutations: int = 2000, n_bootstrap: int = 2000,
+                 permutation_mode: str = 'allocation', max_engine_permutations: int = 200,
+                 proxy_tolerance: float = 0.01, n_jobs: Optional[int] = None, batch_size: int = 250, seed: int = 42):
+        """
+        Args:
+            n_permutations: Label permutations for the significance test
+            n_bootstrap: Stationary bootstrap resamples for Sharpe CIs
+            permutation_mode: 'allocation' evaluates the regime allocation model in
+                vectorized batches (thousands per second; needs per-profile columns);
+                'engine' re-runs RotationEngine per permutation (exact, slow)
+            max_engine_permutations: Cap on full engine re-runs when 'allocation'
+                falls back to the engine
+            proxy_tolerance: Largest daily gap between the allocation model and the
+                real book, as a fraction of the largest daily |P&L|, before
+                'allocation' falls back to the engine (allocations that are not a
+                function of the regime alone make the model's null mis-specified)
+            n_jobs: Worker processes (default: all cores)
+            batch_size: Permutations / resamples per task
+            seed: Seed for all resampling
+        """
+        self.metrics_calc = PerformanceMetrics() if PerformanceMetrics is not None else None
+        self.n_permutations = n_permutations
+        self.n_bootstrap = n_bootstrap
+        self.permutation_mode = permutation_mode
+        self.max_engine_permutations = max_engine_permutations
+        self.proxy_tolerance = proxy_tolerance
+        self.engine = RedTeamEngine(n_jobs=n_jobs, batch_size=batch_size, seed=seed)
 
     def run_full_audit(self, start_date='2020-01-01', end_date='2024-12-31') -> Dict:
         """Run complete overfitting audit (fast version)."""
@@ -59,11 +296,11 @@ class OverfittingRedTeam:
         print("=" * 80)
         results['walk_forward'] = self.test_walk_forward_degradation(start_date, end_date)
 
-        # Test 4: Permutation Tests (REDUCED TO 10 ITERATIONS)
+        # Test 4: Permutation Tests
         print("\n" + "=" * 80)
-        print("TEST 4: PERMUTATION TESTS (10 iterations for speed)")
+        print(f"TEST 4: PERMUTATION TESTS ({self.n_permutations} permutations, {self.permutation_mode} mode)")
         print("=" * 80)
-        results['permutation'] = self.test_permutation_significance(start_date, end_date, n_iter=10)
+        results['permutation'] = self.test_permutation_significance(start_date, end_date, n_iter=self.n_permutations)
 
         # Test 5: Calculate Overall Risk Score
         print("\n" + "=" * 80)
@@ -129,12 +366,7 @@ class OverfittingRedTeam:
         print("\nTesting ±10% variations on rotation parameters...")
         print("(Regime and profile parameters harder to vary systematically)\n")
 
-        # Run baseline
-        print("  Running baseline...")
-        baseline_engine = RotationEngine()
-        baseline_results = baseline_engine.run(start_date, end_date)
-        baseline_sharpe = self._calculate_sharpe(baseline_results['portfolio'])
-        print(f"  Baseline Sharpe: {baseline_sharpe:.3f}")
+        t0 = time.perf_counter()
 
         # Test rotation parameters only (can be varied via constructor)
         test_configs = [
@@ -144,22 +376,23 @@ class OverfittingRedTeam:
             {'name': 'vix_scale_factor', 'baseline': 0.5, 'low': 0.45, 'high': 0.55}
         ]
 
-        sensitivity_results = []
-
+        # Baseline and all ±10% perturbations run in parallel
+        run_args = [({}, start_date, end_date)]
         for config in test_configs:
-            name = config['name']
+            run_args.append(({config['name']: config['low']}, start_date, end_date))
+            run_args.append(({config['name']: config['high']}, start_date, end_date))
+        print(f"  Running baseline + {len(run_args) - 1} perturbations on {self.engine.n_jobs} workers...")
+        runs = self.engine.map_runs(_engine_run, run_args)
+
+        baseline_sharpe = runs[0][0]
+        print(f"  Baseline Sharpe: {baseline_sharpe:.3f}")
 
-            # Test -10%
-            print(f"\n  Testing {name} -10%...")
-            low_engine = RotationEngine(**{name: config['low']})
-            low_results = low_engine.run(start_date, end_date)
-            low_sharpe = self._calculate_sharpe(low_results['portfolio'])
+        sensitivity_results = []
 
-            # Test +10%
-            print(f"  Testing {name} +10%...")
-            high_engine = RotationEngine(**{name: config['high']})
-            high_results = high_engine.run(start_date, end_date)
-            high_sharpe = self._calculate_sharpe(high_results['portfolio'])
+        for i, config in enumerate(test_configs):
+            name = config['name']
+            low_sharpe = runs[1 + 2 * i][0]
+            high_sharpe = runs[2 + 2 * i][0]
 
             # Calculate degradation
             low_deg = ((baseline_sharpe - low_sharpe) / baseline_sharpe * 100) if baseline_sharpe != 0 else 0
@@ -181,41 +414,40 @@ class OverfittingRedTeam:
             })
 
         fragile_count = sum(1 for r in sensitivity_results if r['is_fragile'])
+        runtime = time.perf_counter() - t0
         print(f"\n  Fragile parameters: {fragile_count}/{len(sensitivity_results)}")
+        print(f"  Runtime: {runtime:.1f}s")
 
         return {
             'baseline_sharpe': baseline_sharpe,
             'fragile_count': fragile_count,
-            'total_tests': len(sensitivity_results)
+            'total_tests': len(sensitivity_results),
+            'runtime_s': runtime
         }
 
     def test_walk_forward_degradation(self, start_date: str, end_date: str) -> Dict:
         """Test year-by-year performance consistency."""
         print("\nTesting year-by-year performance...\n")
 
+        t0 = time.perf_counter()
         years = ['2020', '2021', '2022', '2023', '2024']
         year_results = []
 
-        for year in years:
-            print(f"  Running {year}...")
-            engine = RotationEngine()
-
-            try:
-                results = engine.run(f'{year}-01-01', f'{year}-12-31')
-                sharpe = self._calculate_sharpe(results['portfolio'])
-                pnl = results['portfolio']['portfolio_pnl'].sum()
-
-                print(f"    Sharpe: {sharpe:.3f}, P&L: ${pnl:,.0f}")
-
-                year_results.append({
-                    'year': year,
-                    'sharpe': sharpe,
-                    'total_pnl': pnl
-                })
-
-            except Exception as e:
-                print(f"    ERROR: {e}")
-                year_results.append({'year': year, 'sharpe': 0, 'total_pnl': 0})
+        print(f"  Running {len(years)} years on {self.engine.n_jobs} workers...")
+        runs = self.engine.map_runs(_engine_run, [({}, f'{y}-01-01', f'{y}-12-31') for y in years],
+                                    return_exceptions=True)
+
+        for year, run in zip(years, runs):
+            if isinstance(run, Exception):
+                print(f"    {year} ERROR: {run}")
+                run = (0, 0)
+            sharpe, pnl = run
+            print(f"  {year}: Sharpe: {sharpe:.3f}, P&L: ${pnl:,.0f}")
+            year_results.append({
+                'year': year,
+                'sharpe': sharpe,
+                'total_pnl': pnl
+            })
 
         sharpe_values = [r['sharpe'] for r in year_results if r['sharpe'] != 0]
         sharpe_std = np.std(sharpe_values) if len(sharpe_values) > 1 else 0
@@ -229,68 +461,88 @@ class OverfittingRedTeam:
         if sharpe_std / sharpe_mean > 0.5 if sharpe_mean != 0 else False:
             print(f"    ⚠️  WARNING: High variability")
 
+        runtime = time.perf_counter() - t0
+        print(f"  Runtime: {runtime:.1f}s")
+
         return {
             'sharpe_mean': sharpe_mean,
             'sharpe_std': sharpe_std,
             'sharpe_cv': sharpe_std / sharpe_mean if sharpe_mean != 0 else 0,
-            'high_variability': (sharpe_std / sharpe_mean > 0.5) if sharpe_mean != 0 else False
+            'high_variability': (sharpe_std / sharpe_mean > 0.5) if sharpe_mean != 0 else False,
+            'runtime_s': runtime
         }
 
-    def test_permutation_significance(self, start_date: str, end_date: str, n_iter: int = 10) -> Dict:
+    def test_permutation_significance(self, start_date: str, end_date: str, n_iter: int = 2000) -> Dict:
         """Permutation test with shuffled regime labels."""
         print(f"\nRunning {n_iter} permutation tests...\n")
+        t0 = time.perf_counter()
 
         # Baseline
         print("  Running baseline...")
-        baseline_engine = RotationEngine()
+        baseline_engine = _rotation_engine()
         baseline_results = baseline_engine.run(start_date, end_date)
-        baseline_sharpe = self._calculate_sharpe(baseline_results['portfolio'])
-        baseline_pnl = baseline_results['portfolio']['portfolio_pnl'].sum()
+        baseline_portfolio = baseline_results['portfolio']
+        baseline_sharpe = self._calculate_sharpe(baseline_portfolio)
+        baseline_pnl = baseline_portfolio['portfolio_pnl'].sum()
 
         print(f"  Baseline Sharpe: {baseline_sharpe:.3f}")
         print(f"  Baseline P&L: ${baseline_pnl:,.0f}\n")
 
-        # Load data
+        # Load data once (invariant across permutations)
         from data.loaders import load_spy_data
         data = load_spy_data()
         data = data[(data['date'] >= pd.to_datetime(start_date).date()) &
                     (data['date'] <= pd.to_datetime(end_date).date())]
 
-        # Permutation tests
-        permuted_sharpes = []
-        permuted_pnls = []
-
-        for i in range(n_iter):
-            print(f"  Permutation {i+1}/{n_iter}...")
-
-            permuted_data = data.copy()
-            permuted_data['regime'] = np.random.permutation(data['regime'].values)
-
-            try:
-                engine = RotationEngine()
-                results = engine.run(data=permuted_data)
-
-                sharpe = self._calculate_sharpe(results['portfolio'])
-                pnl = results['portfolio']['portfolio_pnl'].sum()
-
-                permuted_sharpes.append(sharpe)
-                permuted_pnls.append(pnl)
-
-            except Exception:
-                permuted_sharpes.append(0)
-                permuted_pnls.append(0)
+        model = None
+        proxy_error = None
+        if self.permutation_mode == 'allocation':
+            model = regime_allocation_model(baseline_portfolio, data['regime'].values)
+            if model is None:
+                print("  Portfolio has no per-profile pnl/weight columns")
+            else:
+                book = baseline_portfolio['portfolio_pnl'].to_numpy(dtype=float)
+                proxy_error = float(np.max(np.abs(allocation_model_pnl(model) - book)))
+                print(f"  Allocation proxy max error: ${proxy_error:,.2f}/day")
+                if proxy_error > self.proxy_tolerance * np.max(np.abs(book)):
+                    print("  ⚠️  Proxy does not reproduce the book (allocations are not a function of the regime)")
+                    model = None
+            if model is None:
+                n_iter = min(n_iter, self.max_engine_permutations)
+                print(f"  Using {n_iter} full engine re-runs")
+
+        if model is not None:
+            unit_pnl, regime_weights, codes = model
+            permuted_sharpes = self.engine.map_batches(
+                _allocation_permutation_batch, n_iter, unit_pnl, regime_weights, codes
+            )
+            # Compare against the model's own unpermuted Sharpe (same approximation)
+            observed = float(sharpe_rows(allocation_model_pnl(model))[0])
+        else:
+            permuted_sharpes = self.engine.map_batches(
+                _engine_permutation_batch, n_iter,
+                initializer=_init_permutation_worker, initargs=(data,)
+            )
+            observed = baseline_sharpe
 
-        # Calculate p-value
-        p_value_sharpe = sum(1 for s in permuted_sharpes if s >= baseline_sharpe) / n_iter
+        # Calculate p-value (with Monte Carlo confidence interval)
+        p_value_sharpe, p_value_ci = monte_carlo_pvalue(permuted_sharpes, observed)
 
         mean_perm = np.mean(permuted_sharpes)
         std_perm = np.std(permuted_sharpes)
 
+        # Sampling uncertainty of the baseline Sharpe itself
+        sharpe_ci = self.engine.bootstrap_sharpe_ci(baseline_portfolio['portfolio_pnl'].values, self.n_bootstrap)
+        runtime = time.perf_counter() - t0
+
         print(f"\n  Results:")
-        print(f"    Actual Sharpe:     {baseline_sharpe:.3f}")
+        print(f"    Actual Sharpe:     {baseline_sharpe:.3f} (95% bootstrap CI {sharpe_ci[0]:.3f} .. {sharpe_ci[1]:.3f})")
+        if model is not None:
+            print(f"    Proxy Sharpe:      {observed:.3f} (tested statistic, max error ${proxy_error:,.2f}/day)")
         print(f"    Mean permuted:     {mean_perm:.3f}")
         print(f"    Std permuted:      {std_perm:.3f}")
-        print(f"    P-value (Sharpe):  {p_value_sharpe:.3f}")
+        print(f"    P-value (Sharpe):  {p_value_sharpe:.4f} (95% CI {p_value_ci[0]:.4f} .. {p_value_ci[1]:.4f})")
+        print(f"    Runtime:           {runtime:.1f}s ({n_iter / runtime:,.0f} permutations/s)")
 
         if p_value_sharpe > 0.05:
             print(f"    ⚠️  CRITICAL: Not statistically significant!")
@@ -299,9 +551,16 @@ class OverfittingRedTeam:
 
         return {
             'baseline_sharpe': baseline_sharpe,
+            'baseline_sharpe_ci': sharpe_ci,
+            'observed_sharpe': observed,
+            'proxy_max_error': proxy_error,
             'mean_permuted_sharpe': mean_perm,
             'p_value_sharpe': p_value_sharpe,
-            'is_significant': p_value_sharpe <= 0.05
+            'p_value_ci': p_value_ci,
+            'n_permutations': n_iter,
+            'mode': 'allocation' if model is not None else 'engine',
+            'is_significant': p_value_sharpe <= 0.05,
+            'runtime_s': runtime
         }
 
     def calculate_risk_score(self, results: Dict) -> Dict:
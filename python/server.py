@@ -12,17 +12,29 @@ Usage:
 Endpoints:
     GET  /health              - Health check and version
     GET  /regimes             - Regime heatmap (query: start_date, end_date)
-    POST /backtest            - Run a backtest
+    POST /backtest            - Run a backtest (body "async": true returns a job id)
+    POST /backtest/jobs       - Queue a backtest job
+    GET  /backtest/jobs/<id>  - Job status / progress (query: equity_since)
+    GET  /backtest/jobs/<id>/events - Progress stream (server-sent events)
+    GET  /backtest/jobs/<id>/result - Persisted job result
+    DELETE /backtest/jobs/<id> - Cancel a job
     GET  /strategies          - List all strategies
     GET  /strategies/<id>     - Get strategy card
     GET  /discovery           - Discovery matrix (strategies x regimes)
     POST /simulate            - Run scenario simulation
+
+Tabular payloads (/backtest, /backtest/jobs/<id>/result, /data/market) can be
+requested in a columnar format via the Accept header (see
+engine.api.transport); query params max_points (LTTB downsampling of the
+chart series), chunk_size (rows per streamed chunk) and table (Arrow only:
+which table to send) apply to those formats.
 """
 
 import os
+import json
 from dotenv import load_dotenv
 from datetime import datetime, timedelta
-from flask import Flask, jsonify, request
+from flask import Flask, Response, jsonify, request, stream_with_context
 
 # Load environment variables from .env file
 load_dotenv()
@@ -31,6 +43,8 @@ from flask_cors import CORS
 
 # Import business logic from routes module
 from engine.api.routes import get_api, STRATEGY_CATALOG, REGIME_DESCRIPTIONS
+from engine.api.jobs import JobStatus, get_job_queue
+from engine.api import transport
 
 # Create Flask app
 app = Flask(__name__)
@@ -41,6 +55,72 @@ CORS(app, resources={r"/*": {"origins": "*"}})
 # Engine version
 ENGINE_VERSION = "2.2.0"
 
+# Longest a synchronous POST /backtest waits before handing back the job id
+BACKTEST_SYNC_TIMEOUT = float(os.environ.get('BACKTEST_SYNC_TIMEOUT', 600))
+
+
+# =============================================================================
+# TABULAR RESPONSES
+# =============================================================================
+
+# Chart-bound series per table: (x column, y column) for LTTB downsampling
+CHART_SERIES = {
+    'equity_curve': ('date', 'equity'),
+    'data': ('timestamp', 'close'),
+}
+
+
+def tabular_response(payload, table_keys, status=200):
+    """
+    Serialize a response whose table_keys hold row records / DataFrames in
+    the format negotiated from the Accept header.
+
+    Plain JSON sends row records as they are, so existing clients are unchanged;
+    frames are only built for downsampling and the columnar formats.
+    """
+    fmt = transport.negotiate(request.headers.get('Accept'))
+    max_points = request.args.get('max_points', type=int)
+    chunk_size = request.args.get('chunk_size', default=transport.DEFAULT_CHUNK_SIZE, type=int)
+
+    tables = {}
+    for key in table_keys:
+        table = payload.get(key)
+        if table is None:
+            continue
+        if max_points and key in CHART_SERIES:
+            x, y = CHART_SERIES[key]
+            frame = transport.to_frame(table)
+            keep = transport.downsample_positions(frame, max_points, y=y,
+                                                  x=x if x in frame.columns else 'date')
+            if keep is not None:
+                # Row records stay the original dicts
+                table = frame.iloc[keep].reset_index(drop=True) if table is frame else [table[i] for i in keep]
+        tables[key] = table
+    meta = {k: v for k, v in payload.items() if k not in tables}
+
+    if fmt == transport.JSON:
+        body = dict(meta)
+        for key, table in tables.items():
+            body[key] = transport.to_records(table)
+        return jsonify(body), status
+
+    tables = {key: transport.to_frame(table) for key, table in tables.items()}
+    if fmt == transport.COLUMNAR_JSON:
+        return Response(json.dumps(transport.columnar_payload(meta, tables), default=str),
+                        status=status, mimetype=fmt)
+    if fmt == transport.NDJSON:
+        return Response(stream_with_context(transport.iter_columnar_chunks(meta, tables, chunk_size)),
+                        status=status, mimetype=fmt)
+
+    # Arrow IPC carries one table; the others stay in the metadata as records
+    name = request.args.get('table') or next(iter(tables), None)
+    frame = tables.pop(name) if name in tables else transport.to_frame([])
+    for key, other in tables.items():
+        meta[key] = transport.to_records(other)
+    meta['table'] = name
+    return Response(stream_with_context(transport.iter_arrow_stream(meta, frame, chunk_size)),
+                    status=status, mimetype=fmt)
+
 
 # =============================================================================
 # ENDPOINTS
@@ -58,6 +138,11 @@ def health():
             'GET  /health',
             'GET  /regimes?start_date=&end_date=',
             'POST /backtest',
+            'POST /backtest/jobs',
+            'GET  /backtest/jobs/<id>',
+            'GET  /backtest/jobs/<id>/events',
+            'GET  /backtest/jobs/<id>/result',
+            'DELETE /backtest/jobs/<id>',
             'GET  /strategies',
             'GET  /strategies/<id>',
             'GET  /discovery',
@@ -202,51 +287,126 @@ def run_backtest():
                     'error': f"Sanity check failed: {result.get('error')}"
                 }), 500
 
-        # ========== PREDICTIVE INTERCEPTOR ==========
-        # Check causal memory for known failure patterns
-        try:
-            import subprocess
-            import json as json_lib
-
-            interceptor_task = f"""Check if strategy '{strategy_key}' has historical failures in period {start_date} to {end_date}.
-
-Return JSON: {{"risk_level": "HIGH|MEDIUM|LOW", "mechanism": "why", "evidence": "data"}}
-If no risk: {{"risk_level": "LOW"}}"""
-
-            result_check = subprocess.run(
-                ['python3', 'scripts/deepseek_agent.py', interceptor_task, 'analyst'],
-                capture_output=True,
-                text=True,
-                timeout=30,
-                cwd=os.path.dirname(os.path.abspath(__file__))
-            )
-
-            if result_check.returncode == 0:
-                try:
-                    risk = json_lib.loads(result_check.stdout)
-                    if risk.get('risk_level') == 'HIGH':
-                        print(f"⚠️  PREDICTIVE INTERVENTION: High risk for {strategy_key}")
-                        print(f"    Mechanism: {risk.get('mechanism')}")
-                except (json_lib.JSONDecodeError, ValueError) as e:
-                    print(f"  [Interceptor] Failed to parse risk check: {e}")
-        except Exception as e:
-            print(f"[Interceptor] Check failed: {e}")
-        # ========== END INTERCEPTOR ==========
-
+        # Repeats are answered from the server's response cache; workers
+        # each have their own API instance, so the cache lives here
         api = get_api()
-        result = api.run_backtest(strategy_key, start_date, end_date, capital)
-
-        if result.get('success'):
-            print("[Backtest] Completed successfully")
-            return jsonify(result)
-        else:
+        if not data.get('async'):
+            cached = api.cached_backtest(strategy_key, start_date, end_date, capital)
+            if cached is not None:
+                print("[Backtest] Served from cache")
+                return tabular_response(cached, ('equity_curve', 'trades'))
+
+        # Runs on the job queue's process pool; the predictive interceptor
+        # runs concurrently instead of blocking the request
+        queue = get_job_queue()
+        submitted = queue.submit(strategy_key, start_date, end_date, capital,
+                                 priority=int(data.get('priority', 10)))
+        if data.get('async'):
+            return jsonify({'success': True, **submitted}), 202
+
+        job = queue.wait(submitted['job_id'], timeout=BACKTEST_SYNC_TIMEOUT)
+        if job['status'] not in JobStatus.FINAL:
+            # Still running: the client can follow it on /backtest/jobs/<id>
+            return jsonify({'success': False, 'error': 'backtest still running', **job}), 202
+        if job['status'] != JobStatus.COMPLETED:
+            result = queue.result(job['job_id']) or {'success': False, 'error': job.get('error') or job['status']}
             return jsonify(result), 400
 
+        result = queue.result(job['job_id'])
+        api.cache_backtest(strategy_key, start_date, end_date, capital, result)
+        if job.get('interceptor'):
+            result['interceptor'] = job['interceptor']
+        result['job_id'] = job['job_id']
+        print("[Backtest] Completed successfully")
+        return tabular_response(result, ('equity_curve', 'trades'))
+
     except Exception as e:
         print(f"[Backtest] Error: {e}")
         return jsonify({'success': False, 'error': str(e)}), 500
 
 
+# =============================================================================
+# BACKTEST JOB ENDPOINTS
+# =============================================================================
+
+@app.route('/backtest/jobs', methods=['POST'])
+def submit_backtest_job():
+    """
+    POST /backtest/jobs - Queue a backtest and return its job id immediately.
+
+    Request body: same as POST /backtest, plus optional "priority" (higher runs first).
+    Identical (strategy, date range, capital) requests join the live job.
+    """
+    data = request.get_json() or {}
+    params = data.get('params', {})
+    submitted = get_job_queue().submit(
+        data.get('strategy_key', 'profile_1'),
+        data.get('start_date') or params.get('startDate', '2023-01-01'),
+        data.get('end_date') or params.get('endDate', '2023-12-31'),
+        data.get('capital') or params.get('capital', 100000),
+        priority=int(data.get('priority', 0))
+    )
+    print(f"[Jobs] Submitted {submitted['job_id']} (deduplicated={submitted['deduplicated']})")
+    return jsonify({'success': True, **submitted}), 202
+
+
+@app.route('/backtest/jobs', methods=['GET'])
+def list_backtest_jobs():
+    """GET /backtest/jobs - All known jobs, newest first."""
+    return jsonify({'success': True, 'jobs': get_job_queue().list_jobs()})
+
+
+@app.route('/backtest/jobs/<job_id>', methods=['GET'])
+def get_backtest_job(job_id):
+    """
+    GET /backtest/jobs/<id> - Job status and progress (polling).
+
+    Query params:
+        equity_since: include partial equity curve points from this index
+    """
+    equity_since = request.args.get('equity_since', type=int)
+    job = get_job_queue().get(job_id, equity_since=equity_since)
+    if job is None:
+        return jsonify({'success': False, 'error': f'Unknown job: {job_id}'}), 404
+    return jsonify({'success': True, 'job': job})
+
+
+@app.route('/backtest/jobs/<job_id>/events', methods=['GET'])
+def stream_backtest_job(job_id):
+    """GET /backtest/jobs/<id>/events - Progress and new equity points as server-sent events."""
+    queue = get_job_queue()
+    if queue.get(job_id) is None:
+        return jsonify({'success': False, 'error': f'Unknown job: {job_id}'}), 404
+
+    def events():
+        for snapshot in queue.stream(job_id):
+            event = 'done' if snapshot['status'] in JobStatus.FINAL else 'progress'
+            yield f"event: {event}\ndata: {json.dumps(snapshot, default=str)}\n\n"
+
+    return Response(stream_with_context(events()), mimetype='text/event-stream',
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
+
+@app.route('/backtest/jobs/<job_id>/result', methods=['GET'])
+def get_backtest_job_result(job_id):
+    """GET /backtest/jobs/<id>/result - Persisted result (also after a server restart)."""
+    result = get_job_queue().result(job_id)
+    if result is None:
+        job = get_job_queue().get(job_id)
+        status = job['status'] if job else 'unknown'
+        return jsonify({'success': False, 'error': f'No result for job {job_id} (status: {status})'}), 404
+    return tabular_response(result, ('equity_curve', 'trades'))
+
+
+@app.route('/backtest/jobs/<job_id>', methods=['DELETE'])
+def cancel_backtest_job(job_id):
+    """DELETE /backtest/jobs/<id> - Cancel a queued or running job."""
+    if not get_job_queue().cancel(job_id):
+        return jsonify({'success': False, 'error': f'Job {job_id} is unknown or already finished'}), 409
+    print(f"[Jobs] Cancelled {job_id}")
+    return jsonify({'success': True, 'job_id': job_id})
+
+
 @app.route('/strategies', methods=['GET'])
 def list_strategies():
     """GET /strategies - List all available strategies."""
@@ -585,13 +745,21 @@ def get_market_data():
         else:
             # DataFrame or other result from Massive
             if hasattr(result, 'to_dict'):
-                return jsonify({
+                # Large frames are only inlined in columnar formats (or once
+                # downsampled with max_points); row-record JSON stays capped
+                columnar = transport.negotiate(request.headers.get('Accept')) != transport.JSON
+                max_points = request.args.get('max_points', type=int)
+                inline = columnar or len(result) < 1000 or (max_points and max_points < 1000)
+                return tabular_response({
                     'success': True,
                     'engine': 'massive',
                     'record_count': len(result),
-                    'data': result.to_dict('records') if len(result) < 1000 else None,
-                    'message': f'{len(result)} records retrieved' if len(result) >= 1000 else None
-                })
+                    'data': result if inline else None,
+                    'message': None if inline else (
+                        f'{len(result)} records retrieved; request Accept: {transport.ARROW_STREAM} '
+                        f'or {transport.COLUMNAR_JSON}, or set max_points, to receive them'
+                    )
+                }, ('data',))
             else:
                 return jsonify({
                     'success': True,
@@ -728,6 +896,7 @@ def run_server(port: int = 5001, debug: bool = False):
     print("  GET  /health                        - Health check")
     print("  GET  /regimes?start_date=&end_date= - Regime heatmap")
     print("  POST /backtest                      - Run backtest")
+    print("  POST /backtest/jobs                 - Queue backtest job (progress: /backtest/jobs/<id>/events)")
     print("  GET  /strategies                    - List all strategies")
     print("  GET  /strategies/<id>               - Get strategy card")
     print("  GET  /discovery                     - Discovery matrix")
@@ -0,0 +1,210 @@
+#!/usr/bin/env python3
+"""
+Active Return Book Tests
+========================
+Validates portfolio-contribution scoring against the aligned active-return
+matrix.
+
+Tests:
+1. calculate_portfolio_contribution matches the Series-based implementation,
+   including NaN returns and partially overlapping dates
+2. Batch scores match single-candidate scores and pandas correlations
+3. add / remove / sync keep the book aligned
+"""
+
+import sys
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import os
+from types import SimpleNamespace
+
+import pytest
+import numpy as np
+import pandas as pd
+
+
+# =============================================================================
+# TEST FIXTURES
+# =============================================================================
+
+@pytest.fixture(scope='module')
+def daemon(tmp_path_factory):
+    """Import daemon.py from a scratch directory (it opens its log file on import)."""
+    cwd = os.getcwd()
+    os.chdir(tmp_path_factory.mktemp('daemon'))
+    try:
+        import daemon
+    finally:
+        os.chdir(cwd)
+    return daemon
+
+
+def reference_contribution(candidate_returns, existing_returns):
+    """calculate_portfolio_contribution before the return book (equal weights)."""
+    if not existing_returns or candidate_returns.empty:
+        return 1.0
+
+    aligned_returns = []
+    for er in existing_returns:
+        aligned = candidate_returns.align(er, join='inner')[1]
+        if len(aligned) > 20:
+            aligned_returns.append(aligned)
+    if not aligned_returns:
+        return 1.0
+
+    correlations = [c for c in (candidate_returns.corr(er) for er in aligned_returns) if not np.isnan(c)]
+    if not correlations:
+        return 1.0
+    avg_corr = np.mean(correlations)
+
+    weights = [1.0 / len(aligned_returns)] * len(aligned_returns)
+    portfolio_returns = sum(w * r for w, r in zip(weights, aligned_returns))
+
+    crisis_alpha = 0
+    portfolio_down_mask = portfolio_returns < 0
+    if portfolio_down_mask.sum() > 10:
+        candidate_during_portfolio_down = candidate_returns[portfolio_down_mask].mean()
+        portfolio_during_down = portfolio_returns[portfolio_down_mask].mean()
+        if portfolio_during_down < 0:
+            crisis_alpha = candidate_during_portfolio_down / abs(portfolio_during_down)
+
+    if avg_corr < -0.3 and crisis_alpha > 0.5:
+        multiplier = 5.0
+    elif avg_corr < 0:
+        multiplier = 2.0 + (abs(avg_corr) * 3.0)
+    elif avg_corr < 0.3:
+        multiplier = 1.0 + (0.3 - avg_corr)
+    elif avg_corr < 0.7:
+        multiplier = 1.0 - (avg_corr - 0.3) * 0.5
+    else:
+        multiplier = 0.1
+    return round(multiplier, 2)
+
+
+def random_case(rng):
+    """Candidate plus 1-5 strategies on overlapping date ranges, with NaN gaps."""
+    factor = rng.normal(0, 0.01, 120)
+
+    def series(start, length):
+        beta = rng.uniform(-1.5, 1.5)
+        values = beta * factor[start:start + length] + rng.normal(0, 0.01, length)
+        values[rng.random(length) < rng.uniform(0, 0.4)] = np.nan
+        return pd.Series(values, index=np.arange(start, start + length))
+
+    existing = [series(rng.integers(0, 40), rng.integers(15, 80)) for _ in range(rng.integers(1, 6))]
+    candidate = series(rng.integers(0, 30), rng.integers(20, 90))
+    return candidate, existing
+
+
+# =============================================================================
+# EQUIVALENCE TESTS
+# =============================================================================
+
+class TestContributionEquivalence:
+    """Single-candidate wrapper against the Series implementation."""
+
+    def test_matches_reference_with_nans(self, daemon):
+        rng = np.random.default_rng(35)
+        compared = 0
+        for _ in range(400):
+            candidate, existing = random_case(rng)
+            try:
+                expected = reference_contribution(candidate, existing)
+            except pd.errors.IndexingError:
+                continue  # Old boolean indexing rejected unequal date ranges
+            assert daemon.calculate_portfolio_contribution(candidate, existing) == expected
+            compared += 1
+
+        assert compared > 100
+
+    def test_identical_dates(self, daemon):
+        rng = np.random.default_rng(7)
+        for _ in range(100):
+            candidate, existing = random_case(rng)
+            existing = [er.reindex(candidate.index) for er in existing]
+            expected = reference_contribution(candidate, existing)
+            assert daemon.calculate_portfolio_contribution(candidate, existing) == expected
+
+    def test_overlap_counts_nan_dates(self, daemon):
+        # 30 shared dates but only 12 with both values: the strategy still
+        # counts as overlapping, as it did with Series.align
+        index = np.arange(30)
+        strategy = pd.Series(np.linspace(-0.01, 0.01, 30), index=index)
+        candidate = pd.Series(-strategy.to_numpy(), index=index)
+        candidate.iloc[::5] = np.nan
+        candidate.iloc[1::5] = np.nan
+        candidate.iloc[2::5] = np.nan
+
+        book = daemon.ActiveReturnBook()
+        book.add('s', strategy)
+        scores = book.score([candidate])
+
+        assert scores.avg_correlation[0] == pytest.approx(-1.0)
+        assert scores.multiplier[0] == reference_contribution(candidate, [strategy]) == 5.0
+
+
+# =============================================================================
+# BOOK TESTS
+# =============================================================================
+
+class TestActiveReturnBook:
+    """Batch scoring and incremental maintenance."""
+
+    def test_batch_matches_single(self, daemon):
+        rng = np.random.default_rng(1)
+        _, existing = random_case(rng)
+        candidates = [random_case(rng)[0] for _ in range(12)]
+
+        book = daemon.ActiveReturnBook()
+        for i, er in enumerate(existing):
+            book.add(f's{i}', er)
+        scores = book.score(candidates)
+
+        for k, candidate in enumerate(candidates):
+            single = book.score([candidate])
+            np.testing.assert_allclose(scores.correlations[k], single.correlations[0], equal_nan=True)
+            assert scores.multiplier[k] == single.multiplier[0]
+            for i, er in enumerate(existing):
+                if np.isfinite(scores.correlations[k, i]):
+                    assert scores.correlations[k, i] == pytest.approx(candidate.corr(er))
+
+    def test_add_remove_sync(self, daemon):
+        book = daemon.ActiveReturnBook()
+        book.add('a', pd.Series([0.01, -0.02, 0.03], index=[0, 1, 2]))
+        book.add('b', pd.Series([0.02, np.nan], index=[2, 5]))
+        book.add('a', pd.Series([0.05], index=[9]))             # Replace
+        assert book.strategy_ids == ['b', 'a']
+
+        rows = {'active': [{'id': 'b'}, {'id': 'c'}, {'id': 'd'}],
+                'details': [{'id': 'c', 'metadata': {'daily_returns': [0.01] * 25}},
+                            {'id': 'd', 'metadata': {}}]}
+
+        class Query:
+            def __init__(self, data):
+                self.data = data
+
+            def select(self, *args):
+                return Query(rows['details'] if 'metadata' in args else rows['active'])
+
+            def eq(self, *args):
+                return self
+
+            def in_(self, *args):
+                return self
+
+            def execute(self):
+                return SimpleNamespace(data=self.data)
+
+        supabase = SimpleNamespace(table=lambda name: Query(None))
+        assert book.sync(supabase) == (1, 1)
+        assert book.strategy_ids == ['b', 'c']
+
+        # 'd' has no stored returns: not re-fetched, dropped once retired
+        rows['active'] = [{'id': 'b'}]
+        assert book.sync(supabase) == (0, 2)
+        assert book.strategy_ids == ['b']
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
@@ -0,0 +1,204 @@
+#!/usr/bin/env python3
+"""
+API Response Caching Tests
+==========================
+Validates precomputed regime labels and the response cache behind the
+/regimes, /discovery and /backtest endpoints using synthetic SPY data.
+
+Tests:
+1. Heatmap payload matches the original iterrows row builder
+2. Labels are computed once per data version and reused from disk
+3. Range slicing is inclusive and binary-searched
+4. LRU eviction, shallow copies, and data-version keys
+5. Backtest responses are cached in the server process, per data version
+"""
+
+import sys
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import pytest
+import numpy as np
+import pandas as pd
+
+
+# =============================================================================
+# TEST FIXTURES
+# =============================================================================
+
+@pytest.fixture
+def routes_module():
+    """The routes module pulls in engine.trading; skip when unavailable."""
+    try:
+        import engine.api.routes  # noqa: F401  (first import may trip on a partial package)
+    except ImportError:
+        pass
+    return pytest.importorskip("engine.api.routes")
+
+
+@pytest.fixture
+def spy_data() -> pd.DataFrame:
+    """Three years of synthetic daily SPY bars with RV / slope / VIX columns."""
+    rng = np.random.default_rng(11)
+    dates = pd.bdate_range('2022-01-03', '2024-12-31')
+    close = 400 * np.exp(np.cumsum(rng.normal(0.0003, 0.01, len(dates))))
+    rv5 = np.abs(rng.normal(0.15, 0.05, len(dates)))
+    rv5[::37] = np.nan
+    return pd.DataFrame({
+        'date': dates.date,
+        'close': close,
+        'RV5': rv5,
+        'RV20': np.abs(rng.normal(0.15, 0.03, len(dates))),
+        'slope': rng.normal(0, 1, len(dates)),
+        'iv': rng.uniform(12, 35, len(dates)),
+    })
+
+
+@pytest.fixture
+def api(routes_module, spy_data, tmp_path, monkeypatch):
+    monkeypatch.setenv('REGIME_LABELS_DIR', str(tmp_path))
+    calls = {'load': 0}
+
+    def fake_load():
+        calls['load'] += 1
+        return spy_data.copy()
+
+    monkeypatch.setattr(routes_module, 'load_spy_data', fake_load)
+    instance = routes_module.QuantEngineAPI()
+    instance.calls = calls
+    return instance
+
+
+def reference_heatmap(routes_module, spy_df, start_date, end_date):
+    """Original row builder (iterrows) over labels for the full history, then filtered."""
+    labeled = routes_module.RegimeEngine().label_historical_data(spy_df)
+    start = pd.Timestamp(start_date).date()
+    end = pd.Timestamp(end_date).date()
+    labeled = labeled[(labeled['date'] >= start) & (labeled['date'] <= end)]
+
+    rows = []
+    for _, row in labeled.iterrows():
+        rows.append({
+            'date': row['date'].strftime('%Y-%m-%d'),
+            'regime': row['regime'],
+            'regime_id': 0,
+            'confidence': 0.85,
+            'metrics': {
+                'rv5': float(row['RV5']) if pd.notna(row['RV5']) else None,
+                'rv20': float(row['RV20']) if pd.notna(row['RV20']) else None,
+                'close': float(row['close']),
+                'trend': 'up' if row['slope'] > 0 else 'down',
+            },
+            'description': routes_module.REGIME_DESCRIPTIONS.get(row['regime'], 'Unknown market state.'),
+        })
+    return rows
+
+
+# =============================================================================
+# REGIME LABEL TESTS
+# =============================================================================
+
+class TestRegimeLabels:
+    """Precomputed labels must reproduce the per-request heatmap."""
+
+    def test_matches_reference_builder(self, routes_module, api, spy_data):
+        result = api.get_regime_heatmap('2023-03-01', '2024-06-30')
+        expected = reference_heatmap(routes_module, spy_data, '2023-03-01', '2024-06-30')
+
+        assert result['success']
+        assert result['count'] == len(expected)
+        assert result['data'] == expected
+
+    def test_labels_computed_once_per_version(self, routes_module, api, spy_data, tmp_path, monkeypatch):
+        api.get_regime_heatmap('2023-01-01', '2023-06-30')
+        files = list(tmp_path.glob('regimes_*.arrow'))
+        assert len(files) == 1
+
+        # A fresh API instance (e.g. after restart) memory-maps the stored labels
+        def fail(*args, **kwargs):
+            raise AssertionError('labels recomputed')
+
+        fresh = routes_module.QuantEngineAPI()
+        monkeypatch.setattr(fresh.regime_engine, 'label_historical_data', fail)
+        result = fresh.get_regime_heatmap('2023-07-01', '2023-12-31')
+        assert result['success'] and result['count'] > 100
+
+        # New data produces a new version (and replaces the stale file)
+        changed = spy_data.copy()
+        changed.loc[changed.index[-1], 'close'] += 1
+        monkeypatch.setattr(routes_module, 'load_spy_data', lambda: changed.copy())
+        api._get_spy_data(force_reload=True)
+        api.get_regime_heatmap('2023-01-01', '2023-06-30')
+        assert [f.name for f in tmp_path.glob('regimes_*.arrow')] == [f"regimes_{api.data_version}.arrow"]
+
+    def test_slice_inclusive(self, api):
+        api.get_regime_heatmap('2023-01-01', '2023-01-31')
+        columns = api.regime_labels.slice(pd.Timestamp('2023-02-03').date(), pd.Timestamp('2023-02-10').date())
+
+        assert list(np.datetime_as_string(columns['date'])) == [
+            '2023-02-03', '2023-02-06', '2023-02-07', '2023-02-08', '2023-02-09', '2023-02-10'
+        ]
+        assert len(columns['regime']) == 6
+
+    def test_empty_range(self, api):
+        result = api.get_regime_heatmap('1990-01-01', '1990-12-31')
+
+        assert not result['success']
+        assert 'No data available' in result['error']
+
+
+# =============================================================================
+# RESPONSE CACHE TESTS
+# =============================================================================
+
+class TestResponseCache:
+    """LRU behavior and cache keys."""
+
+    def test_lru_eviction_and_copies(self, routes_module):
+        cache = routes_module.ResponseCache(max_entries=2)
+        cache.put('regimes', {'a': 1}, 'v1', {'data': [1]})
+        cache.put('regimes', {'a': 2}, 'v1', {'data': [2]})
+        assert cache.get('regimes', {'a': 1}, 'v1') == {'data': [1]}
+
+        cache.put('regimes', {'a': 3}, 'v1', {'data': [3]})
+        assert cache.get('regimes', {'a': 2}, 'v1') is None
+        assert cache.get('regimes', {'a': 1}, 'v2') is None
+
+        hit = cache.get('regimes', {'a': 1}, 'v1')
+        hit['current_regime'] = 'BULL'
+        assert 'current_regime' not in cache.get('regimes', {'a': 1}, 'v1')
+        assert cache.hits == 3 and cache.misses == 2
+
+    def test_repeated_requests_hit_cache(self, api):
+        first = api.get_regime_heatmap('2023-01-01', '2023-12-31')
+        second = api.get_regime_heatmap('2023-01-01', '2023-12-31')
+
+        assert second == first and second['data'] is first['data']
+        assert api.calls['load'] == 1
+        assert api.get_discovery_matrix() == api.get_discovery_matrix()
+        assert api.response_cache.hits == 2
+
+    def test_backtest_cached_in_server_process(self, api, spy_data, monkeypatch, routes_module):
+        args = ('profile_1', '2023-01-01', '2023-12-31', 100000)
+        assert api.cached_backtest(*args) is None
+
+        # A worker's result, computed on the same data
+        response = {'success': True, 'metrics': {'sharpe': 1.0}, 'data_version': api.data_version}
+        api.cache_backtest(*args, response)
+        api.cache_backtest('profile_2', '2023-01-01', '2023-12-31', 100000,
+                           {'success': False, 'error': 'No data', 'data_version': api.data_version})
+
+        assert api.cached_backtest(*args) == response
+        assert api.cached_backtest('profile_1', '2023-01-01', '2023-12-31', 100000.0) == response
+        assert api.cached_backtest('profile_2', '2023-01-01', '2023-12-31', 100000) is None
+
+        # New data invalidates the cached response
+        changed = spy_data.copy()
+        changed.loc[0, 'close'] += 1
+        monkeypatch.setattr(routes_module, 'load_spy_data', lambda: changed)
+        api._get_spy_data(force_reload=True)
+        assert api.cached_backtest(*args) is None
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
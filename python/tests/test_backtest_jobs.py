@@ -0,0 +1,233 @@
+#!/usr/bin/env python3
+"""
+Backtest Job Queue Tests
+========================
+Exercises the process-pool job queue behind POST /backtest/jobs with
+lightweight runners (no market data needed).
+
+Tests:
+1. Submit returns immediately; result is persisted and re-fetchable
+2. Progress and partial equity stream in order
+3. Identical requests share one live job
+4. Priorities order queued jobs
+5. Cancellation of queued and running jobs
+6. Failures are reported
+7. A crashed worker fails its job and the pool recovers
+8. Persisted results are bounded
+"""
+
+import sys
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import os
+import time
+from concurrent.futures import Future
+
+import pytest
+
+from engine.api.jobs import BacktestJob, BacktestJobQueue, JobStatus
+
+
+# =============================================================================
+# TEST RUNNERS (module level so worker processes can import them)
+# =============================================================================
+
+def equity_runner(ctx, params):
+    ctx.progress(0.5, 'simulating')
+    curve = [{'date': f'd{i}', 'equity': params['capital'] + i} for i in range(1200)]
+    ctx.equity(curve)
+    return {'success': True, 'metrics': {'total_return': 0.1}, 'equity_curve': curve,
+            'strategy': params['strategy_key']}
+
+
+def slow_runner(ctx, params):
+    for i in range(100):
+        ctx.checkpoint()
+        ctx.progress(i / 100, 'working')
+        time.sleep(0.05)
+    return {'success': True, 'strategy': params['strategy_key']}
+
+
+def failing_runner(ctx, params):
+    return {'success': False, 'error': 'No data for period'}
+
+
+def crashing_runner(ctx, params):
+    if params['strategy_key'] == 'crash':
+        os._exit(1)
+    return {'success': True, 'strategy': params['strategy_key']}
+
+
+def fake_interceptor(strategy_key, start_date, end_date):
+    return {'risk_level': 'LOW'}
+
+
+# =============================================================================
+# TEST FIXTURES
+# =============================================================================
+
+@pytest.fixture
+def make_queue(tmp_path):
+    queues = []
+
+    def factory(runner, max_workers=1, interceptor=None, **kwargs):
+        queue = BacktestJobQueue(max_workers=max_workers, jobs_dir=str(tmp_path),
+                                 runner=runner, interceptor=interceptor, **kwargs)
+        queues.append(queue)
+        return queue
+
+    yield factory
+    for queue in queues:
+        queue.shutdown()
+
+
+# =============================================================================
+# QUEUE TESTS
+# =============================================================================
+
+class TestJobQueue:
+    """Submit / progress / result lifecycle."""
+
+    def test_submit_and_fetch_result(self, make_queue, tmp_path):
+        queue = make_queue(equity_runner, interceptor=fake_interceptor)
+
+        t0 = time.perf_counter()
+        submitted = queue.submit('profile_1', '2023-01-01', '2023-12-31', 100000)
+        assert time.perf_counter() - t0 < 0.5
+        assert submitted['status'] == JobStatus.QUEUED
+
+        job = queue.wait(submitted['job_id'], timeout=60)
+        assert job['status'] == JobStatus.COMPLETED
+        assert job['progress'] == 1.0
+        assert job['equity_points'] == 1200
+
+        result = queue.result(submitted['job_id'])
+        assert result['strategy'] == 'profile_1'
+        assert (tmp_path / f"{submitted['job_id']}.json").exists()
+
+        deadline = time.time() + 5
+        while queue.get(submitted['job_id'])['interceptor'] is None and time.time() < deadline:
+            time.sleep(0.05)
+        assert queue.get(submitted['job_id'])['interceptor'] == {'risk_level': 'LOW'}
+
+    def test_stream_delivers_equity_incrementally(self, make_queue):
+        queue = make_queue(equity_runner)
+        job_id = queue.submit('profile_2', '2023-01-01', '2023-12-31', 5000)['job_id']
+
+        snapshots = list(queue.stream(job_id, heartbeat=1.0))
+        points = [p for s in snapshots for p in s['equity_curve']]
+
+        assert snapshots[-1]['status'] == JobStatus.COMPLETED
+        assert [p['equity'] for p in points] == [5000 + i for i in range(1200)]
+
+    def test_identical_requests_deduplicated(self, make_queue):
+        queue = make_queue(slow_runner)
+        first = queue.submit('profile_3', '2022-01-01', '2022-12-31', 100000)
+        second = queue.submit('profile_3', '2022-01-01', '2022-12-31', 100000.0)
+        other = queue.submit('profile_3', '2022-01-01', '2022-12-31', 50000)
+
+        assert second['deduplicated'] and second['job_id'] == first['job_id']
+        assert not other['deduplicated'] and other['job_id'] != first['job_id']
+        queue.cancel(first['job_id'])
+        queue.cancel(other['job_id'])
+
+    def test_priority_orders_queued_jobs(self, make_queue):
+        queue = make_queue(equity_runner)
+        blocker = queue.submit('blocker', '2020-01-01', '2020-12-31', 1)['job_id']
+        low = queue.submit('low', '2020-01-01', '2020-12-31', 1, priority=0)['job_id']
+        high = queue.submit('high', '2020-01-01', '2020-12-31', 1, priority=5)['job_id']
+
+        for job_id in (blocker, low, high):
+            queue.wait(job_id, timeout=60)
+        assert queue.get(high)['started_at'] <= queue.get(low)['started_at']
+
+    def test_cancel_queued_and_running(self, make_queue):
+        queue = make_queue(slow_runner)
+        running = queue.submit('a', '2020-01-01', '2020-12-31', 1)['job_id']
+        queued = queue.submit('b', '2020-01-01', '2020-12-31', 1)['job_id']
+
+        deadline = time.time() + 30
+        while queue.get(running)['progress'] == 0 and time.time() < deadline:
+            time.sleep(0.05)
+
+        assert queue.cancel(queued)
+        assert queue.get(queued)['status'] == JobStatus.CANCELLED
+        assert queue.cancel(running)
+
+        job = queue.wait(running, timeout=30)
+        assert job['status'] == JobStatus.CANCELLED
+        assert queue.result(running) is None
+        assert not queue.cancel(running)
+
+    def test_failure_reported(self, make_queue):
+        queue = make_queue(failing_runner)
+        job_id = queue.submit('profile_1', '1990-01-01', '1990-12-31', 1)['job_id']
+
+        job = queue.wait(job_id, timeout=60)
+        assert job['status'] == JobStatus.FAILED
+        assert job['error'] == 'No data for period'
+        assert queue.result(job_id)['success'] is False
+
+
+# =============================================================================
+# RECOVERY TESTS
+# =============================================================================
+
+class TestJobQueueRecovery:
+    """Worker crashes, unusable pools and result retention."""
+
+    def test_worker_crash_fails_job_and_pool_recovers(self, make_queue):
+        queue = make_queue(crashing_runner)
+        crashed = queue.submit('crash', '2020-01-01', '2020-12-31', 1)['job_id']
+        after = queue.submit('after', '2020-01-01', '2020-12-31', 1)['job_id']
+
+        job = queue.wait(crashed, timeout=60)
+        assert job['status'] == JobStatus.FAILED and job['error']
+        assert queue.wait(after, timeout=60)['status'] == JobStatus.COMPLETED
+        assert queue.result(after)['strategy'] == 'after'
+
+    def test_submit_failure_fails_job_and_pool_recovers(self, make_queue):
+        queue = make_queue(crashing_runner)
+        queue._pool.shutdown()
+
+        failed = queue.submit('a', '2020-01-01', '2020-12-31', 1)['job_id']
+        job = queue.wait(failed, timeout=60)
+        assert job['status'] == JobStatus.FAILED
+        assert 'worker pool unavailable' in job['error']
+
+        ok = queue.submit('b', '2020-01-01', '2020-12-31', 1)['job_id']
+        assert queue.wait(ok, timeout=60)['status'] == JobStatus.COMPLETED
+
+    def test_cancelled_future_cancels_job(self, make_queue):
+        queue = make_queue(crashing_runner)
+        with queue._lock:
+            queue._jobs['j1'] = BacktestJob(job_id='j1', key='k1', params={}, status=JobStatus.RUNNING)
+            queue._running = 1
+
+        future = Future()
+        future.cancel()
+        queue._on_done('j1', queue._pool, future)
+
+        assert queue.get('j1')['status'] == JobStatus.CANCELLED
+        assert queue._running == 0
+
+    def test_persisted_results_are_bounded(self, make_queue, tmp_path):
+        for i in range(4):
+            path = tmp_path / f'old{i}.json'
+            path.write_text('{}')
+            os.utime(path, (1000 + i, 1000 + i))
+
+        queue = make_queue(equity_runner, max_results=3)
+        assert sorted(p.stem for p in tmp_path.glob('*.json')) == ['old1', 'old2', 'old3']
+
+        job_id = queue.submit('profile_1', '2023-01-01', '2023-12-31', 1)['job_id']
+        queue.wait(job_id, timeout=60)
+        queue.submit('profile_2', '2023-01-01', '2023-12-31', 1)
+
+        assert queue.result(job_id)['strategy'] == 'profile_1'
+        assert sorted(p.stem for p in tmp_path.glob('*.json')) == sorted(['old2', 'old3', job_id])
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
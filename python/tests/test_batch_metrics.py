@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+"""
+Batch Performance Metrics Tests
+===============================
+Validates the batched statistics engine against the per-series
+PerformanceMetrics calculations and straightforward references.
+
+Tests:
+1. Sharpe / Sortino match PerformanceMetrics column by column
+2. Max drawdown / Calmar match a compounded equity loop
+3. Count-matrix bootstrap equals explicit resampling
+4. Chunking and process parallelism do not change results
+5. PSR / DSR ordering and multiple-testing adjustments
+"""
+
+import sys
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import pytest
+import numpy as np
+import pandas as pd
+
+from engine.analysis.metrics import (
+    BatchPerformanceMetrics,
+    PerformanceMetrics,
+    adjust_pvalues,
+    expected_max_sharpe,
+    stationary_bootstrap_counts,
+)
+
+
+# =============================================================================
+# TEST FIXTURES
+# =============================================================================
+
+@pytest.fixture
+def strategy_returns() -> pd.DataFrame:
+    """500 days x 40 strategies; the first five have real drift."""
+    rng = np.random.default_rng(3)
+    returns = rng.normal(0.0002, 0.01, size=(500, 40))
+    returns[:, :5] += 0.0015
+    return pd.DataFrame(returns, columns=[f's{i}' for i in range(40)])
+
+
+# =============================================================================
+# POINT METRIC TESTS
+# =============================================================================
+
+class TestPointMetrics:
+    """Vectorized point estimates must match the per-series versions."""
+
+    def test_sharpe_sortino_match_single_series(self, strategy_returns):
+        graded = BatchPerformanceMetrics(n_bootstrap=0).grade(strategy_returns)
+        single = PerformanceMetrics()
+
+        for name in strategy_returns.columns[:10]:
+            assert graded.loc[name, 'sharpe'] == pytest.approx(single.sharpe_ratio(strategy_returns[name]), rel=1e-10)
+            assert graded.loc[name, 'sortino'] == pytest.approx(single.sortino_ratio(strategy_returns[name]), rel=1e-10)
+
+    def test_drawdown_and_calmar(self, strategy_returns):
+        graded = BatchPerformanceMetrics(n_bootstrap=0).grade(strategy_returns)
+
+        for name in strategy_returns.columns[:10]:
+            value, peak, max_dd = 1.0, 1.0, 0.0
+            for r in strategy_returns[name]:
+                value *= 1 + r
+                peak = max(peak, value)
+                max_dd = min(max_dd, value / peak - 1)
+            cagr = value ** (252 / len(strategy_returns)) - 1
+
+            assert graded.loc[name, 'max_drawdown'] == pytest.approx(max_dd, rel=1e-10)
+            assert graded.loc[name, 'calmar'] == pytest.approx(cagr / abs(max_dd), rel=1e-10)
+
+    def test_nan_is_flat_day(self, strategy_returns):
+        with_nan = strategy_returns.copy()
+        with_nan.iloc[10:20, 0] = np.nan
+        flat = strategy_returns.copy()
+        flat.iloc[10:20, 0] = 0.0
+
+        engine = BatchPerformanceMetrics(n_bootstrap=0)
+        pd.testing.assert_frame_equal(engine.grade(with_nan), engine.grade(flat))
+
+
+# =============================================================================
+# BOOTSTRAP TESTS
+# =============================================================================
+
+class TestBootstrap:
+    """Stationary bootstrap intervals."""
+
+    def test_counts_are_valid_resamples(self):
+        counts = stationary_bootstrap_counts(200, 50, mean_block=8, seed=1)
+
+        assert counts.shape == (50, 200)
+        assert (counts.sum(axis=1) == 200).all()
+        assert (counts >= 0).all()
+
+    def test_count_sums_equal_explicit_resampling(self, strategy_returns):
+        rng = np.random.default_rng(0)
+        R = strategy_returns.values
+        idx = rng.integers(0, len(R), size=(30, len(R)))
+        counts = np.stack([np.bincount(row, minlength=len(R)) for row in idx]).astype(float)
+
+        np.testing.assert_allclose(counts @ R, R[idx].sum(axis=1), atol=1e-12)
+        np.testing.assert_allclose(counts @ R ** 2, (R[idx] ** 2).sum(axis=1), atol=1e-12)
+
+    def test_interval_brackets_estimate(self, strategy_returns):
+        graded = BatchPerformanceMetrics(n_bootstrap=500).grade(strategy_returns)
+
+        assert (graded['sharpe_ci_low'] < graded['sharpe']).all()
+        assert (graded['sharpe'] < graded['sharpe_ci_high']).all()
+
+    def test_chunking_and_processes_invariant(self, strategy_returns):
+        full = BatchPerformanceMetrics(n_bootstrap=200, chunk_size=1024).grade(strategy_returns)
+        chunked = BatchPerformanceMetrics(n_bootstrap=200, chunk_size=7, n_jobs=2).grade(strategy_returns)
+
+        pd.testing.assert_frame_equal(full, chunked, rtol=1e-12)
+
+
+# =============================================================================
+# SIGNIFICANCE TESTS
+# =============================================================================
+
+class TestSignificance:
+    """PSR / DSR and multiple-testing corrections."""
+
+    def test_deflation_lowers_psr(self, strategy_returns):
+        graded = BatchPerformanceMetrics(n_bootstrap=0).grade(strategy_returns)
+
+        assert (graded['dsr'] <= graded['psr'] + 1e-15).all()
+        assert graded['significant'][:5].all()
+        assert graded['significant'][5:].sum() <= 2
+
+    def test_more_trials_deflate_more(self, strategy_returns):
+        engine = BatchPerformanceMetrics(n_bootstrap=0)
+        few = engine.grade(strategy_returns, n_trials=10)
+        many = engine.grade(strategy_returns, n_trials=10000)
+
+        assert (many['dsr'] <= few['dsr']).all()
+        assert expected_max_sharpe(0.01, 1) == 0.0
+
+    def test_adjust_pvalues_reference(self):
+        rng = np.random.default_rng(9)
+        p = rng.uniform(0, 0.2, 25)
+        n = len(p)
+
+        # Step-up BH: min over j >= rank of p_(j) * n / j
+        order = np.argsort(p)
+        ref_bh = np.empty(n)
+        for rank, i in enumerate(order, 1):
+            ref_bh[i] = min(1.0, min(p[order[j - 1]] * n / j for j in range(rank, n + 1)))
+        np.testing.assert_allclose(adjust_pvalues(p, 'fdr_bh'), ref_bh)
+
+        # Holm: max over j <= rank of p_(j) * (n - j + 1)
+        ref_holm = np.empty(n)
+        for rank, i in enumerate(order, 1):
+            ref_holm[i] = min(1.0, max(p[order[j - 1]] * (n - j + 1) for j in range(1, rank + 1)))
+        np.testing.assert_allclose(adjust_pvalues(p, 'holm'), ref_holm)
+
+        np.testing.assert_allclose(adjust_pvalues(p, 'bonferroni'), np.minimum(p * n, 1))
+
+        with pytest.raises(ValueError):
+            adjust_pvalues(p, 'sidak')
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
@@ -9,6 +9,7 @@ Tests:
 2. Granger causality: GEX → realized volatility
 3. Bidirectional information flow detection
 4. Lead-lag relationships in correlated assets
+5. Transfer entropy matrix engine matches pairwise estimates
 
 These tests verify that the "forces" we compute actually CAUSE price movements,
 not just correlate with them.
@@ -28,7 +29,10 @@ from typing import Tuple, Dict
 from engine.features.entropy import (
     transfer_entropy,
     effective_transfer_entropy,
-    bidirectional_transfer_entropy
+    bidirectional_transfer_entropy,
+    transfer_entropy_matrix,
+    rolling_transfer_entropy,
+    _discretize
 )
 
 
@@ -457,6 +461,95 @@ class TestCausalChain:
         assert np.isfinite(te_a_to_c), "A→C TE should be finite"
 
 
+# =============================================================================
+# TRANSFER ENTROPY MATRIX ENGINE
+# =============================================================================
+
+def reference_transfer_entropy(source, target, k=1, l=1, bins=10):
+    """Per-sample dictionary-count TE (the original tuple-based estimator)."""
+    source_d = _discretize(source, bins)
+    target_d = _discretize(target, bins)
+    joint_xxy, joint_xx, joint_xy, marg_x = {}, {}, {}, {}
+
+    for i in range(max(k, l), len(target_d) - 1):
+        key = (target_d[i + 1], tuple(target_d[i-k+1:i+1]), tuple(source_d[i-l+1:i+1]))
+        joint_xxy[key] = joint_xxy.get(key, 0) + 1
+        joint_xx[key[:2]] = joint_xx.get(key[:2], 0) + 1
+        joint_xy[key[1:]] = joint_xy.get(key[1:], 0) + 1
+        marg_x[key[1]] = marg_x.get(key[1], 0) + 1
+
+    total = sum(joint_xxy.values())
+    te = 0.0
+    for (x_next, x_past, y_past), count in joint_xxy.items():
+        p_cond_xy = count / joint_xy[(x_past, y_past)]
+        p_cond_x = joint_xx[(x_next, x_past)] / marg_x[x_past]
+        te += count / total * np.log2(p_cond_xy / p_cond_x)
+    return max(0, te)
+
+
+class TestTransferEntropyEngine:
+    """Array-based TE engine must reproduce the counting estimator."""
+
+    @pytest.mark.parametrize("k,l,bins", [(1, 1, 10), (2, 3, 5), (3, 1, 4)])
+    def test_matches_reference_estimator(self, lead_lag_data, k, l, bins):
+        x, y = lead_lag_data
+        expected = reference_transfer_entropy(y, x, k=k, l=l, bins=bins)
+        assert transfer_entropy(y, x, k=k, l=l, bins=bins) == pytest.approx(expected, abs=1e-12)
+
+    def test_matrix_matches_pairwise(self):
+        np.random.seed(3)
+        data = pd.DataFrame(np.random.randn(400, 5), columns=list('ABCDE'))
+        data.loc[10, 'C'] = np.nan  # Forces the per-pair alignment path
+
+        result = transfer_entropy_matrix(data)
+
+        assert np.isnan(np.diag(result.te.values)).all()
+        for src in data.columns:
+            for tgt in data.columns:
+                if src != tgt:
+                    expected = transfer_entropy(data[src].values, data[tgt].values)
+                    assert result.te.loc[src, tgt] == pytest.approx(expected, abs=1e-12)
+
+    def test_matrix_finds_planted_lead(self):
+        np.random.seed(5)
+        data = np.random.randn(800, 6)
+        data[1:, 4] += 0.8 * data[:-1, 1]
+
+        result = transfer_entropy_matrix(data, n_surrogates=50, seed=0)
+        pairs = result.lead_lag_pairs(max_p_value=0.05)
+
+        assert (pairs.iloc[0]['leader'], pairs.iloc[0]['follower']) == (1, 4)
+        assert result.p_values.loc[1, 4] < 0.05
+
+    def test_matrix_seed_is_local(self):
+        data = np.random.default_rng(1).normal(size=(300, 4))
+        data[7, 2] = np.nan  # Per-pair path draws surrogates too
+
+        np.random.seed(11)
+        before = np.random.get_state()[1].copy()
+        first = transfer_entropy_matrix(data, n_surrogates=20, seed=4)
+        assert np.array_equal(np.random.get_state()[1], before)
+
+        again = transfer_entropy_matrix(data, n_surrogates=20, seed=4)
+        pd.testing.assert_frame_equal(first.p_values, again.p_values)
+
+    def test_surrogates_batch_noise_floor(self, lead_lag_data):
+        x, y = lead_lag_data
+        np.random.seed(0)
+        ete, raw_te, surrogate_mean = effective_transfer_entropy(y, x, n_surrogates=30)
+
+        assert surrogate_mean > 0
+        assert ete == pytest.approx(raw_te - surrogate_mean)
+        assert ete > 0.3
+
+    def test_rolling_matches_window_slices(self, lead_lag_data):
+        x, y = lead_lag_data
+        series = rolling_transfer_entropy(pd.Series(y), pd.Series(x), window=200, step=100)
+
+        assert series.iloc[:199].isna().all()
+        assert series.iloc[299] == pytest.approx(transfer_entropy(y[100:300], x[100:300]), abs=1e-12)
+
+
 # =============================================================================
 # MAIN
 # =============================================================================
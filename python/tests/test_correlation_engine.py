@@ -0,0 +1,261 @@
+#!/usr/bin/env python3
+"""
+Correlation Engine Equivalence Tests
+====================================
+Validates the vectorized correlation engines against straightforward
+per-step reference implementations.
+
+Tests:
+1. DCCEngine matches the per-step DCC recursion
+2. Chunked processing does not change results
+3. Incremental DCC updates continue the batch recursion
+4. Batch rolling PCA matches per-window absorption ratio / entropy
+5. Streaming RollingPCA tracks the batch eigen-structure
+"""
+
+import sys
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import pytest
+import numpy as np
+import pandas as pd
+
+from engine.features.correlation import (
+    DCCEngine,
+    _repair_non_psd,
+    RollingCovariance,
+    RollingPCA,
+    absorption_ratio,
+    correlation_regime_indicators,
+    dcc_garch_filter,
+    eigenvalue_entropy,
+    estimate_garch_params_batch,
+    garch_11_filter,
+    rolling_absorption_ratio,
+    rolling_dcc_correlation,
+    rolling_eigenvalue_entropy,
+    rolling_pca,
+)
+
+
+# =============================================================================
+# TEST FIXTURES
+# =============================================================================
+
+@pytest.fixture
+def factor_returns() -> np.ndarray:
+    """Returns with one common factor plus idiosyncratic noise."""
+    rng = np.random.default_rng(7)
+    T, N = 400, 6
+    market = rng.normal(0, 0.01, size=(T, 1))
+    return market + rng.normal(0, 0.008, size=(T, N))
+
+
+def reference_dcc(returns, garch_params, a=0.01, b=0.95):
+    """Per-step DCC recursion (the original list-building implementation)."""
+    T, N = returns.shape
+    h = np.column_stack([
+        garch_11_filter(returns[:, i], *garch_params[i])[0] for i in range(N)
+    ])
+    eta = returns / np.sqrt(h)
+    Q_bar = np.corrcoef(eta.T)
+    if np.min(np.linalg.eigvalsh(Q_bar)) < 1e-10:
+        Q_bar = Q_bar + np.eye(N) * 1e-6
+
+    Q = Q_bar.copy()
+    R_list = [Q_bar.copy()]
+    for t in range(1, T):
+        Q = (1 - a - b) * Q_bar + a * np.outer(eta[t-1], eta[t-1]) + b * Q
+        d = np.sqrt(np.diag(Q))
+        R = Q / np.outer(d, d)
+        np.fill_diagonal(R, 1.0)
+        R_list.append(R)
+    return np.array(R_list), h, Q_bar
+
+
+# =============================================================================
+# DCC-GARCH TESTS
+# =============================================================================
+
+class TestDCCEngine:
+    """Vectorized DCC-GARCH must reproduce the per-step recursion."""
+
+    def test_matches_reference_recursion(self, factor_returns):
+        params = estimate_garch_params_batch(factor_returns)
+        R_ref, h_ref, _ = reference_dcc(factor_returns, params)
+
+        result = DCCEngine().fit(factor_returns, garch_params=params)
+
+        np.testing.assert_allclose(result.R, R_ref, atol=1e-12)
+        np.testing.assert_allclose(result.h, h_ref, rtol=1e-12)
+
+    def test_list_wrapper_consistent(self, factor_returns):
+        params = estimate_garch_params_batch(factor_returns)
+        H_list, R_list, eta = dcc_garch_filter(factor_returns, garch_params=params)
+
+        assert len(H_list) == len(R_list) == len(factor_returns)
+        sd = np.sqrt(np.diag(H_list[-1]))
+        np.testing.assert_allclose(H_list[-1] / np.outer(sd, sd), R_list[-1], atol=1e-12)
+
+    def test_chunking_invariant(self, factor_returns):
+        params = estimate_garch_params_batch(factor_returns)
+        full = DCCEngine(chunk_size=4096).fit(factor_returns, garch_params=params)
+        chunked = DCCEngine(chunk_size=17).fit(factor_returns, garch_params=params, summaries_only=True)
+
+        assert chunked.R is None
+        np.testing.assert_allclose(chunked.avg_correlation, full.avg_correlation, atol=1e-12)
+        np.testing.assert_allclose(chunked.correlation_dispersion, full.correlation_dispersion, atol=1e-12)
+
+    def test_summaries_match_matrices(self, factor_returns):
+        result = DCCEngine().fit(factor_returns)
+        iu, ju = np.triu_indices(factor_returns.shape[1], k=1)
+        off_diag = result.R[:, iu, ju]
+
+        np.testing.assert_allclose(result.avg_correlation, off_diag.mean(axis=1), atol=1e-12)
+        np.testing.assert_allclose(result.max_correlation, np.abs(off_diag).max(axis=1), atol=1e-12)
+
+    def test_correlations_are_psd(self, factor_returns):
+        result = DCCEngine().fit(factor_returns, eigenvalues=True)
+        assert result.eigenvalues.min() > -1e-10
+
+    def test_repairs_small_negative_eigenvalues(self):
+        vectors, _ = np.linalg.qr(np.random.default_rng(2).normal(size=(3, 3)))
+        stack = np.stack([vectors @ np.diag(spectrum) @ vectors.T for spectrum in
+                          ([0.5, 1.0, 1.5], [-1e-12, 1.0, 2.0])])
+        stack = np.concatenate([stack, np.diag([1.0, 1.0, 0.0])[None]])  # Singular but PSD
+
+        assert _repair_non_psd(stack) == 1
+        assert np.linalg.eigvalsh(stack[1]).min() > 0
+
+    def test_incremental_update_continues_recursion(self, factor_returns):
+        params = estimate_garch_params_batch(factor_returns)
+        engine = DCCEngine()
+        fitted = engine.fit(factor_returns[:300], garch_params=params)
+
+        # Continue the reference recursion with the fitted Q̄ held fixed
+        a, b = engine.a, engine.b
+        Q_bar = fitted.Q_bar
+        Q = Q_bar.copy()
+        eta = fitted.eta
+        for t in range(1, 300):
+            Q = (1 - a - b) * Q_bar + a * np.outer(eta[t-1], eta[t-1]) + b * Q
+
+        p = np.asarray(params)
+        h_prev, r_prev, eta_prev = fitted.h[-1], factor_returns[299], eta[-1]
+        for t in range(300, 320):
+            h = p[:, 0] + p[:, 1] * r_prev ** 2 + p[:, 2] * h_prev
+            Q = (1 - a - b) * Q_bar + a * np.outer(eta_prev, eta_prev) + b * Q
+            d = np.sqrt(np.diag(Q))
+            expected = Q / np.outer(d, d)
+
+            np.testing.assert_allclose(engine.update(factor_returns[t]), expected, atol=1e-12)
+
+            eta_prev = factor_returns[t] / np.sqrt(h)
+            h_prev, r_prev = h, factor_returns[t]
+
+    def test_rolling_dcc_columns(self, factor_returns):
+        df = pd.DataFrame(factor_returns, columns=list('ABCDEF'))
+        corr = rolling_dcc_correlation(df)
+
+        assert corr.shape == (len(df), 15)
+        assert 'A_B_corr' in corr.columns
+        assert corr.abs().max().max() <= 1.0 + 1e-9
+
+    def test_rejects_non_stationary_params(self):
+        with pytest.raises(ValueError):
+            DCCEngine(a=0.2, b=0.85)
+
+
+# =============================================================================
+# ROLLING PCA TESTS
+# =============================================================================
+
+class TestRollingPCA:
+    """Batch and streaming rolling PCA must match per-window eigendecomposition."""
+
+    def test_absorption_ratio_matches_per_window(self, factor_returns):
+        df = pd.DataFrame(factor_returns)
+        window = 60
+        result = rolling_absorption_ratio(df, window=window)
+
+        assert result.iloc[:window].isna().all()
+        for t in range(window, len(df), 37):
+            cov = np.cov(factor_returns[t-window:t].T)
+            assert result.iloc[t] == pytest.approx(absorption_ratio(cov), abs=1e-12)
+
+    def test_entropy_matches_per_window(self, factor_returns):
+        df = pd.DataFrame(factor_returns)
+        window = 40
+        result = rolling_eigenvalue_entropy(df, window=window)
+
+        for t in range(window, len(df), 37):
+            cov = np.cov(factor_returns[t-window:t].T)
+            assert result.iloc[t] == pytest.approx(eigenvalue_entropy(cov), abs=1e-12)
+
+    def test_regime_indicators_correlation_stats(self, factor_returns):
+        window = 60
+        ind = correlation_regime_indicators(factor_returns, window=window)
+        iu, ju = np.triu_indices(factor_returns.shape[1], k=1)
+
+        t = 250
+        off_diag = np.corrcoef(factor_returns[t-window:t].T)[iu, ju]
+        assert ind['avg_correlation'][t] == pytest.approx(off_diag.mean(), abs=1e-12)
+        assert ind['max_correlation'][t] == pytest.approx(np.abs(off_diag).max(), abs=1e-12)
+        assert ind['correlation_dispersion'][t] == pytest.approx(off_diag.std(), abs=1e-12)
+
+    def test_chunking_invariant(self, factor_returns):
+        full = rolling_pca(factor_returns, 50, chunk_size=4096)
+        chunked = rolling_pca(factor_returns, 50, chunk_size=13)
+
+        np.testing.assert_allclose(chunked['absorption_ratio'], full['absorption_ratio'], atol=1e-12)
+        np.testing.assert_allclose(chunked['eigenvalue_entropy'], full['eigenvalue_entropy'], atol=1e-12)
+
+    def test_short_window_uses_gram_spectrum(self):
+        rng = np.random.default_rng(11)
+        returns = rng.normal(0, 0.01, size=(120, 25))
+        window = 15
+
+        result = rolling_pca(returns, window)
+        t = 80
+        cov = np.cov(returns[t-window:t].T)
+        # Rank-deficient covariance: absorption ratio is NaN on both paths
+        assert np.isnan(result['absorption_ratio'][t]) and np.isnan(absorption_ratio(cov))
+        assert result['eigenvalue_entropy'][t] == pytest.approx(eigenvalue_entropy(cov), abs=1e-12)
+        np.testing.assert_allclose(result['eigenvalues'][t], np.linalg.eigvalsh(cov)[::-1], atol=1e-15)
+
+    def test_nan_rows_only_mask_their_windows(self, factor_returns):
+        returns = factor_returns.copy()
+        returns[100, 2] = np.nan
+        ar = rolling_pca(returns, 30)['absorption_ratio']
+
+        assert np.isnan(ar[101:131]).all()
+        assert np.isfinite(ar[131:]).all()
+        assert np.isfinite(ar[30:101]).all()
+
+    def test_rolling_covariance_matches_np_cov(self, factor_returns):
+        window = 25
+        rc = RollingCovariance(factor_returns.shape[1], window, recompute_every=40)
+        for row in factor_returns[:200]:
+            rc.update(row)
+        np.testing.assert_allclose(rc.covariance(), np.cov(factor_returns[200-window:200].T), atol=1e-15)
+
+    def test_streaming_tracks_batch(self, factor_returns):
+        window = 60
+        batch = rolling_pca(factor_returns, window, n_components=2)
+        pca = RollingPCA(factor_returns.shape[1], window, n_components=2, exact_every=25)
+
+        for t, row in enumerate(factor_returns[:-1]):
+            snap = pca.update(row)
+            if snap is None:
+                assert t < window - 1
+                continue
+            # Streaming window includes row t; batch index t+1 is the same window
+            assert snap.absorption_ratio == pytest.approx(batch['absorption_ratio'][t+1], abs=1e-10)
+            assert snap.eigenvalue_entropy == pytest.approx(batch['eigenvalue_entropy'][t+1], abs=1e-10)
+            lead = batch['eigenvectors'][t+1][:, 0]
+            assert abs(lead @ snap.eigenvectors[:, 0]) > 1 - 1e-4
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
@@ -0,0 +1,283 @@
+#!/usr/bin/env python3
+"""
+Factor Engine Equivalence Tests
+===============================
+Validates the vectorized factor screening paths against the straightforward
+per-candidate implementations they replace.
+
+Tests:
+1. Threshold scan matches per-threshold Welch t-tests
+2. Batch threshold search matches the single-factor search
+3. Compiled frontier evaluation matches per-equation eval
+4. Vectorized expanding z-score matches pandas
+5. Array backtest state machine matches the day-by-day loop
+"""
+
+import sys
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import json
+
+import pytest
+import numpy as np
+import pandas as pd
+from scipy import stats
+
+from engine.factors.equation_compiler import compile_equations, expanding_zscore
+from engine.factors.factor_computer import FactorComputer
+from engine.factors.signal_generator import SignalGenerator, scan_thresholds
+
+
+# =============================================================================
+# TEST FIXTURES
+# =============================================================================
+
+@pytest.fixture
+def factor_panel() -> pd.DataFrame:
+    """Daily factor panel; 'signal' predicts forward_return, the rest are noise."""
+    rng = np.random.default_rng(11)
+    n = 600
+    dates = pd.date_range('2020-01-01', periods=n, freq='D')
+    data = pd.DataFrame(rng.normal(size=(n, 4)), index=dates,
+                        columns=['signal', 'noise_a', 'noise_b', 'noise_c'])
+    data['forward_return'] = 0.004 * data['signal'] + rng.normal(0, 0.01, n)
+    data.iloc[::13, 1] = np.nan
+    return data
+
+
+# =============================================================================
+# THRESHOLD SEARCH TESTS
+# =============================================================================
+
+class TestThresholdScan:
+    """Prefix-sum Welch scan must reproduce scipy's per-split t-tests."""
+
+    def test_matches_ttest_per_candidate(self, factor_panel):
+        factors = factor_panel[['signal', 'noise_a']]
+        returns = factor_panel['forward_return']
+        scan = scan_thresholds(factors, returns)
+
+        for j, name in enumerate(factors.columns):
+            valid = factors[name].notna()
+            x, r = factors[name][valid], returns[valid]
+            for i, threshold in enumerate(np.percentile(x, scan.percentiles)):
+                t_stat, p_value = stats.ttest_ind(r[x > threshold], r[x <= threshold], equal_var=False)
+                assert scan.thresholds[i, j] == threshold
+                assert scan.n_high[i, j] == (x > threshold).sum()
+                assert scan.t_statistic[i, j] == pytest.approx(t_stat, rel=1e-9)
+                assert scan.p_value[i, j] == pytest.approx(p_value, rel=1e-7)
+
+    def test_batch_matches_single_factor_search(self, factor_panel):
+        sg = SignalGenerator(factor_panel)
+        train = factor_panel.index[:400]
+        names = ['signal', 'noise_a', 'noise_b', 'noise_c']
+
+        batch = sg.find_significant_thresholds(names, train, factor_panel['forward_return'], 'above')
+
+        for name in names:
+            try:
+                single = sg.find_significant_threshold(name, train, factor_panel['forward_return'], 'above')
+            except ValueError:
+                single = None
+            assert batch[name] == single
+
+        assert batch['signal'].is_significant()
+
+    def test_dense_grid_finds_at_least_as_strong_split(self, factor_panel):
+        sg = SignalGenerator(factor_panel)
+        train = factor_panel.index[:400]
+        returns = factor_panel['forward_return']
+
+        coarse = sg.find_significant_threshold('signal', train, returns, 'above')
+        dense = sg.find_significant_threshold('signal', train, returns, 'above',
+                                              percentiles=np.arange(20, 80.5, 0.5))
+
+        assert dense.p_value <= coarse.p_value
+
+
+# =============================================================================
+# FACTOR COMPUTATION TESTS
+# =============================================================================
+
+FRONTIER = [
+    "x0",
+    "x0 * (sign(x1) - 0.9148809)",
+    "x0 * (sign(x1) - 0.9148809) + sqrt(x2)",
+    "log(x2) / (x0 * (sign(x1) - 0.9148809) + 1.5)",
+    "square(x3) - exp(x0 * 0.1)",
+    "x1 * x0 + x0 * x1",
+    "np.tanh(x2) % 0.5",
+    "x9 + 1",              # Unmapped variable -> NaN column
+    "mystery(x0)",         # Unsupported function -> NaN column
+]
+
+
+@pytest.fixture
+def frontier_files(tmp_path):
+    """Math Swarm results JSON + features parquet for FactorComputer."""
+    rng = np.random.default_rng(5)
+    n = 500
+    features = pd.DataFrame({
+        'ret_range_50': rng.normal(size=n),
+        'gamma_exposure': rng.normal(size=n),
+        'vol_ratio': rng.normal(size=n),
+        'skew': rng.normal(size=n),
+    }, index=pd.date_range('2023-01-01', periods=n, freq='min'))
+    features.iloc[::17, 2] = np.nan
+
+    equations = {
+        'feature_mapping': {'x0': 'ret_range_50', 'x1': 'gamma_exposure',
+                            'x2': 'vol_ratio', 'x3': 'skew'},
+        'all_equations': [{'equation': eq, 'complexity': i, 'loss': 0.1}
+                          for i, eq in enumerate(FRONTIER)],
+    }
+    eq_path = tmp_path / 'math_swarm_results.json'
+    eq_path.write_text(json.dumps(equations))
+    features_path = tmp_path / 'features.parquet'
+    features.to_parquet(features_path)
+    return str(eq_path), str(features_path)
+
+
+class TestCompiledFactors:
+    """Batch-compiled frontier must reproduce per-equation evaluation."""
+
+    def test_matches_per_equation_eval(self, frontier_files):
+        computer = FactorComputer(*frontier_files, normalize=False)
+        batch = computer.compute_all_factors()
+
+        for idx, equation in enumerate(FRONTIER):
+            parsed = computer._parse_equation(equation)
+            namespace = {
+                'features': computer.features, 'np': np, 'sign': np.sign,
+                'sqrt': lambda x: np.sqrt(np.clip(x, 0, np.inf)),
+                'log': lambda x: np.log(np.clip(x, 1e-10, np.inf)),
+                'square': np.square, 'exp': np.exp,
+            }
+            try:
+                with np.errstate(all='ignore'):
+                    expected = np.asarray(eval(parsed, {"__builtins__": {}}, namespace), dtype=float)
+            except Exception:
+                expected = np.full(len(batch), np.nan)
+            np.testing.assert_allclose(batch[f'factor_{idx}'].values, expected * np.ones(len(batch)),
+                                       rtol=1e-15, atol=0)
+
+    def test_chunked_evaluation_identical(self, frontier_files):
+        full = FactorComputer(*frontier_files).compute_all_factors()
+        chunked = FactorComputer(*frontier_files, chunk_size=64).compute_all_factors()
+        pd.testing.assert_frame_equal(full, chunked)
+
+    def test_shared_subexpressions_evaluated_once(self):
+        plan = compile_equations(
+            ["x0 * (sign(x1) - 0.5)", "x0 * (sign(x1) - 0.5) + x2", "(sign(x1) - 0.5) * x0"],
+            {'x0': 'a', 'x1': 'b', 'x2': 'c'}, ['a', 'b', 'c']
+        )
+        # sign, subtract, multiply shared; one extra add
+        assert plan.n_unique_ops == 4
+        assert plan.outputs[0] == plan.outputs[2]
+
+    def test_expanding_zscore_matches_pandas(self):
+        rng = np.random.default_rng(2)
+        values = rng.normal(5.0, 2.0, size=(300, 3))
+        values[:40, 1] = 3.0          # Constant prefix -> zero std -> NaN
+        values[::7, 2] = np.nan
+
+        result = expanding_zscore(values, min_periods=20, max_cells=128)
+
+        for j in range(values.shape[1]):
+            series = pd.Series(values[:, j])
+            expanding = series.expanding(min_periods=20)
+            expected = (series - expanding.mean()) / expanding.std().replace(0.0, np.nan)
+            np.testing.assert_allclose(result[:, j], expected.values, rtol=1e-9, atol=1e-12)
+
+
+# =============================================================================
+# FACTOR BACKTEST TESTS
+# =============================================================================
+
+@pytest.fixture
+def backtester_module():
+    """factor_backtester pulls in the execution stack; skip when unavailable."""
+    return pytest.importorskip("engine.factors.factor_backtester")
+
+
+def reference_boundaries(signal, factor, exit_threshold, direction):
+    """Day-by-day position loop from the original run_backtest."""
+    entries, exits = [], []
+    in_position = False
+    for t in range(len(signal)):
+        if in_position:
+            should_exit = (direction == "long" and factor[t] < exit_threshold) or \
+                          (direction == "short" and factor[t] > exit_threshold)
+            if signal[t] == 0:
+                should_exit = True
+            if should_exit:
+                exits.append(t)
+                in_position = False
+        if not in_position and signal[t] != 0:
+            entries.append(t)
+            in_position = True
+    return entries, exits
+
+
+class TestVectorizedBacktest:
+    """Array state machine and batched grid must match the sequential backtest."""
+
+    @pytest.mark.parametrize("direction", ["long", "short"])
+    def test_trade_boundaries_match_loop(self, backtester_module, direction):
+        rng = np.random.default_rng(4)
+        factor = rng.normal(size=500)
+        signal = (factor > 0.3).astype(float) if direction == "long" else -(factor < -0.3).astype(float)
+        factor = np.roll(factor, 1)
+        signal[::37] = np.nan
+
+        entries, exits = backtester_module._trade_boundaries(signal, factor, 0.1, direction)
+        ref_entries, ref_exits = reference_boundaries(signal, factor, 0.1, direction)
+
+        assert entries.tolist() == ref_entries
+        assert exits.tolist() == ref_exits
+
+    def test_equity_recursion_closed_form(self, backtester_module):
+        pct = np.array([0.02, -0.01, 0.05, 0.0, -0.03])
+        equity, expected = 100_000.0, []
+        for p in pct:
+            equity = equity + equity * p * backtester_module.POSITION_FRACTION - 0.65
+            expected.append(equity)
+
+        result = backtester_module._equity_after_trades(100_000.0, pct, 0.65)
+        np.testing.assert_allclose(result, expected, rtol=1e-13)
+
+    def test_grid_matches_single_runs(self, backtester_module, tmp_path):
+        rng = np.random.default_rng(8)
+        dates = pd.bdate_range('2024-06-01', periods=300)
+        features = pd.DataFrame({
+            'date': dates,
+            'close': 100 * np.exp(np.cumsum(rng.normal(0, 0.01, len(dates)))),
+            'momentum': rng.normal(size=len(dates)),
+        })
+        path = tmp_path / 'features.parquet'
+        features.to_parquet(path)
+
+        class Computer:
+            def compute_factor(self, name, feats):
+                return feats[name]
+
+        class Signals:
+            def generate_signal(self, values, entry, exit_, direction):
+                active = values > entry if direction == "long" else values < entry
+                return active.astype(float) * (1 if direction == "long" else -1)
+
+        bt = backtester_module.FactorBacktester(Computer(), Signals(), None, str(path))
+        grid = [(0.5, 0.0, "long"), (-0.5, 0.0, "short")]
+        date_sets = {'a': bt.features.index[:150], 'b': bt.features.index[150:]}
+
+        batch = bt.run_backtest_grid('momentum', grid, date_sets)
+
+        for entry, exit_, direction in grid:
+            for name, dates_ in date_sets.items():
+                single = bt.run_backtest('momentum', entry, exit_, direction, dates_)
+                assert batch[(entry, exit_, direction, name)].to_dict() == single.to_dict()
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
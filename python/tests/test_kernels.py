@@ -0,0 +1,345 @@
+#!/usr/bin/env python3
+"""
+Scan Kernel Tests
+=================
+Validates the shared scan kernels against the per-sample loops they replace.
+Per-kernel micro-benchmarks: scripts/benchmark_kernels.py (not run by pytest).
+
+Tests:
+1. Each kernel matches its reference loop (edge cases: ties, NaN, resets)
+2. Feature functions built on the kernels keep their outputs
+3. Compiled kernel bodies match the default kernels; backend flag falls back
+"""
+
+import sys
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import math
+from collections import Counter
+
+import pytest
+import numpy as np
+
+from engine.features import kernels
+from engine.features.change_point import cusum_mean_shift, cusum_variance_shift
+from engine.features.entropy import entropy_rate_lz, permutation_entropy
+from engine.features.flow import cumulative_ofi, lee_ready, tick_rule
+from engine.features.mm_inventory import cumulative_delta, inventory_zscore
+from engine.features.morphology import _compute_dip, hartigans_dip_test
+
+
+# =============================================================================
+# REFERENCE LOOPS (the implementations the kernels replaced)
+# =============================================================================
+
+def ref_tick_rule(prices):
+    n = len(prices)
+    if n < 2:
+        return np.zeros(n)
+    changes = np.diff(prices)
+    signs = np.zeros(n)
+    for i in range(1, n):
+        if changes[i-1] > 0:
+            signs[i] = 1
+        elif changes[i-1] < 0:
+            signs[i] = -1
+        else:
+            signs[i] = signs[i-1]
+    return signs
+
+
+def ref_reset_cumsum(values, boundaries, consume_all):
+    out = np.zeros(len(values))
+    idx, cum = 0, 0.0
+    for i in range(len(values)):
+        if consume_all:
+            while idx < len(boundaries) and i >= boundaries[idx]:
+                cum = 0.0
+                idx += 1
+        elif idx < len(boundaries) and i >= boundaries[idx]:
+            cum = 0.0
+            idx += 1
+        cum += values[i]
+        out[i] = cum
+    return out
+
+
+def ref_lindley(x):
+    stat = np.zeros(len(x))
+    for i in range(1, len(x)):
+        stat[i] = max(0, stat[i-1] + x[i])
+    return stat
+
+
+def ref_rising_edges(alarms):
+    points, in_alarm = [], False
+    for i in range(len(alarms)):
+        if alarms[i] and not in_alarm:
+            points.append(i)
+            in_alarm = True
+        elif not alarms[i]:
+            in_alarm = False
+    return points
+
+
+def ref_lagged_zscore(x, window):
+    z = np.full(len(x), np.nan)
+    for i in range(window, len(x)):
+        w = x[i-window:i]
+        mean, std = np.mean(w), np.std(w)
+        if std > 0:
+            z[i] = (x[i] - mean) / std
+    return z
+
+
+def ref_permutation_entropy(data, order, delay):
+    patterns = [tuple(np.argsort([data[i + j * delay] for j in range(order)]))
+                for i in range(len(data) - delay * (order - 1))]
+    probs = np.array(list(Counter(patterns).values())) / len(patterns)
+    h = -np.sum(np.where(probs > 0, probs * np.log2(probs), 0))
+    return h / np.log2(math.factorial(order))
+
+
+def ref_lz76(sequence):
+    sequence = list(sequence)
+    n = len(sequence)
+    if n == 0:
+        return 0
+    complexity, prefix_len, i = 1, 1, 0
+    while i + prefix_len <= n:
+        current = tuple(sequence[i:i+prefix_len])
+        prefix = sequence[:i]
+        found = any(tuple(prefix[j:j+prefix_len]) == current
+                    for j in range(len(prefix) - prefix_len + 1))
+        if found:
+            prefix_len += 1
+        else:
+            complexity += 1
+            i += prefix_len
+            prefix_len = 1
+    return complexity
+
+
+def ref_envelope(x_vals, y_vals, lower):
+    """Hull build + interpolation from the original _compute_dip."""
+    hull_x, hull_y = [0.0], [0.0]
+    for x_new, y_new in zip(x_vals, y_vals):
+        while len(hull_x) >= 2:
+            dx_prev = hull_x[-1] - hull_x[-2]
+            dx_new = x_new - hull_x[-1]
+            if dx_prev < 1e-12 or dx_new < 1e-12:
+                break
+            slope_prev = (hull_y[-1] - hull_y[-2]) / dx_prev
+            slope_new = (y_new - hull_y[-1]) / dx_new
+            if lower and slope_new >= slope_prev - 1e-12:
+                break
+            if not lower and slope_new <= slope_prev + 1e-12:
+                break
+            hull_x.pop()
+            hull_y.pop()
+        hull_x.append(x_new)
+        hull_y.append(y_new)
+    if hull_x[-1] < 1.0 - 1e-12:
+        hull_x.append(1.0)
+        hull_y.append(1.0)
+
+    out = np.zeros(len(x_vals))
+    hull_idx = 0
+    for i, x in enumerate(x_vals):
+        while hull_idx < len(hull_x) - 1 and hull_x[hull_idx + 1] <= x + 1e-12:
+            hull_idx += 1
+        if hull_idx >= len(hull_x) - 1:
+            out[i] = hull_y[-1]
+        else:
+            x1, y1 = hull_x[hull_idx], hull_y[hull_idx]
+            x2, y2 = hull_x[hull_idx + 1], hull_y[hull_idx + 1]
+            out[i] = y1 + (x - x1) / (x2 - x1) * (y2 - y1) if x2 > x1 + 1e-12 else y1
+    return out
+
+
+def ref_dip(sorted_data):
+    x = (sorted_data - sorted_data[0]) / (sorted_data[-1] - sorted_data[0])
+    n = len(x)
+    gcm = ref_envelope(x, np.arange(n) / n, lower=True)
+    lcm = ref_envelope(x, (np.arange(n) + 1) / n, lower=False)
+    return max(0.5 * np.max(lcm - gcm), 0.0)
+
+
+# =============================================================================
+# TEST FIXTURES
+# =============================================================================
+
+@pytest.fixture
+def rng():
+    return np.random.default_rng(11)
+
+
+@pytest.fixture
+def numpy_backend():
+    previous = kernels.active_backend()
+    kernels.set_backend('numpy')
+    yield
+    kernels.set_backend(previous)
+
+
+def dip_inputs(rng, n):
+    data = np.sort(np.concatenate([rng.normal(-2, 1, n // 2), rng.normal(2, 1, n - n // 2)]))
+    data[5:9] = data[5]  # Ties
+    x = (data - data[0]) / (data[-1] - data[0])
+    return data, x
+
+
+# =============================================================================
+# EQUIVALENCE TESTS
+# =============================================================================
+
+class TestScanEquivalence:
+    """Kernels against the loops they replaced."""
+
+    def test_tick_signs(self, rng):
+        prices = np.round(100 + np.cumsum(rng.normal(0, 0.05, 5000)), 1)  # Many zero ticks
+        prices[:4] = prices[0]
+        prices[100] = np.nan
+
+        np.testing.assert_array_equal(kernels.tick_signs(prices), ref_tick_rule(prices))
+        np.testing.assert_array_equal(tick_rule(prices), ref_tick_rule(prices))
+        assert tick_rule(np.array([1.0])).tolist() == [0.0]
+
+        bids, asks = prices - 0.05, prices + 0.05
+        assert np.all(np.isin(lee_ready(prices, bids, asks), [-1, 0, 1]))
+
+    @pytest.mark.parametrize('boundaries', [
+        [0, 10, 250, 900],
+        [5, 5, 5, 12],          # Duplicates
+        [30, 10, 40, 2000],     # Unsorted, beyond the series
+        [-3, 0, 999],
+        [],
+    ])
+    def test_resetting_sums(self, rng, boundaries):
+        values = rng.normal(0, 1000, 1000)
+        for consume_all in (True, False):
+            starts = kernels.reset_positions(np.array(boundaries), len(values), consume_all)
+            np.testing.assert_array_equal(kernels.segmented_cumsum(values, starts),
+                                          ref_reset_cumsum(values, boundaries, consume_all))
+
+        buy, sell = rng.integers(0, 500, 1000), rng.integers(0, 500, 1000)
+        np.testing.assert_array_equal(
+            cumulative_delta(buy, sell, reset_daily=True, daily_boundaries=np.array(boundaries)),
+            ref_reset_cumsum(buy - sell, boundaries, consume_all=False))
+        np.testing.assert_array_equal(cumulative_ofi(values, np.array(boundaries)),
+                                      ref_reset_cumsum(values, boundaries, consume_all=True))
+
+    def test_lindley_scan(self, rng):
+        for drift in (-0.3, 0.0, 0.3):
+            x = rng.normal(drift, 1, 20000)
+            np.testing.assert_allclose(kernels.lindley_scan(x), ref_lindley(x), rtol=1e-9, atol=1e-9)
+        assert kernels.lindley_scan(np.array([5.0])).tolist() == [0.0]
+
+    def test_cusum_features(self, rng):
+        data = np.concatenate([rng.normal(0, 1, 500), rng.normal(1.5, 2, 500)])
+        z = (data - data[:200].mean()) / data[:200].std(ddof=1)
+        pos = ref_lindley(z - 0.5)
+        neg = -ref_lindley(-(z + 0.5))
+        expected = np.maximum(pos, np.abs(neg))
+
+        result = cusum_mean_shift(data, drift=0.5)
+        np.testing.assert_allclose(result.statistic, expected, rtol=1e-9, atol=1e-9)
+        assert result.change_points == ref_rising_edges(expected > 5.0)
+        assert result.change_points
+
+        var_result = cusum_variance_shift(data)
+        assert var_result.change_points == ref_rising_edges(var_result.statistic > 5.0)
+        assert kernels.rising_edges(np.array([True, True, False, True])).tolist() == [0, 3]
+
+    @pytest.mark.parametrize('window', [1, 20, 100])
+    def test_lagged_zscore(self, rng, window):
+        proxy = np.cumsum(rng.normal(0, 1e4, 9000)) + 1e9  # Trending, large offset
+        proxy[3000:3200] = proxy[3000]                     # Zero-variance windows
+
+        np.testing.assert_array_equal(kernels.lagged_zscore(proxy, window), ref_lagged_zscore(proxy, window))
+        np.testing.assert_array_equal(inventory_zscore(proxy, window), ref_lagged_zscore(proxy, window))
+        assert np.isnan(kernels.lagged_zscore(proxy[:window], window)).all()
+
+    @pytest.mark.parametrize('order,delay', [(2, 1), (3, 1), (4, 2), (5, 3)])
+    def test_permutation_entropy(self, rng, order, delay):
+        data = rng.normal(0, 1, 3000)
+        expected = ref_permutation_entropy(data, order, delay)
+
+        assert permutation_entropy(data, order=order, delay=delay) == pytest.approx(expected, rel=1e-12)
+
+    def test_ordinal_pattern_ties(self):
+        # Ties rank in time order (np.argsort's default kind is not stable on every platform)
+        codes = kernels.ordinal_patterns(np.array([1.0, 1.0, 1.0, 0.0, 0.0]), order=3)
+
+        assert codes.tolist() == [0 * 9 + 1 * 3 + 2, 2 * 9 + 0 * 3 + 1, 1 * 9 + 2 * 3 + 0]
+        assert permutation_entropy(np.ones(50), order=3) == 0.0
+
+    def test_lz76_complexity(self, rng, numpy_backend):
+        for bins in (2, 5, 300):
+            symbols = rng.integers(0, bins, 1500)
+            assert kernels.lz76_complexity(symbols) == ref_lz76(symbols)
+            assert kernels._lz76_array(np.unique(symbols, return_inverse=True)[1]) == ref_lz76(symbols)
+
+        periodic = np.tile([1, 2, 3], 200)
+        assert kernels.lz76_complexity(periodic) == ref_lz76(periodic)
+        assert kernels.lz76_complexity(np.array([], dtype=int)) == 0
+        assert entropy_rate_lz(rng.normal(0, 1, 500)) > 0
+
+    @pytest.mark.parametrize('n', [2, 3, 60, 500])
+    def test_dip_envelopes(self, rng, n, numpy_backend):
+        if n > 9:
+            data, x = dip_inputs(rng, n)
+        else:
+            data = np.sort(rng.normal(0, 1, n))
+            x = (data - data[0]) / (data[-1] - data[0])
+        for lower, y in ((True, np.arange(n) / n), (False, (np.arange(n) + 1) / n)):
+            hull = kernels.unit_envelope(x, y, lower=lower)
+            np.testing.assert_array_equal(kernels.envelope_at(*hull, x), ref_envelope(x, y, lower))
+
+            array_hull = kernels._unit_envelope_array(x, y, lower)
+            np.testing.assert_array_equal(array_hull[0], hull[0])
+            np.testing.assert_array_equal(array_hull[1], hull[1])
+
+        assert _compute_dip(data, None) == ref_dip(data)
+
+    def test_dip_test_unchanged(self, rng):
+        data, _ = dip_inputs(rng, 200)
+        np.random.seed(0)
+        dip, p_value = hartigans_dip_test(data, n_simulations=50)
+        assert dip == ref_dip(data)
+        assert 0.0 <= p_value <= 1.0
+
+
+# =============================================================================
+# BACKEND TESTS
+# =============================================================================
+
+class TestKernelBackend:
+    """Feature flag and fallback."""
+
+    def test_unknown_backend_rejected(self):
+        with pytest.raises(ValueError):
+            kernels.set_backend('cuda')
+
+    def test_env_flag_selects_backend(self, monkeypatch, numpy_backend):
+        monkeypatch.setattr(kernels, '_backend', None)
+        monkeypatch.setenv(kernels.KERNEL_BACKEND_ENV, 'compiled')
+        expected = 'compiled' if kernels._compiled() is not None else 'numpy'
+
+        assert kernels.active_backend() == expected
+        symbols = np.random.default_rng(0).integers(0, 4, 400)
+        assert kernels.lz76_complexity(symbols) == ref_lz76(symbols)
+
+    def test_compiled_kernels_match(self, rng, numpy_backend):
+        pytest.importorskip('numba')
+        assert kernels.set_backend('compiled') == 'compiled'
+
+        symbols = rng.integers(0, 6, 2000)
+        assert kernels.lz76_complexity(symbols) == ref_lz76(symbols)
+        data, x = dip_inputs(rng, 300)
+        assert _compute_dip(data, None) == ref_dip(data)
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
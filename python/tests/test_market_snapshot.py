@@ -0,0 +1,184 @@
+#!/usr/bin/env python3
+"""
+Market Data Snapshot Tests
+==========================
+Validates the per-cycle market data snapshot shared by daemon backtest workers.
+
+Tests:
+1. Snapshot frames match the workers' direct Parquet loading path
+2. table() maps the file without copying; load() returns a writable frame
+3. Realized vol and regime tags are computed once per data version
+4. Pruning keeps recently used snapshots of other date ranges
+5. execute_strategy_backtest gives the same result with and without a snapshot
+"""
+
+import sys
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import os
+import time
+
+import pytest
+import numpy as np
+import pandas as pd
+import polars as pl
+import pyarrow as pa
+
+
+# =============================================================================
+# TEST FIXTURES
+# =============================================================================
+
+@pytest.fixture(scope='module')
+def daemon(tmp_path_factory):
+    """Import daemon.py from a scratch directory (it opens its log file on import)."""
+    cwd = os.getcwd()
+    os.chdir(tmp_path_factory.mktemp('daemon'))
+    try:
+        import daemon
+    finally:
+        os.chdir(cwd)
+    return daemon
+
+
+@pytest.fixture
+def data_dir(tmp_path) -> Path:
+    """Forty daily SPY files plus one outside the requested range."""
+    rng = np.random.default_rng(34)
+    spy_dir = tmp_path / 'stocks_trades' / 'SPY'
+    spy_dir.mkdir(parents=True)
+    price = 450.0
+    for day in pd.bdate_range('2024-01-02', periods=41):
+        n = 50
+        prices = price * np.cumprod(1 + rng.normal(0, 0.001, n))
+        price = prices[-1]
+        pl.DataFrame({
+            'timestamp': pd.date_range(day + pd.Timedelta(hours=14, minutes=30), periods=n, freq='min'),
+            'price': prices,
+            'size': rng.integers(1, 500, n),
+            'exchange': ['N'] * n,
+        }).write_parquet(spy_dir / f"SPY_{day:%Y%m%d}.parquet")
+    return tmp_path
+
+
+def direct_load(daemon, data_dir, start='2024-01-01', end='2024-02-26') -> pd.DataFrame:
+    """The workers' fallback path: decode the in-range Parquet files."""
+    files, error = daemon.find_market_data_files(data_dir, start, end)
+    assert error is None
+    return daemon.with_realized_vol(pl.concat([pl.read_parquet(f) for f in files])).to_pandas()
+
+
+def build(daemon, data_dir, start='2024-01-01', end='2024-02-26', **kwargs):
+    return daemon.MarketDataSnapshot.build(data_dir, start, end, **kwargs)
+
+
+# =============================================================================
+# SNAPSHOT TESTS
+# =============================================================================
+
+class TestMarketDataSnapshot:
+    """Build, map and reuse."""
+
+    def test_matches_direct_load(self, daemon, data_dir):
+        snapshot = build(daemon, data_dir)
+        expected = direct_load(daemon, data_dir)
+
+        assert snapshot.n_rows == len(expected) == 40 * 50
+        pd.testing.assert_frame_equal(snapshot.load(), expected)
+        pd.testing.assert_series_equal(
+            expected['realized_vol'], daemon.RegimeMonitor.realized_vol(expected['price']), check_names=False)
+
+    def test_table_is_zero_copy_and_load_is_writable(self, daemon, data_dir):
+        snapshot = build(daemon, data_dir)
+
+        allocated = pa.total_allocated_bytes()
+        table = snapshot.table()
+        assert pa.total_allocated_bytes() == allocated
+        assert table.num_rows == snapshot.n_rows
+
+        frame = snapshot.load()
+        frame.loc[0, 'price'] = 1.0
+        frame['price'] *= 2
+        assert frame.loc[0, 'price'] == 2.0
+
+    def test_reused_per_data_version(self, daemon, data_dir, monkeypatch):
+        first = build(daemon, data_dir, regime_monitor=daemon.RegimeMonitor(data_dir))
+
+        monkeypatch.setattr(pl, 'read_parquet', lambda *a, **k: pytest.fail('re-decoded'))
+        monitor = daemon.RegimeMonitor(data_dir)
+        monkeypatch.setattr(monitor, '_classify_frame', lambda *a: pytest.fail('re-tagged'))
+
+        second = build(daemon, data_dir, regime_monitor=monitor)
+        assert second == first
+        assert len(monitor.regime_codes(second.load(), cache_key=second.version)) == second.n_rows
+
+    def test_regime_tags_match_direct_load(self, daemon, data_dir):
+        snapshot = build(daemon, data_dir, regime_monitor=daemon.RegimeMonitor(data_dir))
+        cached = daemon.RegimeMonitor(data_dir).regime_codes(snapshot.load(), cache_key=snapshot.version)
+
+        fresh = daemon.RegimeMonitor(data_dir / 'elsewhere').regime_codes(direct_load(daemon, data_dir))
+        np.testing.assert_array_equal(cached, fresh)
+
+    def test_prune_respects_grace_period(self, daemon, data_dir, monkeypatch):
+        monkeypatch.setattr(daemon.MarketDataSnapshot, 'SNAPSHOT_LIMIT', 1)
+        snapshots = [build(daemon, data_dir, '2024-01-01', f'2024-02-{d:02d}') for d in (20, 21, 22)]
+
+        # Beyond the limit but used recently: other directors may hand them out
+        assert all(s.exists() for s in snapshots)
+
+        stale = time.time() - 2 * daemon.MarketDataSnapshot.SNAPSHOT_GRACE_SECONDS
+        orphan = Path(snapshots[0].path).with_suffix('.arrow.tmp')
+        orphan.touch()
+        for path in (snapshots[0].path, orphan):
+            os.utime(path, (stale, stale))
+        current = build(daemon, data_dir)
+
+        assert not snapshots[0].exists() and not orphan.exists()
+        assert snapshots[1].exists() and snapshots[2].exists() and current.exists()
+
+
+# =============================================================================
+# WORKER TESTS
+# =============================================================================
+
+STRATEGY = '''
+import numpy as np
+
+class Strategy:
+    def __init__(self, config):
+        self.config = config
+
+    def run(self, market_data, initial_capital):
+        market_data.loc[market_data.index[0], 'price'] = market_data['price'].iloc[1]
+        returns = market_data['price'].pct_change().fillna(0)
+        returns = returns * np.where(market_data['realized_vol'] > 0.05, 1.0, -1.0)
+        equity = initial_capital * (1 + returns).cumprod()
+        return returns, equity, []
+'''
+
+
+class TestWorkerPath:
+    """execute_strategy_backtest with the shared snapshot."""
+
+    def test_same_result_with_and_without_snapshot(self, daemon, data_dir):
+        snapshot = build(daemon, data_dir, regime_monitor=daemon.RegimeMonitor(data_dir))
+        kwargs = dict(code_content=STRATEGY, dna_config={}, data_dir=str(data_dir),
+                      start_date='2024-01-01', end_date='2024-02-26')
+
+        shared = daemon.execute_strategy_backtest('s1', snapshot=snapshot, **kwargs)
+        direct = daemon.execute_strategy_backtest('s1', **kwargs)
+
+        # The strategy itself ran (no fallback after a failed in-place edit)
+        frame = direct_load(daemon, data_dir)
+        frame.loc[0, 'price'] = frame['price'].iloc[1]
+        expected = frame['price'].pct_change().fillna(0) * np.where(frame['realized_vol'] > 0.05, 1.0, -1.0)
+
+        assert shared.success and direct.success
+        assert shared.daily_returns == direct.daily_returns == expected.tolist()[-252:]
+        assert shared.sharpe_ratio == direct.sharpe_ratio
+        assert shared.regime_performance == direct.regime_performance
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
@@ -0,0 +1,201 @@
+#!/usr/bin/env python3
+"""
+Master Miner Batch Tests
+========================
+Validates the batched MasterMiner against the original per-bar loop
+(every calendar day, every 15-minute bar, one genome at a time).
+
+Tests:
+1. Trading days follow the market calendar
+2. Trigger masks match _check_trigger
+3. Batched run reproduces the per-bar loop for every genome
+4. Each day is loaded once for the whole batch
+"""
+
+import sys
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from types import SimpleNamespace
+
+import pytest
+import numpy as np
+import pandas as pd
+
+
+# =============================================================================
+# TEST FIXTURES
+# =============================================================================
+
+@pytest.fixture
+def miner_module():
+    """The miner pulls in engine.trading; skip when unavailable."""
+    return pytest.importorskip("engine.mining.master_miner")
+
+
+class FakeLoader:
+    """Synthetic intraday trades and option quotes; counts day loads."""
+
+    HOLIDAYS = {'2024-07-04'}
+
+    def __init__(self):
+        self.trade_loads = 0
+
+    def load_trades(self, symbol, date_str, columns=None):
+        day = pd.Timestamp(date_str)
+        if day.weekday() >= 5 or date_str in self.HOLIDAYS:
+            return pd.DataFrame()
+        self.trade_loads += 1
+        rng = np.random.default_rng(day.toordinal())
+        ts = pd.date_range(day + pd.Timedelta(hours=9, minutes=30), periods=390, freq='min')
+        return pd.DataFrame({
+            'timestamp': ts,
+            'underlying_price': 400 + np.cumsum(rng.normal(0, 0.1, len(ts))),
+            'iv': rng.uniform(12, 30, len(ts)),
+        })
+
+    def load_quotes(self, symbol, date_str, columns=None, filters=None):
+        option = filters[0][2]
+        day = pd.Timestamp(date_str)
+        rng = np.random.default_rng(abs(hash((option, date_str))) % 2**32)
+        ts = pd.date_range(day + pd.Timedelta(hours=9, minutes=30), periods=27, freq='15min')
+        mid = rng.uniform(1, 3, len(ts))
+        return pd.DataFrame({'timestamp': ts, 'bid_price': mid - 0.05, 'ask_price': mid + 0.05})
+
+
+class FakeFactory:
+    def get_expiration(self, timestamp, dte):
+        return (timestamp + pd.Timedelta(days=dte)).date()
+
+    def get_strike(self, spot, delta, opt_type, iv=None, dte=None):
+        return round(spot * (1 + delta))
+
+    def build_occ(self, underlying, exp_date, opt_type, strike):
+        return f"{underlying}{exp_date:%y%m%d}{'C' if opt_type == 'call' else 'P'}{int(strike * 1000):08d}"
+
+
+class FakeSimulator:
+    """Records every entry / exit call in order."""
+
+    def __init__(self, initial_capital=100000.0):
+        self.active_trades = []
+        self.log = []
+
+    def enter_trade(self, symbol, date, price, size, direction, strategy_id):
+        trade = SimpleNamespace(symbol=symbol, entry_date=date, direction=direction)
+        self.active_trades.append(trade)
+        self.log.append(('entry', symbol, date, round(price, 6)))
+        return trade
+
+    def exit_trade(self, trade, date, price, reason, vix=20.0):
+        self.active_trades.remove(trade)
+        self.log.append(('exit', trade.symbol, date, round(price, 6), reason))
+
+    def get_results(self):
+        return pd.DataFrame(self.log)
+
+
+def make_genome(i, op, value, hold_days=999):
+    return SimpleNamespace(
+        id=f'g{i}', name=f'g{i}',
+        trigger={'type': 'vix_level', 'operator': op, 'value': value},
+        exit={'hold_days': hold_days},
+        instrument={'delta': -0.05, 'type': 'put', 'action': 'sell' if i % 2 else 'buy'},
+        sizing={'value': 1},
+    )
+
+
+def make_miner(miner_module, start='2024-06-24', end='2024-07-12'):
+    miner = miner_module.MasterMiner(start, end)
+    miner.loader = FakeLoader()
+    miner.factory = FakeFactory()
+    return miner
+
+
+def reference_run(miner, genome, simulator):
+    """Original loop: every calendar day, every bar."""
+    miner.simulator = simulator
+    for date_obj in pd.date_range(miner.start_date, miner.end_date, freq='D'):
+        date_str = date_obj.strftime('%Y-%m-%d')
+        spy_df = miner.loader.load_trades('SPY', date_str)
+        if spy_df.empty:
+            continue
+        ohlc = spy_df.set_index('timestamp').resample('15min').agg({
+            'underlying_price': 'last', 'iv': 'median'
+        }).dropna()
+        ohlc.columns = ['close', 'iv_snapshot']
+        for timestamp, bar in ohlc.iterrows():
+            spot = bar['close']
+            iv = bar['iv_snapshot'] / 100.0 if bar['iv_snapshot'] > 4.0 else bar['iv_snapshot']
+            for trade in list(simulator.active_trades):
+                days_held = (timestamp - trade.entry_date).days
+                if timestamp.date() >= miner._parse_expiration(trade.symbol).date():
+                    miner._execute_expiration(trade, timestamp, spot)
+                    continue
+                if days_held >= genome.exit.get('hold_days', 999):
+                    miner._execute_exit(trade, timestamp, 'time_exit', date_str)
+            if not simulator.active_trades and miner._check_trigger(genome, iv * 100.0):
+                exp = miner.factory.get_expiration(timestamp, 7)
+                strike = miner.factory.get_strike(spot, -0.05, 'put', iv=iv, dte=7)
+                symbol = miner.factory.build_occ('SPY', exp, 'put', strike)
+                direction = 'SHORT' if genome.instrument['action'] == 'sell' else 'LONG'
+                miner._execute_entry(symbol, timestamp, direction, genome, date_str)
+    return simulator.log
+
+
+# =============================================================================
+# CALENDAR / TRIGGER TESTS
+# =============================================================================
+
+class TestCalendarAndTriggers:
+    """Trading days and vectorized triggers."""
+
+    def test_trading_days_skip_holidays(self, miner_module):
+        days = miner_module.trading_days('2024-07-01', '2024-07-08')
+
+        assert pd.Timestamp('2024-07-04') not in days
+        assert pd.Timestamp('2024-07-06') not in days
+        assert len(days) == 5
+
+    def test_masks_match_check_trigger(self, miner_module):
+        miner = make_miner(miner_module)
+        genomes = [make_genome(0, '>', 20), make_genome(1, '<', 18), make_genome(2, '>', 20),
+                   SimpleNamespace(trigger={'type': 'always'})]
+        vix = np.random.default_rng(0).uniform(10, 30, 50)
+
+        masks = miner_module.trigger_masks(genomes, vix)
+        expected = [[miner._check_trigger(g, v) for v in vix] for g in genomes]
+        np.testing.assert_array_equal(masks, np.array(expected))
+
+
+# =============================================================================
+# BATCH RUN TESTS
+# =============================================================================
+
+class TestBatchRun:
+    """Batched genome testing must reproduce the per-bar loop."""
+
+    def test_matches_per_bar_loop(self, miner_module):
+        genomes = [make_genome(i, op, value, hold)
+                   for i, (op, value, hold) in enumerate([('>', 22, 1), ('<', 20, 2), ('>', 21.5, 999),
+                                                          ('<', 25, 0), ('>', 10, 3)])]
+
+        sims = [FakeSimulator() for _ in genomes]
+        make_miner(miner_module).run_batch(genomes, simulators=sims)
+
+        for genome, sim in zip(genomes, sims):
+            expected = reference_run(make_miner(miner_module), genome, FakeSimulator())
+            assert sim.log == expected
+            assert len(expected) > 2
+
+    def test_loads_each_day_once(self, miner_module):
+        miner = make_miner(miner_module)
+        genomes = [make_genome(i, '>', 15 + i, 1) for i in range(20)]
+
+        miner.run_batch(genomes, simulators=[FakeSimulator() for _ in genomes])
+
+        assert miner.loader.trade_loads == len(miner_module.trading_days(miner.start_date, miner.end_date))
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
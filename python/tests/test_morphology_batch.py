@@ -0,0 +1,215 @@
+#!/usr/bin/env python3
+"""
+Batch Morphology Tests
+======================
+Validates the vectorized dip statistic, the dip null table and the rolling
+shape classifier against the per-sample morphology functions.
+
+Tests:
+1. dip_statistics matches _compute_dip row by row (ties included)
+2. Null-table p-values match bootstrap p-values between table sizes
+3. hartigans_dip_test reads the table unless simulations are requested
+4. rolling_shape_metrics matches scipy moments, find_modes and
+   classify_distribution_shape per window
+5. add_morphology_features exposes the batch results
+"""
+
+import sys
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import warnings
+
+import pytest
+import numpy as np
+import pandas as pd
+from scipy import stats
+
+from engine.features import morphology
+from engine.features.morphology import (
+    DIP_NULL_PROBABILITIES,
+    DIP_NULL_SAMPLE_SIZES,
+    DIP_NULL_TABLE,
+    MorphologyConfig,
+    _compute_dip,
+    add_morphology_features,
+    build_dip_null_table,
+    classify_distribution_shape,
+    dip_pvalue,
+    dip_statistics,
+    find_modes,
+    hartigans_dip_test,
+    rolling_shape_metrics,
+)
+
+
+# =============================================================================
+# TEST FIXTURES
+# =============================================================================
+
+@pytest.fixture
+def rng():
+    return np.random.default_rng(21)
+
+
+@pytest.fixture
+def mixed_returns(rng) -> np.ndarray:
+    """Normal, fat-tailed, bimodal and flat stretches, with a few NaN."""
+    bimodal = np.concatenate([rng.normal(-2.5, 1, 750), rng.normal(2.5, 1, 750)])
+    values = np.concatenate([
+        rng.normal(0, 1, 1500),
+        rng.standard_t(4, 1500),
+        bimodal[rng.permutation(1500)],
+        rng.uniform(-1, 1, 1500),
+    ]) * 0.01
+    values[[0, 700, 2000, 2001, 2002]] = np.nan
+    return values
+
+
+# =============================================================================
+# DIP TESTS
+# =============================================================================
+
+class TestDipStatistics:
+    """Vectorized dip against the single-sample hull scan."""
+
+    @pytest.mark.parametrize('n', [2, 3, 8, 60, 300])
+    def test_matches_single_sample(self, rng, n):
+        samples = rng.normal(0, 1, (400, n))
+        samples[1::4, :n // 2] += 4                      # Bimodal rows
+        samples[2::4] = np.round(samples[2::4], 1)       # Heavy ties
+        samples[3] = 1.5                                 # Constant row
+
+        expected = [_compute_dip(np.sort(row), None) for row in samples]
+        np.testing.assert_allclose(dip_statistics(samples), expected, rtol=0, atol=1e-12)
+
+    def test_point_masses(self):
+        # Ties collapse to one hull point per value: pure point masses
+        # leave only the 1/n ECDF step between the hulls
+        for n in (10, 60, 500):
+            data = np.r_[np.zeros(n // 2), np.ones(n // 2)]
+            assert _compute_dip(data, None) == pytest.approx(0.5 / n)
+            assert dip_statistics(data[None, :])[0] == pytest.approx(0.5 / n)
+
+    def test_bootstrap_uses_batch(self, rng, monkeypatch):
+        calls = []
+        original = morphology.dip_statistics
+        monkeypatch.setattr(morphology, 'dip_statistics', lambda s: calls.append(s.shape) or original(s))
+
+        np.random.seed(0)
+        dip, p_value = hartigans_dip_test(rng.normal(0, 1, 50), n_simulations=200)
+
+        assert calls == [(200, 50)]
+        assert 0.0 <= p_value <= 1.0 and dip > 0
+
+
+class TestDipNullTable:
+    """Precomputed null distribution."""
+
+    def test_table_shape_and_monotone(self):
+        assert DIP_NULL_TABLE.shape == (len(DIP_NULL_SAMPLE_SIZES), len(DIP_NULL_PROBABILITIES))
+        assert np.all(np.diff(DIP_NULL_TABLE, axis=1) > 0)
+
+    @pytest.mark.parametrize('n', [11, 45, 70, 130])
+    def test_matches_bootstrap_between_rows(self, rng, n):
+        null = dip_statistics(rng.uniform(0, 1, (6000, n)))
+        for sep in (0.0, 1.5, 2.5):
+            data = np.r_[rng.normal(-sep, 1, n // 2), rng.normal(sep, 1, n - n // 2)]
+            dip = _compute_dip(np.sort(data), None)
+
+            assert dip_pvalue(dip, n) == pytest.approx(np.mean(null >= dip), abs=0.03)
+
+    def test_rebuild_matches_shipped_row(self):
+        row = list(DIP_NULL_SAMPLE_SIZES).index(20)
+        rebuilt = build_dip_null_table(sample_sizes=np.array([20]), n_simulations=8000, seed=3)[0]
+        middle = (DIP_NULL_PROBABILITIES >= 0.1) & (DIP_NULL_PROBABILITIES <= 0.9)
+
+        np.testing.assert_allclose(rebuilt[middle], DIP_NULL_TABLE[row, middle], atol=0.01)
+
+    def test_vectorized_and_edge_cases(self):
+        dips = np.array([0.0, 0.05, 0.1, 0.2, np.nan])
+        p_values = dip_pvalue(dips, 50)
+
+        assert p_values.shape == (5,)
+        assert np.all(np.diff(p_values[:4]) <= 0)
+        assert p_values[0] == 1.0 and p_values[3] == 0.0 and p_values[4] == 1.0
+        assert dip_pvalue(0.25, 2) == 1.0
+        assert isinstance(dip_pvalue(0.1, 5000), float)
+
+    def test_dip_test_reads_table(self, rng, monkeypatch):
+        monkeypatch.setattr(morphology, 'dip_statistics', lambda s: pytest.fail('bootstrapped'))
+        data = rng.normal(0, 1, 80)
+
+        dip, p_value = hartigans_dip_test(data)
+        assert p_value == dip_pvalue(dip, 80)
+        assert MorphologyConfig().dip_n_simulations is None
+
+
+# =============================================================================
+# ROLLING CLASSIFIER TESTS
+# =============================================================================
+
+class TestRollingShapeMetrics:
+    """All windows at once against the per-window functions."""
+
+    def test_matches_per_window(self, mixed_returns):
+        config = MorphologyConfig()
+        out = rolling_shape_metrics(mixed_returns, window=60, config=config)
+
+        assert len(out) == len(mixed_returns)
+        assert (out['shape'].iloc[:59] == 'unknown').all()
+
+        mode_matches = checked = 0
+        for i in range(59, len(mixed_returns), 11):
+            w = mixed_returns[i - 59:i + 1]
+            w = w[~np.isnan(w)]
+            skew, kurt = stats.skew(w), stats.kurtosis(w)
+
+            assert out['skewness'].iloc[i] == pytest.approx(skew, rel=1e-9)
+            assert out['kurtosis'].iloc[i] == pytest.approx(kurt, rel=1e-9)
+            assert out['shape'].iloc[i] == classify_distribution_shape(
+                skew, kurt, not out['is_bimodal'].iloc[i], 1, config)
+
+            with warnings.catch_warnings():
+                warnings.simplefilter('ignore')
+                mode_matches += find_modes(w)[1] == out['n_modes'].iloc[i]
+            checked += 1
+
+        assert mode_matches / checked > 0.97
+
+    def test_bimodality_by_regime(self, mixed_returns):
+        out = rolling_shape_metrics(mixed_returns, window=60)
+        bimodal_rate = [out['is_bimodal'].iloc[s + 60:s + 1500].mean() for s in range(0, 6000, 1500)]
+
+        normal, fat_tailed, bimodal, flat = bimodal_rate
+        assert bimodal > 0.8
+        assert normal < 0.02 and fat_tailed < 0.05 and flat < 0.3
+
+    def test_short_and_degenerate_windows(self):
+        values = np.r_[np.full(30, 0.01), np.full(20, np.nan), np.arange(30) * 1e-3]
+        out = rolling_shape_metrics(values, window=25)
+
+        assert (out['shape'].iloc[:24] == 'unknown').all()
+        assert out['shape'].iloc[29] == 'unknown'      # Constant window
+        assert out['shape'].iloc[60] == 'unknown'      # Only 11 non-NaN values
+        assert out['shape'].iloc[-1] != 'unknown'
+        assert len(rolling_shape_metrics(values[:10], window=25)) == 10
+
+
+class TestAddMorphologyFeatures:
+    """DataFrame integration."""
+
+    def test_columns(self, mixed_returns):
+        df = pd.DataFrame({'returns': mixed_returns})
+        result = add_morphology_features(df, window=60)
+
+        for col in ('skewness', 'kurtosis', 'shape', 'is_bimodal', 'n_modes', 'bimodality', 'shape_score'):
+            assert f'morph_{col}' in result.columns
+        assert result['morph_is_bimodal'].dtype == bool
+        assert result['morph_is_bimodal'].iloc[3100:4400].mean() > 0.8
+        assert result['morph_shape_score'].iloc[:59].isna().all()
+        pd.testing.assert_series_equal(result['returns'], df['returns'])
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+"""
+Observer Feature Snapshot Tests
+===============================
+Validates the shared, memoized feature snapshot behind ObserverSwarm prompts.
+
+Tests:
+1. Each field is summarized once per run_observers call
+2. Observer data matches the per-observer summaries (to 6 significant digits)
+3. Prompts carry only declared fields, as compact valid JSON
+4. Prompts are smaller than the indented per-observer dumps
+5. A field listed twice is rendered once
+"""
+
+import sys
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import json
+
+import pytest
+import numpy as np
+import pandas as pd
+
+from engine.ai_native import observers
+from engine.ai_native.observers import OBSERVER_REGISTRY, FeatureSnapshot, ObserverSwarm
+
+
+# =============================================================================
+# TEST FIXTURES
+# =============================================================================
+
+@pytest.fixture
+def market_data() -> pd.DataFrame:
+    """Every numeric field any observer asks for, plus a label column."""
+    rng = np.random.default_rng(7)
+    n = 120
+    fields = sorted({r for cfg in OBSERVER_REGISTRY.values() for r in cfg['data_requirements']})
+    df = pd.DataFrame({f: rng.normal(10, 3, n) for f in fields})
+    df['shape_class'] = rng.choice(['P', 'b', 'B'], n)
+    df.loc[n - 1, 'vix'] = np.nan
+    return df
+
+
+@pytest.fixture
+def captured_tasks(monkeypatch):
+    """Capture swarm tasks instead of calling the LLM."""
+    captured = []
+
+    def fake_swarm(tasks, concurrency=50, **kwargs):
+        captured.extend(tasks)
+        return [{'id': t['id'], 'status': 'success', 'content': '{"interpretation": "ok", "confidence": 0.8}'}
+                for t in tasks]
+
+    monkeypatch.setattr(observers, 'run_swarm_sync', fake_swarm)
+    return captured
+
+
+def legacy_observer_data(requirements, market_data):
+    """Per-observer summaries as prepare_observer_data built them before the snapshot."""
+    data = {}
+    latest = market_data.iloc[-1]
+    for req in requirements:
+        if req in market_data.columns or req in ['close', 'open', 'high', 'low', 'volume']:
+            data[req] = latest.get(req, 0)
+    for req in requirements:
+        if req in market_data.columns and pd.api.types.is_numeric_dtype(market_data[req]):
+            col = market_data[req].dropna()
+            data[f'{req}_20d_mean'] = float(col.tail(20).mean())
+            data[f'{req}_20d_std'] = float(col.tail(20).std())
+    return data
+
+
+def prompt_payload(task):
+    return task['user'].split('\n\n')[1]
+
+
+# =============================================================================
+# SNAPSHOT TESTS
+# =============================================================================
+
+class TestFeatureSnapshot:
+    """Shared summaries and compact fragments."""
+
+    def test_fields_computed_once(self, market_data, captured_tasks, monkeypatch):
+        calls = []
+        original = FeatureSnapshot.features
+
+        def counting(self, name):
+            if name not in self._features:
+                calls.append(name)
+            return original(self, name)
+
+        monkeypatch.setattr(FeatureSnapshot, 'features', counting)
+        ObserverSwarm().run_observers(market_data, symbol='SPY')
+
+        assert sorted(calls) == sorted(set(calls))
+        assert 'iv_30d' in calls and len(captured_tasks) == len(OBSERVER_REGISTRY)
+
+    def test_matches_per_observer_summaries(self, market_data):
+        swarm = ObserverSwarm()
+        snapshot = FeatureSnapshot(market_data, {'eq1': 'y = 2x'})
+
+        for obs_id, cfg in OBSERVER_REGISTRY.items():
+            data = swarm.prepare_observer_data(obs_id, market_data, snapshot=snapshot)
+            expected = legacy_observer_data(cfg['data_requirements'], market_data)
+
+            assert set(data) - {'math_swarm_equations'} == set(expected)
+            for key, value in expected.items():
+                if isinstance(value, str):
+                    assert data[key] == value
+                elif np.isnan(value):
+                    assert data[key] is None
+                else:
+                    assert data[key] == pytest.approx(value, rel=1e-5)
+            assert data['math_swarm_equations'] == {'eq1': 'y = 2x'}
+
+        assert snapshot.stats()['fields_reused'] > 0
+
+    def test_short_history_and_missing_fields(self):
+        frame = pd.DataFrame({'sma_20': [1.0, 2.0], 'iv_30d': [20.0, 21.0]})
+        data = ObserverSwarm().prepare_observer_data('trend_observer', frame)
+
+        # No 20-bar history yet; a missing price field reports 0.0
+        assert data == {'close': 0.0, 'sma_20': 2.0}
+
+
+    def test_render_deduplicates_requirements(self, market_data):
+        snapshot = FeatureSnapshot(market_data)
+        rendered = snapshot.render(['iv_30d', 'close', 'iv_30d'])
+        keys = [key for key, _ in json.loads(rendered, object_pairs_hook=list)]
+
+        assert len(keys) == len(set(keys))
+        assert rendered == snapshot.render(['iv_30d', 'close'])
+
+
+class TestObserverPrompts:
+    """Prompt assembly in run_observers."""
+
+    def test_prompts_compact_and_scoped(self, market_data, captured_tasks):
+        equations = {'vrp': 'iv_30d - rv_30d'}
+        outputs = ObserverSwarm().run_observers(market_data, equations=equations, symbol='SPY')
+
+        legacy_chars = new_chars = 0
+        for task in captured_tasks:
+            payload = json.loads(prompt_payload(task))
+            requirements = OBSERVER_REGISTRY[task['id']]['data_requirements']
+            bases = {k for k in payload if k != 'math_swarm_equations'}
+
+            assert all(k.split('_20d_')[0] in requirements for k in bases)
+            assert payload['math_swarm_equations'] == equations
+            assert '\n' not in prompt_payload(task)
+
+            legacy = dict(legacy_observer_data(requirements, market_data), math_swarm_equations=equations)
+            legacy_chars += len(json.dumps(legacy, indent=2, default=str))
+            new_chars += len(prompt_payload(task))
+
+        assert new_chars < 0.7 * legacy_chars
+        assert all(o.raw_data for o in outputs)
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
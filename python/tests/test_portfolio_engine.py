@@ -0,0 +1,320 @@
+#!/usr/bin/env python3
+"""
+Portfolio Engine Tests
+======================
+Validates the matrix-based PortfolioBacktester against the original
+day-by-day simulation loop, and the PortfolioOptimizer's analytic
+objectives against the pandas reference.
+
+Tests:
+1. Rebalance schedule (daily / weekly / monthly / regime change)
+2. Scheduled optimizer calls reproduce the per-day loop
+3. Allocation cap, flat days and stop loss
+4. Turnover costs
+5. Analytic Sharpe / Sortino objectives and gradients
+6. Incremental window moments and batch (schedule) optimization
+"""
+
+import sys
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from types import SimpleNamespace
+
+import pytest
+import numpy as np
+import pandas as pd
+
+
+# =============================================================================
+# TEST FIXTURES
+# =============================================================================
+
+@pytest.fixture
+def portfolio_modules():
+    """The portfolio stack pulls in engine.discovery; skip when unavailable."""
+    backtester = pytest.importorskip("engine.portfolio.portfolio_backtester")
+    dna = pytest.importorskip("engine.portfolio.portfolio_dna")
+    return backtester, dna
+
+
+class MockStructure:
+    """Stand-in for StructureDNA (only identity is used)."""
+
+    def __init__(self, key):
+        self.structure_key = key
+
+    def to_dict(self):
+        return {'key': self.structure_key}
+
+
+class MockPrecisionBacktester:
+    """Serves precomputed daily returns per structure."""
+
+    def __init__(self, returns: pd.DataFrame, regimes: pd.Series):
+        self.returns = returns
+        self.regimes = regimes
+        self.trading_dates = returns.index
+
+    def backtest(self, dna, start_date=None, end_date=None):
+        return SimpleNamespace(daily_returns=self.returns[dna.structure_key])
+
+
+@pytest.fixture
+def optimizer_module():
+    return pytest.importorskip("engine.portfolio.portfolio_optimizer")
+
+
+@pytest.fixture
+def market():
+    rng = np.random.default_rng(5)
+    dates = pd.bdate_range('2021-01-04', periods=260)
+    returns = pd.DataFrame(rng.normal(0.0005, 0.01, size=(len(dates), 4)),
+                           index=dates, columns=list('ABCD'))
+    regimes = pd.Series(np.repeat([0, 1, 0, 2, 1], 52), index=dates)
+    return returns, regimes
+
+
+def reference_objective(weights, returns_df, objective):
+    """The pandas objective the analytic one replaced (negated metric)."""
+    if returns_df.empty or len(returns_df) < 2:
+        return -1e9
+
+    portfolio_returns = returns_df.dot(weights)
+    ann_factor = 252
+    mean_return = portfolio_returns.mean() * ann_factor
+
+    if objective.value == 'sharpe_ratio':
+        std_dev = portfolio_returns.std() * np.sqrt(ann_factor)
+        return -1e9 if std_dev == 0 else -mean_return / std_dev
+    if objective.value == 'sortino_ratio':
+        downside_returns = np.minimum(portfolio_returns, 0)
+        downside_std_dev = np.sqrt((downside_returns ** 2).mean()) * np.sqrt(ann_factor)
+        return -1e9 if downside_std_dev == 0 else -mean_return / downside_std_dev
+    if objective.value == 'max_return':
+        return -mean_return
+    if objective.value == 'min_drawdown':
+        cumulative_returns = (1 + portfolio_returns).cumprod()
+        max_peak = cumulative_returns.expanding().max()
+        return ((cumulative_returns - max_peak) / max_peak).min()
+    return -1e9
+
+
+class PeriodOptimizer:
+    """Deterministic optimizer that gates itself like PortfolioOptimizer."""
+
+    def __init__(self, regimes):
+        self.regimes = regimes
+        self.last = None
+        self.calls = 0
+
+    def __call__(self, current_date, dna, structures, returns_df, regimes=None):
+        self.calls += 1
+        freq = dna.rebalance_frequency.value
+        if self.last is not None:
+            if freq == 'weekly' and current_date.isocalendar()[:2] == self.last.isocalendar()[:2]:
+                return None
+            if freq == 'monthly' and (current_date.year, current_date.month) == (self.last.year, self.last.month):
+                return None
+            if freq == 'regime_change' and self.regimes[current_date] == self.regimes[self.last]:
+                return None
+        self.last = current_date
+        rng = np.random.default_rng(current_date.toordinal())
+        w = rng.dirichlet(np.ones(returns_df.shape[1]))
+        return dict(zip(returns_df.columns, w))
+
+
+def reference_backtest(returns_df, dna, optimizer_func):
+    """Original per-day loop: optimizer every day, dict weights, stop loss."""
+    dates = returns_df.index
+    daily = pd.Series(0.0, index=dates)
+    equity = pd.Series(1.0, index=dates)
+    current = {}
+    in_position = False
+    value, max_dd = 1.0, 0.0
+    for current_date in dates:
+        w = optimizer_func(current_date, dna, None, returns_df, None)
+        if w:
+            current = w
+            in_position = any(x > 0 for x in current.values())
+        r = 0.0
+        if in_position:
+            for s_id, weight in current.items():
+                r += returns_df.loc[current_date, s_id] * min(weight, dna.max_strategy_allocation_pct)
+        daily.loc[current_date] = r
+        value *= 1 + r
+        equity.loc[current_date] = value
+        max_dd = max(max_dd, 1 - value / equity.max())
+        if max_dd >= dna.portfolio_stop_loss_pct:
+            break
+    return daily.loc[:current_date], equity.loc[:current_date]
+
+
+def make_backtester(backtester_module, market, **kwargs):
+    returns, regimes = market
+    structures = [MockStructure(c) for c in returns.columns]
+    return backtester_module.PortfolioBacktester(MockPrecisionBacktester(returns, regimes), structures, **kwargs)
+
+
+# =============================================================================
+# SCHEDULE TESTS
+# =============================================================================
+
+class TestRebalanceSchedule:
+    """Rebalance dates are computed up front from the calendar / regimes."""
+
+    def test_schedules(self, portfolio_modules, market):
+        backtester, dna_module = portfolio_modules
+        returns, regimes = market
+        freq = dna_module.RebalanceFrequency
+        dates = returns.index
+
+        assert backtester.rebalance_schedule(dates, freq.DAILY).all()
+
+        weekly = backtester.rebalance_schedule(dates, freq.WEEKLY)
+        assert weekly.sum() == len(set(d.isocalendar()[:2] for d in dates))
+        assert all(dates[weekly][1:].weekday == 0)
+
+        monthly = backtester.rebalance_schedule(dates, freq.MONTHLY)
+        assert monthly.sum() == len(set((d.year, d.month) for d in dates))
+
+        regime = backtester.rebalance_schedule(dates, freq.REGIME_CHANGE, regimes)
+        assert np.flatnonzero(regime).tolist() == [0, 52, 104, 156, 208]
+
+
+# =============================================================================
+# BACKTEST TESTS
+# =============================================================================
+
+class TestMatrixBacktest:
+    """Matrix backtest must reproduce the per-day loop."""
+
+    @pytest.mark.parametrize('frequency', ['daily', 'weekly', 'monthly', 'regime_change'])
+    def test_matches_daily_loop(self, portfolio_modules, market, frequency):
+        backtester, dna_module = portfolio_modules
+        returns, regimes = market
+        dna = dna_module.PortfolioDNA(
+            rebalance_frequency=dna_module.RebalanceFrequency(frequency),
+            max_strategy_allocation_pct=0.35,
+            portfolio_stop_loss_pct=0.5,
+        )
+        pb = make_backtester(backtester, market)
+
+        optimizer = PeriodOptimizer(regimes)
+        result = pb.backtest_portfolio(dna, optimizer)
+        ref_daily, ref_equity = reference_backtest(pb.all_strategy_returns_df, dna, PeriodOptimizer(regimes))
+
+        np.testing.assert_allclose(result.daily_returns.values, ref_daily.values, atol=1e-15)
+        np.testing.assert_allclose(result.equity_curve.values, ref_equity.values, rtol=1e-12)
+        if frequency != 'daily':
+            assert optimizer.calls < len(returns) / 4
+
+    def test_stop_loss_truncates(self, portfolio_modules, market):
+        backtester, dna_module = portfolio_modules
+        returns, regimes = market
+        dna = dna_module.PortfolioDNA(
+            rebalance_frequency=dna_module.RebalanceFrequency.WEEKLY,
+            max_strategy_allocation_pct=1.0,
+            portfolio_stop_loss_pct=0.03,
+        )
+        pb = make_backtester(backtester, market)
+
+        result = pb.backtest_portfolio(dna, PeriodOptimizer(regimes))
+        ref_daily, _ = reference_backtest(pb.all_strategy_returns_df, dna, PeriodOptimizer(regimes))
+
+        assert len(result.daily_returns) == len(ref_daily) < len(returns)
+        assert max(result.weights_history) <= result.daily_returns.index[-1]
+
+    def test_turnover_costs(self, portfolio_modules, market):
+        backtester, dna_module = portfolio_modules
+        returns, regimes = market
+        dna = dna_module.PortfolioDNA(
+            rebalance_frequency=dna_module.RebalanceFrequency.MONTHLY,
+            max_strategy_allocation_pct=1.0,
+            portfolio_stop_loss_pct=1.0,
+        )
+        gross = make_backtester(backtester, market).backtest_portfolio(dna, PeriodOptimizer(regimes))
+        net = make_backtester(backtester, market, transaction_cost_bps=10).backtest_portfolio(dna, PeriodOptimizer(regimes))
+
+        weights = pd.DataFrame(gross.weights_history).T.reindex(returns.index).ffill().fillna(0.0)
+        turnover = weights.diff().fillna(weights).abs().sum(axis=1)
+        np.testing.assert_allclose(gross.daily_returns - net.daily_returns, turnover * 1e-3, atol=1e-15)
+
+    def test_flat_when_no_positive_weight(self, portfolio_modules, market):
+        backtester, dna_module = portfolio_modules
+        dna = dna_module.PortfolioDNA(rebalance_frequency=dna_module.RebalanceFrequency.DAILY)
+        pb = make_backtester(backtester, market)
+
+        result = pb.backtest_portfolio(dna, lambda *args: {c: -0.25 for c in pb.all_strategy_returns_df.columns})
+        assert (result.daily_returns == 0).all()
+
+
+
+# =============================================================================
+# OPTIMIZER TESTS
+# =============================================================================
+
+class TestAnalyticOptimizer:
+    """Closed-form objectives, rolling moments and batch mode."""
+
+    @pytest.mark.parametrize('objective', ['sharpe_ratio', 'sortino_ratio', 'max_return', 'min_drawdown'])
+    def test_objective_matches_reference(self, optimizer_module, portfolio_modules, market, objective):
+        _, dna_module = portfolio_modules
+        returns, _ = market
+        obj = dna_module.PortfolioObjective(objective)
+        rows = returns.values[:60]
+        w = np.array([0.1, 0.2, 0.3, 0.4])
+
+        fun, _ = optimizer_module.portfolio_objective(rows, obj)
+        reference = reference_objective(w, pd.DataFrame(rows), obj)
+        assert fun(w) == pytest.approx(reference, rel=1e-10)
+
+    @pytest.mark.parametrize('objective', ['sharpe_ratio', 'sortino_ratio', 'max_return'])
+    def test_gradients(self, optimizer_module, portfolio_modules, market, objective):
+        from scipy.optimize import approx_fprime
+        _, dna_module = portfolio_modules
+        returns, _ = market
+        fun, jac = optimizer_module.portfolio_objective(
+            returns.values[:60], dna_module.PortfolioObjective(objective)
+        )
+        w = np.array([0.1, 0.2, 0.3, 0.4])
+
+        np.testing.assert_allclose(jac(w), approx_fprime(w, fun, 1e-7), rtol=1e-4, atol=1e-6)
+
+    def test_rolling_moments_match_direct(self, optimizer_module, market):
+        returns, regimes = market
+        values = returns.values
+        moments = optimizer_module.RollingWindowMoments(values, regimes.values)
+
+        for start, stop in [(0, 40), (5, 48), (10, 60), (30, 70), (100, 150)]:
+            positions, n, mean, cov = moments.window(start, stop, 0)
+            rows = values[start:stop][regimes.values[start:stop] == 0]
+            assert n == len(rows) == len(positions)
+            if n > 1:
+                np.testing.assert_allclose(mean, rows.mean(axis=0), atol=1e-15)
+                np.testing.assert_allclose(cov, np.cov(rows, rowvar=False), atol=1e-15)
+
+    def test_schedule_weights_feasible_and_warm_started(self, optimizer_module, portfolio_modules, market):
+        _, dna_module = portfolio_modules
+        returns, regimes = market
+        dna = dna_module.PortfolioDNA(
+            rebalance_frequency=dna_module.RebalanceFrequency.WEEKLY,
+            rebalance_window_days=60,
+            max_strategy_allocation_pct=0.4,
+        )
+        optimizer = optimizer_module.PortfolioOptimizer(regimes)
+
+        history = optimizer.optimize_schedule(dna, [], returns)
+
+        assert len(history) > 30
+        for weights in history.values():
+            w = np.array(list(weights.values()))
+            assert w.sum() == pytest.approx(1.0, abs=1e-6)
+            assert (w >= -1e-9).all() and (w <= 0.4 + 1e-6).all()
+        assert optimizer._initial_weights(list(returns.columns), 0.4) == pytest.approx(
+            np.array(list(optimizer.last_weights.values())) / sum(optimizer.last_weights.values()), abs=1e-6
+        )
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
@@ -0,0 +1,181 @@
+#!/usr/bin/env python3
+"""
+Overfitting Red Team Tests
+==========================
+Validates the batched resampling statistics in
+scripts/overfitting_red_team_fast.py.
+
+Tests:
+1. Monte Carlo p-values come with a Clopper-Pearson CI on the same basis
+2. Batched resampling is reproducible for a seed regardless of n_jobs
+3. The vectorized allocation null reproduces the unpermuted model
+4. A failing walk-forward year is reported without re-running the others
+5. The permutation test falls back to the engine when the proxy misses the book
+"""
+
+import sys
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+sys.path.insert(0, str(Path(__file__).parent.parent / 'scripts'))
+
+import math
+from types import SimpleNamespace
+
+import pytest
+import numpy as np
+import pandas as pd
+from scipy import stats
+
+import overfitting_red_team_fast as red_team
+
+
+# =============================================================================
+# TEST FIXTURES
+# =============================================================================
+
+@pytest.fixture
+def portfolio() -> pd.DataFrame:
+    """Two profiles whose allocation depends on a three-state regime label."""
+    rng = np.random.default_rng(38)
+    n = 300
+    labels = rng.choice(['calm', 'trend', 'stress'], n)
+    weights = {'calm': (0.6, 0.2), 'trend': (0.3, 0.5), 'stress': (0.1, 0.1)}
+    frame = pd.DataFrame({
+        'a_weight': [weights[r][0] for r in labels],
+        'b_weight': [weights[r][1] for r in labels],
+    })
+    frame['a_pnl'] = frame['a_weight'] * rng.normal(0.001, 0.01, n)
+    frame['b_pnl'] = frame['b_weight'] * rng.normal(0.0005, 0.01, n)
+    frame['portfolio_pnl'] = frame['a_pnl'] + frame['b_pnl']
+    return frame, labels
+
+
+# =============================================================================
+# STATISTICS TESTS
+# =============================================================================
+
+class TestMonteCarloPValue:
+    """(k + 1) / (n + 1) p-values and their CIs."""
+
+    @pytest.mark.parametrize('observed', [-10.0, 0.0, 1.5, 10.0])
+    def test_ci_matches_exact_binomial(self, observed):
+        null = np.random.default_rng(0).normal(size=999)
+        p_value, (lo, hi) = red_team.monte_carlo_pvalue(null, observed)
+
+        k = int(np.sum(null >= observed))
+        assert p_value == (k + 1) / 1000
+        assert lo <= p_value <= hi
+        exact = stats.binomtest(k + 1, 1000).proportion_ci(method='exact')
+        assert (lo, hi) == pytest.approx((exact.low, exact.high))
+
+    def test_no_exceedances_is_not_zero(self):
+        p_value, (lo, hi) = red_team.monte_carlo_pvalue(np.zeros(99), 1.0)
+        assert p_value == 0.01
+        assert 0 < lo < p_value < hi
+
+
+class TestRedTeamEngine:
+    """Seeded batches and parallel runs."""
+
+    def test_bootstrap_reproducible_across_jobs(self):
+        pnl = np.random.default_rng(1).normal(0.001, 0.01, 250)
+        serial = red_team.RedTeamEngine(n_jobs=1, batch_size=100, seed=7)
+        parallel = red_team.RedTeamEngine(n_jobs=2, batch_size=100, seed=7)
+
+        assert serial.bootstrap_sharpe_ci(pnl, n_boot=450) == parallel.bootstrap_sharpe_ci(pnl, n_boot=450)
+
+    @pytest.mark.parametrize('n_jobs', [1, 2])
+    def test_map_runs_returns_exceptions(self, n_jobs):
+        engine = red_team.RedTeamEngine(n_jobs=n_jobs)
+        runs = engine.map_runs(math.sqrt, [(4.0,), (-1.0,), (9.0,)], return_exceptions=True)
+
+        assert runs[0] == 2.0 and runs[2] == 3.0
+        assert isinstance(runs[1], ValueError)
+        with pytest.raises(ValueError):
+            engine.map_runs(math.sqrt, [(4.0,), (-1.0,)])
+
+    def test_allocation_null(self, portfolio):
+        frame, labels = portfolio
+        unit_pnl, regime_weights, codes = red_team.regime_allocation_model(frame, labels)
+
+        # Allocations are a function of the regime, so the model is exact
+        np.testing.assert_allclose(red_team.allocation_model_pnl((unit_pnl, regime_weights, codes)),
+                                   frame['portfolio_pnl'])
+
+        null = red_team._allocation_permutation_batch(np.random.SeedSequence(3), 200, unit_pnl,
+                                                      regime_weights, codes)
+        assert null.shape == (200,) and np.isfinite(null).all()
+
+        # A single regime makes every permutation identical to the observed book
+        single = red_team._allocation_permutation_batch(np.random.SeedSequence(3), 5, unit_pnl,
+                                                        regime_weights[:1], np.zeros_like(codes))
+        np.testing.assert_allclose(single, red_team.sharpe_rows(regime_weights[0] @ unit_pnl.T)[0])
+
+    def test_allocation_model_needs_profile_columns(self, portfolio):
+        frame, labels = portfolio
+        assert red_team.regime_allocation_model(frame[['portfolio_pnl']], labels) is None
+
+
+# =============================================================================
+# AUDIT TESTS
+# =============================================================================
+
+class TestWalkForward:
+    """Per-year runs with one failing year."""
+
+    def test_failed_year_runs_once(self, monkeypatch):
+        calls = []
+
+        def engine_run(engine_kwargs, start_date, end_date):
+            calls.append(start_date[:4])
+            if start_date.startswith('2022'):
+                raise RuntimeError('no data')
+            return 1.0 + len(calls) / 10, 1000.0
+
+        monkeypatch.setattr(red_team, '_engine_run', engine_run)
+        audit = red_team.OverfittingRedTeam(n_jobs=1)
+        result = audit.test_walk_forward_degradation('2020-01-01', '2024-12-31')
+
+        assert calls == ['2020', '2021', '2022', '2023', '2024']
+        assert result['sharpe_mean'] == pytest.approx(np.mean([1.1, 1.2, 1.4, 1.5]))
+
+    @pytest.fixture
+    def audit_run(self, monkeypatch):
+        """Runs the permutation test on a fixed book with stubbed engine runs."""
+        def run_audit(frame, labels):
+            dates = pd.date_range('2020-01-01', periods=len(frame)).date
+            engine = SimpleNamespace(run=lambda start_date, end_date: {'portfolio': frame})
+            loaders = SimpleNamespace(load_spy_data=lambda: pd.DataFrame({'date': dates, 'regime': labels}))
+            monkeypatch.setattr(red_team, '_rotation_engine', lambda **kwargs: engine)
+            monkeypatch.setattr(red_team, '_engine_permutation_batch', lambda seed, n: np.zeros(n))
+            monkeypatch.setitem(sys.modules, 'data.loaders', loaders)
+            audit = red_team.OverfittingRedTeam(n_bootstrap=100, max_engine_permutations=20, n_jobs=1)
+            return audit.test_permutation_significance('2020-01-01', '2021-12-31', n_iter=500)
+        return run_audit
+
+    def test_allocation_proxy_reproduces_book(self, portfolio, audit_run):
+        frame, labels = portfolio
+        result = audit_run(frame, labels)
+
+        assert result['mode'] == 'allocation' and result['n_permutations'] == 500
+        assert result['proxy_max_error'] < 1e-12
+        assert result['observed_sharpe'] == pytest.approx(result['baseline_sharpe'])
+
+    def test_proxy_mismatch_falls_back_to_engine(self, portfolio, audit_run):
+        frame, labels = portfolio
+        # Allocations that drift within a regime are not a function of the label
+        drift = np.linspace(0.5, 1.5, len(frame))
+        frame = frame.assign(a_weight=frame['a_weight'] * drift)
+
+        result = audit_run(frame, labels)
+
+        assert result['mode'] == 'engine' and result['n_permutations'] == 20
+        assert result['proxy_max_error'] > 0.01 * frame['portfolio_pnl'].abs().max()
+        assert result['observed_sharpe'] == result['baseline_sharpe']
+
+    def test_allocation_is_default(self):
+        assert red_team.OverfittingRedTeam().permutation_mode == 'allocation'
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+"""
+Regime Tagging Tests
+====================
+Validates RegimeMonitor's vectorized regime tagging and the on-disk
+regime-tag cache shared by backtest workers.
+
+Tests:
+1. tag_historical_regimes matches the per-row classify_regime loop
+2. regime_codes artifacts are reused per data version
+3. The artifact cache is bounded and orphaned temp files are removed
+"""
+
+import sys
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import os
+import time
+
+import pytest
+import numpy as np
+import pandas as pd
+
+
+# =============================================================================
+# TEST FIXTURES
+# =============================================================================
+
+@pytest.fixture(scope='module')
+def daemon(tmp_path_factory):
+    """Import daemon.py from a scratch directory (it opens its log file on import)."""
+    cwd = os.getcwd()
+    os.chdir(tmp_path_factory.mktemp('daemon'))
+    try:
+        import daemon
+    finally:
+        os.chdir(cwd)
+    return daemon
+
+
+@pytest.fixture
+def monitor(daemon, tmp_path):
+    return daemon.RegimeMonitor(tmp_path)
+
+
+@pytest.fixture
+def market_data() -> pd.DataFrame:
+    """SPY closes with VIX/VIX9D/skew spanning every branch, thresholds and NaNs."""
+    rng = np.random.default_rng(33)
+    n = 1500
+    close = 400 * np.cumprod(1 + rng.normal(0.0005, 0.012, n))
+    vix = rng.uniform(8, 45, n)
+    vix[::50] = rng.choice([15.0, 25.0, 30.0], len(vix[::50]))
+    df = pd.DataFrame({
+        'close': close,
+        'vix': vix,
+        'vix9d': vix * rng.uniform(0.85, 1.2, n),
+        'put_call_skew': rng.normal(4, 3, n),
+    })
+    df.loc[df.index[::97], 'vix'] = np.nan
+    df.loc[df.index[5::89], 'vix9d'] = 0.0
+    return df
+
+
+def reference_tags(monitor, market_data: pd.DataFrame) -> list:
+    """Per-row tagging as tag_historical_regimes did before vectorization."""
+    df, vix_col, vix9d_col, skew_col = monitor._prepare_regime_inputs(market_data)
+    regimes = []
+    for _, row in df.iterrows():
+        vix = row.get(vix_col, 15)
+        vix9d = row.get(vix9d_col, vix * 0.95)
+        state = monitor.classify_regime(
+            vix, vix9d, row.get('realized_vol', 0.15), row.get(skew_col, 0), row.get('momentum_20d', 0)
+        )
+        regimes.append(state.regime)
+    return regimes
+
+
+# =============================================================================
+# TAGGING TESTS
+# =============================================================================
+
+class TestRegimeTagging:
+    """Vectorized decision tree against the scalar classifier."""
+
+    @pytest.mark.parametrize('columns', [
+        ['close', 'vix', 'vix9d', 'put_call_skew'],
+        ['close', 'vix'],          # Estimated VIX9D and zero skew
+        ['close'],                 # VIX estimated from realized vol
+    ])
+    def test_matches_per_row_loop(self, monitor, market_data, columns):
+        frame = market_data[columns]
+        expected = reference_tags(monitor, frame)
+
+        assert monitor.tag_historical_regimes(frame)['regime'].tolist() == expected
+        assert monitor.tag_historical_regimes(frame, cache_key='v1')['regime'].tolist() == expected
+
+    def test_confidence_matches_scalar(self, daemon, monitor, market_data):
+        df = market_data.iloc[:300]
+        momentum = df['close'].pct_change(20).to_numpy()
+        codes, confidence = monitor.classify_regimes(
+            df['vix'].to_numpy(), df['vix9d'].to_numpy(), df['put_call_skew'].to_numpy(), momentum)
+
+        for i in range(len(df)):
+            state = monitor.classify_regime(df['vix'].iloc[i], df['vix9d'].iloc[i], 0.15,
+                                            df['put_call_skew'].iloc[i], momentum[i])
+            assert daemon.RegimeType.ALL[codes[i]] == state.regime
+            assert confidence[i] == pytest.approx(state.confidence, nan_ok=True)
+
+
+# =============================================================================
+# ARTIFACT CACHE TESTS
+# =============================================================================
+
+class TestRegimeArtifacts:
+    """Per-version .npy artifacts under data_dir/.cache/regime_tags."""
+
+    def test_reused_per_version(self, monitor, market_data, monkeypatch):
+        codes = monitor.regime_codes(market_data, cache_key='v1')
+        monkeypatch.setattr(monitor, '_classify_frame', lambda *a: pytest.fail('re-tagged'))
+
+        cached = monitor.regime_codes(market_data, cache_key='v1')
+        assert isinstance(cached, np.memmap)
+        np.testing.assert_array_equal(cached, codes)
+
+    def test_cache_is_bounded(self, monitor, market_data, monkeypatch):
+        monkeypatch.setattr(monitor, 'REGIME_ARTIFACT_LIMIT', 3)
+        cache_dir = monitor._regime_artifact_path('v0').parent
+        cache_dir.mkdir(parents=True)
+
+        orphan = cache_dir / 'orphan.npy.tmp'
+        in_flight = cache_dir / 'in_flight.npy.tmp'
+        orphan.touch()
+        in_flight.touch()
+        stale = time.time() - 2 * monitor.REGIME_ARTIFACT_TMP_MAX_AGE
+        os.utime(orphan, (stale, stale))
+
+        for version in range(5):
+            monitor.regime_codes(market_data, cache_key=f'v{version}')
+            if version == 2:
+                # v0 is read again, so it outlives v1 and v2
+                time.sleep(0.01)
+                monitor.regime_codes(market_data, cache_key='v0')
+            time.sleep(0.01)
+
+        kept = {p.name for p in cache_dir.glob('*.npy')}
+        assert kept == {monitor._regime_artifact_path(v).name for v in ('v0', 'v3', 'v4')}
+        assert not orphan.exists() and in_flight.exists()
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
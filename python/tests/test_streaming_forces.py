@@ -0,0 +1,211 @@
+#!/usr/bin/env python3
+"""
+Streaming Force Engine Tests
+============================
+Validates bar-by-bar force updates against the batch calculations.
+
+Tests:
+1. RollingPercentile ranks match the list-based percentile history
+2. StreamingVPIN matches calculate_vpin on the full history
+3. HMM online filtering matches the forward pass without refitting
+4. Entropy, volatility and slowing-down state match the batch functions
+5. StreamingForceEngine produces a full MarketPhysicsState every bar
+"""
+
+import sys
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import logging
+import warnings
+
+import pytest
+import numpy as np
+import pandas as pd
+
+from engine.ai_native.force_aggregator import (
+    ForceAggregator,
+    MarketPhysicsState,
+    RollingPercentile,
+    StreamingForceEngine,
+)
+from engine.features.duration import compute_hazard_rate
+from engine.features.dynamics import compute_entropy_dynamics, compute_volatility_dynamics
+from engine.features.flow import StreamingVPIN, calculate_vpin
+from engine.features.regime import (
+    GaussianHMM,
+    HMMConfig,
+    critical_slowing_down_indicators,
+    detect_slowing_down,
+)
+
+
+# =============================================================================
+# TEST FIXTURES
+# =============================================================================
+
+@pytest.fixture(autouse=True)
+def quiet():
+    logging.disable(logging.WARNING)
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore')
+        yield
+    logging.disable(logging.NOTSET)
+
+
+@pytest.fixture
+def market_df() -> pd.DataFrame:
+    """Daily bars for SPY plus four correlated assets, with a volatility cluster."""
+    rng = np.random.default_rng(3)
+    n = 700
+    returns = rng.normal(0, 0.01, n)
+    returns[350:450] *= 3
+    df = pd.DataFrame({
+        'close': 100 * np.cumprod(1 + returns),
+        'volume': rng.integers(1_000_000, 5_000_000, n).astype(float),
+    })
+    for name in ('qqq', 'iwm', 'tlt', 'gld'):
+        df[name] = 50 * np.cumprod(1 + 0.5 * returns + rng.normal(0, 0.01, n))
+    return df
+
+
+def reference_percentile(history, value, maxlen=252):
+    """The list-based percentile ForceAggregator used to keep."""
+    if not np.isfinite(value):
+        return 50.0
+    history.append(value)
+    del history[:-maxlen]
+    valid = [v for v in history if np.isfinite(v)]
+    if len(valid) <= 1:
+        return 50.0
+    return float(np.sum(np.array(valid) <= value) / len(valid) * 100)
+
+
+# =============================================================================
+# ORDER STATISTICS / COMPONENT TESTS
+# =============================================================================
+
+class TestRollingPercentile:
+    """Sorted-ring percentile ranks."""
+
+    def test_matches_list_history(self):
+        rng = np.random.default_rng(0)
+        values = np.round(rng.normal(0, 1, 2000), 1)  # Ties
+        values[::97] = np.nan
+        values[5::131] = np.inf
+
+        rolling, history = RollingPercentile(252), []
+        for v in values:
+            assert rolling.update(v) == reference_percentile(history, v)
+        assert len(rolling) == 252
+        assert rolling.values() == history[-252:]
+
+    def test_aggregator_history_bounded(self):
+        agg = ForceAggregator(percentile_window=10)
+        ranks = [agg._compute_percentile('vpin', float(v)) for v in range(30)]
+
+        assert ranks[0] == 50.0 and ranks[-1] == 100.0
+        assert agg.history['vpin'].values() == [float(v) for v in range(20, 30)]
+
+
+class TestStreamingComponents:
+    """Per-force streaming state against the batch functions."""
+
+    def test_vpin_matches_batch(self, market_df):
+        prices, volumes = market_df['close'].values, market_df['volume'].values.copy()
+        volumes[100:103] = 0
+        bucket_size = np.median(volumes[volumes > 0]) * 0.7
+
+        for sigma in (0.01, None):
+            vpin = StreamingVPIN(bucket_size, n_buckets=50, sigma=sigma)
+            for i in range(300):
+                value = vpin.update(prices[i], volumes[i])
+                if i == 0:
+                    assert np.isnan(value)
+                    continue
+                batch, _ = calculate_vpin(prices[:i + 1], volumes[:i + 1], bucket_size, 50, sigma=sigma)
+                np.testing.assert_allclose(vpin.recent_values(5), batch[-5:], rtol=1e-12)
+                assert value == pytest.approx(batch[-1], rel=1e-12)
+
+    def test_hmm_filter_step(self, market_df):
+        returns = market_df['close'].pct_change().dropna().values
+        hmm = GaussianHMM(HMMConfig(n_regimes=2, random_state=0)).fit(returns[:300])
+
+        probs, stepped = None, []
+        for r in returns:
+            probs = hmm.filter_step(probs, r)
+            stepped.append(probs)
+        np.testing.assert_allclose(np.array(stepped), hmm.filter(returns), atol=1e-12)
+
+    def test_hazard_with_long_regimes(self):
+        _, hazard = compute_hazard_rate(np.array([5, 5, 400, 10]), max_duration=252)
+
+        assert len(hazard) == 252
+        assert hazard[4] == pytest.approx(0.5)
+        assert hazard[9] == pytest.approx(0.5)
+        assert hazard[251] == 0.0
+
+
+# =============================================================================
+# ENGINE TESTS
+# =============================================================================
+
+class TestStreamingForceEngine:
+    """Bar-by-bar MarketPhysicsState."""
+
+    def test_matches_batch_dynamics(self, market_df, monkeypatch):
+        fits = []
+        original_fit = GaussianHMM.fit
+        monkeypatch.setattr(GaussianHMM, 'fit', lambda self, data: fits.append(len(data)) or original_fit(self, data))
+
+        engine = StreamingForceEngine(morphology_every=50)
+        engine.warm_up(market_df.iloc[:400])
+        for i in range(400, len(market_df)):
+            state = engine.update(market_df.iloc[i])
+
+            if i % 60 == 0 or i == len(market_df) - 1:
+                returns = market_df['close'].iloc[:i + 1].pct_change().dropna().values
+                entropy = compute_entropy_dynamics(returns, lookback=20)
+                vol = compute_volatility_dynamics(returns)
+                csd = detect_slowing_down(critical_slowing_down_indicators(returns))
+
+                assert state.raw_metrics['entropy'] == pytest.approx(entropy.current_entropy, rel=1e-12)
+                assert state.raw_metrics['entropy_velocity'] == pytest.approx(entropy.entropy_velocity, rel=1e-9)
+                assert state.raw_metrics['realized_vol'] == pytest.approx(vol.realized_vol, rel=1e-12)
+                assert state.raw_metrics['vol_velocity'] == pytest.approx(vol.vol_velocity, rel=1e-9)
+                assert state.regime.critical_slowing_down == (csd['warning_level'] == 'HIGH')
+
+                filtered = engine.aggregator.hmm.filter(returns)[-1]
+                assert state.raw_metrics['regime_probability'] == pytest.approx(filtered.max(), rel=1e-9)
+
+        # Fitted once at warm-up, then only filtered
+        assert fits == [399]
+
+    def test_state_every_bar(self, market_df):
+        engine = StreamingForceEngine(ForceAggregator(percentile_window=100), morphology_every=100)
+        engine.warm_up(market_df.iloc[:300])
+
+        for i in range(300, 330):
+            state = engine.update(market_df.iloc[i].to_dict())
+            assert isinstance(state, MarketPhysicsState)
+            assert {f.name for f in state.forces} == {
+                'shannon_entropy', 'vpin', 'absorption_ratio', 'skewness', 'realized_vol'}
+            assert state.flow_signal != 'unknown' and state.correlation_signal != 'unknown'
+            assert 0.0 <= state.risk_score <= 1.0
+
+        assert all(len(h) <= 100 for h in engine.aggregator.history.values())
+        assert state.regime.days_in_regime >= 1
+        assert 'MARKET PHYSICS STATE' in state.to_prompt_context()
+
+    def test_update_only_fits_lazily(self, market_df):
+        engine = StreamingForceEngine(morphology_every=1000)
+        for i in range(150):
+            state = engine.update(market_df.iloc[i].to_dict())
+
+        assert engine.aggregator.hmm is not None
+        assert 'vpin' in state.raw_metrics
+        assert state.regime.regime_probability > 0.5
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
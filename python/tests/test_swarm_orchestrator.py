@@ -0,0 +1,399 @@
+#!/usr/bin/env python3
+"""
+Swarm Orchestrator Tests
+========================
+Runs the SwarmOrchestrator against a local stub of the chat completions
+API (no network, no API key).
+
+Tests:
+1. Repeated deterministic prompts are served from the response cache
+2. Identical in-flight tasks share one request
+3. Non-deterministic and failed tasks are never cached
+4. Cache TTL, LRU eviction and persistence across instances
+5. Results stream in completion order (slow calls do not hold fast ones)
+6. AIMD limit backs off under 429s and recovers; 429s are retried
+7. Priority classes and per-model token budgets
+"""
+
+import sys
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import asyncio
+import threading
+import time
+
+import pytest
+from aiohttp import web
+
+from engine.swarm.orchestrator import SwarmOrchestrator, iter_swarm_sync
+from engine.swarm.response_cache import ResponseCache, request_key
+from engine.swarm.scheduler import AdaptiveLimiter, SwarmScheduler, TokenBudget, PRIORITY_CLASSES
+
+
+# =============================================================================
+# STUB LLM SERVER
+# =============================================================================
+
+class StubLLM:
+    """
+    Chat completions stub on a background event loop.
+
+    Echoes the user prompt. Prompts containing "fail" get a 500 and
+    prompts containing "slow" take slow_latency. With max_concurrent set,
+    requests beyond that many in flight get a 429.
+    """
+
+    def __init__(self, latency: float = 0.05, slow_latency: float = 1.0):
+        self.latency = latency
+        self.slow_latency = slow_latency
+        self.max_concurrent = None
+        self.active = 0
+        self.peak = 0
+        self.rejected = 0
+        self.requests = []
+        self._loop = asyncio.new_event_loop()
+        self._ready = threading.Event()
+        self._thread = threading.Thread(target=self._serve, daemon=True)
+        self._thread.start()
+        self._ready.wait(10)
+
+    async def _handle(self, request):
+        body = await request.json()
+        user = body['messages'][1]['content']
+        self.requests.append(body)
+        if self.max_concurrent is not None and self.active >= self.max_concurrent:
+            self.rejected += 1
+            return web.Response(status=429, text='rate limited', headers={'Retry-After': '0.02'})
+
+        self.active += 1
+        self.peak = max(self.peak, self.active)
+        try:
+            await asyncio.sleep(self.slow_latency if 'slow' in user else self.latency)
+        finally:
+            self.active -= 1
+        if 'fail' in user:
+            return web.Response(status=500, text='upstream error')
+        return web.json_response({
+            'choices': [{'message': {'content': f"echo: {user}", 'reasoning_content': 'thinking'}}],
+            'usage': {'prompt_tokens': len(user), 'completion_tokens': 5},
+        })
+
+    def _serve(self):
+        asyncio.set_event_loop(self._loop)
+        app = web.Application()
+        app.router.add_post('/chat/completions', self._handle)
+        self._runner = web.AppRunner(app)
+        self._loop.run_until_complete(self._runner.setup())
+        site = web.TCPSite(self._runner, '127.0.0.1', 0)
+        self._loop.run_until_complete(site.start())
+        self.url = f"http://127.0.0.1:{site._server.sockets[0].getsockname()[1]}/chat/completions"
+        self._ready.set()
+        self._loop.run_forever()
+
+    def close(self):
+        asyncio.run_coroutine_threadsafe(self._runner.cleanup(), self._loop).result(5)
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join(5)
+
+
+# =============================================================================
+# TEST FIXTURES
+# =============================================================================
+
+@pytest.fixture
+def stub():
+    server = StubLLM()
+    yield server
+    server.close()
+
+
+@pytest.fixture
+def make_orchestrator(stub, tmp_path):
+    def factory(cache=None, **kwargs):
+        if cache is None:
+            cache = ResponseCache(path=str(tmp_path / 'responses.sqlite'))
+        return SwarmOrchestrator(api_url=stub.url, api_key='test', cache=cache, **kwargs)
+    return factory
+
+
+def run(orchestrator, tasks):
+    return asyncio.run(orchestrator.run_swarm(tasks))
+
+
+def task(i, user, **extra):
+    return {'id': f'agent_{i}', 'system': 'You are a quant.', 'user': user,
+            'model': 'deepseek-chat', **extra}
+
+
+def payload(model, user, temperature, **extra):
+    return {'model': model, 'messages': [{'role': 'system', 'content': 'sys'},
+                                         {'role': 'user', 'content': user}],
+            'temperature': temperature, 'stream': False, **extra}
+
+
+# =============================================================================
+# RESPONSE CACHE TESTS
+# =============================================================================
+
+class TestResponseCaching:
+    """Cache hits, in-flight coalescing, and what is never cached."""
+
+    def test_repeat_served_from_cache(self, stub, make_orchestrator):
+        orchestrator = make_orchestrator()
+        first = run(orchestrator, [task(0, 'analyze SPY'), task(1, 'analyze QQQ')])
+        second = run(orchestrator, [task(2, 'analyze SPY'), task(3, 'analyze QQQ')])
+
+        assert len(stub.requests) == 2
+        assert [r['content'] for r in second] == [r['content'] for r in first]
+        assert [r['id'] for r in second] == ['agent_2', 'agent_3']
+        assert all(r['cached'] and r['status'] == 'success' for r in second)
+        assert second[0]['reasoning'] == 'thinking'
+        assert orchestrator.cache.stats()['hit_rate'] == 0.5
+
+    def test_inflight_duplicates_coalesced(self, stub, make_orchestrator):
+        orchestrator = make_orchestrator()
+        results = run(orchestrator, [task(i, 'same prompt') for i in range(20)] + [task(99, 'other')])
+
+        assert len(stub.requests) == 2
+        assert [r['id'] for r in results] == [f'agent_{i}' for i in range(20)] + ['agent_99']
+        assert sum(1 for r in results if r.get('coalesced')) == 19
+        assert orchestrator.cache.coalesced == 19
+
+    def test_max_tokens_in_key(self, stub, make_orchestrator):
+        orchestrator = make_orchestrator()
+        limits = [task(0, 'summarize', max_tokens=200), task(1, 'summarize', max_tokens=4000)]
+        first = run(orchestrator, limits)
+        second = run(orchestrator, limits)
+
+        assert sorted(r['max_tokens'] for r in stub.requests) == [200, 4000]
+        assert not any(r.get('coalesced') for r in first)
+        assert all(r.get('cached') for r in second)
+        assert len(orchestrator.cache) == 2
+
+    def test_sampling_and_failures_not_cached(self, stub, make_orchestrator):
+        orchestrator = make_orchestrator()
+        run(orchestrator, [task(0, 'creative', temperature=0.7), task(1, 'please fail'),
+                           task(2, 'opt out', cache=False)])
+        results = run(orchestrator, [task(0, 'creative', temperature=0.7), task(1, 'please fail'),
+                                     task(2, 'opt out', cache=False)])
+
+        assert len(stub.requests) == 6
+        assert results[1]['status'] == 'failed' and 'API 500' in results[1]['error']
+        assert not any(r.get('cached') for r in results)
+        assert len(orchestrator.cache) == 0
+
+    def test_cache_disabled(self, stub, make_orchestrator):
+        orchestrator = make_orchestrator(use_cache=False)
+        run(orchestrator, [task(0, 'x'), task(1, 'x')])
+
+        assert orchestrator.cache is None
+        assert len(stub.requests) == 2
+
+
+class TestResponseCacheStore:
+    """TTL, eviction and persistence of the SQLite store."""
+
+    def test_ttl_and_lru(self, tmp_path):
+        cache = ResponseCache(path=str(tmp_path / 'c.sqlite'), ttl=0.2, max_entries=3)
+        keys = [request_key(payload('m', f'u{i}', 0)) for i in range(4)]
+        for key in keys[:3]:
+            cache.put(key, {'content': key})
+            time.sleep(0.01)
+        cache.get(keys[0])                      # refresh keys[0]
+        cache.put(keys[3], {'content': keys[3]})  # evicts keys[1] (least recently used)
+
+        assert cache.get(keys[1]) is None
+        assert cache.get(keys[0]) == {'content': keys[0], 'reasoning': None, 'model': None, 'usage': None}
+        time.sleep(0.25)
+        assert cache.get(keys[3]) is None
+        assert cache.evictions >= 1
+
+    def test_persistent_across_instances(self, tmp_path):
+        path = str(tmp_path / 'c.sqlite')
+        key = request_key(payload('deepseek-chat', 'user', 0.0))
+        ResponseCache(path=path).put(key, {'content': 'answer', 'model': 'deepseek-chat'})
+
+        assert ResponseCache(path=path).get(key)['content'] == 'answer'
+        assert request_key(payload('deepseek-chat', 'user', 0)) == key
+        assert request_key(payload('deepseek-reasoner', 'user', 0)) != key
+        assert request_key(payload('deepseek-chat', 'user', 0, max_tokens=200)) != key
+
+
+# =============================================================================
+# SCHEDULER TESTS
+# =============================================================================
+
+class TestStreaming:
+    """Completion-order streaming."""
+
+    def test_slow_call_does_not_hold_results(self, stub, make_orchestrator):
+        orchestrator = make_orchestrator(use_cache=False)
+        tasks = [task(0, 'slow reasoning')] + [task(i, f'quick {i}') for i in range(1, 6)]
+
+        async def collect():
+            started, arrivals = time.perf_counter(), []
+            async for result in orchestrator.stream_swarm(tasks):
+                arrivals.append((result['id'], time.perf_counter() - started))
+            return arrivals
+
+        arrivals = asyncio.run(collect())
+        assert arrivals[-1][0] == 'agent_0'
+        assert all(t < 0.5 for _, t in arrivals[:-1])
+        assert arrivals[-1][1] >= 1.0
+
+    def test_run_swarm_keeps_task_order(self, stub, make_orchestrator):
+        orchestrator = make_orchestrator(use_cache=False)
+        results = run(orchestrator, [task(0, 'slow'), task(1, 'a'), task(2, 'a')])
+
+        assert [r['id'] for r in results] == ['agent_0', 'agent_1', 'agent_2']
+
+    def test_iter_swarm_sync(self, stub, monkeypatch, tmp_path):
+        monkeypatch.setenv('SWARM_CACHE_PATH', str(tmp_path / 'sync.sqlite'))
+        monkeypatch.setattr('engine.swarm.response_cache._response_cache', None)
+        results = list(iter_swarm_sync([task(0, 'slow one'), task(1, 'fast one')],
+                                       api_url=stub.url, api_key='test'))
+
+        assert [r['id'] for r in results] == ['agent_1', 'agent_0']
+
+
+class TestAdaptiveConcurrency:
+    """AIMD limit driven by 429 / 5xx and latency."""
+
+    def test_backs_off_under_rate_limits_and_retries(self, stub, make_orchestrator):
+        stub.max_concurrent = 4
+        orchestrator = make_orchestrator(concurrency=32, use_cache=False, max_retries=20)
+        results = run(orchestrator, [task(i, f'job {i}') for i in range(60)])
+
+        stats = orchestrator.scheduler.stats()
+        assert all(r['status'] == 'success' for r in results)
+        assert stub.rejected > 0
+        assert stats['decreases'] > 0 and stats['limit'] < 32
+
+    def test_limiter_aimd(self):
+        async def scenario():
+            limiter = AdaptiveLimiter(16, min_limit=2, latency_target=1.0, smoothing=0.0)
+            limiter.record(0.1, congested=True)
+            after_congestion = limiter.limit
+            limiter.record(0.1, congested=True)   # same round trip: no second halving
+            assert limiter.limit == after_congestion
+            time.sleep(0.11)
+            limiter.record(2.0, congested=False)   # too slow counts as congestion
+            after_slow = limiter.limit
+            for _ in range(200):
+                limiter.record(0.1, congested=False)
+            return after_congestion, after_slow, limiter.limit
+
+        after_congestion, after_slow, recovered = asyncio.run(scenario())
+        assert after_congestion == 8.0
+        assert after_slow == 4.0
+        assert recovered == 16.0
+
+    def test_priority_order(self):
+        async def scenario():
+            limiter = AdaptiveLimiter(1)
+            await limiter.acquire()
+            order = []
+
+            async def waiter(name, priority):
+                await limiter.acquire(priority)
+                order.append(name)
+                limiter.release()
+
+            waiters = [asyncio.ensure_future(waiter('research', PRIORITY_CLASSES['research'])),
+                       asyncio.ensure_future(waiter('interactive', PRIORITY_CLASSES['interactive'])),
+                       asyncio.ensure_future(waiter('live', PRIORITY_CLASSES['live']))]
+            await asyncio.sleep(0.01)
+            limiter.release()
+            await asyncio.gather(*waiters)
+            return order
+
+        assert asyncio.run(scenario()) == ['live', 'interactive', 'research']
+
+
+class TestTokenBudgets:
+    """Per-model token buckets."""
+
+    def test_bucket_waits_for_refill(self):
+        async def scenario():
+            budget = TokenBudget(tokens_per_minute=6000)   # 100 tokens / s
+            await budget.acquire(6000)
+            started = time.perf_counter()
+            await budget.acquire(30)
+            waited = time.perf_counter() - started
+            budget.settle(30, 10)                          # refund the unused 20
+            return waited, budget.tokens
+
+        waited, tokens = asyncio.run(scenario())
+        assert 0.25 <= waited < 1.0
+        assert 19 <= tokens < 25
+
+    def test_budget_throttles_model(self, stub, make_orchestrator):
+        # Each task reserves ~2000 tokens of a 3000-token budget, so requests
+        # run one at a time; unused reservations are refunded on completion
+        orchestrator = make_orchestrator(use_cache=False, token_budgets={'deepseek-chat': 3000})
+        results = run(orchestrator, [task(i, 'x' * 40, max_tokens=2000) for i in range(6)]
+                      + [task(9, 'other model', model='deepseek-reasoner')])
+
+        budget = orchestrator.scheduler.stats()['token_budgets']['deepseek-chat']
+        assert all(r['status'] == 'success' for r in results)
+        assert stub.peak <= 2
+        assert 0 < budget['used'] < 6 * 100
+
+    def test_token_waiters_served_by_priority(self):
+        async def scenario():
+            budget = TokenBudget(tokens_per_minute=6000)   # 100 tokens / s
+            await budget.acquire(6000)
+            order = []
+
+            async def waiter(name, priority):
+                await budget.acquire(20, priority)
+                order.append(name)
+
+            waiters = [asyncio.ensure_future(waiter('research', PRIORITY_CLASSES['research'])),
+                       asyncio.ensure_future(waiter('interactive', PRIORITY_CLASSES['interactive']))]
+            await asyncio.sleep(0.01)
+            waiters.append(asyncio.ensure_future(waiter('live', PRIORITY_CLASSES['live'])))
+            await asyncio.wait_for(asyncio.gather(*waiters), timeout=5)
+            return order
+
+        assert asyncio.run(scenario()) == ['live', 'interactive', 'research']
+
+    def test_cancelled_waiter_does_not_block_queue(self):
+        async def scenario():
+            budget = TokenBudget(tokens_per_minute=6000)
+            await budget.acquire(6000)
+            head = asyncio.ensure_future(budget.acquire(3000, PRIORITY_CLASSES['live']))
+            behind = asyncio.ensure_future(budget.acquire(10))
+            await asyncio.sleep(0.01)
+            head.cancel()
+            started = time.perf_counter()
+            await asyncio.wait_for(behind, timeout=5)
+            return time.perf_counter() - started, budget._waiters
+
+        waited, waiters = asyncio.run(scenario())
+        assert waited < 0.5 and waiters == []
+
+    def test_cancel_while_waiting_for_slot_refunds_tokens(self):
+        async def scenario():
+            scheduler = SwarmScheduler(concurrency=1, token_budgets={'m': 6000})
+            budget = scheduler.budgets['m']
+            await scheduler.limiter.acquire()               # Occupy the only slot
+
+            async def request():
+                async with scheduler.slot({'model': 'm', 'user': '', 'max_tokens': 500}):
+                    pass
+
+            pending = asyncio.ensure_future(request())
+            await asyncio.sleep(0.01)
+            assert budget.tokens < 6000 - 499
+            pending.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await pending
+            return budget.tokens
+
+        assert asyncio.run(scenario()) == pytest.approx(6000, abs=1)
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
@@ -0,0 +1,204 @@
+#!/usr/bin/env python3
+"""
+Tick Replay Tests
+=================
+Validates the tick record/replay harness used for offline live-path benchmarks.
+
+Tests:
+1. Binary and Parquet recordings round-trip trades, quotes and option contracts
+2. ReplayClient yields subscribed ticks in recorded order
+3. Paced replay preserves inter-tick gaps and drops ticks for a slow consumer
+4. disconnect() returns when the consumer stops early with the queue full
+"""
+
+import sys
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import asyncio
+import time
+from datetime import date, datetime, timedelta, timezone
+
+import pytest
+
+from thetadata_client import QuoteTick, SecurityType, TradeTick
+from tick_replay import ReplayClient, TickRecorder, read_tick_file
+
+
+# =============================================================================
+# TEST FIXTURES
+# =============================================================================
+
+T0 = datetime(2024, 3, 1, 14, 30, tzinfo=timezone.utc)
+
+
+def make_ticks(n: int = 60, spacing_ms: float = 5.0) -> list:
+    """SPY/QQQ trades and quotes plus one option contract, evenly spaced."""
+    ticks = []
+    for i in range(n):
+        ts = T0 + timedelta(milliseconds=i * spacing_ms)
+        if i % 3 == 0:
+            ticks.append(QuoteTick(symbol='SPY', bid_price=500 + i * 0.01, ask_price=500.02 + i * 0.01,
+                                   bid_size=100, ask_size=200 + i, timestamp=ts, delta=None))
+        elif i % 5 == 0:
+            ticks.append(TradeTick(symbol='SPY240315C00500000', price=4.2, size=3, timestamp=ts,
+                                   sequence=i, security_type=SecurityType.OPTION, root='SPY',
+                                   expiration=date(2024, 3, 15), strike=500.0, right='C'))
+        else:
+            ticks.append(TradeTick(symbol='SPY' if i % 2 else 'QQQ', price=100 + i, size=i + 1,
+                                   timestamp=ts, exchange=4, sequence=i))
+    return ticks
+
+
+@pytest.fixture
+def ticks() -> list:
+    return make_ticks()
+
+
+def record(path: Path, ticks: list) -> Path:
+    with TickRecorder(path, flush_every=16) as recorder:
+        for tick in ticks:
+            recorder.record(tick)
+    return path
+
+
+@pytest.fixture
+def tape_path(tmp_path, ticks) -> Path:
+    return record(tmp_path / 'session.ticks', ticks)
+
+
+async def replay(client: ReplayClient, subscribe=('SPY',), limit=None) -> list:
+    await client.connect()
+    await client.subscribe_stock_trades(list(subscribe))
+    await client.subscribe_stock_quotes(list(subscribe))
+    out = []
+    async for tick in client.stream():
+        out.append(tick)
+        if limit is not None and len(out) >= limit:
+            break
+    await client.disconnect()
+    return out
+
+
+# =============================================================================
+# RECORDING TESTS
+# =============================================================================
+
+class TestRecording:
+    """TickRecorder / read_tick_file round trips."""
+
+    @pytest.mark.parametrize('suffix', ['.ticks', '.parquet'])
+    def test_round_trip(self, tmp_path, ticks, suffix):
+        tape = read_tick_file(record(tmp_path / f'session{suffix}', ticks))
+        assert len(tape) == len(ticks)
+        assert list(tape.iter_ticks()) == ticks
+        assert tape.duration_seconds == pytest.approx(0.295)
+        assert sorted(tape.stock_symbols()) == ['QQQ', 'SPY']
+
+    def test_closed_recorder_rejects_ticks(self, tmp_path, ticks):
+        recorder = TickRecorder(tmp_path / 'closed.ticks')
+        recorder.close()
+        with pytest.raises(ValueError):
+            recorder.record(ticks[0])
+
+
+# =============================================================================
+# REPLAY TESTS
+# =============================================================================
+
+class TestReplayClient:
+    """Replay order, pacing and shutdown."""
+
+    def test_order_and_subscriptions(self, tape_path, ticks):
+        client = ReplayClient(tape_path, speed=None)
+        out = asyncio.run(replay(client))
+
+        assert out == [t for t in ticks if t.symbol == 'SPY']
+        assert client.ticks_emitted == len(out) and client.ticks_dropped == 0
+        assert not client.is_connected
+
+    def test_option_subscription(self, tape_path, ticks):
+        async def scenario():
+            client = ReplayClient(tape_path, speed=None, queue_size=4)
+            await client.connect()
+            await client.subscribe_option_trades('spy', date(2024, 3, 15), 500.0, 'c')
+            return [t async for t in client.stream()]
+
+        out = asyncio.run(scenario())
+        assert out == [t for t in ticks if t.is_option]
+
+    def test_paced_gaps(self, tmp_path):
+        tape_ticks = make_ticks(n=21, spacing_ms=20.0)         # 0.4s of market time
+        client = ReplayClient(record(tmp_path / 'paced.ticks', tape_ticks), speed=4.0)
+
+        started = time.perf_counter()
+        out = asyncio.run(replay(client, subscribe=('SPY', 'QQQ')))
+        elapsed = time.perf_counter() - started
+
+        assert len(out) == sum(not t.is_option for t in tape_ticks)
+        assert 0.09 <= elapsed < 1.0
+
+    def test_paced_slow_consumer_drops(self, tmp_path):
+        tape_ticks = make_ticks(n=200, spacing_ms=0.1)
+
+        async def scenario():
+            client = ReplayClient(record(tmp_path / 'fast.ticks', tape_ticks), speed=1.0, queue_size=2)
+            await client.connect()
+            await client.subscribe_stock_trades(['SPY', 'QQQ'])
+            received = 0
+            async for _ in client.stream():
+                received += 1
+                await asyncio.sleep(0.005)
+            return client, received
+
+        client, received = asyncio.run(scenario())
+        subscribed = sum(isinstance(t, TradeTick) and not t.is_option for t in tape_ticks)
+        assert client.ticks_dropped > 0
+        assert client.ticks_emitted + client.ticks_dropped == subscribed
+        assert received == client.ticks_emitted
+
+    @pytest.mark.parametrize('speed', [None, 1000.0])
+    def test_early_disconnect_with_full_queue(self, tape_path, speed):
+        client = ReplayClient(tape_path, speed=speed, queue_size=5)
+
+        async def scenario():
+            await client.connect()
+            await client.subscribe_stock_trades(['SPY', 'QQQ'])
+            out = []
+            async for tick in client.stream():
+                out.append(tick)
+                if len(out) == 2:
+                    break
+            await asyncio.sleep(0.05)                       # Producer refills the queue
+            assert client._queue.full()
+            await asyncio.wait_for(client.disconnect(), timeout=5)
+            return out
+
+        assert len(asyncio.run(scenario())) == 2
+        assert client._producer.done()
+
+    def test_disconnect_wakes_waiting_stream(self, tmp_path):
+        # Two ticks an hour apart: the stream waits on the second one
+        path = record(tmp_path / 'gap.ticks', [
+            TradeTick(symbol='SPY', price=1.0, size=1, timestamp=T0),
+            TradeTick(symbol='SPY', price=2.0, size=1, timestamp=T0 + timedelta(hours=1)),
+        ])
+
+        async def scenario():
+            client = ReplayClient(path, speed=1.0, queue_size=1)
+            await client.connect()
+            await client.subscribe_stock_trades(['SPY'])
+
+            async def consume():
+                return [t.price async for t in client.stream()]
+
+            consumer = asyncio.ensure_future(consume())
+            await asyncio.sleep(0.05)
+            await client.disconnect()
+            return await asyncio.wait_for(consumer, timeout=5)
+
+        assert asyncio.run(scenario()) == [1.0]
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
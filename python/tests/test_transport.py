@@ -0,0 +1,187 @@
+#!/usr/bin/env python3
+"""
+Columnar Transport Tests
+========================
+Validates the opt-in response encodings in engine.api.transport.
+
+Tests:
+1. Accept negotiation keeps JSON as the default
+2. LTTB matches a reference implementation and keeps the endpoints
+3. Columnar JSON round-trips through typed-array buffers
+4. NDJSON and Arrow IPC streams arrive in chunks and reassemble exactly
+5. Row-record JSON keeps None and missing keys (no NaN tokens)
+"""
+
+import sys
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import json
+import math
+
+import pytest
+import numpy as np
+import pandas as pd
+
+from engine.api import transport
+
+
+# =============================================================================
+# TEST FIXTURES
+# =============================================================================
+
+@pytest.fixture
+def equity_curve() -> pd.DataFrame:
+    """Two years of minute-ish equity points with a gap in the values."""
+    rng = np.random.default_rng(5)
+    n = 5000
+    frame = pd.DataFrame({
+        'date': pd.date_range('2023-01-03 09:30', periods=n, freq='min'),
+        'equity': 100000 + np.cumsum(rng.normal(0, 50, n)),
+        'active_trades': rng.integers(0, 4, n),
+        'trading_halted': rng.random(n) < 0.01,
+        'note': np.where(rng.random(n) < 0.5, 'a', None),
+    })
+    frame.loc[100, 'equity'] = np.nan
+    return frame
+
+
+def reference_lttb(x, y, threshold):
+    """Straight port of the published LTTB loop."""
+    n = len(x)
+    if threshold >= n or threshold < 3:
+        return list(range(n))
+    every = (n - 2) / (threshold - 2)
+    a = 0
+    sampled = [0]
+    for i in range(threshold - 2):
+        avg_start = int(math.floor((i + 1) * every) + 1)
+        avg_end = min(int(math.floor((i + 2) * every) + 1), n)
+        avg_x = sum(x[avg_start:avg_end]) / (avg_end - avg_start)
+        avg_y = sum(y[avg_start:avg_end]) / (avg_end - avg_start)
+
+        range_start = int(math.floor(i * every) + 1)
+        range_end = int(math.floor((i + 1) * every) + 1)
+        best, best_area = range_start, -1.0
+        for j in range(range_start, range_end):
+            area = abs((x[a] - avg_x) * (y[j] - y[a]) - (x[a] - x[j]) * (avg_y - y[a]))
+            if area > best_area:
+                best, best_area = j, area
+        sampled.append(best)
+        a = best
+    sampled.append(n - 1)
+    return sampled
+
+
+# =============================================================================
+# NEGOTIATION / DOWNSAMPLING TESTS
+# =============================================================================
+
+class TestNegotiation:
+    """Accept header handling."""
+
+    def test_formats(self):
+        assert transport.negotiate(None) == transport.JSON
+        assert transport.negotiate('*/*') == transport.JSON
+        assert transport.negotiate('application/json, */*') == transport.JSON
+        assert transport.negotiate(transport.ARROW_STREAM) == transport.ARROW_STREAM
+        assert transport.negotiate(f'{transport.COLUMNAR_JSON}, application/json;q=0.5') == transport.COLUMNAR_JSON
+        assert transport.negotiate('text/html') == transport.JSON
+
+
+class TestDownsampling:
+    """LTTB chart downsampling."""
+
+    def test_matches_reference(self):
+        rng = np.random.default_rng(1)
+        x = np.sort(rng.uniform(0, 1000, 3001))
+        y = np.cumsum(rng.normal(0, 1, 3001))
+
+        for threshold in (3, 10, 137, 500):
+            np.testing.assert_array_equal(transport.lttb_indices(x, y, threshold),
+                                          reference_lttb(x.tolist(), y.tolist(), threshold))
+
+    def test_downsample_frame(self, equity_curve):
+        small = transport.downsample(equity_curve, 400, y='equity', x='date')
+
+        assert len(small) == 400
+        assert small['date'].iloc[0] == equity_curve['date'].iloc[0]
+        assert small['date'].iloc[-1] == equity_curve['date'].iloc[-1]
+        assert small['date'].is_monotonic_increasing
+        assert small['equity'].notna().all()
+        # The visual envelope survives
+        span = equity_curve['equity'].max() - equity_curve['equity'].min()
+        assert equity_curve['equity'].max() - small['equity'].max() < 0.02 * span
+        assert small['equity'].min() - equity_curve['equity'].min() < 0.02 * span
+        assert transport.downsample(equity_curve, 10000, y='equity') is equity_curve
+
+
+# =============================================================================
+# ENCODING TESTS
+# =============================================================================
+
+class TestEncodings:
+    """Columnar JSON, NDJSON and Arrow IPC."""
+
+    def test_columnar_round_trip(self, equity_curve):
+        body = json.loads(json.dumps(transport.columnar_payload({'success': True}, {'equity_curve': equity_curve})))
+        columns = body['equity_curve']['columns']
+
+        assert body['format'] == 'columnar' and body['equity_curve']['length'] == len(equity_curve)
+        np.testing.assert_array_equal(transport.decode_column(columns['equity']), equity_curve['equity'].values)
+        np.testing.assert_array_equal(transport.decode_column(columns['active_trades']), equity_curve['active_trades'])
+        assert transport.decode_column(columns['trading_halted']).astype(bool).tolist() == equity_curve['trading_halted'].tolist()
+        assert transport.decode_column(columns['note']) == [n if isinstance(n, str) else None for n in equity_curve['note']]
+
+        ms = transport.decode_column(columns['date'])
+        assert columns['date']['dtype'] == 'timestamp_ms'
+        assert pd.to_datetime(ms, unit='ms').equals(pd.DatetimeIndex(equity_curve['date']))
+
+    def test_ndjson_chunks(self, equity_curve):
+        lines = list(transport.iter_columnar_chunks({'success': True}, {'equity_curve': equity_curve}, chunk_size=1000))
+        header, chunks = json.loads(lines[0]), [json.loads(line) for line in lines[1:]]
+
+        assert header['tables'] == {'equity_curve': 5000}
+        assert [c['offset'] for c in chunks] == [0, 1000, 2000, 3000, 4000]
+        equity = np.concatenate([transport.decode_column(c['columns']['equity']) for c in chunks])
+        np.testing.assert_array_equal(equity, equity_curve['equity'].values)
+
+    def test_arrow_stream_chunks(self, equity_curve):
+        pieces = list(transport.iter_arrow_stream({'success': True, 'metrics': {'sharpe': 1.2}},
+                                                  equity_curve, chunk_size=1000))
+        payload, table = transport.read_arrow_stream(b''.join(pieces))
+
+        assert len(pieces) == 6 and all(pieces)
+        assert payload == {'success': True, 'metrics': {'sharpe': 1.2}}
+        pd.testing.assert_frame_equal(table.to_pandas(), equity_curve, check_dtype=False)
+
+
+    def test_records_pass_through(self):
+        records = [{'date': '2023-01-03', 'equity': 1.0, 'exit_reason': None},
+                   {'date': '2023-01-04', 'equity': 2.0}]
+
+        out = transport.to_records(records)
+        assert out == records and out[0] is records[0]
+        assert 'exit_reason' not in out[1]
+
+    def test_frame_records_are_strict_json(self, equity_curve):
+        def reject(token):
+            raise ValueError(token)
+
+        rows = json.loads(json.dumps(transport.to_records(equity_curve.iloc[:200]), default=str),
+                          parse_constant=reject)
+        assert rows[100]['equity'] is None
+        assert [r['note'] for r in rows] == [n if isinstance(n, str) else None for n in equity_curve['note'][:200]]
+
+    def test_downsample_positions_select_records(self, equity_curve):
+        records = transport.to_records(equity_curve)
+        keep = transport.downsample_positions(transport.to_frame(records), 500, y='equity', x='date')
+
+        assert transport.downsample_positions(equity_curve, 6000, y='equity', x='date') is None
+        pd.testing.assert_frame_equal(transport.to_frame([records[i] for i in keep]),
+                                      transport.to_frame(transport.to_records(
+                                          transport.downsample(equity_curve, 500, y='equity', x='date'))))
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
@@ -0,0 +1,207 @@
+#!/usr/bin/env python3
+"""
+UI Event Bus Tests
+==================
+Validates the segmented-log transport behind engine.ui_bridge.emit_ui_event.
+
+Tests:
+1. Ordered events are batched into one-line-per-event segments
+2. Progress events coalesce per (session, view), latest wins
+3. Completion events supersede pending progress
+4. Progress is rate-limited per key
+5. Full queues block, then drop (backpressure)
+6. Segments rotate and old ones are retired; dropped unread segments are reported
+7. File-per-event fallback never collides
+"""
+
+import sys
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import json
+import threading
+import time
+
+import pytest
+
+from engine import ui_bridge
+from engine.ui_bridge import UIEventBus, emit_ui_event
+
+
+# =============================================================================
+# TEST FIXTURES
+# =============================================================================
+
+@pytest.fixture
+def make_bus(tmp_path):
+    buses = []
+
+    def factory(**kwargs):
+        bus = UIEventBus(log_dir=tmp_path / 'events', **kwargs)
+        buses.append(bus)
+        return bus
+
+    yield factory
+    for bus in buses:
+        bus.close()
+
+
+@pytest.fixture
+def bridge_bus(make_bus, monkeypatch):
+    """Route emit_ui_event through a bus in a temp directory."""
+    bus = make_bus(flush_interval=60.0)
+    monkeypatch.setattr(ui_bridge, '_event_bus', bus)
+    monkeypatch.delenv('UI_EVENT_TRANSPORT', raising=False)
+    return bus
+
+
+def read_events(log_dir: Path):
+    events = []
+    for segment in sorted(log_dir.glob('*.ndjson')):
+        events.extend(json.loads(line) for line in segment.read_text().splitlines())
+    return events
+
+
+# =============================================================================
+# LOG TRANSPORT TESTS
+# =============================================================================
+
+class TestEventLog:
+    """Batching, ordering and segment management."""
+
+    def test_ordered_events_batched(self, make_bus):
+        bus = make_bus(flush_interval=60.0)
+        for i in range(500):
+            assert bus.publish({'i': i})
+        bus.flush()
+
+        lines = bus.segment_path.read_text().splitlines()
+        assert [json.loads(line)['i'] for line in lines] == list(range(500))
+        assert bus.stats['batches'] == 1
+        assert ': ' not in lines[0]
+
+    def test_background_flush(self, make_bus):
+        bus = make_bus(flush_interval=0.01)
+        bus.publish({'hello': 'ui'})
+
+        deadline = time.time() + 5
+        while not bus.segment_path.read_text() and time.time() < deadline:
+            time.sleep(0.01)
+        assert json.loads(bus.segment_path.read_text()) == {'hello': 'ui'}
+
+    def test_rotation_and_retention(self, make_bus, capsys):
+        bus = make_bus(flush_interval=60.0, segment_bytes=2000, max_segments=3)
+        for i in range(200):
+            bus.publish({'i': i, 'pad': 'x' * 50})
+            bus.flush()
+
+        segments = sorted(bus.log_dir.glob('*.ndjson'))
+        assert len(segments) == 3
+        kept = [e['i'] for e in read_events(bus.log_dir)]
+        assert kept == list(range(kept[0], 200))
+
+        # Nothing consumed the log: every retired segment was dropped unread
+        assert bus.stats['segments_dropped'] == bus._segment_index - 3
+        assert 'dropped 1 unread segment' in capsys.readouterr().err
+
+
+class TestFlowControl:
+    """Coalescing, rate limiting and backpressure."""
+
+    def test_progress_coalesces_latest_wins(self, make_bus):
+        bus = make_bus(flush_interval=60.0)
+        for p in range(1000):
+            bus.publish({'view': 'backtest', 'p': p}, coalesce_key=(None, 'backtest'))
+            bus.publish({'view': 'swarm', 'p': p}, coalesce_key=(None, 'swarm'))
+        bus.flush()
+
+        events = read_events(bus.log_dir)
+        assert sorted((e['view'], e['p']) for e in events) == [('backtest', 999), ('swarm', 999)]
+        assert bus.stats['coalesced'] == 1998
+
+    def test_completion_supersedes_progress(self, make_bus):
+        bus = make_bus(flush_interval=60.0)
+        bus.publish({'p': 45}, coalesce_key=(None, 'backtest'))
+        bus.publish({'p': 100, 'done': True}, supersedes=(None, 'backtest'))
+        bus.flush()
+
+        assert read_events(bus.log_dir) == [{'p': 100, 'done': True}]
+
+    def test_rate_limited_per_key(self, make_bus):
+        bus = make_bus(flush_interval=0.005, max_rate=5.0)
+        t_end = time.time() + 1.0
+        p = 0
+        while time.time() < t_end:
+            bus.publish({'p': p}, coalesce_key=('s', 'backtest'))
+            p += 1
+            time.sleep(0.001)
+        bus.close()
+
+        written = [e['p'] for e in read_events(bus.log_dir)]
+        assert 3 <= len(written) <= 8
+        assert written[-1] == p - 1
+
+    def test_backpressure_blocks_then_drops(self, make_bus):
+        bus = make_bus(flush_interval=60.0, max_pending=10, block_timeout=0.2)
+        # Stall the writer so the queue cannot drain
+        bus._write_lock.acquire()
+        try:
+            for i in range(10):
+                assert bus.publish({'i': i})
+            t0 = time.perf_counter()
+            assert not bus.publish({'i': 10})
+            assert time.perf_counter() - t0 >= 0.19
+            assert bus.stats['dropped'] == 1
+        finally:
+            bus._write_lock.release()
+
+        # A blocked publisher succeeds once the writer catches up
+        result = {}
+        publisher = threading.Thread(target=lambda: result.setdefault('ok', bus.publish({'i': 11})))
+        bus.block_timeout = 5.0
+        publisher.start()
+        time.sleep(0.05)
+        bus.flush()
+        publisher.join()
+        assert result['ok']
+
+
+# =============================================================================
+# EMIT_UI_EVENT TESTS
+# =============================================================================
+
+class TestEmitUIEvent:
+    """emit_ui_event on both transports."""
+
+    def test_progress_helpers_coalesce(self, bridge_bus):
+        for i in range(300):
+            ui_bridge.ui_backtest_progress(i // 3, f'2024-01-{i % 28 + 1:02d}', float(i))
+        ui_bridge.ui_backtest_complete(1.4, 0.12, -0.08)
+        bridge_bus.flush()
+
+        events = read_events(bridge_bus.log_dir)
+        assert len(events) == 1
+        assert events[0]['display_directives'][1] == {'type': 'progress', 'value': 100,
+                                                      'message': events[0]['content']}
+        assert any(d['type'] == 'metrics' for d in events[0]['display_directives'])
+
+    def test_returns_segment_path(self, bridge_bus):
+        path = emit_ui_event(view='insight', message='Gamma analysis complete', chart={'type': 'bar'})
+        bridge_bus.flush()
+
+        assert path == str(bridge_bus.segment_path)
+        assert read_events(bridge_bus.log_dir)[0]['activity_type'] == 'gamma_analysis'
+
+    def test_file_fallback_unique(self, tmp_path, monkeypatch):
+        monkeypatch.setenv('UI_EVENT_TRANSPORT', 'files')
+        monkeypatch.setattr(ui_bridge, 'RESULTS_DIR', tmp_path)
+
+        paths = [emit_ui_event(view='swarm', message=f'event {i}', progress=i) for i in range(50)]
+
+        assert len(set(paths)) == 50
+        assert sorted(p.name for p in tmp_path.iterdir()) == sorted(Path(p).name for p in paths)
+        assert json.loads(Path(paths[7]).read_text())['content'] == 'event 7'
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
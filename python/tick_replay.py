@@ -0,0 +1,942 @@
+#!/usr/bin/env python3
+"""
+Tick Replay - Offline Record/Replay Harness for the Live Path
+==============================================================
+Records ThetaData TradeTick/QuoteTick streams to disk and replays them
+through a client with the same interface as ThetaDataClient, so the
+ShadowTrader -> MultiSymbolBuffer -> strategy fan-out can be load-tested
+without a running Theta Terminal.
+
+Formats (chosen by file extension):
+    *.parquet   One row per tick (requires pyarrow). Easy to inspect in pandas/DuckDB.
+    anything    Compact framed binary: fixed-width numpy records plus an
+                incremental symbol table. No dependencies beyond numpy.
+
+Replay speed:
+    speed=1.0   Real time (inter-tick gaps preserved)
+    speed=N     N x real time
+    speed=None  As fast as the consumer can take ticks (lossless backpressure)
+
+In paced modes the replay client behaves like a live feed: if the consumer
+falls behind and the bounded queue fills up, ticks are dropped and counted.
+
+Usage:
+    # Record 10 minutes of SPY/QQQ from Theta Terminal
+    python tick_replay.py record --symbols SPY QQQ --duration 600 --out spy_qqq.ticks
+
+    # Benchmark ShadowTrader on the recording at max speed with one strategy
+    python tick_replay.py bench spy_qqq.ticks --speed 0 --strategy my_strategy.py
+
+    # Programmatic
+    replay = ReplayClient('spy_qqq.ticks', speed=10.0)
+    await replay.connect()
+    await replay.subscribe_stock_trades(['SPY'])
+    async for tick in replay.stream():
+        ...
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import struct
+import time
+from dataclasses import dataclass, field, asdict
+from datetime import datetime, date, timedelta, timezone
+from pathlib import Path
+from typing import Optional, List, Dict, Any, AsyncGenerator, Callable, Iterator, Tuple, Union
+
+import numpy as np
+
+from thetadata_client import ThetaDataClient, TradeTick, QuoteTick, Tick, SecurityType
+
+logger = logging.getLogger(__name__)
+
+
+# =============================================================================
+# Record Layout
+# =============================================================================
+
+FILE_MAGIC = b'QETICKS1'
+FORMAT_VERSION = 1
+
+KIND_TRADE = 0
+KIND_QUOTE = 1
+
+GREEK_FIELDS = (
+    'delta', 'gamma', 'theta', 'vega', 'rho', 'implied_volatility',
+    'vanna', 'charm', 'vomma', 'veta',
+)
+
+# One fixed-width record per tick. Trades and quotes share the layout:
+# price/size/exchange/condition hold the trade fields or the bid side,
+# ask_* hold the ask side (zero for trades). Greeks are NaN when absent.
+TICK_DTYPE = np.dtype([
+    ('kind', 'u1'),
+    ('security', 'u1'),
+    ('utc', 'u1'),
+    ('symbol_id', '<u4'),
+    ('ts_us', '<i8'),
+    ('price', '<f8'),
+    ('ask_price', '<f8'),
+    ('size', '<i8'),
+    ('ask_size', '<i8'),
+    ('exchange', '<i4'),
+    ('ask_exchange', '<i4'),
+    ('condition', '<i4'),
+    ('ask_condition', '<i4'),
+    ('sequence', '<i8'),
+] + [(name, '<f4') for name in GREEK_FIELDS])
+
+_NO_GREEKS = (float('nan'),) * len(GREEK_FIELDS)
+_EPOCH = datetime(1970, 1, 1)
+_U32 = struct.Struct('<I')
+
+
+def _timestamp_to_us(ts: datetime) -> Tuple[int, int]:
+    """Encode a datetime as (microseconds since epoch, utc flag)."""
+    if ts.tzinfo is not None:
+        return (ts.astimezone(timezone.utc).replace(tzinfo=None) - _EPOCH) // timedelta(microseconds=1), 1
+    return (ts - _EPOCH) // timedelta(microseconds=1), 0
+
+
+def _us_to_timestamp(ts_us: int, utc: int) -> datetime:
+    """Inverse of _timestamp_to_us."""
+    ts = _EPOCH + timedelta(microseconds=int(ts_us))
+    return ts.replace(tzinfo=timezone.utc) if utc else ts
+
+
+def _contract_of(tick: Tick) -> Optional[Dict[str, Any]]:
+    """Option contract metadata for the symbol table (None for stocks)."""
+    if not tick.is_option:
+        return None
+    return {
+        'root': tick.root,
+        'expiration': int(tick.expiration.strftime('%Y%m%d')) if tick.expiration else None,
+        'strike': tick.strike,
+        'right': tick.right,
+    }
+
+
+def _parse_expiration(value: Optional[int]) -> Optional[date]:
+    if not value:
+        return None
+    value = int(value)
+    return date(value // 10000, (value % 10000) // 100, value % 100)
+
+
+# =============================================================================
+# Tick Tape (in-memory recording)
+# =============================================================================
+
+@dataclass
+class TickTape:
+    """
+    A loaded recording: structured tick records plus the symbol table.
+
+    Attributes:
+        records: numpy structured array with TICK_DTYPE, in recorded order
+        symbols: symbol_id -> symbol string
+        contracts: symbol -> option contract metadata (options only)
+    """
+    records: np.ndarray
+    symbols: List[str]
+    contracts: Dict[str, Dict[str, Any]] = field(default_factory=dict)
+
+    def __len__(self) -> int:
+        return len(self.records)
+
+    @property
+    def duration_seconds(self) -> float:
+        """Market time spanned by the recording."""
+        if len(self.records) < 2:
+            return 0.0
+        ts = self.records['ts_us']
+        return float(ts.max() - ts.min()) / 1e6
+
+    def stock_symbols(self) -> List[str]:
+        """Symbols that carry stock ticks."""
+        ids = np.unique(self.records['symbol_id'][self.records['security'] == 0])
+        return [self.symbols[i] for i in ids]
+
+    def tick_at(self, index: int) -> Tick:
+        """Materialize record `index` as a TradeTick or QuoteTick."""
+        r = self.records[index]
+        symbol = self.symbols[r['symbol_id']]
+        security = SecurityType.OPTION if r['security'] else SecurityType.STOCK
+        contract = self.contracts.get(symbol) or {}
+        timestamp = _us_to_timestamp(r['ts_us'], r['utc'])
+
+        option_fields = {
+            'root': contract.get('root'),
+            'expiration': _parse_expiration(contract.get('expiration')),
+            'strike': contract.get('strike'),
+            'right': contract.get('right'),
+        }
+
+        if r['kind'] == KIND_TRADE:
+            return TradeTick(
+                symbol=symbol,
+                price=float(r['price']),
+                size=int(r['size']),
+                timestamp=timestamp,
+                exchange=int(r['exchange']),
+                condition=int(r['condition']),
+                sequence=int(r['sequence']),
+                security_type=security,
+                **option_fields,
+            )
+
+        greeks = {}
+        for name in GREEK_FIELDS:
+            value = float(r[name])
+            greeks[name] = None if np.isnan(value) else value
+
+        return QuoteTick(
+            symbol=symbol,
+            bid_price=float(r['price']),
+            ask_price=float(r['ask_price']),
+            bid_size=int(r['size']),
+            ask_size=int(r['ask_size']),
+            timestamp=timestamp,
+            bid_exchange=int(r['exchange']),
+            ask_exchange=int(r['ask_exchange']),
+            bid_condition=int(r['condition']),
+            ask_condition=int(r['ask_condition']),
+            security_type=security,
+            **option_fields,
+            **greeks,
+        )
+
+    def iter_ticks(self) -> Iterator[Tick]:
+        """Iterate over all ticks in recorded order."""
+        for i in range(len(self.records)):
+            yield self.tick_at(i)
+
+
+# =============================================================================
+# Recorder
+# =============================================================================
+
+class TickRecorder:
+    """
+    Captures a TradeTick/QuoteTick stream to a tick file.
+
+    Ticks are buffered and written in frames of `flush_every` records, so the
+    recorder can be attached directly as the on_trade/on_quote callback of a
+    ThetaDataClient without adding per-tick disk I/O to the live path.
+
+    Usage:
+        recorder = TickRecorder('session.ticks')
+        client = ThetaDataClient(on_trade=recorder.record, on_quote=recorder.record)
+        ...
+        recorder.close()
+    """
+
+    def __init__(self, path: Union[str, Path], flush_every: int = 10_000):
+        self.path = Path(path)
+        self.flush_every = flush_every
+        self.format = 'parquet' if self.path.suffix == '.parquet' else 'binary'
+        self.ticks_recorded = 0
+
+        self._rows: List[tuple] = []
+        self._symbol_ids: Dict[str, int] = {}
+        self._symbols: List[str] = []
+        self._contracts: Dict[str, Dict[str, Any]] = {}
+        self._pending_symbols: List[list] = []
+        self._file = None
+        self._parquet_writer = None
+        self._closed = False
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+
+    def __enter__(self) -> 'TickRecorder':
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def _symbol_id(self, tick: Tick) -> int:
+        symbol_id = self._symbol_ids.get(tick.symbol)
+        if symbol_id is None:
+            symbol_id = len(self._symbols)
+            self._symbol_ids[tick.symbol] = symbol_id
+            self._symbols.append(tick.symbol)
+            contract = _contract_of(tick)
+            if contract:
+                self._contracts[tick.symbol] = contract
+            self._pending_symbols.append([tick.symbol, contract])
+        return symbol_id
+
+    def record(self, tick: Tick) -> None:
+        """Append one tick (TradeTick or QuoteTick)."""
+        if self._closed:
+            raise ValueError(f"TickRecorder for {self.path} is closed")
+
+        symbol_id = self._symbol_id(tick)
+        ts_us, utc = _timestamp_to_us(tick.timestamp)
+        security = 1 if tick.is_option else 0
+
+        if isinstance(tick, QuoteTick):
+            greeks = tuple(
+                float('nan') if getattr(tick, name) is None else getattr(tick, name)
+                for name in GREEK_FIELDS
+            )
+            row = (
+                KIND_QUOTE, security, utc, symbol_id, ts_us,
+                tick.bid_price, tick.ask_price, tick.bid_size, tick.ask_size,
+                tick.bid_exchange, tick.ask_exchange, tick.bid_condition, tick.ask_condition,
+                0,
+            ) + greeks
+        else:
+            row = (
+                KIND_TRADE, security, utc, symbol_id, ts_us,
+                tick.price, 0.0, tick.size, 0,
+                tick.exchange, 0, tick.condition, 0,
+                tick.sequence,
+            ) + _NO_GREEKS
+
+        self._rows.append(row)
+        self.ticks_recorded += 1
+
+        if len(self._rows) >= self.flush_every:
+            self.flush()
+
+    def flush(self) -> None:
+        """Write buffered ticks as one frame (binary) or row group (Parquet)."""
+        if not self._rows and not self._pending_symbols:
+            return
+
+        records = np.array(self._rows, dtype=TICK_DTYPE)
+        self._rows = []
+
+        if self.format == 'parquet':
+            self._write_parquet(records)
+        else:
+            self._write_frame(records)
+        self._pending_symbols = []
+
+    def _write_frame(self, records: np.ndarray) -> None:
+        if self._file is None:
+            self._file = open(self.path, 'wb')
+            header = json.dumps({
+                'version': FORMAT_VERSION,
+                'dtype': [list(d) for d in TICK_DTYPE.descr],
+                'created': datetime.now(timezone.utc).isoformat(),
+            }).encode()
+            self._file.write(FILE_MAGIC + _U32.pack(len(header)) + header)
+
+        symbols = json.dumps(self._pending_symbols).encode()
+        self._file.write(_U32.pack(len(symbols)) + symbols)
+        self._file.write(_U32.pack(len(records)))
+        self._file.write(records.tobytes())
+        self._file.flush()
+
+    def _write_parquet(self, records: np.ndarray) -> None:
+        import pandas as pd
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        df = pd.DataFrame(records)
+        symbols = np.asarray(self._symbols, dtype=object)
+        df['symbol'] = symbols[records['symbol_id']]
+        for key in ('root', 'expiration', 'strike', 'right'):
+            df[key] = df['symbol'].map(lambda s: (self._contracts.get(s) or {}).get(key))
+        df = df.drop(columns=['symbol_id'])
+
+        table = pa.Table.from_pandas(df, preserve_index=False)
+        if self._parquet_writer is None:
+            self._parquet_writer = pq.ParquetWriter(self.path, table.schema)
+        self._parquet_writer.write_table(table)
+
+    def close(self) -> None:
+        """Flush remaining ticks and close the file."""
+        if self._closed:
+            return
+        self.flush()
+        if self._file is not None:
+            self._file.close()
+        if self._parquet_writer is not None:
+            self._parquet_writer.close()
+        self._closed = True
+        logger.info(f"📼 Recorded {self.ticks_recorded:,} ticks to {self.path}")
+
+
+def _read_binary(path: Path) -> TickTape:
+    with open(path, 'rb') as f:
+        data = f.read()
+
+    if data[:len(FILE_MAGIC)] != FILE_MAGIC:
+        raise ValueError(f"{path} is not a tick file (bad magic)")
+
+    offset = len(FILE_MAGIC)
+    (header_len,) = _U32.unpack_from(data, offset)
+    offset += _U32.size
+    header = json.loads(data[offset:offset + header_len])
+    offset += header_len
+
+    file_dtype = np.dtype([tuple(d) for d in header['dtype']])
+    if file_dtype != TICK_DTYPE:
+        raise ValueError(f"{path} uses an unsupported record layout (version {header.get('version')})")
+
+    symbols: List[str] = []
+    contracts: Dict[str, Dict[str, Any]] = {}
+    chunks = []
+
+    while offset < len(data):
+        (symbols_len,) = _U32.unpack_from(data, offset)
+        offset += _U32.size
+        for symbol, contract in json.loads(data[offset:offset + symbols_len]):
+            symbols.append(symbol)
+            if contract:
+                contracts[symbol] = contract
+        offset += symbols_len
+
+        (n_records,) = _U32.unpack_from(data, offset)
+        offset += _U32.size
+        nbytes = n_records * TICK_DTYPE.itemsize
+        chunks.append(np.frombuffer(data, dtype=TICK_DTYPE, count=n_records, offset=offset))
+        offset += nbytes
+
+    records = np.concatenate(chunks) if chunks else np.empty(0, dtype=TICK_DTYPE)
+    return TickTape(records=records, symbols=symbols, contracts=contracts)
+
+
+def _read_parquet(path: Path) -> TickTape:
+    import pandas as pd
+
+    df = pd.read_parquet(path)
+    symbols, symbol_ids = np.unique(df['symbol'].to_numpy(dtype=object).astype(str), return_inverse=True)
+
+    records = np.empty(len(df), dtype=TICK_DTYPE)
+    for name in TICK_DTYPE.names:
+        records[name] = symbol_ids if name == 'symbol_id' else df[name].to_numpy()
+
+    contracts = {}
+    options = df[df['security'] == 1].drop_duplicates('symbol')
+    for row in options.itertuples(index=False):
+        contracts[row.symbol] = {
+            'root': row.root,
+            'expiration': int(row.expiration) if pd.notna(row.expiration) else None,
+            'strike': float(row.strike) if pd.notna(row.strike) else None,
+            'right': row.right,
+        }
+
+    return TickTape(records=records, symbols=[str(s) for s in symbols], contracts=contracts)
+
+
+def read_tick_file(path: Union[str, Path]) -> TickTape:
+    """Load a recording written by TickRecorder."""
+    path = Path(path)
+    if path.suffix == '.parquet':
+        return _read_parquet(path)
+    return _read_binary(path)
+
+
+# =============================================================================
+# Replay Client
+# =============================================================================
+
+_END_OF_TAPE = object()
+
+
+class ReplayClient:
+    """
+    Replays a tick recording through the ThetaDataClient interface.
+
+    connect/subscribe_*/stream/run_forever/disconnect behave like the live
+    client, so anything that consumes `ThetaDataClient.stream()` (ShadowTrader,
+    StreamBuffer pipelines) can be driven offline. Differences from live:
+      - Stale-tick rejection is skipped (recorded timestamps are historical)
+      - The stream ends when the tape is exhausted
+      - Subscriptions are resolved when stream() starts
+
+    Attributes:
+        ticks_emitted: Ticks handed to the queue
+        ticks_dropped: Ticks dropped because the consumer fell behind (paced modes)
+        last_arrival: perf_counter() at which the most recently yielded tick
+                      arrived (dequeue time at max speed) - used for
+                      tick-to-signal latency measurement
+    """
+
+    def __init__(
+        self,
+        source: Union[str, Path, TickTape],
+        speed: Optional[float] = 1.0,
+        queue_size: int = 10_000,
+        on_trade: Optional[Callable[[TradeTick], None]] = None,
+        on_quote: Optional[Callable[[QuoteTick], None]] = None,
+        on_disconnect: Optional[Callable[[], None]] = None,
+        on_reconnect: Optional[Callable[[], None]] = None,
+    ):
+        """
+        Args:
+            source: Tick file path or an already-loaded TickTape
+            speed: Replay speed multiplier; None or 0 replays at max speed
+            queue_size: Bound on ticks buffered between replay and consumer
+            on_trade/on_quote/on_disconnect/on_reconnect: Same as ThetaDataClient
+        """
+        self.tape = source if isinstance(source, TickTape) else read_tick_file(source)
+        self.speed = speed if speed else None
+        self.queue_size = queue_size
+
+        self.on_trade = on_trade
+        self.on_quote = on_quote
+        self.on_disconnect = on_disconnect
+        self.on_reconnect = on_reconnect
+
+        self._connected = False
+        self._running = False
+        self._request_id = 0
+        self._subscriptions: Dict[int, Dict[str, Any]] = {}
+        self._queue: Optional[asyncio.Queue] = None
+        self._producer: Optional[asyncio.Task] = None
+
+        self.ticks_emitted = 0
+        self.ticks_dropped = 0
+        self.last_arrival: Optional[float] = None
+
+        logger.info(
+            f"ReplayClient initialized ({len(self.tape):,} ticks, "
+            f"{'max' if self.speed is None else f'{self.speed:g}x'} speed)"
+        )
+
+    @property
+    def is_connected(self) -> bool:
+        return self._connected
+
+    async def connect(self) -> bool:
+        self._connected = True
+        self._running = True
+        self._queue = asyncio.Queue(maxsize=self.queue_size)
+        return True
+
+    async def disconnect(self) -> None:
+        self._running = False
+        self._connected = False
+        if self._producer and not self._producer.done():
+            self._producer.cancel()
+            await asyncio.gather(self._producer, return_exceptions=True)
+
+    def _next_request_id(self) -> int:
+        self._request_id += 1
+        return self._request_id
+
+    def _subscribe(self, sub_info: Dict[str, Any]) -> int:
+        req_id = self._next_request_id()
+        self._subscriptions[req_id] = sub_info
+        return req_id
+
+    # -------------------------------------------------------------------------
+    # Subscriptions (mirror ThetaDataClient bookkeeping)
+    # -------------------------------------------------------------------------
+
+    async def subscribe_stock_trades(self, symbols: List[str]) -> List[int]:
+        return [self._subscribe({'type': 'stock_trade', 'symbol': s.upper()}) for s in symbols]
+
+    async def subscribe_stock_quotes(self, symbols: List[str]) -> List[int]:
+        return [self._subscribe({'type': 'stock_quote', 'symbol': s.upper()}) for s in symbols]
+
+    async def subscribe_option_trades(self, root: str, expiration: date, strike: float, right: str) -> int:
+        return self._subscribe({
+            'type': 'option_trade', 'root': root.upper(), 'expiration': expiration,
+            'strike': strike, 'right': right.upper(),
+        })
+
+    async def subscribe_option_quotes(self, root: str, expiration: date, strike: float, right: str) -> int:
+        return self._subscribe({
+            'type': 'option_quote', 'root': root.upper(), 'expiration': expiration,
+            'strike': strike, 'right': right.upper(),
+        })
+
+    async def subscribe_all_option_trades(self) -> int:
+        return self._subscribe({'type': 'all_option_trades'})
+
+    async def unsubscribe(self, request_id: int) -> bool:
+        return self._subscriptions.pop(request_id, None) is not None
+
+    async def unsubscribe_all(self) -> None:
+        self._subscriptions.clear()
+
+    def _subscription_mask(self) -> np.ndarray:
+        """Boolean mask over tape records selected by the current subscriptions."""
+        n_symbols = len(self.tape.symbols)
+        trade_ok = np.zeros(n_symbols, dtype=bool)
+        quote_ok = np.zeros(n_symbols, dtype=bool)
+        symbol_ids = {s: i for i, s in enumerate(self.tape.symbols)}
+
+        for sub in self._subscriptions.values():
+            sub_type = sub['type']
+            if sub_type in ('stock_trade', 'stock_quote'):
+                i = symbol_ids.get(sub['symbol'])
+                if i is not None and sub['symbol'] not in self.tape.contracts:
+                    (trade_ok if sub_type == 'stock_trade' else quote_ok)[i] = True
+            elif sub_type in ('option_trade', 'option_quote'):
+                exp_int = int(sub['expiration'].strftime('%Y%m%d'))
+                for symbol, contract in self.tape.contracts.items():
+                    if (contract.get('root') == sub['root'] and contract.get('expiration') == exp_int
+                            and contract.get('strike') == sub['strike'] and contract.get('right') == sub['right']):
+                        (trade_ok if sub_type == 'option_trade' else quote_ok)[symbol_ids[symbol]] = True
+            elif sub_type == 'all_option_trades':
+                for symbol in self.tape.contracts:
+                    trade_ok[symbol_ids[symbol]] = True
+
+        records = self.tape.records
+        sid = records['symbol_id']
+        return np.where(records['kind'] == KIND_TRADE, trade_ok[sid], quote_ok[sid])
+
+    # -------------------------------------------------------------------------
+    # Streaming
+    # -------------------------------------------------------------------------
+
+    async def _produce(self) -> None:
+        """Push subscribed ticks into the queue at the configured pace."""
+        indices = np.flatnonzero(self._subscription_mask())
+        paced = self.speed is not None
+
+        if paced and len(indices):
+            ts = self.tape.records['ts_us'][indices]
+            offsets = (ts - ts[0]) / 1e6 / self.speed
+        else:
+            offsets = None
+
+        started = time.perf_counter()
+        try:
+            for k, index in enumerate(indices):
+                if not self._running:
+                    break
+
+                if paced:
+                    delay = started + offsets[k] - time.perf_counter()
+                    await asyncio.sleep(max(delay, 0.0))
+
+                item = (time.perf_counter(), self.tape.tick_at(index))
+                if paced:
+                    try:
+                        self._queue.put_nowait(item)
+                    except asyncio.QueueFull:
+                        self.ticks_dropped += 1
+                        continue
+                else:
+                    await self._queue.put(item)
+                self.ticks_emitted += 1
+
+            if self._running:
+                # Tape exhausted: the end marker queues behind the remaining ticks
+                await self._queue.put(_END_OF_TAPE)
+                return
+        except asyncio.CancelledError:
+            self._end_stream()
+            raise
+        self._end_stream()
+
+    def _end_stream(self) -> None:
+        """
+        Wake a waiting stream() after disconnect without blocking.
+
+        The consumer may have stopped reading with the queue full, so
+        undelivered ticks are discarded to make room for the end marker.
+        """
+        while self._queue.full():
+            self._queue.get_nowait()
+        self._queue.put_nowait(_END_OF_TAPE)
+
+    async def stream(self) -> AsyncGenerator[Tick, None]:
+        """
+        Async generator that yields replayed ticks.
+
+        Usage:
+            async for tick in client.stream():
+                process(tick)
+        """
+        if not self._connected:
+            raise ConnectionError("Not connected. Call connect() first.")
+
+        if self._producer is None:
+            self._producer = asyncio.create_task(self._produce())
+
+        while self._running:
+            item = await self._queue.get()
+            if item is _END_OF_TAPE:
+                break
+
+            # At max speed the queue is always full, so time from dequeue;
+            # paced replays include queueing delay like a live feed would
+            arrival, tick = item
+            self.last_arrival = time.perf_counter() if self.speed is None else arrival
+            if isinstance(tick, TradeTick):
+                if self.on_trade:
+                    self.on_trade(tick)
+            elif self.on_quote:
+                self.on_quote(tick)
+            yield tick
+
+        self._connected = False
+        if self.on_disconnect:
+            self.on_disconnect()
+
+    async def run_forever(self) -> None:
+        """Replay the whole tape, processing ticks via callbacks."""
+        async for _ in self.stream():
+            pass
+
+
+# =============================================================================
+# Benchmark Harness
+# =============================================================================
+
+class LatencyHistogram:
+    """Latency samples in milliseconds with log-spaced bucket counts."""
+
+    BUCKET_EDGES_MS = (0.1, 0.25, 0.5, 1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+
+    def __init__(self):
+        self._samples: List[float] = []
+
+    def add(self, latency_ms: float) -> None:
+        self._samples.append(latency_ms)
+
+    def __len__(self) -> int:
+        return len(self._samples)
+
+    def summary(self) -> Dict[str, Any]:
+        """Count, mean, percentiles and bucket counts."""
+        if not self._samples:
+            return {'count': 0}
+
+        samples = np.asarray(self._samples)
+        p50, p90, p99 = np.percentile(samples, [50, 90, 99])
+        edges = np.asarray(self.BUCKET_EDGES_MS)
+        counts = np.bincount(np.searchsorted(edges, samples), minlength=len(edges) + 1)
+
+        buckets = {f"<={edge:g}ms": int(c) for edge, c in zip(edges, counts[:-1])}
+        buckets[f">{edges[-1]:g}ms"] = int(counts[-1])
+
+        return {
+            'count': len(samples),
+            'mean': float(samples.mean()),
+            'p50': float(p50),
+            'p90': float(p90),
+            'p99': float(p99),
+            'max': float(samples.max()),
+            'buckets': buckets,
+        }
+
+
+@dataclass
+class ReplayReport:
+    """Result of one ShadowTrader replay run."""
+    ticks_emitted: int
+    ticks_dropped: int
+    bars_processed: int
+    signals: int
+    strategy_runs: int
+    wall_seconds: float
+    speed: Optional[float]
+    tick_to_signal_ms: Dict[str, Any]
+    trader_stats: Dict[str, Any] = field(default_factory=dict)
+
+    @property
+    def ticks_per_sec(self) -> float:
+        return self.ticks_emitted / self.wall_seconds if self.wall_seconds > 0 else 0.0
+
+    @property
+    def bars_per_sec(self) -> float:
+        return self.bars_processed / self.wall_seconds if self.wall_seconds > 0 else 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        result = asdict(self)
+        result['ticks_per_sec'] = self.ticks_per_sec
+        result['bars_per_sec'] = self.bars_per_sec
+        return result
+
+
+_OFFLINE_TRADER_CLS = None
+
+
+def _offline_trader_class():
+    """
+    ShadowTrader with its Supabase touchpoints replaced for offline replay.
+
+    Strategies come from the caller instead of strategy_genome, and signals
+    are timed and counted instead of being filled against the database.
+    Imported lazily - daemon.py is heavy and recording does not need it.
+    """
+    global _OFFLINE_TRADER_CLS
+    if _OFFLINE_TRADER_CLS is not None:
+        return _OFFLINE_TRADER_CLS
+
+    from daemon import ShadowTrader
+
+    class OfflineShadowTrader(ShadowTrader):
+        MIN_LATENCY_MS = 0
+        MAX_LATENCY_MS = 0
+
+        def __init__(self, strategies: List[Dict[str, Any]], latency: LatencyHistogram, **kwargs):
+            super().__init__(supabase=None, regime_monitor=None, **kwargs)
+            self._replay_strategies = strategies
+            self._latency = latency
+
+        async def _restore_open_positions(self) -> None:
+            return
+
+        async def _get_live_strategies(self, symbol: str) -> List[Dict[str, Any]]:
+            strategies = []
+            for s in self._replay_strategies:
+                config = s.get('dna_config', {}) or {}
+                strategy_symbols = config.get('symbols', self.symbols)
+                if symbol in strategy_symbols or not strategy_symbols:
+                    strategies.append(s)
+            return strategies
+
+        async def submit_signal(self, signal) -> None:
+            arrival = getattr(self._client, 'last_arrival', None)
+            if arrival is not None:
+                self._latency.add((time.perf_counter() - arrival) * 1000)
+            await super().submit_signal(signal)
+
+        async def _execute_signal(self, signal, latency_ms: int) -> None:
+            self.stats['replay_signals_executed'] = self.stats.get('replay_signals_executed', 0) + 1
+
+        async def _position_updater(self) -> None:
+            while self._running:
+                await asyncio.sleep(1)
+
+    _OFFLINE_TRADER_CLS = OfflineShadowTrader
+    return _OFFLINE_TRADER_CLS
+
+
+async def replay_shadow_trader(
+    source: Union[str, Path, TickTape],
+    strategies: List[Dict[str, Any]],
+    symbols: Optional[List[str]] = None,
+    speed: Optional[float] = None,
+    queue_size: int = 10_000,
+) -> ReplayReport:
+    """
+    Drive ShadowTrader from a tick recording and measure the live path.
+
+    Args:
+        source: Tick file path or loaded TickTape
+        strategies: strategy_genome-style dicts with id, name, code_content, dna_config
+        symbols: Symbols to stream (default: every stock symbol on the tape)
+        speed: Replay speed multiplier; None/0 = max speed
+        queue_size: Replay queue bound (drops are counted in paced modes)
+
+    Returns:
+        ReplayReport with tick-to-signal latency histogram, bars/sec and drops
+    """
+    tape = source if isinstance(source, TickTape) else read_tick_file(source)
+    symbols = symbols or tape.stock_symbols()
+
+    client = ReplayClient(tape, speed=speed, queue_size=queue_size)
+    latency = LatencyHistogram()
+    trader = _offline_trader_class()(strategies=strategies, latency=latency, symbols=symbols, client=client)
+
+    started = time.perf_counter()
+    await trader.start()
+    if not trader._running:
+        raise RuntimeError("ShadowTrader failed to start on the replay feed")
+
+    # The tick consumer exits when the tape is exhausted
+    await trader._tick_task
+    while not trader._pending_signals.empty():
+        await asyncio.sleep(0.01)
+    wall_seconds = time.perf_counter() - started
+
+    await trader.stop()
+
+    return ReplayReport(
+        ticks_emitted=client.ticks_emitted,
+        ticks_dropped=client.ticks_dropped,
+        bars_processed=trader.stats['bars_processed'],
+        signals=trader.stats['signals_received'],
+        strategy_runs=trader.stats['strategy_runs'],
+        wall_seconds=wall_seconds,
+        speed=client.speed,
+        tick_to_signal_ms=latency.summary(),
+        trader_stats=dict(trader.stats),
+    )
+
+
+def load_strategy_files(paths: List[Union[str, Path]]) -> List[Dict[str, Any]]:
+    """Wrap strategy source files (each defining `Strategy`) as strategy_genome dicts."""
+    strategies = []
+    for path in map(Path, paths):
+        strategies.append({
+            'id': path.stem,
+            'name': path.stem,
+            'code_content': path.read_text(),
+            'dna_config': {},
+            'status': 'shadow',
+        })
+    return strategies
+
+
+# =============================================================================
+# CLI
+# =============================================================================
+
+async def _record(args: argparse.Namespace) -> None:
+    recorder = TickRecorder(args.out)
+    client = ThetaDataClient(on_trade=recorder.record, on_quote=recorder.record)
+
+    if not await client.connect():
+        raise ConnectionError("Failed to connect to Theta Terminal")
+
+    try:
+        await client.subscribe_stock_trades(args.symbols)
+        if not args.trades_only:
+            await client.subscribe_stock_quotes(args.symbols)
+        try:
+            await asyncio.wait_for(client.run_forever(), timeout=args.duration)
+        except asyncio.TimeoutError:
+            pass
+    finally:
+        await client.disconnect()
+        recorder.close()
+
+
+async def _bench(args: argparse.Namespace) -> None:
+    tape = read_tick_file(args.tape)
+    logger.info(f"📼 {args.tape}: {len(tape):,} ticks over {tape.duration_seconds:,.0f}s of market time")
+
+    report = await replay_shadow_trader(
+        tape,
+        strategies=load_strategy_files(args.strategy or []),
+        symbols=args.symbols,
+        speed=args.speed,
+        queue_size=args.queue_size,
+    )
+    result = report.to_dict()
+    print(json.dumps(result, indent=2, default=str))
+
+    if args.json:
+        Path(args.json).write_text(json.dumps(result, indent=2, default=str))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Record and replay ThetaData tick streams')
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    rec = sub.add_parser('record', help='Record live ticks from Theta Terminal')
+    rec.add_argument('--symbols', nargs='+', default=['SPY', 'QQQ', 'IWM'])
+    rec.add_argument('--duration', type=float, default=3600, help='Seconds to record (default: 3600)')
+    rec.add_argument('--out', required=True, help='Output file (.parquet or binary)')
+    rec.add_argument('--trades-only', action='store_true', help='Skip quote subscriptions')
+
+    bench = sub.add_parser('bench', help='Replay a recording through ShadowTrader')
+    bench.add_argument('tape', help='Tick file written by `record`')
+    bench.add_argument('--speed', type=float, default=0,
+                       help='Replay speed multiplier; 0 = max speed (default: 0)')
+    bench.add_argument('--strategy', action='append', help='Strategy .py file (repeatable)')
+    bench.add_argument('--symbols', nargs='+', help='Symbols to stream (default: all on tape)')
+    bench.add_argument('--queue-size', type=int, default=10_000)
+    bench.add_argument('--json', help='Write the report to this path')
+
+    args = parser.parse_args()
+    asyncio.run(_record(args) if args.command == 'record' else _bench(args))
+
+
+if __name__ == '__main__':
+    main()
@@ -12,6 +12,11 @@
  * 4. This watcher picks up the file
  * 5. Inserts result as chat_message to Supabase
  * 6. UI updates via real-time subscription
+ *
+ * JARVIS engine events (python/engine/ui_bridge.py) arrive batched in an
+ * append-only segmented log under /tmp/claude-code-results/events/
+ * (one JSON event per line); this watcher tails the segments. Per-event
+ * JSON files are still accepted as a fallback.
  */
 
 import * as fs from 'fs';
@@ -22,12 +27,25 @@ import { BrowserWindow } from 'electron';
 // Result directory that Claude Code writes to
 const RESULTS_DIR = '/tmp/claude-code-results';
 
+// Segmented engine event log written by the Python UI bridge
+const EVENT_LOG_DIR = path.join(RESULTS_DIR, 'events');
+
+// Segments older than this at startup are skipped instead of replayed
+const STALE_SEGMENT_MS = 5 * 60 * 1000;
+
+// A writer's newest segment is retired once read if untouched this long
+const IDLE_SEGMENT_MS = 5 * 60 * 1000;
+
 // Reference to main window for sending IPC events
 let mainWindowRef: BrowserWindow | null = null;
 
 // Track files being processed to avoid duplicate processing
 const processingFiles = new Set<string>();
 
+// Bytes consumed per event log segment
+const segmentOffsets = new Map<string, number>();
+let segmentReadTimer: ReturnType<typeof setTimeout> | null = null;
+
 /**
  * Set the main window reference for IPC communication
  */
@@ -98,6 +116,9 @@ function startWatching(): void {
   // Process any existing files first (in case app restarted mid-execution)
   processExistingFiles();
 
+  // Tail the engine event log
+  startEventLogTail();
+
   // Watch for new files
   fs.watch(RESULTS_DIR, { persistent: true }, async (eventType, filename) => {
     if (eventType === 'rename' && filename && filename.endsWith('.json')) {
@@ -159,20 +180,7 @@ async function processResultFile(filePath: string): Promise<void> {
     // JARVIS: Engine events go directly to UI via IPC (no Supabase)
     if (isEngineEvent(result)) {
       console.log('[ClaudeCodeWatcher] JARVIS engine event:', result.activity_type);
-
-      if (mainWindowRef && !mainWindowRef.isDestroyed()) {
-        mainWindowRef.webContents.send('jarvis-event', {
-          sessionId: result.session_id,
-          activityType: result.activity_type,
-          content: result.content,
-          timestamp: result.timestamp,
-          displayDirectives: result.display_directives || [],
-          data: result.data || {}
-        });
-        console.log('[ClaudeCodeWatcher] Sent JARVIS event to renderer');
-      } else {
-        console.warn('[ClaudeCodeWatcher] No window reference, cannot send JARVIS event');
-      }
+      sendEngineEvent(result);
 
       // Delete processed engine event file
       fs.unlinkSync(filePath);
@@ -262,6 +270,151 @@ async function processResultFile(filePath: string): Promise<void> {
   }
 }
 
+/**
+ * Forward a JARVIS engine event to the renderer
+ */
+function sendEngineEvent(result: ClaudeCodeResult): void {
+  if (mainWindowRef && !mainWindowRef.isDestroyed()) {
+    mainWindowRef.webContents.send('jarvis-event', {
+      sessionId: result.session_id,
+      activityType: result.activity_type,
+      content: result.content,
+      timestamp: result.timestamp,
+      displayDirectives: result.display_directives || [],
+      data: result.data || {}
+    });
+  } else {
+    console.warn('[ClaudeCodeWatcher] No window reference, cannot send JARVIS event');
+  }
+}
+
+/**
+ * Tail the segmented engine event log
+ */
+function startEventLogTail(): void {
+  if (!fs.existsSync(EVENT_LOG_DIR)) {
+    fs.mkdirSync(EVENT_LOG_DIR, { recursive: true });
+  }
+
+  // Skip segments left over from earlier runs
+  const now = Date.now();
+  for (const file of fs.readdirSync(EVENT_LOG_DIR)) {
+    const filePath = path.join(EVENT_LOG_DIR, file);
+    try {
+      const stat = fs.statSync(filePath);
+      if (file.endsWith('.ndjson') && now - stat.mtimeMs > STALE_SEGMENT_MS) {
+        segmentOffsets.set(filePath, stat.size);
+      }
+    } catch {
+      // Segment rotated away between readdir and stat
+    }
+  }
+  readEventSegments();
+
+  // Watch events can burst; read at most once per tick window
+  fs.watch(EVENT_LOG_DIR, { persistent: true }, () => {
+    if (!segmentReadTimer) {
+      segmentReadTimer = setTimeout(() => {
+        segmentReadTimer = null;
+        readEventSegments();
+      }, 20);
+    }
+  });
+  // Safety net for missed watch notifications
+  setInterval(readEventSegments, 1000);
+}
+
+/**
+ * Whether the process behind a segment writer (<start_ms>-<pid>) is running
+ */
+function isWriterAlive(writer: string): boolean {
+  const pid = Number(writer.slice(writer.lastIndexOf('-') + 1));
+  if (!Number.isInteger(pid) || pid <= 0) {
+    return false;
+  }
+  try {
+    process.kill(pid, 0);
+    return true;
+  } catch (error: any) {
+    // EPERM: the process exists but belongs to another user
+    return error?.code === 'EPERM';
+  }
+}
+
+/**
+ * Read complete new lines from every segment and dispatch them
+ */
+function readEventSegments(): void {
+  let files: string[];
+  try {
+    files = fs.readdirSync(EVENT_LOG_DIR).filter(f => f.endsWith('.ndjson')).sort();
+  } catch (error) {
+    console.error('[ClaudeCodeWatcher] Cannot read event log:', error);
+    return;
+  }
+
+  // Newest segment per writer (<start_ms>-<pid>) is still being appended to
+  const newestByWriter = new Map<string, string>();
+  for (const file of files) {
+    newestByWriter.set(file.slice(0, file.lastIndexOf('-')), file);
+  }
+
+  for (const file of files) {
+    const filePath = path.join(EVENT_LOG_DIR, file);
+    let offset = segmentOffsets.get(filePath) ?? 0;
+    let size: number;
+    let mtimeMs: number;
+    try {
+      ({ size, mtimeMs } = fs.statSync(filePath));
+    } catch {
+      segmentOffsets.delete(filePath);
+      continue;
+    }
+    if (size < offset) {
+      offset = 0;
+    }
+
+    if (size > offset) {
+      const buffer = Buffer.alloc(size - offset);
+      const fd = fs.openSync(filePath, 'r');
+      try {
+        fs.readSync(fd, buffer, 0, buffer.length, offset);
+      } finally {
+        fs.closeSync(fd);
+      }
+
+      // Only consume complete lines; a partial tail is re-read next time
+      const end = buffer.lastIndexOf(0x0a);
+      if (end >= 0) {
+        for (const line of buffer.subarray(0, end).toString('utf-8').split('\n')) {
+          if (!line) continue;
+          try {
+            sendEngineEvent(JSON.parse(line));
+          } catch (error) {
+            console.error('[ClaudeCodeWatcher] Bad event log line:', error);
+          }
+        }
+        offset += end + 1;
+      }
+    }
+    segmentOffsets.set(filePath, offset);
+
+    // Retire fully read segments once their writer has moved on, exited,
+    // or gone idle (an idle writer that resumes recreates the segment)
+    const writer = file.slice(0, file.lastIndexOf('-'));
+    if (offset >= size && (newestByWriter.get(writer) !== file
+        || Date.now() - mtimeMs > IDLE_SEGMENT_MS
+        || !isWriterAlive(writer))) {
+      try {
+        fs.unlinkSync(filePath);
+      } catch {
+        // Already removed by the writer's retention
+      }
+      segmentOffsets.delete(filePath);
+    }
+  }
+}
+
 /**
  * Get the results directory path (for Claude Code prompt)
  */